@@ -1,15 +1,16 @@
 from django.contrib import admin
-from api.models import Citizen, Authority, Category, SubCategory, Report
+from django.db.models import Count
+from api.models import Citizen, Authority, Category, SubCategory, Report, ArchivedReport
 
 
 @admin.register(Citizen)
 class CitizenAdmin(admin.ModelAdmin):
     """Admin interface for Citizen model"""
-    list_display = ['id', 'name', 'email']
+    list_display = ['id', 'name', 'email', 'is_active']
     search_fields = ['name', 'email']
-    list_filter = ['id']
+    list_filter = ['is_active']
     ordering = ['-id']
-    readonly_fields = ['id']
+    readonly_fields = ['id', 'deactivated_at']
 
 
 @admin.register(Authority)
@@ -28,16 +29,22 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ['id', 'report_type', 'get_subcategories_count']
     search_fields = ['report_type']
     readonly_fields = ['id']
-    
+
+    def get_queryset(self, request):
+        # Count subcategories in the changelist query instead of once per row
+        return super().get_queryset(request).annotate(subcategories_count=Count('subcategories'))
+
     def get_subcategories_count(self, obj):
-        return obj.subcategories.count()
+        return obj.subcategories_count
     get_subcategories_count.short_description = 'Subcategories'
+    get_subcategories_count.admin_order_field = 'subcategories_count'
 
 
 @admin.register(SubCategory)
 class SubCategoryAdmin(admin.ModelAdmin):
     """Admin interface for SubCategory model"""
-    list_display = ['id', 'sub_category', 'report_type']
+    list_display = ['id', 'sub_category', 'report_type', 'severity']
+    list_editable = ['severity']
     list_filter = ['report_type']
     search_fields = ['sub_category']
     readonly_fields = ['id']
@@ -49,5 +56,19 @@ class ReportAdmin(admin.ModelAdmin):
     """Admin interface for Report model"""
     list_display = ['id', 'report_type']
     list_filter = ['report_type']
-    readonly_fields = ['id']
+    readonly_fields = ['id', 'priority', 'confirmation_count']
     ordering = ['-id']
+
+
+@admin.register(ArchivedReport)
+class ArchivedReportAdmin(admin.ModelAdmin):
+    """Read-only admin interface for ArchivedReport model"""
+    list_display = ['id', 'report_type', 'created_at', 'archived_at']
+    list_filter = ['report_type']
+    ordering = ['-id']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        # Register signal handlers
+        from api import signals  # noqa: F401
+        # Register background tasks and housekeeping
+        from api.services import (  # noqa: F401
+            alerts, citizen_deletion, confirmations, idempotency, mail, media_pipeline, notifications, outbox, triage,
+        )
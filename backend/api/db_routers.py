@@ -0,0 +1,75 @@
+"""
+Routing of reads to database replicas.
+
+Writes always go to the primary. Reads go to a replica only inside
+``replica_reads()``, which the read-only API actions enter (see
+``ReplicaReadMixin``), so anything not explicitly marked safe for slightly
+stale data keeps reading from the primary.
+
+Read-your-writes: after a user writes (e.g. a citizen creates a report)
+they are marked sticky for ``REPLICA_STICKY_SECONDS``, and their requests
+read from the primary until replicas have caught up.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Let reads in this context (and threads it hands work to) use replicas"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def sticky_key(user_type, user_id):
+    return f'db_sticky:{user_type}:{user_id}'
+
+
+def mark_sticky(user_type, user_id):
+    """Pin a user's reads to the primary after a write"""
+    cache.set(sticky_key(user_type, user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user_type, user_id):
+    return bool(user_id) and cache.get(sticky_key(user_type, user_id)) is not None
+
+
+async def amark_sticky(user_type, user_id):
+    await cache.aset(sticky_key(user_type, user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+async def ais_sticky(user_type, user_id):
+    return bool(user_id) and await cache.aget(sticky_key(user_type, user_id)) is not None
+
+
+class ReplicaRouter:
+    """Send reads to a random replica inside replica_reads(), everything else to default"""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
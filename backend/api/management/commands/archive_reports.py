@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.services.archive import archive_batches, archive_candidates, months_ago
+
+
+class Command(BaseCommand):
+    help = 'Moves resolved reports older than N months to the archive table, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=settings.REPORT_ARCHIVE_MONTHS,
+            help='Archive resolved reports created more than this many months ago',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of reports moved per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the reports that would be archived',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = months_ago(options['months'])
+
+        if options['dry_run']:
+            count = archive_candidates(cutoff).count()
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {count} resolved reports created before {cutoff:%Y-%m-%d} would be archived'
+            ))
+            return
+
+        self.stdout.write(self.style.WARNING(
+            f'Archiving resolved reports created before {cutoff:%Y-%m-%d}...'
+        ))
+        archived = 0
+        for moved in archive_batches(cutoff, batch_size=options['batch_size']):
+            archived += moved
+            self.stdout.write(f'  {archived} reports archived')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Archived {archived} reports'))
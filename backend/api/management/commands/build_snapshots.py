@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.services.snapshots import FORMATS, build, reports_dir
+
+
+class Command(BaseCommand):
+    help = 'Writes open-data snapshots of reports (GeoJSON and CSV, gzipped), one file per day and format'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--formats',
+            default=','.join(FORMATS),
+            help=f"Comma-separated formats to write ({', '.join(FORMATS)})",
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rewrite every day, not only the days whose reports changed',
+        )
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows fetched per round trip')
+
+    def handle(self, *args, **options):
+        formats = [fmt for fmt in options['formats'].split(',') if fmt]
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise CommandError(f"Unknown formats: {', '.join(sorted(unknown))}")
+
+        self.stdout.write(self.style.WARNING(f'Building report snapshots in {reports_dir()}...'))
+        counts = build(full=options['full'], formats=formats, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {counts['written']} days written, {counts['unchanged']} unchanged, {counts['removed']} removed"
+        ))
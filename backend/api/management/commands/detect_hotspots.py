@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from api.services.hotspots import detect_hotspots
+
+
+class Command(BaseCommand):
+    help = 'Detects report hotspots, folding in reports created since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Discard the stored cell counts and reprocess every report (runs also do this '
+                 'every HOTSPOT_FULL_REBUILD_INTERVAL seconds)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100_000,
+            help='Number of reports loaded per query',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Detecting hotspots...'))
+
+        run = detect_hotspots(full=options['full'], batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ Processed {run.reports_processed} new reports (created up to {run.watermark:%Y-%m-%d %H:%M:%S}), '
+                f'{run.hotspots_found} hotspots in refreshed sub-categories'
+            )
+        )
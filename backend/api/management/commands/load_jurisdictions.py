@@ -0,0 +1,97 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.models import Authority, Report
+from api.services import jurisdictions
+from api.services.spatial import polygon_rings
+
+
+class Command(BaseCommand):
+    help = 'Loads authority jurisdiction polygons from a GeoJSON FeatureCollection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='GeoJSON file; each feature needs an "authority_id" or "authority_email" property',
+        )
+        parser.add_argument(
+            '--assign-existing',
+            action='store_true',
+            help='Route reports that have no assigned authority yet',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of reports routed per batch with --assign-existing',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path']) as f:
+                collection = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read GeoJSON: {e}')
+
+        if collection.get('type') != 'FeatureCollection':
+            raise CommandError('Expected a GeoJSON FeatureCollection.')
+
+        self.stdout.write(self.style.WARNING('Loading jurisdictions...'))
+        loaded = 0
+        with transaction.atomic():
+            for index, feature in enumerate(collection.get('features', [])):
+                properties = feature.get('properties') or {}
+                geometry = feature.get('geometry') or {}
+                try:
+                    polygon_rings(geometry)
+                except (ValueError, KeyError, TypeError) as e:
+                    raise CommandError(f'Feature {index}: invalid geometry ({e}).')
+
+                authority = self.find_authority(properties)
+                if authority is None:
+                    raise CommandError(f'Feature {index}: no matching authority for {properties}.')
+
+                authority.jurisdiction = geometry
+                authority.save(update_fields=['jurisdiction'])
+                loaded += 1
+                self.stdout.write(self.style.SUCCESS(f'✓ {authority.authority_name}'))
+
+        jurisdictions.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'\n✓ Loaded {loaded} jurisdictions'))
+
+        if options['assign_existing']:
+            self.assign_existing(options['batch_size'])
+
+    def find_authority(self, properties):
+        if properties.get('authority_id') is not None:
+            return Authority.objects.filter(id=properties['authority_id']).first()
+        if properties.get('authority_email'):
+            return Authority.objects.filter(email=properties['authority_email'].lower()).first()
+        return None
+
+    def assign_existing(self, batch_size):
+        """Route unassigned reports in ID-ordered batches"""
+        index = jurisdictions.get_index()
+        last_id = 0
+        routed = 0
+        while True:
+            batch = list(
+                Report.objects.filter(id__gt=last_id, assigned_authority__isnull=True)
+                .order_by('id')
+                .values_list('id', 'latitude', 'longitude')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+
+            by_authority = {}
+            for report_id, latitude, longitude in batch:
+                authority_id = index.lookup(latitude, longitude)
+                if authority_id is not None:
+                    by_authority.setdefault(authority_id, []).append(report_id)
+            for authority_id, report_ids in by_authority.items():
+                Report.objects.filter(id__in=report_ids).update(assigned_authority_id=authority_id)
+                routed += len(report_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Routed {routed} existing reports'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from api.models import Report
+from api.services import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the fallback report search index (no-op on PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of reports indexed per batch',
+        )
+
+    def handle(self, *args, **options):
+        if search.uses_native_search():
+            self.stdout.write(self.style.SUCCESS(
+                '✓ PostgreSQL maintains reports.search_vector itself, nothing to rebuild'
+            ))
+            return
+
+        self.stdout.write(self.style.WARNING('Rebuilding report search index...'))
+        indexed = search.rebuild_index(Report.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Indexed {indexed} reports'))
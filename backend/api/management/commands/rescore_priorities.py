@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from api.services.triage import rescore
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the triage priority of open reports changed since the last run (workers also do this every PRIORITY_INTERVAL seconds)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rescore every open report (runs also do this every PRIORITY_FULL_INTERVAL seconds)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Rescoring open reports...'))
+
+        result = rescore(full=options['full'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Scored {result['scored']} open reports, updated {result['updated']}, "
+                f"reset {result['closed']} closed reports"
+            )
+        )
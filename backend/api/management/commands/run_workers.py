@@ -0,0 +1,107 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from api.services.jobs import Worker
+
+
+def run_threads(threads, stop, worker_options, burst):
+    """
+    Run ``threads`` workers in this process until ``stop`` is set.
+
+    Returns:
+        int: Number of jobs processed
+    """
+    if threads == 1:
+        return Worker(**worker_options).run(stop, burst=burst)
+
+    processed = []
+
+    def work():
+        try:
+            processed.append(Worker(**worker_options).run(stop, burst=burst))
+        finally:
+            # Each thread has its own database connections
+            connections.close_all()
+
+    pool = [threading.Thread(target=work, name=f'job-worker-{i}') for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(processed)
+
+
+def child_main(threads, worker_options, burst, total):
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    processed = run_threads(threads, stop, worker_options, burst)
+    with total.get_lock():
+        total.value += processed
+
+
+class Command(BaseCommand):
+    help = 'Runs background job workers (processes x threads) until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes')
+        parser.add_argument('--threads', type=int, default=1, help='Worker threads per process')
+        parser.add_argument(
+            '--queues',
+            default='',
+            help='Comma-separated queues to take jobs from (default: all)',
+        )
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed at a time')
+        parser.add_argument('--poll-interval', type=float, default=None, help='Seconds between polls when idle')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queues are drained')
+
+    def handle(self, *args, **options):
+        worker_options = {
+            'queues': [q for q in options['queues'].split(',') if q] or None,
+            'batch_size': options['batch_size'],
+            'poll_interval': options['poll_interval'],
+        }
+        processes, threads, burst = options['processes'], options['threads'], options['burst']
+        self.stdout.write(self.style.WARNING(
+            f'Starting {processes} x {threads} workers on '
+            f"{', '.join(worker_options['queues'] or ['all queues'])}..."
+        ))
+
+        if processes == 1:
+            stop = threading.Event()
+            previous = {}
+            if threading.current_thread() is threading.main_thread():
+                # Finish the current batch on Ctrl-C/SIGTERM
+                for signum in (signal.SIGTERM, signal.SIGINT):
+                    previous[signum] = signal.signal(signum, lambda *args: stop.set())
+            try:
+                processed = run_threads(threads, stop, worker_options, burst)
+            finally:
+                for signum, handler in previous.items():
+                    signal.signal(signum, handler)
+        else:
+            # Children must not share the parent's database connections
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            total = context.Value('q', 0)
+            children = [
+                context.Process(target=child_main, args=(threads, worker_options, burst, total))
+                for _ in range(processes)
+            ]
+            for child in children:
+                child.start()
+            # Children stop after their current batch on SIGTERM
+            signal.signal(signal.SIGTERM, lambda *args: [child.terminate() for child in children])
+            try:
+                for child in children:
+                    child.join()
+            except KeyboardInterrupt:
+                # Ctrl-C also reached the children; wait for them to finish their batch
+                for child in children:
+                    child.join()
+            processed = total.value
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Workers stopped after processing {processed} jobs'))
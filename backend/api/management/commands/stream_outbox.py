@@ -0,0 +1,69 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.services.outbox import get_sink, stream_batch
+
+
+class Command(BaseCommand):
+    help = 'Streams report changes from the outbox to NDJSON files or another sink, at least once'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--consumer',
+            default='default',
+            help='Name the checkpoint is kept under; each consumer receives every event',
+        )
+        parser.add_argument(
+            '--sink',
+            default=None,
+            help='Dotted path of the sink class (default: OUTBOX_SINK)',
+        )
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Directory NDJSON files are written to, or - for stdout (default: OUTBOX_DIRECTORY)',
+        )
+        parser.add_argument('--batch-size', type=int, default=None, help='Events per batch (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Deliver only the last event of each report in a batch',
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when caught up')
+        parser.add_argument('--once', action='store_true', help='Exit once the outbox is drained')
+
+    def handle(self, *args, **options):
+        sink_options = {'directory': options['output']} if options['output'] else {}
+        sink = get_sink(options['sink'], **sink_options)
+        consumer = options['consumer']
+        batch_size = options['batch_size'] or settings.OUTBOX_BATCH_SIZE
+        # Progress goes to stderr when events go to stdout
+        log = self.stderr if options['output'] == '-' else self.stdout
+
+        stop = threading.Event()
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            # Finish the current batch on Ctrl-C/SIGTERM
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous[signum] = signal.signal(signum, lambda *args: stop.set())
+
+        read = delivered = 0
+        try:
+            while not stop.is_set():
+                batch_read, batch_delivered = stream_batch(consumer, sink, batch_size, options['compact'])
+                read += batch_read
+                delivered += batch_delivered
+                if batch_read:
+                    log.write(f'  {read} events read, {delivered} delivered')
+                    continue
+                if options['once']:
+                    break
+                stop.wait(options['poll_interval'])
+        finally:
+            sink.close()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        log.write(self.style.SUCCESS(f'✓ Streamed {delivered} events ({read} read) for consumer {consumer}'))
@@ -0,0 +1,174 @@
+"""
+Request instrumentation.
+
+``RequestMetricsMiddleware`` records total latency and response rendering
+time for every request, and the number and duration of database queries
+for a random sample of requests (``METRICS_SAMPLE_RATE``), so that query
+accounting only costs on the sampled fraction. Results go to the
+histograms in ``api.services.metrics`` and to a ``Server-Timing`` header.
+
+With ``METRICS_DEBUG_SQL`` every request is sampled and SQL statements
+executed more than once in the same request are logged with the stack
+that issued them, which is how N+1 query patterns show up.
+"""
+import logging
+import random
+import time
+import traceback
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from api.services import metrics
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_VIEW = '<unmatched>'
+
+# Recorder of the request being handled. A context variable rather than a
+# per-connection wrapper so that it follows the request into the threads
+# where async views run their ORM calls.
+_active_recorder = ContextVar('request_query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing queries"""
+
+    def __init__(self, capture_stacks=False):
+        self.capture_stacks = capture_stacks
+        self.count = 0
+        self.duration = 0.0
+        self.statements = defaultdict(list)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if self.capture_stacks:
+                self.statements[sql].append(traceback.extract_stack()[:-1])
+
+    def duplicates(self):
+        """Yield ``(sql, times, stack)`` for statements executed more than once"""
+        for sql, stacks in self.statements.items():
+            if len(stacks) > 1:
+                yield sql, len(stacks), stacks[0]
+
+
+def dispatch_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; records sampled requests only"""
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_dispatch(connection):
+    if dispatch_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(dispatch_query)
+
+
+def project_frames(stack):
+    """Keep the frames from this project's code, dropping Django and libraries"""
+    base_dir = str(settings.BASE_DIR)
+    return [
+        frame for frame in stack
+        if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+    ]
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_VIEW
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    """Record per-view latency, query count, DB time and serialization time"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = self.start_recording()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop_recording(recorder)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = self.start_recording()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop_recording(recorder)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    def start_recording(self):
+        if not (settings.METRICS_DEBUG_SQL or random.random() < settings.METRICS_SAMPLE_RATE):
+            return None
+        recorder = QueryRecorder(capture_stacks=settings.METRICS_DEBUG_SQL)
+        recorder.token = _active_recorder.set(recorder)
+        return recorder
+
+    def stop_recording(self, recorder):
+        if recorder is not None:
+            _active_recorder.reset(recorder.token)
+
+    def finish(self, request, response, recorder, total):
+        view = view_label(request)
+        if view == 'metrics':
+            return response
+
+        method = request.method
+        metrics.REQUEST_DURATION.observe(total, view=view, method=method)
+        timings = []
+        if recorder is not None:
+            metrics.REQUEST_DB_QUERIES.observe(recorder.count, view=view, method=method)
+            metrics.REQUEST_DB_DURATION.observe(recorder.duration, view=view, method=method)
+            timings.append(f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"')
+        render_time = getattr(request, '_metrics_render_time', None)
+        if render_time is not None:
+            metrics.REQUEST_SERIALIZE_DURATION.observe(render_time, view=view, method=method)
+            timings.append(f'serialize;dur={render_time * 1000:.1f}')
+        timings.append(f'total;dur={total * 1000:.1f}')
+
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = ', '.join(timings)
+        if recorder is not None and recorder.capture_stacks:
+            self.log_duplicates(request, view, recorder)
+        metrics.flush_when_due()
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the rendering of DRF responses, which happens after the view returns"""
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_time = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_duplicates(self, request, view, recorder):
+        for sql, times, stack in recorder.duplicates():
+            frames = ''.join(traceback.format_list(project_frames(stack)))
+            logger.warning(
+                'Duplicate SQL executed %d times in %s %s (%s): %s\n%s',
+                times, request.method, request.path, view, sql, frames,
+            )
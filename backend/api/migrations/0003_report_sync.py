@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_seed_categories_and_subcategories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_id', models.BigIntegerField(help_text='ID of the deleted report')),
+                ('citizen_id', models.BigIntegerField(help_text='Owner of the deleted report')),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Report Tombstone',
+                'verbose_name_plural': 'Report Tombstones',
+                'db_table': 'report_tombstones',
+                'ordering': ['deleted_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['citizen', 'updated_at'], name='report_citizen_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reporttombstone',
+            index=models.Index(fields=['citizen_id', 'deleted_at'], name='tombstone_citizen_idx'),
+        ),
+    ]
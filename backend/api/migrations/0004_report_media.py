@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:16
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_report_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportMedia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(db_index=True, help_text='SHA-256 of the uploaded file', max_length=64)),
+                ('content_type', models.CharField(max_length=64)),
+                ('size', models.PositiveBigIntegerField(help_text='Size of the uploaded file in bytes')),
+                ('processing_status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media', to='api.report')),
+            ],
+            options={
+                'verbose_name': 'Report Media',
+                'verbose_name_plural': 'Report Media',
+                'db_table': 'report_media',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MediaUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('citizen_id', models.BigIntegerField(help_text='Citizen who started the upload')),
+                ('content_type', models.CharField(max_length=64)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to='api.report')),
+                ('media', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='api.reportmedia')),
+            ],
+            options={
+                'verbose_name': 'Media Upload',
+                'verbose_name_plural': 'Media Uploads',
+                'db_table': 'media_uploads',
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SEARCH_VECTOR_SQL = """
+ALTER TABLE reports ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED;
+CREATE INDEX reports_search_vector_idx ON reports USING GIN (search_vector);
+"""
+
+
+def add_search_vector(apps, schema_editor):
+    """
+    Add the maintained tsvector column and its GIN index on PostgreSQL.
+
+    The column is generated by the database, so it stays in sync with
+    title/description on every write without application code. Other
+    databases fall back to the report_search_terms inverted index.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(SEARCH_VECTOR_SQL)
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("ALTER TABLE reports DROP COLUMN IF EXISTS search_vector;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_report_media'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(help_text='Relevance of the term for this report')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='api.report')),
+            ],
+            options={
+                'verbose_name': 'Report Search Term',
+                'verbose_name_plural': 'Report Search Terms',
+                'db_table': 'report_search_terms',
+                'constraints': [models.UniqueConstraint(fields=('term', 'report'), name='unique_search_term_report')],
+            },
+        ),
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
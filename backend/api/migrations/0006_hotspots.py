@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_report_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotspotRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_report_id', models.BigIntegerField(help_text='Highest report ID folded into the cells')),
+                ('reports_processed', models.PositiveIntegerField(default=0)),
+                ('hotspots_found', models.PositiveIntegerField(default=0)),
+                ('full_rebuild', models.BooleanField(default=False)),
+                ('finished_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Hotspot Run',
+                'verbose_name_plural': 'Hotspot Runs',
+                'db_table': 'hotspot_runs',
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Hotspot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('centroid_latitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('centroid_longitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('polygon', models.JSONField(help_text='GeoJSON Polygon outlining the hotspot')),
+                ('report_count', models.PositiveIntegerField()),
+                ('score', models.FloatField(db_index=True, help_text='Report count weighted by concentration')),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('sub_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hotspots', to='api.subcategory')),
+            ],
+            options={
+                'verbose_name': 'Hotspot',
+                'verbose_name_plural': 'Hotspots',
+                'db_table': 'hotspots',
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HotspotCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_x', models.IntegerField(help_text='Longitude cell index')),
+                ('cell_y', models.IntegerField(help_text='Latitude cell index')),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('sub_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hotspot_cells', to='api.subcategory')),
+            ],
+            options={
+                'verbose_name': 'Hotspot Cell',
+                'verbose_name_plural': 'Hotspot Cells',
+                'db_table': 'hotspot_cells',
+                'constraints': [models.UniqueConstraint(fields=('sub_category', 'cell_x', 'cell_y'), name='unique_hotspot_cell')],
+            },
+        ),
+    ]
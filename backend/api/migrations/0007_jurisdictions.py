@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_hotspots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authority',
+            name='jurisdiction',
+            field=models.JSONField(blank=True, help_text='GeoJSON Polygon/MultiPolygon of the area this authority handles', null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='assigned_authority',
+            field=models.ForeignKey(blank=True, db_index=False, help_text='Authority whose jurisdiction contains the report location', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_reports', to='api.authority'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['assigned_authority', '-created_at'], name='report_authority_created_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_jurisdictions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReport',
+            fields=[
+                ('id', models.BigIntegerField(help_text='ID the report had in the hot table', primary_key=True, serialize=False)),
+                ('title', models.TextField(blank=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Report',
+                'verbose_name_plural': 'Archived Reports',
+                'db_table': 'reports_archive',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedReportMedia',
+            fields=[
+                ('id', models.BigIntegerField(help_text='ID the photo had in report_media', primary_key=True, serialize=False)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('content_type', models.CharField(max_length=64)),
+                ('size', models.PositiveBigIntegerField()),
+                ('processing_status', models.CharField(max_length=16)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Archived Report Media',
+                'verbose_name_plural': 'Archived Report Media',
+                'db_table': 'report_media_archive',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-created_at'], name='report_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedreport',
+            name='assigned_authority',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reports', to='api.authority'),
+        ),
+        migrations.AddField(
+            model_name='archivedreport',
+            name='citizen',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reports', to='api.citizen'),
+        ),
+        migrations.AddField(
+            model_name='archivedreport',
+            name='report_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reports', to='api.category'),
+        ),
+        migrations.AddField(
+            model_name='archivedreport',
+            name='status',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_reports', to='api.status'),
+        ),
+        migrations.AddField(
+            model_name='archivedreport',
+            name='sub_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reports', to='api.subcategory'),
+        ),
+        migrations.AddField(
+            model_name='archivedreportmedia',
+            name='report',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media', to='api.archivedreport'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedreport',
+            index=models.Index(fields=['citizen', '-created_at'], name='archived_citizen_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedreport',
+            index=models.Index(fields=['assigned_authority', '-created_at'], name='archived_authority_created_idx'),
+        ),
+    ]
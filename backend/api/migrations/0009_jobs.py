@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_report_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue', models.CharField(default='default', max_length=64)),
+                ('task', models.CharField(help_text='Registered task name, see api/services/jobs.py', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher runs first')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not claimed before this time')),
+                ('locked_by', models.CharField(blank=True, help_text='Worker running the job', max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'db_table': 'jobs',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['queue', 'state', 'run_at'], name='job_claim_idx'), models.Index(fields=['state', 'locked_at'], name='job_stale_idx')],
+            },
+        ),
+    ]
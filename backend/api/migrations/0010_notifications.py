@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_id', models.BigIntegerField()),
+                ('report_title', models.TextField(blank=True)),
+                ('old_status', models.CharField(max_length=15)),
+                ('new_status', models.CharField(max_length=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, help_text='When the digest containing it was sent', null=True)),
+                ('citizen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='api.citizen')),
+            ],
+            options={
+                'verbose_name': 'Notification',
+                'verbose_name_plural': 'Notifications',
+                'db_table': 'notifications',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['citizen', 'sent_at'], name='notification_citizen_sent_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:21
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('fingerprint', models.CharField(help_text='SHA-256 of the request body', max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField(null=True)),
+                ('response', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('citizen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idempotency_keys', to='api.citizen')),
+            ],
+            options={
+                'verbose_name': 'Idempotency Key',
+                'verbose_name_plural': 'Idempotency Keys',
+                'db_table': 'idempotency_keys',
+                'constraints': [models.UniqueConstraint(fields=('citizen', 'key'), name='idempotency_key_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, help_text='e.g. Home, Commute', max_length=100)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('radius_meters', models.PositiveIntegerField(blank=True, null=True)),
+                ('area', models.JSONField(blank=True, help_text='GeoJSON Polygon/MultiPolygon', null=True)),
+                ('sub_categories', models.JSONField(blank=True, default=list, help_text='Hazard sub-category codes to alert on; empty for all hazards')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('citizen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alert_subscriptions', to='api.citizen')),
+            ],
+            options={
+                'verbose_name': 'Alert Subscription',
+                'verbose_name_plural': 'Alert Subscriptions',
+                'db_table': 'alert_subscriptions',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HazardAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_id', models.BigIntegerField()),
+                ('report_title', models.TextField(blank=True)),
+                ('sub_category', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, help_text='When the digest containing it was sent', null=True)),
+                ('citizen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hazard_alerts', to='api.citizen')),
+                ('subscription', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alerts', to='api.alertsubscription')),
+            ],
+            options={
+                'verbose_name': 'Hazard Alert',
+                'verbose_name_plural': 'Hazard Alerts',
+                'db_table': 'hazard_alerts',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='alertsubscription',
+            index=models.Index(fields=['citizen', 'is_active'], name='alert_sub_citizen_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hazardalert',
+            index=models.Index(fields=['citizen', 'sent_at'], name='hazard_alert_citizen_sent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hazardalert',
+            constraint=models.UniqueConstraint(fields=('citizen', 'report_id'), name='hazard_alert_unique'),
+        ),
+    ]
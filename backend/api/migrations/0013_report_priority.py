@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:57
+
+from django.db import migrations, models
+
+# Starting severities; authorities can tune them in the admin
+SEVERITIES = {
+    'STRUCTURAL_COLLAPSE': 10,
+    'ELECTRICAL_HAZARD': 9,
+    'FIRE_HAZARD': 9,
+    'ROAD_ACCIDENT': 8,
+    'LANDSLIDE': 8,
+    'SINKHOLE': 8,
+    'EARTHQUAKE': 8,
+    'FLOODING': 7,
+    'BRIDGE': 7,
+    'FALLEN_TREES': 6,
+    'SAFETY_SECURITY': 6,
+    'BUILDING': 5,
+    'PUBLIC_HEALTH': 5,
+    'HAZARD_OTHER': 5,
+    'BLOCKED_DRAINAGE': 4,
+    'ROAD_DAMAGE': 4,
+    'STREETLIGHTS': 3,
+    'INFRA_OTHER': 3,
+    'SIDEWALKS': 2,
+}
+
+
+def seed_severities(apps, schema_editor):
+    SubCategory = apps.get_model('api', 'SubCategory')
+    for sub_category, severity in SEVERITIES.items():
+        SubCategory.objects.filter(sub_category=sub_category).update(severity=severity)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_hazard_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='priority',
+            field=models.FloatField(default=0, help_text='Triage score, kept up to date by a periodic job (see api/services/triage.py)'),
+        ),
+        migrations.AddField(
+            model_name='subcategory',
+            name='severity',
+            field=models.PositiveSmallIntegerField(default=5, help_text='How urgent reports of this sub category are, from 1 to 10 (see api/services/triage.py)'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-priority', '-id'], name='report_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['assigned_authority', '-priority', '-id'], name='report_authority_priority_idx'),
+        ),
+        migrations.RunPython(seed_severities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_report_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedreport',
+            name='confirmation_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='confirmation_count',
+            field=models.IntegerField(default=0, help_text='Citizens confirming the report, as of the last fold (see api/services/confirmations.py)'),
+        ),
+        migrations.CreateModel(
+            name='ReportConfirmation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('citizen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='confirmations', to='api.citizen')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='confirmations', to='api.report')),
+            ],
+            options={
+                'verbose_name': 'Report Confirmation',
+                'verbose_name_plural': 'Report Confirmations',
+                'db_table': 'report_confirmations',
+                'indexes': [models.Index(fields=['citizen', '-created_at'], name='confirmation_citizen_idx')],
+                'constraints': [models.UniqueConstraint(fields=('report', 'citizen'), name='report_confirmation_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportConfirmationShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='confirmation_shards', to='api.report')),
+            ],
+            options={
+                'verbose_name': 'Report Confirmation Shard',
+                'verbose_name_plural': 'Report Confirmation Shards',
+                'db_table': 'report_confirmation_shards',
+                'constraints': [models.UniqueConstraint(fields=('report', 'shard'), name='confirmation_shard_unique')],
+            },
+        ),
+    ]
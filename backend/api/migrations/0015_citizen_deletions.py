@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_report_confirmations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CitizenDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('citizen_id', models.BigIntegerField(unique=True)),
+                ('mode', models.CharField(choices=[('delete', 'Delete reports'), ('anonymize', 'Keep reports, anonymized')], default='delete', max_length=16)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done')], default='queued', max_length=16)),
+                ('step', models.CharField(choices=[('reports', 'Reports'), ('archived_reports', 'Archived reports'), ('confirmations', 'Confirmations'), ('account', 'Account')], default='reports', max_length=16)),
+                ('total_reports', models.PositiveIntegerField(default=0, help_text='Hot and archived reports when requested')),
+                ('processed_reports', models.PositiveIntegerField(default=0)),
+                ('batches', models.PositiveIntegerField(default=0)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Citizen Deletion',
+                'verbose_name_plural': 'Citizen Deletions',
+                'db_table': 'citizen_deletions',
+                'ordering': ['-requested_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='citizen',
+            name='deactivated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='citizen',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+    ]
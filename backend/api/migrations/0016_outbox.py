@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_citizen_deletions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=64, unique=True)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('delivered', models.BigIntegerField(default=0, help_text='Events delivered, after compaction')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Outbox Checkpoint',
+                'verbose_name_plural': 'Outbox Checkpoints',
+                'db_table': 'outbox_checkpoints',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('report.created', 'Report created'), ('report.status_changed', 'Report status changed')], max_length=32)),
+                ('report_id', models.BigIntegerField()),
+                ('payload', models.JSONField(help_text='Report as it was after the change')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Outbox Event',
+                'verbose_name_plural': 'Outbox Events',
+                'db_table': 'outbox_events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_outbox'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='hotspotrun',
+            name='last_report_id',
+        ),
+        migrations.AddField(
+            model_name='hotspotrun',
+            name='watermark',
+            field=models.DateTimeField(help_text='Reports created up to this time are folded into the cells', null=True),
+        ),
+    ]
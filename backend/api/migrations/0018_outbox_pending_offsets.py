@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_hotspot_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxcheckpoint',
+            name='pending',
+            field=models.JSONField(blank=True, default=dict, help_text='Offsets skipped over before they committed, with when they were skipped'),
+        ),
+    ]
@@ -3,14 +3,45 @@ from api.models.category import Category
 from api.models.sub_category import SubCategory
 from api.models.authority import Authority
 from api.models.citizen import Citizen
+from api.models.citizen_deletion import CitizenDeletion
 from api.models.report import Report
 from api.models.status import Status
+from api.models.report_tombstone import ReportTombstone
+from api.models.report_media import ReportMedia, MediaUpload
+from api.models.report_search_term import ReportSearchTerm
+from api.models.hotspot import Hotspot, HotspotCell, HotspotRun
+from api.models.archived_report import ArchivedReport, ArchivedReportMedia
+from api.models.job import Job
+from api.models.notification import Notification
+from api.models.idempotency_key import IdempotencyKey
+from api.models.alert_subscription import AlertSubscription, HazardAlert
+from api.models.report_confirmation import ReportConfirmation, ReportConfirmationShard
+from api.models.outbox import OutboxCheckpoint, OutboxEvent
 
 __all__ = [
     'Category',
     'SubCategory',
     'Authority',
     'Citizen',
+    'CitizenDeletion',
     'Report',
-    'Status'
+    'Status',
+    'ReportTombstone',
+    'ReportMedia',
+    'MediaUpload',
+    'ReportSearchTerm',
+    'Hotspot',
+    'HotspotCell',
+    'HotspotRun',
+    'ArchivedReport',
+    'ArchivedReportMedia',
+    'Job',
+    'Notification',
+    'IdempotencyKey',
+    'AlertSubscription',
+    'HazardAlert',
+    'ReportConfirmation',
+    'ReportConfirmationShard',
+    'OutboxEvent',
+    'OutboxCheckpoint',
     ]
@@ -0,0 +1,73 @@
+from django.db import models
+
+from .citizen import Citizen
+
+
+class AlertSubscription(models.Model):
+    """
+    Area a citizen wants hazard alerts for: a circle around a point, or a
+    GeoJSON polygon.
+
+    Deleting a subscription only deactivates it, so the workers' in-memory
+    match index picks the change up with its incremental refresh (by
+    ``updated_at``) instead of a rebuild.
+    """
+    citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='alert_subscriptions')
+    name = models.CharField(max_length=100, blank=True, help_text="e.g. Home, Commute")
+    # Circle
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    radius_meters = models.PositiveIntegerField(null=True, blank=True)
+    # Polygon
+    area = models.JSONField(null=True, blank=True, help_text="GeoJSON Polygon/MultiPolygon")
+    sub_categories = models.JSONField(
+        default=list, blank=True, help_text="Hazard sub-category codes to alert on; empty for all hazards"
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        db_table = "alert_subscriptions"
+        verbose_name = "Alert Subscription"
+        verbose_name_plural = "Alert Subscriptions"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['citizen', 'is_active'], name='alert_sub_citizen_active_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name or 'Alert area'} of citizen #{self.citizen_id}"
+
+
+class HazardAlert(models.Model):
+    """
+    Hazard report that fell inside a citizen's alert area, waiting to be
+    emailed. Like status notifications, alerts go out as digests.
+    """
+    citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='hazard_alerts')
+    subscription = models.ForeignKey(
+        AlertSubscription, on_delete=models.SET_NULL, null=True, blank=True, related_name='alerts'
+    )
+    # Not a foreign key: alerts outlive archived and deleted reports
+    report_id = models.BigIntegerField()
+    report_title = models.TextField(blank=True)
+    sub_category = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, help_text="When the digest containing it was sent")
+
+    class Meta:
+        db_table = "hazard_alerts"
+        verbose_name = "Hazard Alert"
+        verbose_name_plural = "Hazard Alerts"
+        ordering = ['created_at', 'id']
+        constraints = [
+            # Overlapping areas of one citizen alert them once per report
+            models.UniqueConstraint(fields=['citizen', 'report_id'], name='hazard_alert_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['citizen', 'sent_at'], name='hazard_alert_citizen_sent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Report #{self.report_id} for citizen #{self.citizen_id}"
@@ -0,0 +1,79 @@
+from django.db import models
+
+from .authority import Authority
+from .category import Category
+from .citizen import Citizen
+from .status import Status
+from .sub_category import SubCategory
+
+
+class ArchivedReport(models.Model):
+    """
+    Resolved report moved out of the hot ``reports`` table.
+
+    ``manage.py archive_reports`` moves resolved reports older than a few
+    months here in batches, keeping their IDs, so that the hot table and its
+    indexes only hold the rows most queries touch. The report endpoints
+    read from both tables when a query's date range reaches the archive.
+    """
+    id = models.BigIntegerField(primary_key=True, help_text="ID the report had in the hot table")
+    status = models.ForeignKey(Status, related_name='archived_reports', on_delete=models.PROTECT)
+    citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='archived_reports')
+    report_type = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='archived_reports')
+    sub_category = models.ForeignKey(
+        SubCategory,
+        on_delete=models.SET_NULL,
+        related_name='archived_reports',
+        null=True,
+        blank=True
+    )
+    assigned_authority = models.ForeignKey(
+        Authority,
+        on_delete=models.SET_NULL,
+        related_name='archived_reports',
+        null=True,
+        blank=True,
+        db_index=False,  # covered by archived_authority_created_idx
+    )
+
+    title = models.TextField(blank=True)
+    description = models.TextField(blank=True, null=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    created_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    confirmation_count = models.IntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "reports_archive"
+        verbose_name = "Archived Report"
+        verbose_name_plural = "Archived Reports"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['citizen', '-created_at'], name='archived_citizen_created_idx'),
+            models.Index(fields=['assigned_authority', '-created_at'], name='archived_authority_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived report #{self.id}"
+
+
+class ArchivedReportMedia(models.Model):
+    """Photo of an archived report, moved along with it from ``report_media``"""
+    id = models.BigIntegerField(primary_key=True, help_text="ID the photo had in report_media")
+    report = models.ForeignKey(ArchivedReport, on_delete=models.CASCADE, related_name='media')
+    sha256 = models.CharField(max_length=64, db_index=True)
+    content_type = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField()
+    processing_status = models.CharField(max_length=16)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "report_media_archive"
+        verbose_name = "Archived Report Media"
+        verbose_name_plural = "Archived Report Media"
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Media {self.sha256[:12]} for archived report #{self.report_id}"
@@ -6,6 +6,11 @@ class Authority(models.Model):
     authority_name = models.TextField(max_length=64)
     email = models.EmailField(max_length=64)
     password = models.TextField(max_length=128)  # Hashed password
+    jurisdiction = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="GeoJSON Polygon/MultiPolygon of the area this authority handles"
+    )
     
     class Meta:
         db_table = 'authorities'
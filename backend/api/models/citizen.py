@@ -6,6 +6,10 @@ class Citizen(models.Model):
     name = models.CharField(max_length=64)
     email = models.EmailField(max_length=64, unique=True)
     password = models.CharField(max_length=128)  # Hashed password
+    # Cleared when the citizen deletes their account: they can no longer
+    # log in while their data is removed (see api/services/citizen_deletion.py)
+    is_active = models.BooleanField(default=True)
+    deactivated_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         db_table = "citizens"
@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class CitizenDeletion(models.Model):
+    """
+    Progress of deleting a citizen's account and data.
+
+    The citizen is deactivated right away; a background job then removes
+    their data in bounded batches, one transaction each, recording here
+    which step it reached and how many reports it handled, so that a job
+    interrupted at any point resumes where it stopped (see
+    api/services/citizen_deletion.py).
+    """
+    class State(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+
+    class Step(models.TextChoices):
+        REPORTS = 'reports', 'Reports'
+        ARCHIVED_REPORTS = 'archived_reports', 'Archived reports'
+        CONFIRMATIONS = 'confirmations', 'Confirmations'
+        ACCOUNT = 'account', 'Account'
+
+    class Mode(models.TextChoices):
+        DELETE = 'delete', 'Delete reports'
+        ANONYMIZE = 'anonymize', 'Keep reports, anonymized'
+
+    # Not a foreign key: the record outlives the citizen
+    citizen_id = models.BigIntegerField(unique=True)
+    mode = models.CharField(max_length=16, choices=Mode.choices, default=Mode.DELETE)
+    state = models.CharField(max_length=16, choices=State.choices, default=State.QUEUED)
+    step = models.CharField(max_length=16, choices=Step.choices, default=Step.REPORTS)
+    total_reports = models.PositiveIntegerField(default=0, help_text="Hot and archived reports when requested")
+    processed_reports = models.PositiveIntegerField(default=0)
+    batches = models.PositiveIntegerField(default=0)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "citizen_deletions"
+        verbose_name = "Citizen Deletion"
+        verbose_name_plural = "Citizen Deletions"
+        ordering = ['-requested_at']
+
+    def __str__(self):
+        return f"Deletion of citizen #{self.citizen_id} ({self.state})"
@@ -0,0 +1,84 @@
+from django.db import models
+
+from .sub_category import SubCategory
+
+
+class HotspotCell(models.Model):
+    """
+    Running report count for one grid cell of one sub-category.
+
+    Cells are the incremental state of hotspot detection: each run only adds
+    the reports created since the previous run, then re-clusters the cells.
+    Deleted or moved reports are only taken out by the periodic full rebuild.
+    """
+    sub_category = models.ForeignKey(
+        SubCategory,
+        on_delete=models.CASCADE,
+        related_name='hotspot_cells',
+        null=True,
+        blank=True
+    )
+    cell_x = models.IntegerField(help_text="Longitude cell index")
+    cell_y = models.IntegerField(help_text="Latitude cell index")
+    report_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "hotspot_cells"
+        verbose_name = "Hotspot Cell"
+        verbose_name_plural = "Hotspot Cells"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sub_category', 'cell_x', 'cell_y'],
+                name='unique_hotspot_cell'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Cell ({self.cell_x}, {self.cell_y}): {self.report_count} reports"
+
+
+class Hotspot(models.Model):
+    """Area where reports of one sub-category concentrate"""
+    sub_category = models.ForeignKey(
+        SubCategory,
+        on_delete=models.CASCADE,
+        related_name='hotspots',
+        null=True,
+        blank=True
+    )
+    centroid_latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    centroid_longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    polygon = models.JSONField(help_text="GeoJSON Polygon outlining the hotspot")
+    report_count = models.PositiveIntegerField()
+    score = models.FloatField(db_index=True, help_text="Report count weighted by concentration")
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "hotspots"
+        verbose_name = "Hotspot"
+        verbose_name_plural = "Hotspots"
+        ordering = ['-score']
+
+    def __str__(self):
+        return f"Hotspot of {self.report_count} reports (score {self.score:.1f})"
+
+
+class HotspotRun(models.Model):
+    """Checkpoint of a hotspot detection run"""
+    watermark = models.DateTimeField(
+        null=True,
+        help_text="Reports created up to this time are folded into the cells"
+    )
+    reports_processed = models.PositiveIntegerField(default=0)
+    hotspots_found = models.PositiveIntegerField(default=0)
+    full_rebuild = models.BooleanField(default=False)
+    finished_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "hotspot_runs"
+        verbose_name = "Hotspot Run"
+        verbose_name_plural = "Hotspot Runs"
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"Hotspot run #{self.id} up to {self.watermark}"
@@ -0,0 +1,34 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from .citizen import Citizen
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response of a request made with an ``Idempotency-Key`` header, replayed
+    when the client retries it with the same key.
+
+    The unique (citizen, key) constraint is what serializes concurrent
+    retries: the row is inserted in the same transaction as the report, so
+    a duplicate insert waits for the first request to commit and then
+    fails, and the retry answers with the stored response.
+    """
+    citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64, help_text="SHA-256 of the request body")
+    # Filled in before the claiming transaction commits, so never seen empty
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "idempotency_keys"
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=['citizen', 'key'], name='idempotency_key_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.citizen_id}:{self.key}"
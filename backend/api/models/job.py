@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Unit of background work for ``manage.py run_workers``.
+
+    Workers claim queued jobs whose ``run_at`` has passed (with
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it),
+    run the registered task with ``payload`` and either mark the job done
+    or schedule a retry with exponential backoff.
+    """
+    class State(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    queue = models.CharField(max_length=64, default='default')
+    task = models.CharField(max_length=100, help_text="Registered task name, see api/services/jobs.py")
+    payload = models.JSONField(default=dict, blank=True)
+    state = models.CharField(max_length=16, choices=State.choices, default=State.QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Not claimed before this time")
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker running the job")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "jobs"
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['queue', 'state', 'run_at'], name='job_claim_idx'),
+            models.Index(fields=['state', 'locked_at'], name='job_stale_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} {self.task} ({self.state})"
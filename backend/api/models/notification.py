@@ -0,0 +1,33 @@
+from django.db import models
+
+from .citizen import Citizen
+
+
+class Notification(models.Model):
+    """
+    Status change of a report, waiting to be emailed to its citizen.
+
+    Changes are not mailed one by one: the first pending change of a
+    citizen schedules a digest ``NOTIFICATION_DIGEST_SECONDS`` later, which
+    sends everything that accumulated in the meantime in one email.
+    """
+    citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='notifications')
+    # Not a foreign key: notifications outlive archived and deleted reports
+    report_id = models.BigIntegerField()
+    report_title = models.TextField(blank=True)
+    old_status = models.CharField(max_length=15)
+    new_status = models.CharField(max_length=15)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, help_text="When the digest containing it was sent")
+
+    class Meta:
+        db_table = "notifications"
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['citizen', 'sent_at'], name='notification_citizen_sent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Report #{self.report_id}: {self.old_status} -> {self.new_status}"
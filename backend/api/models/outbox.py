@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """
+    Change to a report, for ``manage.py stream_outbox`` to deliver downstream.
+
+    Written in the same transaction as the change itself (see
+    ``Report.save``), so an event exists exactly when its change committed.
+    The auto-increment ``id`` is the event's offset in the stream.
+    """
+    class Type(models.TextChoices):
+        REPORT_CREATED = 'report.created', 'Report created'
+        STATUS_CHANGED = 'report.status_changed', 'Report status changed'
+
+    event_type = models.CharField(max_length=32, choices=Type.choices)
+    report_id = models.BigIntegerField()
+    payload = models.JSONField(help_text="Report as it was after the change")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "outbox_events"
+        verbose_name = "Outbox Event"
+        verbose_name_plural = "Outbox Events"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type} of report #{self.report_id}"
+
+
+class OutboxCheckpoint(models.Model):
+    """Offset of the last outbox event a consumer has durably received"""
+    consumer = models.CharField(max_length=64, unique=True)
+    offset = models.BigIntegerField(default=0)
+    delivered = models.BigIntegerField(default=0, help_text="Events delivered, after compaction")
+    pending = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Offsets skipped over before they committed, with when they were skipped"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "outbox_checkpoints"
+        verbose_name = "Outbox Checkpoint"
+        verbose_name_plural = "Outbox Checkpoints"
+
+    def __str__(self):
+        return f"{self.consumer} at #{self.offset}"
@@ -2,8 +2,9 @@ from .status import Status
 from .citizen import Citizen
 from .category import Category
 from .sub_category import SubCategory
+from .authority import Authority
 
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 
 
@@ -19,18 +20,50 @@ class Report(models.Model):
         blank=True,
         help_text="Sub category of the report (required for Hazard category)"
     )
+    assigned_authority = models.ForeignKey(
+        Authority,
+        on_delete=models.SET_NULL,
+        related_name='assigned_reports',
+        null=True,
+        blank=True,
+        db_index=False,  # covered by report_authority_created_idx
+        help_text="Authority whose jurisdiction contains the report location"
+    )
 
     title = models.TextField(blank=True, help_text='Title of report')
     description = models.TextField(blank=True, null=True, help_text="Optional description of the issue")
     latitude = models.DecimalField(max_digits=9, decimal_places=6, help_text="Latitude of the report location")
     longitude = models.DecimalField(max_digits=9, decimal_places=6, help_text="Longitude of the report location")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    priority = models.FloatField(
+        default=0,
+        help_text="Triage score, kept up to date by a periodic job (see api/services/triage.py)"
+    )
+    confirmation_count = models.IntegerField(
+        default=0,
+        help_text="Citizens confirming the report, as of the last fold (see api/services/confirmations.py)"
+    )
 
     class Meta:
         db_table = "reports"
         verbose_name = "Report"
         verbose_name_plural = "Reports"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['citizen', 'updated_at'], name='report_citizen_updated_idx'),
+            models.Index(fields=['assigned_authority', '-created_at'], name='report_authority_created_idx'),
+            models.Index(fields=['-created_at'], name='report_created_idx'),
+            models.Index(fields=['-priority', '-id'], name='report_priority_idx'),
+            models.Index(fields=['assigned_authority', '-priority', '-id'], name='report_authority_priority_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        report = super().from_db(db, field_names, values)
+        # Remembered so that saving can tell a status change (see api/signals.py)
+        report._loaded_status_id = report.__dict__.get('status_id')
+        return report
 
     def clean(self):
         """
@@ -56,14 +89,26 @@ class Report(models.Model):
                 })
 
     def save(self, *args, **kwargs):
-        """Override save to call clean validation"""
+        """
+        Override save to call clean validation, to give new reports their
+        initial triage priority, and to record creations and status
+        changes in the outbox in the same transaction
+        """
+        from api.services import outbox, triage
+
         self.full_clean()
 
         # Set default status to 'pending' if not provided
         if not self.pk and not self.status_id:
             self.status = Status.objects.get(code='pending')
 
-        super().save(*args, **kwargs)
+        created = self._state.adding
+        if created and not self.priority:
+            self.priority = triage.initial_priority(self)
+        old_status_id = getattr(self, '_loaded_status_id', None)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            outbox.record_report_save(self, created, old_status_id)
 
     def __str__(self):
         sub_cat_str = f" - {self.sub_category.get_sub_category_display()}" if self.sub_category else ""
@@ -0,0 +1,57 @@
+from django.db import models
+
+from .citizen import Citizen
+from .report import Report
+
+
+class ReportConfirmation(models.Model):
+    """
+    A citizen's "me too" on someone else's report: they ran into the same
+    issue and confirm it instead of filing a duplicate.
+
+    The unique (citizen, report) constraint keeps confirmations to one per
+    citizen; the count lives in ``Report.confirmation_count`` and in
+    ``ReportConfirmationShard`` rows (see api/services/confirmations.py).
+    """
+    citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='confirmations')
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='confirmations')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "report_confirmations"
+        verbose_name = "Report Confirmation"
+        verbose_name_plural = "Report Confirmations"
+        constraints = [
+            models.UniqueConstraint(fields=['report', 'citizen'], name='report_confirmation_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['citizen', '-created_at'], name='confirmation_citizen_idx'),
+        ]
+
+    def __str__(self):
+        return f"Citizen #{self.citizen_id} confirms report #{self.report_id}"
+
+
+class ReportConfirmationShard(models.Model):
+    """
+    Confirmations of a report not yet added to ``Report.confirmation_count``.
+
+    Each confirmation increments one of ``CONFIRMATION_SHARDS`` rows of its
+    report at random, so concurrent confirmations of a busy report rarely
+    wait on the same row lock; workers periodically fold the shards into
+    the report row. Withdrawn confirmations make counts negative.
+    """
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='confirmation_shards')
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "report_confirmation_shards"
+        verbose_name = "Report Confirmation Shard"
+        verbose_name_plural = "Report Confirmation Shards"
+        constraints = [
+            models.UniqueConstraint(fields=['report', 'shard'], name='confirmation_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f"Shard {self.shard} of report #{self.report_id}: {self.count:+d}"
@@ -0,0 +1,74 @@
+import uuid
+
+from django.db import models
+
+from .report import Report
+
+
+class ReportMedia(models.Model):
+    """
+    Photo attached to a report.
+
+    Files are content-addressed: the blob lives under its SHA-256 digest, so
+    the same photo uploaded twice is stored once.
+    """
+    class ProcessingStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Failed'
+
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='media')
+    sha256 = models.CharField(max_length=64, db_index=True, help_text="SHA-256 of the uploaded file")
+    content_type = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField(help_text="Size of the uploaded file in bytes")
+    processing_status = models.CharField(
+        max_length=16,
+        choices=ProcessingStatus.choices,
+        default=ProcessingStatus.PENDING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "report_media"
+        verbose_name = "Report Media"
+        verbose_name_plural = "Report Media"
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Media {self.sha256[:12]} for report #{self.report_id}"
+
+
+class MediaUpload(models.Model):
+    """
+    Resumable upload session for a report photo.
+
+    Chunks are appended to a part file on disk; ``received`` tracks how many
+    bytes have been persisted so a client can resume after a dropped
+    connection.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='media_uploads')
+    citizen_id = models.BigIntegerField(help_text="Citizen who started the upload")
+    content_type = models.CharField(max_length=64)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    media = models.OneToOneField(
+        ReportMedia,
+        on_delete=models.SET_NULL,
+        related_name='upload',
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "media_uploads"
+        verbose_name = "Media Upload"
+        verbose_name_plural = "Media Uploads"
+
+    @property
+    def is_complete(self):
+        return self.media_id is not None
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received}/{self.total_size} bytes)"
@@ -0,0 +1,27 @@
+from django.db import models
+
+from .report import Report
+
+
+class ReportSearchTerm(models.Model):
+    """
+    Inverted index entry used for report search on databases without
+    native full-text search (SQLite test runs).
+
+    On PostgreSQL the ``reports.search_vector`` column and its GIN index are
+    used instead and this table stays empty.
+    """
+    term = models.CharField(max_length=64)
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveSmallIntegerField(help_text="Relevance of the term for this report")
+
+    class Meta:
+        db_table = "report_search_terms"
+        verbose_name = "Report Search Term"
+        verbose_name_plural = "Report Search Terms"
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'report'], name='unique_search_term_report'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> report #{self.report_id}"
@@ -0,0 +1,26 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ReportTombstone(models.Model):
+    """
+    Marker left behind when a report is deleted.
+
+    Lets delta sync clients drop reports they have cached locally without
+    re-downloading their whole report history.
+    """
+    report_id = models.BigIntegerField(help_text="ID of the deleted report")
+    citizen_id = models.BigIntegerField(help_text="Owner of the deleted report")
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = "report_tombstones"
+        verbose_name = "Report Tombstone"
+        verbose_name_plural = "Report Tombstones"
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['citizen_id', 'deleted_at'], name='tombstone_citizen_idx'),
+        ]
+
+    def __str__(self):
+        return f"Tombstone for report #{self.report_id}"
@@ -64,6 +64,10 @@ class SubCategory(models.Model):
         max_length=64,
         choices=SubCategoryType.choices
     )
+    severity = models.PositiveSmallIntegerField(
+        default=5,
+        help_text="How urgent reports of this sub category are, from 1 to 10 (see api/services/triage.py)"
+    )
     
     class Meta:
         db_table = "sub_categories"
@@ -1,13 +1,26 @@
-from .citizen import CitizenSerializer
+from .citizen import CitizenSerializer, CitizenDeletionSerializer
 from .authority import AuthoritySerializer
 from .category import CategorySerializer
 from .sub_category import SubCategorySerializer
-from .report import ReportSerializer
+from .report import ReportSerializer, TriageReportSerializer
+from .report_media import ReportMediaSerializer
+from .hotspot import HotspotSerializer
+from .archived_report import ArchivedReportSerializer, ArchivedReportMediaSerializer
+from .alert_subscription import AlertSubscriptionSerializer
+from .route_hazard import RouteHazardSerializer
 
 __all__ = [
     'CitizenSerializer',
+    'CitizenDeletionSerializer',
     'AuthoritySerializer',
     'CategorySerializer',
     'SubCategorySerializer',
     'ReportSerializer',
+    'TriageReportSerializer',
+    'ReportMediaSerializer',
+    'HotspotSerializer',
+    'ArchivedReportSerializer',
+    'ArchivedReportMediaSerializer',
+    'AlertSubscriptionSerializer',
+    'RouteHazardSerializer',
 ]
@@ -0,0 +1,97 @@
+import math
+
+from django.conf import settings
+from rest_framework import serializers
+from api.models import AlertSubscription, SubCategory
+from api.services.spatial import polygon_rings
+
+METERS_PER_DEGREE = 111_320
+
+
+class AlertSubscriptionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for AlertSubscription model.
+
+    An area is either a circle (latitude, longitude and radius_meters) or a
+    GeoJSON polygon (area), at most ALERT_MAX_RADIUS_METERS across in each
+    direction from its center. The citizen comes from the token.
+    """
+
+    class Meta:
+        model = AlertSubscription
+        fields = [
+            'id',
+            'name',
+            'latitude',
+            'longitude',
+            'radius_meters',
+            'area',
+            'sub_categories',
+            'created_at',
+            'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate_sub_categories(self, value):
+        """Validate that only hazard sub-categories are listed"""
+        hazards = [str(code) for code in SubCategory.CATEGORY_MAPPING['Hazard']]
+        if not isinstance(value, list) or any(code not in hazards for code in value):
+            raise serializers.ValidationError(f"Must be a list of hazard sub categories: {', '.join(hazards)}.")
+        return sorted(set(value))
+
+    def validate_area(self, value):
+        """Validate that the area is a GeoJSON polygon of bounded size"""
+        if value is None:
+            return value
+        try:
+            polygons = polygon_rings(value)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise serializers.ValidationError("Must be a GeoJSON Polygon or MultiPolygon.")
+        points = [point for rings in polygons for point in rings[0]]
+        if not polygons or any(len(rings[0]) < 4 for rings in polygons):
+            raise serializers.ValidationError("Polygon rings need at least 4 positions.")
+
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        if min(ys) < -90 or max(ys) > 90 or min(xs) < -180 or max(xs) > 180:
+            raise serializers.ValidationError("Coordinates must be [longitude, latitude].")
+        height = (max(ys) - min(ys)) * METERS_PER_DEGREE
+        width = (max(xs) - min(xs)) * METERS_PER_DEGREE * math.cos(math.radians((max(ys) + min(ys)) / 2))
+        if max(height, width) > 2 * settings.ALERT_MAX_RADIUS_METERS:
+            raise serializers.ValidationError(
+                f"Area may span at most {2 * settings.ALERT_MAX_RADIUS_METERS} meters."
+            )
+        return value
+
+    def validate_radius_meters(self, value):
+        if value is not None and not 1 <= value <= settings.ALERT_MAX_RADIUS_METERS:
+            raise serializers.ValidationError(
+                f"Radius must be between 1 and {settings.ALERT_MAX_RADIUS_METERS} meters."
+            )
+        return value
+
+    def validate(self, data):
+        """
+        Cross-field validation to ensure:
+        1. The area is either a complete circle or a polygon
+        2. The citizen stays within ALERT_MAX_SUBSCRIPTIONS active areas
+        """
+        def current(field):
+            if field in data:
+                return data[field]
+            return getattr(self.instance, field, None)
+
+        circle = [current(field) for field in ('latitude', 'longitude', 'radius_meters')]
+        has_circle = any(value is not None for value in circle)
+        if has_circle and any(value is None for value in circle):
+            raise serializers.ValidationError('A circle needs latitude, longitude and radius_meters.')
+        if has_circle == (current('area') is not None):
+            raise serializers.ValidationError('Give either a circle (latitude, longitude, radius_meters) or an area.')
+        if has_circle and not (-90 <= circle[0] <= 90 and -180 <= circle[1] <= 180):
+            raise serializers.ValidationError('Latitude or longitude out of range.')
+
+        if self.instance is None:
+            citizen_id = self.context['citizen_id']
+            limit = settings.ALERT_MAX_SUBSCRIPTIONS
+            if AlertSubscription.objects.filter(citizen_id=citizen_id, is_active=True).count() >= limit:
+                raise serializers.ValidationError(f'You can have at most {limit} alert areas.')
+        return data
@@ -0,0 +1,25 @@
+from api.models import ArchivedReport, ArchivedReportMedia
+from .report import ReportSerializer
+from .report_media import ReportMediaSerializer
+
+
+class ArchivedReportMediaSerializer(ReportMediaSerializer):
+    """Serializer for photos of archived reports, same shape as ReportMediaSerializer"""
+
+    class Meta(ReportMediaSerializer.Meta):
+        model = ArchivedReportMedia
+
+
+class ArchivedReportSerializer(ReportSerializer):
+    """
+    Serializer for ArchivedReport model.
+
+    Read-only, with the same fields as ReportSerializer so that clients
+    cannot tell archived reports from hot ones.
+    """
+
+    media = ArchivedReportMediaSerializer(many=True, read_only=True)
+
+    class Meta(ReportSerializer.Meta):
+        model = ArchivedReport
+        read_only_fields = ReportSerializer.Meta.fields
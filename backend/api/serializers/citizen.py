@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
-from api.models import Citizen
+from api.models import Citizen, CitizenDeletion
 
 
 class CitizenSerializer(serializers.ModelSerializer):
@@ -72,3 +72,25 @@ class CitizenSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         return instance
+
+
+class CitizenDeletionSerializer(serializers.ModelSerializer):
+    """Progress of a citizen's account deletion"""
+
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CitizenDeletion
+        fields = [
+            'citizen_id', 'mode', 'state', 'step', 'total_reports', 'processed_reports', 'progress',
+            'batches', 'requested_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        """Percentage of the work done, by reports handled"""
+        if obj.state == CitizenDeletion.State.DONE:
+            return 100
+        if not obj.total_reports:
+            return 0
+        return min(99, obj.processed_reports * 100 // obj.total_reports)
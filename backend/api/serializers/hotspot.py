@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from api.models import Hotspot
+
+
+class HotspotSerializer(serializers.ModelSerializer):
+    """
+    Serializer for Hotspot model.
+
+    Read-only; hotspots are computed by the detect_hotspots command.
+    """
+
+    sub_category_name = serializers.CharField(source='sub_category.get_sub_category_display', read_only=True, default=None)
+
+    class Meta:
+        model = Hotspot
+        fields = [
+            'id',
+            'sub_category',
+            'sub_category_name',
+            'centroid_latitude',
+            'centroid_longitude',
+            'polygon',
+            'report_count',
+            'score',
+            'computed_at'
+        ]
+        read_only_fields = fields
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from api.models import Report, Category, Citizen, SubCategory
+from .report_media import ReportMediaSerializer
 
 
 class ReportSerializer(serializers.ModelSerializer):
@@ -16,6 +17,8 @@ class ReportSerializer(serializers.ModelSerializer):
     citizen_name = serializers.CharField(source='citizen.name', read_only=True)
     citizen_email = serializers.CharField(source='citizen.email', read_only=True)
     status_name = serializers.CharField(source='status.get_code_display', read_only=True)
+    assigned_authority_name = serializers.CharField(source='assigned_authority.authority_name', read_only=True, default=None)
+    media = ReportMediaSerializer(many=True, read_only=True)
 
     class Meta:
         model = Report
@@ -30,13 +33,18 @@ class ReportSerializer(serializers.ModelSerializer):
             'sub_category_name',
             'status',
             'status_name',
+            'assigned_authority',
+            'assigned_authority_name',
             'title',
             'latitude',
             'longitude',
             'description',
-            'created_at'
+            'media',
+            'confirmation_count',
+            'created_at',
+            'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'assigned_authority', 'confirmation_count', 'created_at', 'updated_at']
     
     def validate_report_type(self, value):
         """Validate that the category exists"""
@@ -86,3 +94,11 @@ class ReportSerializer(serializers.ModelSerializer):
         if value < -180 or value > 180:
             raise serializers.ValidationError("Longitude must be between -180 and 180 degrees.")
         return value
+
+
+class TriageReportSerializer(ReportSerializer):
+    """Report with its triage priority, for the authorities' queue (read-only)"""
+
+    class Meta(ReportSerializer.Meta):
+        fields = ReportSerializer.Meta.fields + ['priority']
+        read_only_fields = fields
@@ -0,0 +1,44 @@
+from django.urls import reverse
+from rest_framework import serializers
+from api.models import ReportMedia
+
+
+class ReportMediaSerializer(serializers.ModelSerializer):
+    """
+    Serializer for ReportMedia model.
+
+    Read-only; photos are created through the resumable upload endpoints.
+    URLs are only exposed once the photo has been processed, so clients
+    never receive a file that still carries EXIF metadata.
+    """
+
+    url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportMedia
+        fields = [
+            'id',
+            'content_type',
+            'size',
+            'processing_status',
+            'url',
+            'thumbnail_url',
+            'created_at'
+        ]
+        read_only_fields = fields
+
+    def _build_url(self, name, obj):
+        if obj.processing_status != ReportMedia.ProcessingStatus.READY:
+            return None
+        path = reverse(name, kwargs={'sha256': obj.sha256})
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+    def get_url(self, obj):
+        """Return the URL of the full-size photo"""
+        return self._build_url('media-file', obj)
+
+    def get_thumbnail_url(self, obj):
+        """Return the URL of the thumbnail"""
+        return self._build_url('media-thumbnail', obj)
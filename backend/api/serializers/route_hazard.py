@@ -0,0 +1,32 @@
+from rest_framework import serializers
+from api.models import Report
+
+
+class RouteHazardSerializer(serializers.ModelSerializer):
+    """
+    Serializer for hazards found along a route.
+
+    Read-only and without the reporter's details; distance_meters and
+    route_offset_meters are set by hazards_along_route().
+    """
+
+    sub_category_name = serializers.CharField(source='sub_category.get_sub_category_display', read_only=True, default=None)
+    status_name = serializers.CharField(source='status.get_code_display', read_only=True, default=None)
+    distance_meters = serializers.FloatField(read_only=True)
+    route_offset_meters = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Report
+        fields = [
+            'id',
+            'title',
+            'sub_category',
+            'sub_category_name',
+            'status_name',
+            'latitude',
+            'longitude',
+            'created_at',
+            'distance_meters',
+            'route_offset_meters'
+        ]
+        read_only_fields = fields
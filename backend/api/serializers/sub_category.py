@@ -22,6 +22,7 @@ class SubCategorySerializer(serializers.ModelSerializer):
             'category_id',
             'category_name',
             'sub_category',
-            'sub_category_display'
+            'sub_category_display',
+            'severity'
         ]
-        read_only_fields = ['id', 'report_type', 'sub_category']
+        read_only_fields = ['id', 'report_type', 'sub_category', 'severity']
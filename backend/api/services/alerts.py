@@ -0,0 +1,267 @@
+"""
+Hazard alerts for citizens' alert areas, sent as digests.
+
+Citizens subscribe to areas (``AlertSubscription``: a circle or a polygon,
+optionally limited to some hazard sub-categories). Creating a hazard
+report queues an ``alerts.match`` job, so matching never runs on the
+request path. Workers claim match jobs in batches and look each report up
+in an in-memory ``GeofenceIndex`` of all active subscriptions, whose cost
+depends on the subscriptions near the report rather than on how many
+there are.
+
+Each worker process keeps one ``SubscriptionIndex`` (an ``OverlayIndex``,
+see api/services/overlay_index.py):
+
+- A base index built from every active subscription, rebuilt every
+  ``ALERT_INDEX_TTL`` seconds.
+- Before each batch, subscriptions updated since the last refresh are
+  fetched (by ``updated_at``, with a margin for transactions committing
+  late) into a small overlay index. Base matches of changed subscriptions
+  are dropped in favour of the overlay, so edits and deactivations apply
+  right away. Past ``ALERT_INDEX_MAX_OVERLAY`` changes the base is rebuilt.
+
+Matches are checked against the database (the subscription may have been
+deleted with its citizen since the index was built) and stored as
+``HazardAlert`` rows, one per citizen and report however many of their
+areas overlap. As with status notifications, a citizen's first pending
+alert schedules an ``alerts.digest`` job ``ALERT_DIGEST_SECONDS`` later,
+which mails everything collected in the window at once.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.services.jobs import enqueue, enqueue_many, task
+from api.services.notifications import send_pending_digests
+from api.services.overlay_index import OverlayIndex
+
+MATCH_TASK = 'alerts.match'
+DIGEST_TASK = 'alerts.digest'
+
+# IDs per query when checking matches against the database
+CHUNK_SIZE = 500
+
+
+def hazard_types():
+    """Hazard sub-category codes; a code's position is its bit in type masks"""
+    from api.models import SubCategory
+
+    return [str(code) for code in SubCategory.CATEGORY_MAPPING['Hazard']]
+
+
+def type_mask(codes):
+    """Type mask of a subscription's sub-categories; none means every hazard"""
+    types = hazard_types()
+    if not codes:
+        return (1 << len(types)) - 1
+    return sum(1 << types.index(code) for code in set(codes))
+
+
+def report_mask(sub_category):
+    """Type mask of a report's sub-category (HAZARD_OTHER when it has none)"""
+    from api.models import SubCategory
+
+    types = hazard_types()
+    code = sub_category if sub_category in types else str(SubCategory.SubCategoryType.HAZARD_OTHER)
+    return 1 << types.index(code)
+
+
+def build_index(subscriptions):
+    """
+    Build a GeofenceIndex of subscriptions.
+
+    Args:
+        subscriptions (iterable): (id, citizen_id, latitude, longitude,
+            radius_meters, area, sub_categories) rows of active subscriptions
+    """
+    from api.services.geofence import GeofenceIndex
+
+    circles, polygons = [], []
+    for key, owner, latitude, longitude, radius, area, codes in subscriptions:
+        if area:
+            polygons.append((key, owner, area, type_mask(codes)))
+        else:
+            circles.append((key, owner, float(latitude), float(longitude), radius, type_mask(codes)))
+    return GeofenceIndex(circles, polygons, cell_size=settings.ALERT_INDEX_CELL_SIZE)
+
+
+def subscription_rows(queryset):
+    return queryset.values_list(
+        'id', 'citizen_id', 'latitude', 'longitude', 'radius_meters', 'area', 'sub_categories', 'is_active'
+    ).iterator(chunk_size=10000)
+
+
+class SubscriptionIndex(OverlayIndex):
+    """A worker's match index of all active subscriptions (see module docstring)"""
+
+    ttl_setting = 'ALERT_INDEX_TTL'
+    max_overlay_setting = 'ALERT_INDEX_MAX_OVERLAY'
+
+    def load_rows(self):
+        from api.models import AlertSubscription
+
+        return (row[:7] for row in subscription_rows(AlertSubscription.objects.filter(is_active=True)))
+
+    def load_changes(self, since):
+        from api.models import AlertSubscription
+
+        return subscription_rows(AlertSubscription.objects.filter(updated_at__gte=since))
+
+    def build_index(self, rows):
+        return build_index(rows)
+
+    def match(self, latitude, longitude, mask):
+        """
+        Find the active subscriptions whose area contains a point and whose
+        sub-categories include the type mask.
+
+        Returns:
+            tuple: (subscription IDs, citizen IDs), two int64 arrays
+        """
+        return self.query('match', latitude, longitude, mask)
+
+
+_index = SubscriptionIndex()
+
+
+def get_index():
+    """Return this process's subscription index, brought up to date"""
+    _index.refresh()
+    return _index
+
+
+def reset_index():
+    """Drop this process's index; the next match rebuilds it (tests)"""
+    global _index
+    _index = SubscriptionIndex()
+
+
+def queue_match(report):
+    """Schedule matching of a new report against alert areas, if it is a hazard"""
+    if report.report_type.report_type == 'Hazard':
+        enqueue(MATCH_TASK, {'report_id': report.id})
+
+
+def first_match_per_citizen(reports, index):
+    """
+    Match reports against the index.
+
+    Returns:
+        dict: (citizen_id, report) -> subscription_id, one entry per citizen
+        and report, leaving out reporters' own reports
+    """
+    import numpy as np
+
+    matches = {}
+    for report in reports:
+        code = report.sub_category.sub_category if report.sub_category_id else None
+        keys, owners = index.match(report.latitude, report.longitude, report_mask(code))
+        owners, first = np.unique(owners, return_index=True)
+        for owner, key in zip(owners.tolist(), keys[first].tolist()):
+            if owner != report.citizen_id:
+                matches[(owner, report)] = key
+    return matches
+
+
+@task(MATCH_TASK, queue='alerts', batch=True)
+def match_reports(payloads):
+    """
+    Match a batch of new hazard reports, store the alerts and schedule the
+    digests of citizens that have none pending.
+
+    Returns:
+        list: None for each payload (reports deleted since are skipped)
+    """
+    from api.models import AlertSubscription, HazardAlert, Report
+
+    reports = Report.objects.filter(
+        id__in={payload['report_id'] for payload in payloads}
+    ).select_related('sub_category').only(
+        'id', 'title', 'latitude', 'longitude', 'citizen_id', 'sub_category__sub_category'
+    )
+    matches = first_match_per_citizen(reports, get_index())
+
+    # The index may be behind on deletions: keep subscriptions still active
+    subscription_ids = sorted(set(matches.values()))
+    active = set()
+    for start in range(0, len(subscription_ids), CHUNK_SIZE):
+        active.update(AlertSubscription.objects.filter(
+            id__in=subscription_ids[start:start + CHUNK_SIZE], is_active=True
+        ).values_list('id', flat=True))
+
+    alerts = [
+        HazardAlert(
+            citizen_id=citizen_id,
+            subscription_id=subscription_id,
+            report_id=report.id,
+            report_title=report.title,
+            sub_category=report.sub_category.sub_category if report.sub_category_id else '',
+        )
+        for (citizen_id, report), subscription_id in matches.items() if subscription_id in active
+    ]
+    if not alerts:
+        return [None] * len(payloads)
+
+    window = settings.ALERT_DIGEST_SECONDS
+    citizen_ids = sorted({alert.citizen_id for alert in alerts})
+    # Citizens with a pending alert in the window already have a digest scheduled
+    scheduled = set()
+    for start in range(0, len(citizen_ids), CHUNK_SIZE):
+        scheduled.update(HazardAlert.objects.filter(
+            citizen_id__in=citizen_ids[start:start + CHUNK_SIZE], sent_at__isnull=True,
+            created_at__gte=timezone.now() - timedelta(seconds=window),
+        ).values_list('citizen_id', flat=True))
+
+    HazardAlert.objects.bulk_create(alerts, batch_size=CHUNK_SIZE, ignore_conflicts=True)
+    enqueue_many(
+        DIGEST_TASK,
+        [{'citizen_id': citizen_id} for citizen_id in citizen_ids if citizen_id not in scheduled],
+        delay=window,
+    )
+    return [None] * len(payloads)
+
+
+def build_digest(citizen, alerts):
+    """
+    Render the alert digest email of one citizen.
+
+    Returns:
+        dict: The email, as taken by mail.queue_emails(), or None when
+        there is nothing to send
+    """
+    from api.models import SubCategory
+
+    if not alerts:
+        return None
+
+    labels = dict(SubCategory.SubCategoryType.choices)
+    lines = [
+        f'- {labels.get(alert.sub_category, "Hazard")}: "{alert.report_title}" near '
+        f'{alert.subscription.name if alert.subscription and alert.subscription.name else "your alert area"} '
+        f'(report #{alert.report_id})'
+        for alert in alerts
+    ]
+    subject = (
+        'Hazard reported near you' if len(alerts) == 1
+        else f'{len(alerts)} hazards reported near you'
+    )
+    body = '\n'.join([
+        f'Hello {citizen.name},',
+        '',
+        'Hazards were reported in your alert areas:',
+        '',
+        *lines,
+        '',
+        'Stay safe.',
+        'Smartwayz',
+    ])
+    return {'to': [citizen.email], 'subject': subject, 'body': body}
+
+
+@task(DIGEST_TASK, queue='notifications', batch=True)
+def send_digests(payloads):
+    """Queue the alert digests of a batch of citizens (see notifications.send_pending_digests)"""
+    from api.models import HazardAlert
+
+    return send_pending_digests(HazardAlert, payloads, build_digest, related=('citizen', 'subscription'))
@@ -0,0 +1,142 @@
+"""
+Hot/archive split of the reports table.
+
+Resolved reports older than ``REPORT_ARCHIVE_MONTHS`` are moved from
+``reports`` to ``reports_archive`` (keeping their IDs) in keyset-paginated
+batches, each in its own short transaction. Most traffic concerns recent
+reports, so the hot table and its indexes stay small.
+
+Readers decide whether to look at the archive from the *horizon*: the
+newest ``created_at`` in the archive. A query whose date range starts after
+it cannot match archived rows and only reads the hot table.
+"""
+import calendar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+HORIZON_KEY = 'report_archive_horizon'
+
+
+def months_ago(months, now=None):
+    """
+    Return the same moment ``months`` calendar months earlier.
+
+    The day is clamped to the length of the target month (e.g. May 31 minus
+    three months is February 28/29).
+    """
+    now = now or timezone.now()
+    year, month = divmod(now.year * 12 + now.month - 1 - months, 12)
+    day = min(now.day, calendar.monthrange(year, month + 1)[1])
+    return now.replace(year=year, month=month + 1, day=day)
+
+
+def archive_horizon():
+    """
+    Return the newest ``created_at`` of any archived report, or None when
+    the archive is empty. Cached, and invalidated by ``archive_batches``.
+    """
+    from api.models import ArchivedReport
+
+    cached = cache.get(HORIZON_KEY)
+    if cached is not None:
+        return cached['horizon']
+    horizon = ArchivedReport.objects.order_by('-created_at').values_list('created_at', flat=True).first()
+    cache.set(HORIZON_KEY, {'horizon': horizon}, timeout=settings.REPORT_ARCHIVE_HORIZON_TIMEOUT)
+    return horizon
+
+
+async def aarchive_horizon():
+    from api.models import ArchivedReport
+
+    cached = await cache.aget(HORIZON_KEY)
+    if cached is not None:
+        return cached['horizon']
+    horizon = await ArchivedReport.objects.order_by('-created_at').values_list('created_at', flat=True).afirst()
+    await cache.aset(HORIZON_KEY, {'horizon': horizon}, timeout=settings.REPORT_ARCHIVE_HORIZON_TIMEOUT)
+    return horizon
+
+
+def reaches_archive(horizon, created_after):
+    """
+    Tell whether reports created from ``created_after`` on may be archived.
+
+    Args:
+        horizon (datetime): Result of archive_horizon()
+        created_after (datetime): Start of the queried range, None if open
+    """
+    return horizon is not None and (created_after is None or created_after <= horizon)
+
+
+def archive_candidates(cutoff):
+    """Hot reports eligible for archiving: resolved and created before ``cutoff``"""
+    from api.models import Report
+
+    return Report.objects.filter(status__code='resolved', created_at__lt=cutoff)
+
+
+def archive_batches(cutoff, batch_size=1000):
+    """
+    Move archivable reports to the archive, one transaction per batch.
+
+    Photos move to ``report_media_archive``; search index entries,
+    pending uploads and individual confirmations (their count is kept) are
+    dropped. Rows are deleted without signals, so no delta sync tombstones
+    are written: archiving is not a deletion.
+
+    Args:
+        cutoff (datetime): Only reports created before it are moved
+        batch_size (int): Reports moved per transaction
+
+    Yields:
+        int: Number of reports moved by each batch
+    """
+    from api.models import (
+        ArchivedReport, ArchivedReportMedia, MediaUpload, Report, ReportConfirmation, ReportConfirmationShard,
+        ReportMedia, ReportSearchTerm,
+    )
+    from api.services.confirmations import confirmation_counts
+
+    # Archived reports keep what they were, not working state like the triage priority
+    report_fields = [f.attname for f in ArchivedReport._meta.concrete_fields if f.attname != 'archived_at']
+    media_fields = [f.attname for f in ArchivedReportMedia._meta.concrete_fields]
+    queryset = archive_candidates(cutoff).order_by('id')
+    cursor = 0
+    try:
+        while True:
+            with transaction.atomic():
+                # Rows locked by a concurrent status change are left for the next run
+                reports = list(
+                    queryset.filter(id__gt=cursor).select_for_update(skip_locked=True, of=('self',))[:batch_size]
+                )
+                if not reports:
+                    return
+                cursor = reports[-1].id
+                ids = [report.id for report in reports]
+
+                # Confirmations not folded yet are counted in
+                counts = confirmation_counts(ids)
+                for report in reports:
+                    report.confirmation_count = counts[report.id]
+                ArchivedReport.objects.bulk_create([
+                    ArchivedReport(**{name: getattr(report, name) for name in report_fields})
+                    for report in reports
+                ])
+                ArchivedReportMedia.objects.bulk_create([
+                    ArchivedReportMedia(**media)
+                    for media in ReportMedia.objects.filter(report_id__in=ids).values(*media_fields)
+                ])
+                for dependents in [
+                    ReportSearchTerm.objects.filter(report_id__in=ids),
+                    MediaUpload.objects.filter(report_id__in=ids),
+                    ReportMedia.objects.filter(report_id__in=ids),
+                    ReportConfirmation.objects.filter(report_id__in=ids),
+                    ReportConfirmationShard.objects.filter(report_id__in=ids),
+                    Report.objects.filter(id__in=ids),
+                ]:
+                    dependents._raw_delete(dependents.db)
+            yield len(reports)
+    finally:
+        cache.delete(HORIZON_KEY)
@@ -0,0 +1,230 @@
+"""
+Deleting a citizen's account without one giant transaction.
+
+Deleting a ``Citizen`` row cascades to all their reports and everything
+hanging off them: for a prolific citizen that is one transaction holding
+locks on hundreds of thousands of report rows, inside a request that
+times out. Instead, ``request_deletion()`` only deactivates the citizen
+(they can no longer log in, refresh tokens or file reports) and queues a
+job, which works through these steps in batches of
+``CITIZEN_DELETION_BATCH_SIZE`` rows, one short transaction each:
+
+1. ``reports``: delete the citizen's reports with their photos, search
+   terms, uploads and confirmations, or with ``CITIZEN_DELETION_MODE =
+   'anonymize'``, hand them over to a shared "Deleted citizen" account;
+2. ``archived_reports``: the same for their archived reports;
+3. ``confirmations``: withdraw their confirmations of other reports;
+4. ``account``: delete the citizen row, which cascades to the few rows
+   left (alert areas, notifications, idempotency keys).
+
+Each batch takes the first rows still matching its step, so no cursor is
+needed: what is left is what remains to do. The step and the progress
+counters are updated in the batch's transaction, under a row lock on the
+``CitizenDeletion`` record, so a job interrupted at any point (or run
+twice) resumes cleanly. A job hands over to a fresh one after
+``CITIZEN_DELETION_JOB_SECONDS``, staying well within the workers' job
+lock timeout.
+
+Rows are deleted without signals, like archiving does. Deleted hot
+reports get a ``ReportTombstone`` each, written in the batch's
+transaction, since authorities' delta sync clients list them too (see
+``ReportViewSet.list``); anonymized ones get a new ``updated_at`` instead.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from api.services.jobs import enqueue, task
+
+DELETE_TASK = 'citizens.delete'
+
+PLACEHOLDER_EMAIL = 'deleted-citizen@smartwayz.invalid'
+
+
+def request_deletion(citizen_id, mode=None):
+    """
+    Deactivate a citizen and queue the deletion of their data.
+
+    Requesting the deletion of a citizen already being deleted returns the
+    deletion in progress.
+
+    Returns:
+        CitizenDeletion
+    """
+    from api.models import ArchivedReport, Citizen, CitizenDeletion, Report
+
+    with transaction.atomic():
+        Citizen.objects.filter(id=citizen_id, is_active=True).update(is_active=False, deactivated_at=timezone.now())
+        deletion, created = CitizenDeletion.objects.get_or_create(citizen_id=citizen_id, defaults={
+            'mode': mode or settings.CITIZEN_DELETION_MODE,
+            'total_reports': (
+                Report.objects.filter(citizen_id=citizen_id).count()
+                + ArchivedReport.objects.filter(citizen_id=citizen_id).count()
+            ),
+        })
+        if created:
+            enqueue(DELETE_TASK, {'deletion': deletion.id})
+    return deletion
+
+
+def placeholder_citizen_id():
+    """ID of the account anonymized reports are handed over to"""
+    from api.models import Citizen
+
+    citizen, _ = Citizen.objects.get_or_create(email=PLACEHOLDER_EMAIL, defaults={
+        'name': 'Deleted citizen', 'password': make_password(None), 'is_active': False,
+    })
+    return citizen.id
+
+
+def delete_reports(ids, citizen_id):
+    """Delete hot reports and the rows that depend on them, leaving tombstones for delta sync"""
+    from api.models import (
+        MediaUpload, Report, ReportConfirmation, ReportConfirmationShard, ReportMedia, ReportSearchTerm,
+        ReportTombstone,
+    )
+
+    ReportTombstone.objects.bulk_create([
+        ReportTombstone(report_id=report_id, citizen_id=citizen_id) for report_id in ids
+    ])
+
+    for dependents in [
+        ReportSearchTerm.objects.filter(report_id__in=ids),
+        MediaUpload.objects.filter(report_id__in=ids),
+        ReportMedia.objects.filter(report_id__in=ids),
+        ReportConfirmation.objects.filter(report_id__in=ids),
+        ReportConfirmationShard.objects.filter(report_id__in=ids),
+        Report.objects.filter(id__in=ids),
+    ]:
+        dependents._raw_delete(dependents.db)
+
+
+def delete_archived_reports(ids):
+    """Delete archived reports and their photos"""
+    from api.models import ArchivedReport, ArchivedReportMedia
+
+    for dependents in [
+        ArchivedReportMedia.objects.filter(report_id__in=ids),
+        ArchivedReport.objects.filter(id__in=ids),
+    ]:
+        dependents._raw_delete(dependents.db)
+
+
+def process_reports(deletion, batch_size):
+    """Delete or anonymize a batch of the citizen's hot reports; returns how many"""
+    from api.models import CitizenDeletion, MediaUpload, Report
+
+    ids = list(
+        Report.objects.filter(citizen_id=deletion.citizen_id).order_by().values_list('id', flat=True)[:batch_size]
+    )
+    if deletion.mode == CitizenDeletion.Mode.ANONYMIZE:
+        uploads = MediaUpload.objects.filter(report_id__in=ids)
+        uploads._raw_delete(uploads.db)
+        # A new owner is a change delta sync clients (authorities) need
+        Report.objects.filter(id__in=ids).update(citizen_id=placeholder_citizen_id(), updated_at=timezone.now())
+    elif ids:
+        delete_reports(ids, deletion.citizen_id)
+    return len(ids)
+
+
+def process_archived_reports(deletion, batch_size):
+    """Delete or anonymize a batch of the citizen's archived reports; returns how many"""
+    from api.models import ArchivedReport, CitizenDeletion
+
+    ids = list(
+        ArchivedReport.objects.filter(citizen_id=deletion.citizen_id).order_by().values_list('id', flat=True)[:batch_size]
+    )
+    if deletion.mode == CitizenDeletion.Mode.ANONYMIZE:
+        ArchivedReport.objects.filter(id__in=ids).update(citizen_id=placeholder_citizen_id())
+    elif ids:
+        delete_archived_reports(ids)
+    return len(ids)
+
+
+def process_confirmations(deletion, batch_size):
+    """Withdraw a batch of the citizen's confirmations of other reports; returns how many"""
+    from api.models import ReportConfirmation
+    from api.services.confirmations import add_to_shard
+
+    rows = list(
+        ReportConfirmation.objects.filter(citizen_id=deletion.citizen_id).order_by()
+        .values_list('id', 'report_id')[:batch_size]
+    )
+    confirmations = ReportConfirmation.objects.filter(id__in=[row[0] for row in rows])
+    confirmations._raw_delete(confirmations.db)
+    for _, report_id in rows:
+        add_to_shard(report_id, -1)
+    return len(rows)
+
+
+def process_account(deletion, batch_size):
+    """
+    Delete the citizen row with what is left of their data. Their
+    tombstones stay: authorities' clients may not have synced them yet.
+    """
+    from api.models import Citizen
+
+    Citizen.objects.filter(id=deletion.citizen_id).delete()
+    return 0
+
+
+STEPS = {
+    'reports': process_reports,
+    'archived_reports': process_archived_reports,
+    'confirmations': process_confirmations,
+    'account': process_account,
+}
+REPORT_STEPS = ('reports', 'archived_reports')
+
+
+def run_batch(deletion_id, batch_size=None):
+    """
+    Run one batch of a deletion in its own transaction.
+
+    Returns:
+        bool: Whether work is left
+    """
+    from api.models import CitizenDeletion
+
+    batch_size = batch_size or settings.CITIZEN_DELETION_BATCH_SIZE
+    with transaction.atomic():
+        deletion = CitizenDeletion.objects.select_for_update().get(id=deletion_id)
+        if deletion.state == CitizenDeletion.State.DONE:
+            return False
+
+        handled = STEPS[deletion.step](deletion, batch_size)
+        if deletion.step in REPORT_STEPS:
+            deletion.processed_reports += handled
+        if handled < batch_size:
+            # The step is done: a short (or empty) batch took the last rows
+            steps = list(STEPS)
+            position = steps.index(deletion.step) + 1
+            if position < len(steps):
+                deletion.step = steps[position]
+            else:
+                deletion.state = CitizenDeletion.State.DONE
+                deletion.finished_at = timezone.now()
+        deletion.batches += 1
+        deletion.save()
+    return deletion.state != CitizenDeletion.State.DONE
+
+
+@task(DELETE_TASK)
+def run_deletion(deletion, batch_size=None):
+    """
+    Run batches of a deletion for up to CITIZEN_DELETION_JOB_SECONDS, then
+    queue a job to carry on.
+    """
+    from api.models import CitizenDeletion
+
+    CitizenDeletion.objects.filter(id=deletion, started_at__isnull=True).update(
+        state=CitizenDeletion.State.RUNNING, started_at=timezone.now()
+    )
+    deadline = time.monotonic() + settings.CITIZEN_DELETION_JOB_SECONDS
+    while run_batch(deletion, batch_size):
+        if time.monotonic() > deadline:
+            enqueue(DELETE_TASK, {'deletion': deletion, 'batch_size': batch_size})
+            return
@@ -0,0 +1,165 @@
+"""
+"Me too" confirmations of reports, counted without a hot row.
+
+A confirmation is a unique (citizen, report) row. Counting it by
+incrementing ``Report.confirmation_count`` would make every confirmation
+of a popular report wait on that report's row lock until the previous one
+commits, so confirmations of a viral pothole would run one at a time.
+Instead each one adds 1 (or -1, when withdrawn) with an ``F()`` update to
+one of ``CONFIRMATION_SHARDS`` counter rows of the report, picked at
+random, in the same transaction as the confirmation row:
+
+    report.confirmation_count + sum(shard counts) = confirmations
+
+Every ``CONFIRMATION_FOLD_INTERVAL`` seconds one idle worker folds the
+shards into the report rows (see ``fold()``): both sides of the equation
+change in one transaction, and shards are decremented by what was read
+rather than reset, so confirmations landing during the fold are kept.
+Shards that reach 0 are deleted, so the table only holds recent activity.
+
+``Report.confirmation_count`` is what report listings show, up to one
+fold interval behind; ``confirmation_counts()`` adds the pending shards
+for an exact count.
+"""
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from api.services.jobs import maintenance
+
+FOLD_LOCK_KEY = 'confirmations:fold'
+
+# Shard rows folded per transaction
+FOLD_BATCH_SIZE = 1000
+
+
+def add_to_shard(report_id, delta):
+    """Add ``delta`` to a random counter shard of a report"""
+    from api.models import ReportConfirmationShard
+
+    shard = random.randrange(settings.CONFIRMATION_SHARDS)
+    shards = ReportConfirmationShard.objects.filter(report_id=report_id, shard=shard)
+    if shards.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            ReportConfirmationShard.objects.create(report_id=report_id, shard=shard, count=delta)
+    except IntegrityError:
+        # Another confirmation created the shard first
+        shards.update(count=F('count') + delta)
+
+
+def confirm(citizen_id, report_id):
+    """
+    Record a citizen's confirmation of a report.
+
+    Returns:
+        bool: False if the citizen had already confirmed it
+    """
+    from api.models import ReportConfirmation
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                ReportConfirmation.objects.create(citizen_id=citizen_id, report_id=report_id)
+        except IntegrityError:
+            return False
+        add_to_shard(report_id, 1)
+    return True
+
+
+def withdraw(citizen_id, report_id):
+    """
+    Withdraw a citizen's confirmation of a report.
+
+    Returns:
+        bool: False if the citizen had not confirmed it
+    """
+    from api.models import ReportConfirmation
+
+    with transaction.atomic():
+        deleted, _ = ReportConfirmation.objects.filter(citizen_id=citizen_id, report_id=report_id).delete()
+        if not deleted:
+            return False
+        add_to_shard(report_id, -1)
+    return True
+
+
+def confirmation_counts(report_ids):
+    """
+    Count the confirmations of reports exactly, pending shards included.
+
+    One query, so a concurrent fold is seen entirely or not at all.
+
+    Returns:
+        dict: Report ID -> number of confirmations, for existing reports
+    """
+    from api.models import Report
+
+    rows = Report.objects.filter(id__in=report_ids).annotate(
+        pending=Sum('confirmation_shards__count'),
+    ).values_list('id', 'confirmation_count', 'pending')
+    return {report_id: folded + (pending or 0) for report_id, folded, pending in rows}
+
+
+def fold(batch_size=FOLD_BATCH_SIZE):
+    """
+    Move the counts of the confirmation shards into their reports.
+
+    Shard rows locked by confirmations in flight are skipped; the next
+    fold gets them.
+
+    Returns:
+        int: Number of shard rows folded
+    """
+    from api.models import Report, ReportConfirmationShard
+
+    folded = 0
+    cursor = 0
+    while True:
+        with transaction.atomic():
+            shards = list(
+                ReportConfirmationShard.objects.filter(id__gt=cursor)
+                .select_for_update(skip_locked=True).order_by('id')
+                .values_list('id', 'report_id', 'count')[:batch_size]
+            )
+            if not shards:
+                break
+            cursor = shards[-1][0]
+
+            totals = defaultdict(int)
+            for _, report_id, count in shards:
+                totals[report_id] += count
+            # One UPDATE per distinct amount: most are +1 or +2
+            for reports, amount in group_by_value(totals.items()):
+                if amount:
+                    # update() leaves updated_at alone: a new count is not a
+                    # change clients need to sync
+                    Report.objects.filter(id__in=reports).update(confirmation_count=F('confirmation_count') + amount)
+            for ids, count in group_by_value((shard_id, count) for shard_id, _, count in shards):
+                if count:
+                    ReportConfirmationShard.objects.filter(id__in=ids).update(count=F('count') - count)
+            # Including shards a withdrawal brought back to 0
+            ReportConfirmationShard.objects.filter(id__in=[row[0] for row in shards], count=0).delete()
+        folded += len(shards)
+    return folded
+
+
+def group_by_value(pairs):
+    """Group (key, value) pairs into (keys, value) pairs, one per distinct value"""
+    groups = defaultdict(list)
+    for key, value in pairs:
+        groups[value].append(key)
+    return [(keys, value) for value, keys in groups.items()]
+
+
+@maintenance
+def fold_when_due():
+    """Fold confirmation shards on one idle worker every CONFIRMATION_FOLD_INTERVAL seconds"""
+    # The shared cache elects the worker: the first to add the key runs
+    if cache.add(FOLD_LOCK_KEY, True, timeout=settings.CONFIRMATION_FOLD_INTERVAL):
+        return fold()
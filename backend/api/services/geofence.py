@@ -0,0 +1,128 @@
+"""
+Vectorised point-in-area index for hazard alert subscriptions.
+
+``GeofenceIndex`` answers "which alert areas contain this point" over a
+uniform grid. Circles, the bulk of the areas, are stored column-wise in
+NumPy arrays laid out in grid cell order: each circle appears in every
+cell its bounding box touches, so a cell's candidates are one contiguous
+slice and a query is a dict lookup plus a few vectorised operations on
+that slice (squared equirectangular distance against the squared radius,
+and the hazard type mask). Coordinates are stored as float32, accurate to
+about a meter. Polygons go to a ``PolygonGridIndex``.
+
+NumPy is only loaded by the job workers that match reports, which is why
+this lives apart from ``api.services.spatial``.
+"""
+import math
+
+import numpy as np
+
+from api.services.spatial import METERS_PER_DEGREE, PolygonGridIndex  # noqa: F401
+
+# Cells are numbered (cx + OFFSET) * 2 * OFFSET + (cy + OFFSET)
+CELL_OFFSET = 1 << 20
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def cell_number(cx, cy):
+    """Number a grid cell; works on Python ints and NumPy arrays alike"""
+    return (cx + CELL_OFFSET) * (2 * CELL_OFFSET) + (cy + CELL_OFFSET)
+
+
+class GeofenceIndex:
+    """
+    Index of circular and polygonal areas, each with an owner and a type
+    mask, returning all areas that contain a point.
+    """
+
+    def __init__(self, circles=(), polygons=(), cell_size=0.01):
+        """
+        Args:
+            circles (iterable): (key, owner, latitude, longitude, radius in
+                meters, type mask) tuples
+            polygons (iterable): (key, owner, GeoJSON geometry, type mask) tuples
+            cell_size (float): Grid cell edge in degrees
+        """
+        self.cell_size = cell_size
+        self._build_circles(list(circles))
+        polygons = list(polygons)
+        self.polygons = PolygonGridIndex(((key, geometry) for key, _, geometry, _ in polygons), cell_size)
+        self.polygon_owners = {key: (owner, mask) for key, owner, _, mask in polygons}
+
+    def _build_circles(self, rows):
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), 6)
+        keys, owners = data[:, 0].astype(np.int64), data[:, 1].astype(np.int64)
+        lat, lon, radius = data[:, 2], data[:, 3], data[:, 4]
+        masks = data[:, 5].astype(np.int64)
+
+        # Bounding box of each circle in cells
+        dlat = radius / METERS_PER_DEGREE
+        dlon = radius / (METERS_PER_DEGREE * np.maximum(np.cos(np.radians(lat)), 1e-6))
+        cx0 = np.floor((lon - dlon) / self.cell_size).astype(np.int64)
+        cx1 = np.floor((lon + dlon) / self.cell_size).astype(np.int64)
+        cy0 = np.floor((lat - dlat) / self.cell_size).astype(np.int64)
+        cy1 = np.floor((lat + dlat) / self.cell_size).astype(np.int64)
+        ny = cy1 - cy0 + 1
+        counts = (cx1 - cx0 + 1) * ny
+
+        # One (cell, circle) pair per cell of each box, without a Python loop
+        circle = np.repeat(np.arange(len(rows)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = cell_number(cx0[circle] + offset // ny[circle], cy0[circle] + offset % ny[circle])
+
+        order = np.argsort(cells, kind='stable')
+        cells, circle = cells[order], circle[order]
+        numbers, starts = np.unique(cells, return_index=True)
+        ends = np.append(starts[1:], len(cells))
+        self.cells = dict(zip(numbers.tolist(), zip(starts.tolist(), ends.tolist())))
+
+        self.circle_count = len(rows)
+        self.lat = lat[circle].astype(np.float32)
+        self.lon = lon[circle].astype(np.float32)
+        self.radius2 = (radius[circle] ** 2).astype(np.float32)
+        self.masks = masks[circle].astype(np.int32)
+        # Position of each entry's circle in the per-circle arrays
+        self.slots = circle.astype(np.int32)
+        self.circle_keys = keys
+        self.circle_owners = owners
+
+    def __len__(self):
+        return self.circle_count + len(self.polygon_owners)
+
+    @property
+    def nbytes(self):
+        """Memory held by the circle arrays"""
+        arrays = (self.lat, self.lon, self.radius2, self.masks, self.slots, self.circle_keys, self.circle_owners)
+        return sum(a.nbytes for a in arrays)
+
+    def match(self, latitude, longitude, mask):
+        """
+        Find the areas containing a point whose type mask shares a bit
+        with ``mask``.
+
+        Returns:
+            tuple: (keys, owners), two int64 arrays
+        """
+        x, y = float(longitude), float(latitude)
+        keys = owners = EMPTY
+        span = self.cells.get(cell_number(math.floor(x / self.cell_size), math.floor(y / self.cell_size)))
+        if span is not None:
+            start, end = span
+            scale = math.cos(math.radians(y)) * METERS_PER_DEGREE
+            dx = (self.lon[start:end] - np.float32(x)) * np.float32(scale)
+            dy = (self.lat[start:end] - np.float32(y)) * np.float32(METERS_PER_DEGREE)
+            hits = (dx * dx + dy * dy <= self.radius2[start:end]) & ((self.masks[start:end] & mask) != 0)
+            # compress/take run several times faster than boolean and fancy indexing
+            slots = np.compress(hits, self.slots[start:end])
+            keys, owners = self.circle_keys.take(slots), self.circle_owners.take(slots)
+
+        if self.polygon_owners:
+            found = [
+                (key, owner) for key in self.polygons.lookup_all(y, x)
+                for owner, polygon_mask in [self.polygon_owners[key]] if polygon_mask & mask
+            ]
+            if found:
+                found = np.array(found, dtype=np.int64)
+                keys, owners = np.concatenate([keys, found[:, 0]]), np.concatenate([owners, found[:, 1]])
+        return keys, owners
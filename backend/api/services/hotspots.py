@@ -0,0 +1,298 @@
+"""
+Hotspot detection over report locations.
+
+Reports are binned into a square grid per sub-category (vectorized with
+NumPy), and the per-cell counts are persisted in ``hotspot_cells``. Cells
+holding at least ``HOTSPOT_MIN_REPORTS`` reports are dense; dense cells
+touching each other (8-neighbourhood) form a hotspot, together with the
+non-dense cells bordering them — DBSCAN on the grid, with the cell size as
+epsilon. Each run only bins the reports created since the previous run and
+re-clusters the sub-categories they touched, so the cost of a run follows
+the number of new reports and occupied cells, not the table size.
+
+Runs are checkpointed by a ``created_at`` watermark rather than by report
+ID: IDs are handed out before commit, so a report with a lower ID than the
+highest visible one may still be in flight. Like delta sync (see
+``api/services/sync.py``), the watermark is held back by
+``HOTSPOT_SAFETY_LAG_SECONDS``, and reports younger than that are left to
+the next run.
+
+Cell counts only ever grow: deleted reports (and reports whose location
+or sub-category changed) stay counted where they were until the next full
+rebuild, which runs take on their own every
+``HOTSPOT_FULL_REBUILD_INTERVAL`` seconds.
+"""
+from datetime import timedelta
+from collections import deque
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from api.models import ArchivedReport, Hotspot, HotspotCell, HotspotRun, Report
+
+METERS_PER_DEGREE = 111_320
+
+# Cell keys pack (sub_category, cell_x, cell_y) into one int64 so binning
+# is a single 1-D np.unique: 22 bits of sub-category, 21 bits per axis.
+AXIS_BITS = 21
+AXIS_OFFSET = 1 << (AXIS_BITS - 1)
+AXIS_MASK = (1 << AXIS_BITS) - 1
+NO_SUB_CATEGORY = 0
+
+NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+def cell_size_degrees():
+    return settings.HOTSPOT_CELL_SIZE_METERS / METERS_PER_DEGREE
+
+
+def bin_points(sub_category_ids, latitudes, longitudes, cell_size):
+    """
+    Count points per (sub-category, cell).
+
+    Args:
+        sub_category_ids (ndarray): int64, NO_SUB_CATEGORY for none
+        latitudes (ndarray): float64 degrees
+        longitudes (ndarray): float64 degrees
+        cell_size (float): Cell edge in degrees
+
+    Returns:
+        tuple: (keys, counts) as int64 arrays, keys sorted and unique
+    """
+    cell_x = np.floor(longitudes / cell_size).astype(np.int64) + AXIS_OFFSET
+    cell_y = np.floor(latitudes / cell_size).astype(np.int64) + AXIS_OFFSET
+    keys = (sub_category_ids.astype(np.int64) << (2 * AXIS_BITS)) | (cell_x << AXIS_BITS) | cell_y
+    return np.unique(keys, return_counts=True)
+
+
+def merge_counts(keys_a, counts_a, keys_b, counts_b):
+    """Add two (keys, counts) histograms"""
+    keys, inverse = np.unique(np.concatenate([keys_a, keys_b]), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([counts_a, counts_b]))
+    return keys, counts.astype(np.int64)
+
+
+def unpack_keys(keys):
+    """Split packed keys into (sub_category_id, cell_x, cell_y) arrays"""
+    sub_category_ids = keys >> (2 * AXIS_BITS)
+    cell_x = ((keys >> AXIS_BITS) & AXIS_MASK) - AXIS_OFFSET
+    cell_y = (keys & AXIS_MASK) - AXIS_OFFSET
+    return sub_category_ids, cell_x, cell_y
+
+
+def cluster_cells(cells, min_reports):
+    """
+    Group the cells of one sub-category into hotspots.
+
+    Args:
+        cells (dict): {(cell_x, cell_y): report_count}
+        min_reports (int): Reports needed for a cell to be dense
+
+    Returns:
+        list: One list of (cell_x, cell_y) per hotspot
+    """
+    dense = {cell for cell, count in cells.items() if count >= min_reports}
+    assigned = set()
+    clusters = []
+
+    for seed in dense:
+        if seed in assigned:
+            continue
+        members = []
+        queue = deque([seed])
+        assigned.add(seed)
+        while queue:
+            cell = queue.popleft()
+            members.append(cell)
+            if cell not in dense:
+                continue  # border cells join but do not expand the hotspot
+            x, y = cell
+            for dx, dy in NEIGHBOURS:
+                neighbour = (x + dx, y + dy)
+                if neighbour in cells and neighbour not in assigned:
+                    assigned.add(neighbour)
+                    queue.append(neighbour)
+        clusters.append(members)
+
+    return clusters
+
+
+def convex_hull(points):
+    """Monotone chain convex hull; returns the hull counter-clockwise"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def describe_cluster(members, cells, cell_size, min_reports):
+    """Compute centroid, outline polygon and score of one hotspot"""
+    counts = np.array([cells[c] for c in members], dtype=np.float64)
+    xs = np.array([c[0] for c in members], dtype=np.float64)
+    ys = np.array([c[1] for c in members], dtype=np.float64)
+    total = counts.sum()
+
+    centroid_lon = float(((xs + 0.5) * counts).sum() / total * cell_size)
+    centroid_lat = float(((ys + 0.5) * counts).sum() / total * cell_size)
+
+    corners = []
+    for x, y in members:
+        corners.extend([(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1)])
+    hull = [[round(x * cell_size, 6), round(y * cell_size, 6)] for x, y in convex_hull(corners)]
+
+    return {
+        'centroid_latitude': round(centroid_lat, 6),
+        'centroid_longitude': round(centroid_lon, 6),
+        'polygon': {'type': 'Polygon', 'coordinates': [hull + [hull[0]]]},
+        'report_count': int(total),
+        # Concentration: average reports per cell relative to the density threshold
+        'score': round(total * (total / len(members)) / min_reports, 2),
+    }
+
+
+def load_new_reports(after, up_to, batch_size, model=Report):
+    """
+    Yield (sub_category_ids, latitudes, longitudes) arrays for reports
+    created after ``after`` (None for all) up to ``up_to``, in
+    keyset-paginated batches to bound memory.
+    """
+    queryset = model.objects.filter(created_at__lte=up_to)
+    if after is not None:
+        queryset = queryset.filter(created_at__gt=after)
+    queryset = queryset.annotate(
+        lat=Cast('latitude', FloatField()),
+        lon=Cast('longitude', FloatField()),
+    ).order_by('id').values_list('id', 'sub_category_id', 'lat', 'lon')
+
+    cursor = 0
+    while True:
+        rows = list(queryset.filter(id__gt=cursor)[:batch_size])
+        if not rows:
+            return
+        cursor = rows[-1][0]
+        _, sub_category_ids, latitudes, longitudes = zip(*rows)
+        yield (
+            np.array([s or NO_SUB_CATEGORY for s in sub_category_ids], dtype=np.int64),
+            np.array(latitudes, dtype=np.float64),
+            np.array(longitudes, dtype=np.float64),
+        )
+
+
+def rebuild_due(previous):
+    """Tell whether the cells are due for a full rebuild"""
+    if previous is None or previous.watermark is None:
+        return True
+    last_full = HotspotRun.objects.filter(full_rebuild=True).order_by('-id').values_list(
+        'finished_at', flat=True
+    ).first()
+    interval = timedelta(seconds=settings.HOTSPOT_FULL_REBUILD_INTERVAL)
+    return last_full is None or last_full < timezone.now() - interval
+
+
+def detect_hotspots(full=False, batch_size=100_000):
+    """
+    Fold new reports into the cell counts and refresh affected hotspots.
+
+    Args:
+        full (bool): Discard the cell counts and rebin every report, which
+            runs also do when the last full rebuild is older than
+            HOTSPOT_FULL_REBUILD_INTERVAL
+        batch_size (int): Reports loaded per query
+
+    Returns:
+        HotspotRun: The checkpoint recorded for this run
+    """
+    cell_size = cell_size_degrees()
+    min_reports = settings.HOTSPOT_MIN_REPORTS
+
+    with transaction.atomic():
+        previous = HotspotRun.objects.select_for_update().order_by('-id').first()
+        full = full or rebuild_due(previous)
+        if full:
+            HotspotCell.objects.all().delete()
+            Hotspot.objects.all().delete()
+            after = None
+        else:
+            after = previous.watermark
+        up_to = timezone.now() - timedelta(seconds=settings.HOTSPOT_SAFETY_LAG_SECONDS)
+        if after is not None and up_to < after:
+            up_to = after
+
+        keys = np.empty(0, dtype=np.int64)
+        counts = np.empty(0, dtype=np.int64)
+        processed = 0
+        # Archived reports were binned while they were hot; only a full
+        # rebuild has to read them back
+        sources = [Report, ArchivedReport] if full else [Report]
+        for model in sources:
+            for sub_category_ids, latitudes, longitudes in load_new_reports(after, up_to, batch_size, model):
+                batch_keys, batch_counts = bin_points(sub_category_ids, latitudes, longitudes, cell_size)
+                keys, counts = merge_counts(keys, counts, batch_keys, batch_counts)
+                processed += len(sub_category_ids)
+
+        affected = sorted({int(s) for s in np.unique(unpack_keys(keys)[0])})
+        hotspots_found = 0
+        for sub_category_id in affected:
+            hotspots_found += refresh_sub_category(sub_category_id, keys, counts, cell_size, min_reports)
+
+        return HotspotRun.objects.create(
+            watermark=up_to,
+            reports_processed=processed,
+            hotspots_found=hotspots_found,
+            full_rebuild=full,
+        )
+
+
+def refresh_sub_category(sub_category_id, new_keys, new_counts, cell_size, min_reports):
+    """Merge new counts into the stored cells of one sub-category and re-cluster it"""
+    db_sub_category_id = sub_category_id or None
+    mask = unpack_keys(new_keys)[0] == sub_category_id
+    _, new_x, new_y = unpack_keys(new_keys[mask])
+    additions = dict(zip(zip(new_x.tolist(), new_y.tolist()), new_counts[mask].tolist()))
+
+    stored = {
+        (cell.cell_x, cell.cell_y): cell
+        for cell in HotspotCell.objects.filter(sub_category_id=db_sub_category_id).only(
+            'id', 'cell_x', 'cell_y', 'report_count'
+        )
+    }
+
+    # Only write the cells that changed
+    changed, created = [], []
+    for (x, y), count in additions.items():
+        cell = stored.get((x, y))
+        if cell is None:
+            cell = HotspotCell(sub_category_id=db_sub_category_id, cell_x=x, cell_y=y, report_count=count)
+            stored[(x, y)] = cell
+            created.append(cell)
+        else:
+            cell.report_count += count
+            changed.append(cell)
+    HotspotCell.objects.bulk_update(changed, ['report_count'], batch_size=1000)
+    HotspotCell.objects.bulk_create(created, batch_size=5000)
+
+    cells = {key: cell.report_count for key, cell in stored.items()}
+    Hotspot.objects.filter(sub_category_id=db_sub_category_id).delete()
+    hotspots = [
+        Hotspot(sub_category_id=db_sub_category_id, **describe_cluster(members, cells, cell_size, min_reports))
+        for members in cluster_cells(cells, min_reports)
+    ]
+    Hotspot.objects.bulk_create(hotspots)
+    return len(hotspots)
@@ -0,0 +1,117 @@
+"""
+Idempotency keys for report creation and photo uploads.
+
+Clients on flaky networks retry ``POST /api/reports/`` and the start of
+photo uploads. When the request carries an ``Idempotency-Key`` header,
+``run_once()`` runs it inside a transaction that also inserts an
+``IdempotencyKey`` row for (citizen, key) and stores the response in it
+before committing. A retry finds the row and
+gets the stored response back without validating or inserting anything.
+
+Concurrent duplicates are serialized by the unique constraint rather than
+by explicit locks: the second insert of the same (citizen, key) waits for
+the first transaction to finish (PostgreSQL; SQLite serializes writers
+anyway). If it committed, the insert fails and the duplicate replays the
+stored response; if it rolled back, the duplicate goes ahead. Failed
+requests are rolled back with their key, so they can be retried.
+
+Keys expire after ``IDEMPOTENCY_KEY_TTL`` seconds; idle job workers delete
+expired ones.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from api.services.jobs import maintenance
+
+MAX_KEY_LENGTH = 255
+
+
+class KeyReused(Exception):
+    """The key was already used for a different request"""
+
+
+def fingerprint(path, data):
+    """SHA-256 of a request's path and body (dict or QueryDict), independent of key order"""
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    body = json.dumps([path, data], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def _stored(citizen_id, key, request_fingerprint):
+    """Return the live stored row for a key, deleting it if expired"""
+    from api.models import IdempotencyKey
+
+    record = IdempotencyKey.objects.filter(citizen_id=citizen_id, key=key).first()
+    if record is None:
+        return None
+    if record.created_at < expiry_cutoff():
+        IdempotencyKey.objects.filter(pk=record.pk, created_at=record.created_at).delete()
+        return None
+    if record.fingerprint != request_fingerprint:
+        raise KeyReused(key)
+    return record
+
+
+def run_once(citizen_id, key, request_fingerprint, handler):
+    """
+    Run ``handler`` at most once per (citizen, key).
+
+    Args:
+        citizen_id (int): Citizen making the request
+        key (str): The Idempotency-Key header
+        request_fingerprint (str): fingerprint() of the request, compared
+            with the original request's on replays
+        handler (callable): Returns (status_code, payload); exceptions and
+            non-2xx results are not stored
+
+    Returns:
+        tuple: (status_code, payload, replayed)
+
+    Raises:
+        KeyReused: If the key was used for a different request
+    """
+    from api.models import IdempotencyKey
+
+    record = _stored(citizen_id, key, request_fingerprint)
+    if record is not None:
+        return record.status_code, record.response, True
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    citizen_id=citizen_id, key=key, fingerprint=request_fingerprint
+                )
+        except IntegrityError:
+            # A concurrent request with the same key committed first
+            record = _stored(citizen_id, key, request_fingerprint)
+            if record is None:
+                raise
+            return record.status_code, record.response, True
+
+        status_code, payload = handler()
+        if 200 <= status_code < 300:
+            record.status_code, record.response = status_code, payload
+            record.save(update_fields=['status_code', 'response'])
+        else:
+            transaction.set_rollback(True)
+    return status_code, payload, False
+
+
+@maintenance
+def prune_expired():
+    """Delete idempotency keys older than IDEMPOTENCY_KEY_TTL"""
+    from api.models import IdempotencyKey
+
+    return IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()[0]
@@ -0,0 +1,304 @@
+"""
+Background jobs backed by the database, without an external broker.
+
+Tasks are functions registered with ``@task``. ``enqueue()`` stores a
+``Job`` row; workers (``manage.py run_workers``) claim up to ``batch_size``
+due jobs at a time and run them:
+
+- On PostgreSQL jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+  so concurrent workers never wait on each other's rows. Databases without
+  SKIP LOCKED (SQLite) claim with a conditional ``UPDATE`` instead, which
+  is atomic there because writers are serialized.
+- A failed job is retried after an exponential backoff with jitter
+  (``JOB_BACKOFF_BASE * 2 ** (attempts - 1)``, capped at
+  ``JOB_BACKOFF_MAX``) until it has used ``max_attempts``.
+- Jobs still running after ``JOB_LOCK_TIMEOUT`` seconds belong to a worker
+  that died; idle workers put them back in the queue, or mark them failed
+  once they have used ``max_attempts``. A worker only records the outcome
+  of jobs it still holds, so a job taken back from it is left alone.
+
+Batch tasks (``@task(batch=True)``) receive the payloads of all their jobs
+in a claimed batch at once, e.g. to send many emails over one connection.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+class UnknownTask(LookupError):
+    """Raised when enqueuing or running a task that is not registered."""
+
+
+class Task:
+    def __init__(self, name, func, queue, max_attempts, batch):
+        self.name = name
+        self.func = func
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.batch = batch
+
+
+def task(name, queue='default', max_attempts=None, batch=False):
+    """
+    Register a function as a background task.
+
+    Args:
+        name (str): Name jobs refer to the task by
+        queue (str): Queue its jobs go to
+        max_attempts (int): Runs before a job is marked failed
+            (default: JOB_MAX_ATTEMPTS)
+        batch (bool): Call the function once per claimed batch with the
+            list of payloads; it returns one error (or None) per payload.
+            Otherwise it is called with each payload as keyword arguments.
+    """
+    def register(func):
+        TASKS[name] = Task(name, func, queue, max_attempts or settings.JOB_MAX_ATTEMPTS, batch)
+        func.task_name = name
+        return func
+    return register
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise UnknownTask(f'No task registered as {name!r}') from None
+
+
+def enqueue(name, payload=None, delay=None, priority=0):
+    """
+    Queue one job.
+
+    Args:
+        name (str): Registered task name
+        payload (dict): JSON-serializable task arguments
+        delay (float): Seconds before the job may run
+
+    Returns:
+        Job: The queued job
+    """
+    return enqueue_many(name, [payload or {}], delay=delay, priority=priority)[0]
+
+
+def enqueue_many(name, payloads, delay=None, priority=0):
+    """Queue one job per payload with a single INSERT"""
+    from api.models import Job
+
+    spec = get_task(name)
+    run_at = timezone.now() + timedelta(seconds=delay or 0)
+    return Job.objects.bulk_create([
+        Job(queue=spec.queue, task=spec.name, payload=payload, run_at=run_at,
+            max_attempts=spec.max_attempts, priority=priority)
+        for payload in payloads
+    ])
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying a job that failed ``attempts`` times"""
+    delay = min(settings.JOB_BACKOFF_MAX, settings.JOB_BACKOFF_BASE * 2 ** (attempts - 1))
+    # Jitter spreads out retries of jobs that failed together
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim_jobs(worker_id, queues=None, batch_size=10):
+    """
+    Claim up to ``batch_size`` due jobs for a worker.
+
+    Returns:
+        list: The claimed jobs, marked running with their attempt counted
+    """
+    from api.models import Job
+
+    now = timezone.now()
+    due = Job.objects.filter(state=Job.State.QUEUED, run_at__lte=now)
+    if queues:
+        due = due.filter(queue__in=queues)
+    due = due.order_by('-priority', 'run_at', 'id')
+    claim = {'state': Job.State.RUNNING, 'locked_by': worker_id, 'locked_at': now, 'attempts': F('attempts') + 1}
+
+    if connections[Job.objects.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            jobs = list(due.select_for_update(skip_locked=True)[:batch_size])
+            if jobs:
+                Job.objects.filter(id__in=[job.id for job in jobs]).update(**claim)
+        for job in jobs:
+            job.state, job.locked_by, job.locked_at = Job.State.RUNNING, worker_id, now
+            job.attempts += 1
+        return jobs
+
+    ids = list(due.values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    # Another worker may claim some of these first; keep what we won
+    Job.objects.filter(id__in=ids, state=Job.State.QUEUED).update(**claim)
+    return list(Job.objects.filter(id__in=ids, state=Job.State.RUNNING, locked_by=worker_id))
+
+
+def run_jobs(jobs):
+    """
+    Run claimed jobs and record their outcome.
+
+    Returns:
+        int: Number of jobs that succeeded, leaving out those no longer held
+    """
+    from api.models import Job
+
+    by_task = {}
+    for job in jobs:
+        by_task.setdefault(job.task, []).append(job)
+
+    succeeded, failed = [], []
+    for name, task_jobs in by_task.items():
+        try:
+            spec = get_task(name)
+        except UnknownTask as e:
+            failed.extend((job, str(e), True) for job in task_jobs)
+            continue
+
+        if spec.batch:
+            try:
+                errors = spec.func([job.payload for job in task_jobs])
+            except Exception:
+                errors = [traceback.format_exc()] * len(task_jobs)
+            else:
+                # zip() would leave the jobs without an outcome running
+                if not isinstance(errors, (list, tuple)) or len(errors) != len(task_jobs):
+                    got = len(errors) if isinstance(errors, (list, tuple)) else type(errors).__name__
+                    errors = [f'Batch task {name} returned {got} results for {len(task_jobs)} payloads'] * len(task_jobs)
+            for job, error in zip(task_jobs, errors):
+                if error is None:
+                    succeeded.append(job)
+                else:
+                    failed.append((job, error if isinstance(error, str) else format_error(error), False))
+            continue
+
+        for job in task_jobs:
+            try:
+                spec.func(**job.payload)
+            except Exception:
+                failed.append((job, traceback.format_exc(), False))
+            else:
+                succeeded.append(job)
+
+    now = timezone.now()
+    # Jobs requeued as stale (and maybe claimed by another worker) since
+    # are no longer ours to update
+    held = Job.objects.filter(state=Job.State.RUNNING)
+    by_worker = {}
+    for job in succeeded:
+        by_worker.setdefault(job.locked_by, []).append(job.id)
+    done = 0
+    for worker_id, ids in by_worker.items():
+        done += held.filter(id__in=ids, locked_by=worker_id).update(state=Job.State.DONE, finished_at=now, last_error='')
+    for job, error, permanent in failed:
+        mine = held.filter(id=job.id, locked_by=job.locked_by)
+        if permanent or job.attempts >= job.max_attempts:
+            logger.error('Job #%s (%s) failed for good: %s', job.id, job.task, error)
+            mine.update(state=Job.State.FAILED, finished_at=now, last_error=error)
+        else:
+            logger.warning('Job #%s (%s) failed, attempt %s of %s', job.id, job.task, job.attempts, job.max_attempts)
+            mine.update(
+                state=Job.State.QUEUED, locked_by='', locked_at=None, last_error=error,
+                run_at=now + timedelta(seconds=backoff(job.attempts)),
+            )
+    return done
+
+
+def format_error(error):
+    return ''.join(traceback.format_exception(error))
+
+
+# Housekeeping functions idle workers run every Worker.maintenance_interval
+MAINTENANCE = []
+
+
+def maintenance(func):
+    """Register ``func`` to be run periodically by idle workers"""
+    MAINTENANCE.append(func)
+    return func
+
+
+@maintenance
+def requeue_stale():
+    """
+    Put back jobs whose worker has held them longer than JOB_LOCK_TIMEOUT,
+    or mark them failed when that was their last attempt (a job that kills
+    its worker must not be retried forever).
+    """
+    from api.models import Job
+
+    now = timezone.now()
+    stale = Job.objects.filter(state=Job.State.RUNNING, locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        state=Job.State.FAILED, locked_by='', locked_at=None, finished_at=now,
+        last_error='Worker lock expired on the last attempt'
+    )
+    requeued = stale.update(state=Job.State.QUEUED, locked_by='', locked_at=None, last_error='Worker lock expired')
+    return failed + requeued
+
+
+@maintenance
+def prune_finished():
+    """Delete done jobs older than JOB_DONE_RETENTION seconds"""
+    from api.models import Job
+
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_DONE_RETENTION)
+    return Job.objects.filter(state=Job.State.DONE, finished_at__lt=cutoff).delete()[0]
+
+
+class Worker:
+    """Claim-and-run loop of one worker thread"""
+
+    # Seconds between housekeeping passes (see MAINTENANCE)
+    maintenance_interval = 60
+
+    def __init__(self, queues=None, batch_size=10, poll_interval=None):
+        self.id = f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex[:6]}'
+        self.queues = queues
+        self.batch_size = batch_size
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.last_maintenance = 0.0
+
+    def run(self, stop=None, burst=False):
+        """
+        Process jobs until ``stop`` is set, or the queue is drained when
+        ``burst`` is true.
+
+        Returns:
+            int: Number of jobs processed (succeeded or not)
+        """
+        stop = stop or threading.Event()
+        processed = 0
+        while not stop.is_set():
+            jobs = claim_jobs(self.id, self.queues, self.batch_size)
+            if jobs:
+                run_jobs(jobs)
+                processed += len(jobs)
+                continue
+            self.maintain()
+            if burst:
+                break
+            stop.wait(self.poll_interval)
+        return processed
+
+    def maintain(self):
+        if time.monotonic() - self.last_maintenance < self.maintenance_interval:
+            return
+        self.last_maintenance = time.monotonic()
+        for func in MAINTENANCE:
+            func()
@@ -0,0 +1,63 @@
+"""
+Routing of reports to the authority whose jurisdiction contains them.
+
+Each process keeps a ``PolygonGridIndex`` of all authority jurisdictions.
+It is rebuilt when the jurisdictions change (signalled through a cache
+version key) and at least every ``JURISDICTION_INDEX_TTL`` seconds, so
+processes that cannot see the invalidation still converge.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.services.spatial import PolygonGridIndex
+
+VERSION_KEY = 'jurisdiction_index_version'
+
+_lock = threading.Lock()
+_state = {'index': None, 'version': None, 'built_at': 0.0}
+
+
+def invalidate():
+    """Force every process to rebuild its index on next use"""
+    cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def build_index():
+    from api.models import Authority
+
+    entries = Authority.objects.exclude(jurisdiction__isnull=True).values_list('id', 'jurisdiction')
+    return PolygonGridIndex(entries, cell_size=settings.JURISDICTION_INDEX_CELL_SIZE)
+
+
+def get_index():
+    """Return the current jurisdiction index, rebuilding it when stale"""
+    version = cache.get(VERSION_KEY)
+    now = time.monotonic()
+    if (
+        _state['index'] is None
+        or _state['version'] != version
+        or now - _state['built_at'] > settings.JURISDICTION_INDEX_TTL
+    ):
+        with _lock:
+            if _state['index'] is None or _state['version'] != version or now - _state['built_at'] > settings.JURISDICTION_INDEX_TTL:
+                _state['index'] = build_index()
+                _state['version'] = version
+                _state['built_at'] = time.monotonic()
+    return _state['index']
+
+
+def route_report(latitude, longitude):
+    """
+    Find the authority responsible for a location.
+
+    Returns:
+        int or None: Authority ID, or None if no jurisdiction covers it
+    """
+    return get_index().lookup(latitude, longitude)
+
+
+def has_jurisdiction(authority_id):
+    return authority_id in get_index()
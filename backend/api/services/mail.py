@@ -0,0 +1,76 @@
+"""
+Email delivery through the background job queue.
+
+``queue_email()`` stores the message as a ``mail.send`` job, so requests
+never wait on the mail server. Workers deliver all the messages claimed in
+a batch over a single connection to ``EMAIL_BACKEND``; a message that
+fails is retried on its own with backoff.
+"""
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from api.services.jobs import enqueue_many, task
+
+SEND_TASK = 'mail.send'
+
+
+def queue_email(to, subject, body, html_body=None):
+    """Queue one email, see queue_emails()"""
+    return queue_emails([{'to': to, 'subject': subject, 'body': body, 'html_body': html_body}])[0]
+
+
+def queue_emails(messages):
+    """
+    Queue emails for background delivery.
+
+    Args:
+        messages (list): Dicts with 'to' (address or list of addresses),
+            'subject', 'body' and optionally 'html_body'
+
+    Returns:
+        list: The queued jobs
+    """
+    payloads = []
+    for message in messages:
+        to = message['to']
+        payloads.append({
+            'to': [to] if isinstance(to, str) else list(to),
+            'subject': message['subject'],
+            'body': message['body'],
+            'html_body': message.get('html_body'),
+        })
+    return enqueue_many(SEND_TASK, payloads)
+
+
+def build_message(payload, connection=None):
+    message = EmailMultiAlternatives(
+        subject=payload['subject'],
+        body=payload['body'],
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=payload['to'],
+        connection=connection,
+    )
+    if payload.get('html_body'):
+        message.attach_alternative(payload['html_body'], 'text/html')
+    return message
+
+
+@task(SEND_TASK, queue='mail', batch=True)
+def send_emails(payloads):
+    """
+    Deliver a batch of queued emails over one backend connection.
+
+    Returns:
+        list: None for each delivered message, the exception otherwise
+    """
+    errors = []
+    # Opening fails the whole batch (e.g. SMTP server down); all of it is retried
+    with get_connection(fail_silently=False) as connection:
+        for payload in payloads:
+            try:
+                connection.send_messages([build_message(payload, connection)])
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+    return errors
@@ -0,0 +1,104 @@
+"""
+Background processing of uploaded report photos.
+
+Each finished upload queues a ``media.process`` job (see
+api/services/jobs.py) in the transaction that records it, which strips
+EXIF metadata (citizens' photos routinely embed GPS coordinates and device
+details) and renders a JPEG thumbnail. Requests never wait on this work,
+and a worker restarting mid-queue leaves the job to another worker rather
+than the photo pending forever.
+"""
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+from api.models import ReportMedia
+from api.services import media_storage
+from api.services.jobs import enqueue as enqueue_job, task
+
+logger = logging.getLogger(__name__)
+
+PROCESS_TASK = 'media.process'
+
+
+def enqueue(media_id):
+    """
+    Queue processing of a ReportMedia; call it in the transaction creating it.
+
+    With ``MEDIA_PIPELINE_EAGER`` the work runs inline, which keeps tests
+    deterministic.
+    """
+    if settings.MEDIA_PIPELINE_EAGER:
+        process_media(media_id)
+        return
+    enqueue_job(PROCESS_TASK, {'media_id': media_id})
+
+
+def _write_atomically(path, save):
+    """Write through a temporary file so readers never see a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+    try:
+        save(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def strip_and_thumbnail(sha256):
+    """
+    Strip metadata from a stored blob and render its thumbnail.
+
+    The blob keeps the name of the uploaded bytes' digest so later uploads
+    of the same photo are still deduplicated against it.
+    """
+    from PIL import Image, ImageOps
+
+    source = media_storage.blob_path(sha256)
+    with Image.open(source) as image:
+        image_format = image.format
+        # Bake the orientation in before the EXIF tag carrying it is dropped
+        image = ImageOps.exif_transpose(image)
+
+        save_options = {}
+        clean = image
+        if image_format in ('JPEG', 'WEBP'):
+            save_options['quality'] = 90
+        if image_format == 'JPEG':
+            clean = image.convert('RGB')
+
+        # Re-encoding without passing exif= drops all metadata
+        _write_atomically(
+            source,
+            lambda tmp: clean.save(tmp, format=image_format, **save_options)
+        )
+
+        thumbnail = image.convert('RGB')
+        thumbnail.thumbnail(settings.MEDIA_THUMBNAIL_SIZE)
+        _write_atomically(
+            media_storage.thumbnail_path(sha256),
+            lambda tmp: thumbnail.save(tmp, format='JPEG', quality=80, optimize=True)
+        )
+
+
+@task(PROCESS_TASK, queue='media')
+def process_media(media_id):
+    """Process one ReportMedia and record the outcome"""
+    try:
+        media = ReportMedia.objects.get(pk=media_id)
+    except ReportMedia.DoesNotExist:
+        return
+
+    try:
+        # Deduplicated uploads reuse the already processed blob
+        if not media_storage.thumbnail_path(media.sha256).exists():
+            strip_and_thumbnail(media.sha256)
+        outcome = ReportMedia.ProcessingStatus.READY
+    except Exception:
+        logger.exception('Failed to process media %s', media_id)
+        outcome = ReportMedia.ProcessingStatus.FAILED
+
+    ReportMedia.objects.filter(pk=media_id).update(processing_status=outcome)
@@ -0,0 +1,179 @@
+"""
+Local filesystem storage for report photos.
+
+Layout under ``MEDIA_ROOT``::
+
+    uploads/<upload-id>.part       in-progress resumable uploads
+    blobs/ab/cd/<sha256>           original photos (EXIF stripped)
+    thumbs/ab/cd/<sha256>.jpg      thumbnails
+
+Blobs are named after the SHA-256 of the uploaded bytes, so identical
+uploads share one file. Everything is streamed in fixed-size chunks and
+never held in memory as a whole.
+"""
+import fcntl
+import hashlib
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    """Raised when a chunk does not start where the stored upload ends."""
+
+    def __init__(self, expected):
+        super().__init__(f'Expected chunk starting at byte {expected}.')
+        self.expected = expected
+
+
+class UploadTooLarge(Exception):
+    """Raised when a chunk would write past the declared upload size."""
+
+
+class UploadInProgress(Exception):
+    """Raised when another request is writing a chunk of the same upload."""
+
+
+def _root():
+    return Path(settings.MEDIA_ROOT)
+
+
+def _sharded(directory, sha256, suffix=''):
+    return _root() / directory / sha256[:2] / sha256[2:4] / f'{sha256}{suffix}'
+
+
+def part_path(upload_id):
+    return _root() / 'uploads' / f'{upload_id}.part'
+
+
+def blob_path(sha256):
+    return _sharded('blobs', sha256)
+
+
+def thumbnail_path(sha256):
+    return _sharded('thumbs', sha256, '.jpg')
+
+
+@contextmanager
+def part_lock(upload_id):
+    """
+    Hold an exclusive lock on an upload's part file while a chunk is written.
+
+    The lock is taken without waiting, on a sidecar file so that
+    ``finalize_upload`` can move the part file while it is held.
+
+    Raises:
+        UploadInProgress: If another request holds the lock
+    """
+    path = part_path(upload_id).with_suffix('.lock')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadInProgress('Another chunk of this upload is being written.') from None
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Stream one chunk of an upload from ``stream`` onto its part file.
+
+    Args:
+        upload (MediaUpload): The upload session
+        stream: File-like object to read the chunk from
+        offset (int): Byte offset the client claims the chunk starts at
+        length (int): Number of bytes in the chunk
+
+    Returns:
+        int: The new number of bytes received
+
+    Raises:
+        UploadOffsetMismatch: If ``offset`` is not where the upload ends, or
+            the part file holds fewer bytes
+        UploadTooLarge: If the chunk goes past the declared total size
+    """
+    if offset != upload.received:
+        raise UploadOffsetMismatch(upload.received)
+    if offset + length > upload.total_size:
+        raise UploadTooLarge('Chunk exceeds the declared upload size.')
+
+    path = part_path(upload.id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    with open(path, 'ab') as part:
+        # The part file is gone or short (e.g. moved away by a finished
+        # upload): never fill the gap with zeros
+        size = os.fstat(part.fileno()).st_size
+        if size < offset:
+            raise UploadOffsetMismatch(size)
+        # A previous attempt may have died mid-chunk; drop the partial bytes
+        part.truncate(offset)
+        part.seek(offset)
+        while written < length:
+            data = stream.read(min(CHUNK_SIZE, length - written))
+            if not data:
+                break
+            part.write(data)
+            written += len(data)
+        part.flush()
+        os.fsync(part.fileno())
+
+    return offset + written
+
+
+def file_sha256(path):
+    """Hash a file in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def finalize_upload(upload):
+    """
+    Move a completed part file into content-addressed storage.
+
+    Returns:
+        tuple: (sha256, created) where ``created`` is False if an identical
+        blob was already stored and the upload was deduplicated
+    """
+    path = part_path(upload.id)
+    sha256 = file_sha256(path)
+    target = blob_path(sha256)
+
+    if target.exists():
+        path.unlink()
+        return sha256, False
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(path, target)
+    return sha256, True
+
+
+def release_upload(upload):
+    """
+    Remove the lock file of a finalized upload.
+
+    Call it once the upload's completion has committed, so a chunk taking
+    the lock after that finds the upload complete.
+    """
+    part_path(upload.id).with_suffix('.lock').unlink(missing_ok=True)
+
+
+def discard_upload(upload):
+    """Remove the part file of an abandoned upload"""
+    for path in [part_path(upload.id), part_path(upload.id).with_suffix('.lock')]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,221 @@
+"""
+Request metrics exported in the Prometheus text format.
+
+Only per-bucket counts, a sum and a count are stored per label set, so
+recording an observation is a lock plus a short bucket scan.
+
+Histograms live in process memory. Under a multi-process server (gunicorn
+workers, see gunicorn.conf.py) a scrape reaches one worker at random, so
+set ``METRICS_MULTIPROC_DIR`` to a directory shared by the workers of a
+host: each worker then writes its histograms to ``<pid>.json`` in there at
+most every ``METRICS_FLUSH_INTERVAL`` seconds (``flush_when_due()``, called
+by the middleware after each request), and ``render_metrics()`` sums the
+files of all workers. Files of exited workers are kept, so totals never go
+down; a worker reusing a pid carries on from its file. The gunicorn master
+empties the directory on startup. Without it, each process exposes its
+own histograms.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+# Latency buckets in seconds, from 5 ms to 10 s
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """A labelled Prometheus histogram"""
+
+    def __init__(self, name, documentation, labelnames, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts + overflow, sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self, **labels):
+        """Return ``(buckets, sum, count)`` for one label set, or None"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return None if series is None else (list(series[0]), series[1], series[2])
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        """Return every series as ``{labels: [buckets, sum, count]}``"""
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self._series.items()}
+
+    def merge(self, snapshot):
+        """Add the series of a ``snapshot()`` to this histogram"""
+        with self._lock:
+            merge_series(self._series, snapshot)
+
+    def render(self, series=None):
+        """Render ``series`` (a ``snapshot()``, by default this process's own)"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        if series is None:
+            series = self.snapshot()
+        series = sorted((key, counts, total, count) for key, (counts, total, count) in series.items())
+        for key, counts, total, count in series:
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (None,), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound is None else _format_number(bound)
+                bucket_labels = ','.join(labels + [f'le="{le}"'])
+                lines.append(f'{self.name}_bucket{{{bucket_labels}}} {cumulative}')
+            label_text = '{' + ','.join(labels) + '}' if labels else ''
+            lines.append(f'{self.name}_sum{label_text} {_format_number(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return '\n'.join(lines)
+
+
+def merge_series(series, snapshot):
+    """Add the series of ``snapshot`` into ``series`` in place"""
+    for key, (counts, total, count) in snapshot.items():
+        target = series.get(key)
+        if target is None:
+            series[key] = [list(counts), total, count]
+            continue
+        target[0] = [a + b for a, b in zip(target[0], counts)]
+        target[1] += total
+        target[2] += count
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REQUEST_DURATION = Histogram(
+    'smartwayz_request_duration_seconds',
+    'Total request latency, measured on every request.',
+    ['view', 'method'],
+)
+REQUEST_SERIALIZE_DURATION = Histogram(
+    'smartwayz_request_serialize_duration_seconds',
+    'Time spent rendering the response body, measured on every request.',
+    ['view', 'method'],
+)
+REQUEST_DB_QUERIES = Histogram(
+    'smartwayz_request_db_queries',
+    'Database queries per request, measured on sampled requests.',
+    ['view', 'method'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'smartwayz_request_db_duration_seconds',
+    'Time spent in database queries per request, measured on sampled requests.',
+    ['view', 'method'],
+)
+
+REGISTRY = [REQUEST_DURATION, REQUEST_SERIALIZE_DURATION, REQUEST_DB_QUERIES, REQUEST_DB_DURATION]
+
+
+METRICS = {metric.name: metric for metric in REGISTRY}
+
+_flush_lock = threading.Lock()
+_flush_state = {'pid': None, 'next': 0.0}
+
+
+def multiproc_dir():
+    directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+    return Path(directory) if directory else None
+
+
+def flush(directory):
+    """Write this process's histograms to ``<pid>.json`` in ``directory``"""
+    pid = os.getpid()
+    path = directory / f'{pid}.json'
+    if _flush_state['pid'] != pid:
+        # First flush of this process: a worker that exited with the same
+        # pid left totals that must not go down
+        _flush_state['pid'] = pid
+        for name, series in read_snapshot(path).items():
+            if name in METRICS:
+                METRICS[name].merge(series)
+
+    data = {
+        name: [[list(key), *values] for key, values in metric.snapshot().items()]
+        for name, metric in METRICS.items()
+    }
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f'.{pid}.json.tmp'
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def read_snapshot(path):
+    """Read a file written by ``flush()`` as ``{metric: snapshot}``"""
+    try:
+        data = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {
+        name: {tuple(key): [counts, total, count] for key, counts, total, count in rows}
+        for name, rows in data.items()
+    }
+
+
+def flush_when_due():
+    """Flush this process's histograms if METRICS_MULTIPROC_DIR is set and the interval has passed"""
+    directory = multiproc_dir()
+    if directory is None or time.monotonic() < _flush_state['next']:
+        return
+    # One thread flushes; the others carry on
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _flush_state['next'] = time.monotonic() + getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        flush(directory)
+    finally:
+        _flush_lock.release()
+
+
+def render_metrics():
+    """Render every registered metric in the Prometheus text exposition format"""
+    directory = multiproc_dir()
+    if directory is None:
+        return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+    with _flush_lock:
+        flush(directory)
+    merged = {name: {} for name in METRICS}
+    for path in sorted(directory.glob('*.json')):
+        for name, snapshot in read_snapshot(path).items():
+            if name in merged:
+                merge_series(merged[name], snapshot)
+    return '\n'.join(metric.render(merged[metric.name]) for metric in REGISTRY) + '\n'
+
+
+def reset_metrics():
+    for metric in REGISTRY:
+        metric.clear()
+    _flush_state.update(pid=None, next=0.0)
+
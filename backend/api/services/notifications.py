@@ -0,0 +1,158 @@
+"""
+Email notifications for report status changes, sent as digests.
+
+Saving a report with a new status records a ``Notification``. The first
+pending notification of a citizen schedules a ``notifications.digest`` job
+``NOTIFICATION_DIGEST_SECONDS`` later; when it runs, every change of that
+citizen accumulated in the window goes out in one email, with repeated
+changes of the same report collapsed into one line.
+
+Workers claim digest jobs in batches, mark the citizens' pending
+notifications sent and queue their emails as ``mail.send`` jobs in the
+same transaction (see api/services/mail.py), which deliver them over one
+``EMAIL_BACKEND`` connection per claimed batch and retry a failing email
+on its own.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.services.jobs import enqueue, task
+from api.services.mail import queue_emails
+
+DIGEST_TASK = 'notifications.digest'
+
+
+def record_status_change(report, old_status_id):
+    """
+    Record a report's status change and schedule its citizen's digest.
+
+    Args:
+        report (Report): The saved report, carrying the new status
+        old_status_id (int): Status the report had before
+    """
+    from api.models import Notification, Status
+
+    window = settings.NOTIFICATION_DIGEST_SECONDS
+    codes = Status.objects.in_bulk([old_status_id, report.status_id])
+    # Older pending notifications whose digest gave up are picked up by the next one
+    in_window = Notification.objects.filter(
+        citizen_id=report.citizen_id, sent_at__isnull=True,
+        created_at__gte=timezone.now() - timedelta(seconds=window),
+    ).exists()
+    Notification.objects.create(
+        citizen_id=report.citizen_id,
+        report_id=report.id,
+        report_title=report.title,
+        old_status=codes[old_status_id].code,
+        new_status=codes[report.status_id].code,
+    )
+    # Otherwise a digest is already scheduled for the current window
+    if not in_window:
+        enqueue(DIGEST_TASK, {'citizen_id': report.citizen_id}, delay=window)
+
+
+def coalesce(notifications):
+    """
+    Collapse repeated changes of the same report.
+
+    Returns:
+        list: (report_id, title, first old status, last new status) per
+        report, in order of first change; reports that ended up back in
+        their original status are left out
+    """
+    changes = {}
+    for notification in notifications:
+        first = changes.get(notification.report_id)
+        old_status = first[2] if first else notification.old_status
+        changes[notification.report_id] = (
+            notification.report_id, notification.report_title, old_status, notification.new_status
+        )
+    return [change for change in changes.values() if change[2] != change[3]]
+
+
+def build_digest(citizen, notifications):
+    """
+    Render the digest email of one citizen.
+
+    Returns:
+        dict: The email, as taken by mail.queue_emails(), or None when
+        nothing is left to report
+    """
+    from api.models import Status
+
+    labels = dict(Status.CODES)
+    changes = coalesce(notifications)
+    if not changes:
+        return None
+
+    lines = [
+        f'- Report #{report_id} "{title}": {labels.get(old, old)} -> {labels.get(new, new)}'
+        for report_id, title, old, new in changes
+    ]
+    subject = (
+        'Update on your report' if len(changes) == 1
+        else f'Updates on {len(changes)} of your reports'
+    )
+    body = '\n'.join([
+        f'Hello {citizen.name},',
+        '',
+        'The status of your reports has changed:',
+        '',
+        *lines,
+        '',
+        'Thank you for helping keep our roads safe.',
+        'Smartwayz',
+    ])
+    return {'to': [citizen.email], 'subject': subject, 'body': body}
+
+
+def send_pending_digests(model, payloads, build, related=('citizen',)):
+    """
+    Queue the digests of a batch of citizens for delivery.
+
+    Shared by the digest tasks of status notifications and hazard alerts.
+    The rows are marked sent and their emails queued in one transaction, so
+    a digest is neither lost nor queued twice; delivery failures are
+    retried by the ``mail.send`` jobs.
+
+    Args:
+        model: Model of the digest's rows, with ``citizen`` and ``sent_at``
+            fields; rows not yet sent are pending
+        payloads (list): Job payloads, each with a ``citizen_id``
+        build: ``build(citizen, rows)`` returning the email as taken by
+            mail.queue_emails(), or None when nothing is left to report
+        related (tuple): Relations to select along with the rows
+
+    Returns:
+        list: None for each payload
+    """
+    citizen_ids = {payload['citizen_id'] for payload in payloads}
+    with transaction.atomic():
+        pending = {}
+        rows = model.objects.filter(citizen_id__in=citizen_ids, sent_at__isnull=True).select_related(*related)
+        for row in rows:
+            pending.setdefault(row.citizen_id, []).append(row)
+
+        messages = []
+        for citizen_id, rows in pending.items():
+            # Claim them, so a concurrent digest of the same citizen skips them
+            claimed_at = timezone.now()
+            model.objects.filter(id__in=[row.id for row in rows], sent_at__isnull=True).update(sent_at=claimed_at)
+            ids = set(model.objects.filter(citizen_id=citizen_id, sent_at=claimed_at).values_list('id', flat=True))
+            message = build(rows[0].citizen, [row for row in rows if row.id in ids])
+            if message is not None:
+                messages.append(message)
+        queue_emails(messages)
+
+    return [None] * len(payloads)
+
+
+@task(DIGEST_TASK, queue='notifications', batch=True)
+def send_digests(payloads):
+    """Queue the status digests of a batch of citizens (see send_pending_digests)"""
+    from api.models import Notification
+
+    return send_pending_digests(Notification, payloads, build_digest)
@@ -0,0 +1,280 @@
+"""
+Transactional outbox of report changes, streamed to downstream consumers.
+
+``Report.save`` writes an ``OutboxEvent`` in the transaction that saves the
+report, for every creation and status change, so the outbox holds exactly
+the changes that committed. ``manage.py stream_outbox`` delivers them, in
+offset (``id``) order, in batches of ``OUTBOX_BATCH_SIZE``:
+
+1. lock the consumer's ``OutboxCheckpoint`` row and read the events after
+   its offset;
+2. hand them to the sink, which makes them durable before returning;
+3. move the offset to the last event read, in the same transaction.
+
+A consumer that dies between 2 and 3 gets the batch again: delivery is
+at-least-once, and downstream deduplicates by offset. With ``compact``,
+only the last event of each report in a batch is delivered, for sinks that
+only keep the latest state of reports.
+
+Offsets are allocated when a transaction inserts its event, not when it
+commits, so a later event can become visible before an earlier one. A
+batch therefore stops at the first missing offset, until the event after
+it is older than ``OUTBOX_GAP_SECONDS``. The stream then moves past the
+gap, which most likely belonged to a transaction that rolled back, but
+the checkpoint keeps the skipped offsets in ``pending``: each batch looks
+for them again and delivers those that have committed since, out of
+offset order. An offset is given up on ``OUTBOX_GAP_RECHECK_SECONDS``
+after it was skipped.
+
+Events are read with their payload as text and written out as NDJSON lines
+without decoding them. Events every consumer has received are pruned after
+``OUTBOX_RETENTION_SECONDS`` by an idle worker.
+
+Bulk inserts and ``QuerySet.update()`` bypass ``Report.save`` and are not
+recorded, like they bypass signals.
+"""
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min, TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from api.services.jobs import maintenance
+
+PRUNE_LOCK_KEY = 'outbox:prune'
+
+# Events deleted per statement when pruning
+PRUNE_CHUNK_SIZE = 10_000
+
+
+def status_codes():
+    """Status codes by ID, from the cached reference data"""
+    from api.services.reference_data import get_reference_data
+
+    return {status['id']: status['code'] for status in get_reference_data().data['statuses']}
+
+
+def report_payload(report, old_status_id=None):
+    """State of a report as outbox events carry it; free text is left out"""
+    codes = status_codes()
+    if report.status_id not in codes or (old_status_id and old_status_id not in codes):
+        from api.models import Status
+
+        codes = dict(Status.objects.values_list('id', 'code'))
+    payload = {
+        'id': report.id,
+        'citizen_id': report.citizen_id,
+        'report_type_id': report.report_type_id,
+        'sub_category_id': report.sub_category_id,
+        'status_id': report.status_id,
+        'status': codes.get(report.status_id),
+        'assigned_authority_id': report.assigned_authority_id,
+        'latitude': float(report.latitude),
+        'longitude': float(report.longitude),
+        'created_at': report.created_at.isoformat(),
+        'updated_at': report.updated_at.isoformat(),
+    }
+    if old_status_id:
+        payload['old_status_id'] = old_status_id
+        payload['old_status'] = codes.get(old_status_id)
+    return payload
+
+
+def record_report_save(report, created, old_status_id):
+    """
+    Write the outbox event of a report save, if it was a creation or a
+    status change. Called by ``Report.save`` inside its transaction.
+    """
+    from api.models import OutboxEvent
+
+    if created:
+        event_type, old_status_id = OutboxEvent.Type.REPORT_CREATED, None
+    elif old_status_id is not None and old_status_id != report.status_id:
+        event_type = OutboxEvent.Type.STATUS_CHANGED
+    else:
+        return None
+    return OutboxEvent.objects.create(
+        event_type=event_type, report_id=report.id, payload=report_payload(report, old_status_id)
+    )
+
+
+@dataclass
+class Batch:
+    """Events handed to a sink: offsets of the first and last event read, and one JSON line per event"""
+    first_offset: int
+    last_offset: int
+    lines: list
+
+
+class NdjsonSink:
+    """
+    Writes each batch to its own NDJSON file in ``directory``, named after
+    its offsets, or to stdout when ``directory`` is ``-``.
+
+    Files are written to a temporary name, synced and renamed, so a file
+    exists only complete; a redelivered batch replaces its file.
+    """
+
+    def __init__(self, directory=None):
+        directory = directory or settings.OUTBOX_DIRECTORY
+        self.directory = None if str(directory) == '-' else Path(directory)
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, batch):
+        data = ''.join(f'{line}\n' for line in batch.lines)
+        if self.directory is None:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+            return
+        path = self.directory / f'{batch.first_offset:020d}-{batch.last_offset:020d}.ndjson'
+        fd, temp = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def close(self):
+        pass
+
+
+def get_sink(path=None, **options):
+    """Instantiate the sink class at dotted ``path`` (default: OUTBOX_SINK)"""
+    return import_string(path or settings.OUTBOX_SINK)(**options)
+
+
+def committed_prefix(rows, offset, now):
+    """
+    Cut ``rows`` (ordered by offset) at the first missing offset that may
+    still be committed; see the module docstring.
+
+    Returns:
+        tuple: (rows to deliver, offsets skipped over)
+    """
+    horizon = now - timedelta(seconds=settings.OUTBOX_GAP_SECONDS)
+    expected = offset + 1
+    skipped = []
+    for position, row in enumerate(rows):
+        if row[0] != expected:
+            if row[3] > horizon:
+                return rows[:position], skipped
+            skipped.extend(range(expected, row[0]))
+        expected = row[0] + 1
+    return rows, skipped
+
+
+def compact(rows):
+    """Keep the last event of each report, in offset order"""
+    last = {row[2]: row for row in rows}
+    return sorted(last.values(), key=lambda row: row[0])
+
+
+def encode(row):
+    """NDJSON line of an event row, reusing its payload's JSON text"""
+    offset, event_type, report_id, created_at, payload = row
+    return (
+        f'{{"offset":{offset},"type":"{event_type}","report_id":{report_id},'
+        f'"created_at":"{created_at.isoformat()}","payload":{payload}}}'
+    )
+
+
+def stream_batch(consumer, sink, batch_size=None, compact_batch=False):
+    """
+    Deliver the next batch of events to ``sink`` and move the consumer's
+    checkpoint past it.
+
+    Returns:
+        tuple: (events read, events delivered); (0, 0) when caught up
+    """
+    from api.models import OutboxCheckpoint, OutboxEvent
+
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        # Serializes streamers of one consumer
+        checkpoint, _ = OutboxCheckpoint.objects.select_for_update().get_or_create(consumer=consumer)
+        events = OutboxEvent.objects.order_by('id').annotate(raw=Cast('payload', TextField())).values_list(
+            'id', 'event_type', 'report_id', 'created_at', 'raw'
+        )
+
+        # Skipped offsets that have committed since, or been waited for long enough
+        pending = dict(checkpoint.pending)
+        late = []
+        if pending:
+            late = list(events.filter(id__in=[int(offset) for offset in pending]))
+            give_up = now.timestamp() - settings.OUTBOX_GAP_RECHECK_SECONDS
+            found = {str(row[0]) for row in late}
+            pending = {
+                offset: skipped_at for offset, skipped_at in pending.items()
+                if offset not in found and skipped_at > give_up
+            }
+
+        rows = list(events.filter(id__gt=checkpoint.offset)[:batch_size])
+        rows, skipped = committed_prefix(rows, checkpoint.offset, now)
+        pending.update((str(offset), now.timestamp()) for offset in skipped)
+        if not rows and not late:
+            if pending != checkpoint.pending:
+                checkpoint.pending = pending
+                checkpoint.save(update_fields=['pending', 'updated_at'])
+            return 0, 0
+
+        # Late events all come before the checkpoint's offset
+        rows = late + rows
+        delivered = compact(rows) if compact_batch else rows
+        sink.write(Batch(rows[0][0], rows[-1][0], [encode(row) for row in delivered]))
+        checkpoint.offset = max(checkpoint.offset, rows[-1][0])
+        checkpoint.delivered += len(delivered)
+        checkpoint.pending = pending
+        checkpoint.save(update_fields=['offset', 'delivered', 'pending', 'updated_at'])
+    return len(rows), len(delivered)
+
+
+def prune(now=None):
+    """
+    Delete events every consumer has received, once older than
+    OUTBOX_RETENTION_SECONDS.
+
+    Returns:
+        int: Number of events deleted
+    """
+    from api.models import OutboxCheckpoint, OutboxEvent
+
+    now = now or timezone.now()
+    received = OutboxCheckpoint.objects.aggregate(offset=Min('offset'))['offset']
+    if not received:
+        return 0
+    cutoff = now - timedelta(seconds=settings.OUTBOX_RETENTION_SECONDS)
+    newest = (
+        OutboxEvent.objects.filter(id__lte=received, created_at__lt=cutoff)
+        .order_by('-id').values_list('id', flat=True).first()
+    )
+    oldest = OutboxEvent.objects.order_by('id').values_list('id', flat=True).first()
+    if newest is None or oldest is None:
+        return 0
+
+    deleted = 0
+    for start in range(oldest, newest + 1, PRUNE_CHUNK_SIZE):
+        events = OutboxEvent.objects.filter(id__gte=start, id__lte=min(start + PRUNE_CHUNK_SIZE - 1, newest))
+        deleted += events._raw_delete(events.db)
+    return deleted
+
+
+@maintenance
+def prune_when_due():
+    """Prune the outbox on one idle worker every OUTBOX_PRUNE_INTERVAL seconds"""
+    if cache.add(PRUNE_LOCK_KEY, True, timeout=settings.OUTBOX_PRUNE_INTERVAL):
+        return prune()
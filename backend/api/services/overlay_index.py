@@ -0,0 +1,126 @@
+"""
+In-memory indexes of a table kept current by an overlay of recent changes.
+
+Building an index over a whole table is too slow to do per request, and
+rebuilding it on every change would be just as bad. An ``OverlayIndex``
+keeps two:
+
+- A base index of every row, rebuilt every ``ttl`` seconds.
+- An overlay index of the rows changed since the base was built, fetched
+  by ``updated_at`` (with ``SYNC_MARGIN`` for transactions committing
+  late) at most every ``refresh_interval`` seconds. Base results of changed
+  rows are dropped in favour of the overlay, so edits and removals apply
+  right away. Past ``max_overlay`` changes the base is rebuilt.
+
+Subclasses supply the row loaders and the index builder; the indexes they
+build answer queries with a tuple of arrays, row IDs first (see
+``OverlayIndex.query``). Used by the alert subscription index
+(api/services/alerts.py) and the route hazard index
+(api/services/route_hazards.py).
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+# Changes committed this long after their updated_at are still picked up
+SYNC_MARGIN = timedelta(seconds=5)
+
+
+class OverlayIndex:
+    """A process's base-plus-overlay index of a table (see module docstring)"""
+
+    # Names of the settings holding the base index's lifetime, the number
+    # of changes that triggers a rebuild and the seconds between refreshes
+    # (None: refresh on every call)
+    ttl_setting = None
+    max_overlay_setting = None
+    refresh_setting = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.base = None
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+        self.synced_at = None
+        # Row ID -> row, for rows changed since the base was built
+        self.changed = {}
+        self.overlay = None
+        self.changed_ids = None
+
+    def load_rows(self):
+        """Rows to index, each starting with its ID"""
+        raise NotImplementedError
+
+    def load_changes(self, since):
+        """Rows updated since ``since``, each ending with whether it is still to be indexed"""
+        raise NotImplementedError
+
+    def build_index(self, rows):
+        """Build an index of ``rows``, shaped like those of load_rows()"""
+        raise NotImplementedError
+
+    def refresh_interval(self):
+        return getattr(settings, self.refresh_setting) if self.refresh_setting else 0
+
+    def rebuild(self):
+        synced_at = timezone.now()
+        self.base = self.build_index(self.load_rows())
+        self.built_at = self.refreshed_at = time.monotonic()
+        self.synced_at = synced_at
+        self.changed = {}
+        self._build_overlay()
+
+    def _build_overlay(self):
+        import numpy as np
+
+        self.overlay = self.build_index([row[:-1] for row in self.changed.values() if row[-1]])
+        self.changed_ids = np.array(sorted(self.changed), dtype=np.int64)
+
+    def refresh(self):
+        """Apply changes when due, rebuilding the base index when due"""
+        now = time.monotonic()
+        if self.base is not None and now - self.refreshed_at < self.refresh_interval():
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self.base is None or now - self.built_at > getattr(settings, self.ttl_setting):
+                self.rebuild()
+                return
+            if now - self.refreshed_at < self.refresh_interval():
+                return
+
+            synced_at = timezone.now()
+            rows = list(self.load_changes(self.synced_at - SYNC_MARGIN))
+            self.synced_at = synced_at
+            self.refreshed_at = now
+            fresh = [row for row in rows if self.changed.get(row[0]) != row]
+            if not fresh:
+                return
+            self.changed.update((row[0], row) for row in fresh)
+            if len(self.changed) > getattr(settings, self.max_overlay_setting):
+                self.rebuild()
+            else:
+                self._build_overlay()
+
+    def query(self, method, *args):
+        """
+        Run ``method`` of the base and overlay indexes and merge their results.
+
+        Returns:
+            tuple: The arrays ``method`` returns, row IDs first; base rows
+            that changed are replaced by the overlay's, which come last
+        """
+        import numpy as np
+
+        base, overlay, changed_ids = self.base, self.overlay, self.changed_ids
+        found = getattr(base, method)(*args)
+        if len(changed_ids):
+            current = ~np.isin(found[0], changed_ids)
+            found = tuple(array[current] for array in found)
+        if len(overlay):
+            extra = getattr(overlay, method)(*args)
+            found = tuple(np.concatenate(pair) for pair in zip(found, extra))
+        return found
@@ -0,0 +1,46 @@
+"""
+Password verification off the event loop.
+
+PBKDF2 hashing takes tens of milliseconds of CPU. Async views hand it to
+a small dedicated thread pool: hashlib releases the GIL while hashing, so
+checks run in parallel up to the pool size, and neither the event loop
+nor the single thread that serializes Django's sync-to-async ORM calls is
+held up by it. Excess logins queue for a worker instead of oversubscribing
+the CPU.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide hashing thread pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_WORKERS,
+                    thread_name_prefix='password-hashing'
+                )
+    return _executor
+
+
+async def acheck_password(user, raw_password):
+    """
+    Async version of ``user.check_password`` running in the hashing pool.
+
+    Args:
+        user: A Citizen or Authority
+        raw_password (str): The plain text password to check
+
+    Returns:
+        bool: True if password matches, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), user.check_password, raw_password)
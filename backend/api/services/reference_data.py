@@ -0,0 +1,78 @@
+"""
+Versioned blob of the reference data clients load at start-up.
+
+Categories, sub-categories (also grouped like
+``SubCategory.CATEGORY_MAPPING``) and statuses change only through the
+admin, so they are built into one blob and kept in the ``reference``
+cache namespace, which saving a category, sub-category or status
+invalidates (see api/signals.py). Warm requests read it from the
+process's L1 cache without a query.
+
+The version is a hash of the blob's content, so every process computes the
+same one and it only changes when the data does: clients send it back
+(as an ETag) and skip downloading data they already have.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from api.services import tiered_cache
+
+CACHE_KEY = 'bootstrap'
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    version: str
+    data: dict
+
+    @property
+    def etag(self):
+        return f'"{self.version}"'
+
+
+def build():
+    """Load the reference data from the database"""
+    from api.models import Category, Status, SubCategory
+    from api.serializers import CategorySerializer, SubCategorySerializer
+
+    subcategories = SubCategorySerializer(SubCategory.objects.select_related('report_type'), many=True).data
+    by_code = {}
+    for subcategory in subcategories:
+        by_code.setdefault(subcategory['category_name'], {})[subcategory['sub_category']] = subcategory
+    category_mapping = {}
+    for category in Category.objects.order_by('report_type').values_list('report_type', flat=True):
+        codes = by_code.get(category, {})
+        # In CATEGORY_MAPPING's order, then any sub-category it lacks
+        order = [str(code) for code in SubCategory.CATEGORY_MAPPING.get(category, []) if code in codes]
+        order += [code for code in codes if code not in order]
+        category_mapping[category] = [codes[code] for code in order]
+
+    data = {
+        'categories': CategorySerializer(Category.objects.all(), many=True).data,
+        'subcategories': subcategories,
+        'category_mapping': category_mapping,
+        'statuses': [
+            {'id': status.id, 'code': status.code, 'name': status.get_code_display()}
+            for status in Status.objects.all()
+        ],
+    }
+    # Plain dicts and lists, hashed in a stable encoding
+    data = json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+    encoded = json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+    return ReferenceData(hashlib.sha256(encoded).hexdigest()[:20], data)
+
+
+def get_reference_data():
+    """Return the current reference data, from the cache when possible"""
+    return tiered_cache.namespace('reference').get_or_set(CACHE_KEY, build)
+
+
+def matches(reference, if_none_match):
+    """Tell whether an If-None-Match header (or bare version) names this version"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix('W/').strip('"') for tag in if_none_match.split(',')}
+    return reference.version in tags or '*' in tags
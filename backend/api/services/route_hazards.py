@@ -0,0 +1,139 @@
+"""
+Open hazards along a route, for trip planning.
+
+Each process keeps a ``PointGridIndex`` of open hazard reports (Hazard
+category, not resolved or rejected), so finding the reports within a
+corridor around a route costs a few vectorised passes over the cells the
+route crosses instead of a database scan (see api/services/corridor.py).
+
+The index is an ``OverlayIndex`` (api/services/overlay_index.py), like
+the alert subscription index: at most every ``ROUTE_INDEX_REFRESH``
+seconds, reports updated since the last refresh are fetched by
+``updated_at`` into a small overlay that replaces their base entries; the
+base is rebuilt every ``ROUTE_INDEX_TTL`` seconds or past
+``ROUTE_INDEX_MAX_OVERLAY`` changes. Matches are loaded from the database with the same open-hazard
+filter, so reports deleted or closed since are never returned.
+"""
+from django.conf import settings
+
+from api.services.overlay_index import OverlayIndex
+
+# Reports in these statuses are not hazards anymore
+CLOSED_STATUSES = ('resolved', 'rejected')
+
+# IDs per query when loading matched reports
+CHUNK_SIZE = 500
+
+
+def open_hazards(queryset):
+    """Restrict reports to open hazards"""
+    return queryset.filter(report_type__report_type='Hazard').exclude(status__code__in=CLOSED_STATUSES)
+
+
+def build_index(rows):
+    """Build a PointGridIndex of (id, latitude, longitude) rows"""
+    import numpy as np
+
+    from api.services.corridor import PointGridIndex
+
+    data = np.array(rows, dtype=np.float64).reshape(len(rows), 3)
+    return PointGridIndex(data[:, 0], data[:, 1], data[:, 2], cell_size=settings.ROUTE_INDEX_CELL_SIZE)
+
+
+class HazardIndex(OverlayIndex):
+    """A process's index of open hazard reports (see module docstring)"""
+
+    ttl_setting = 'ROUTE_INDEX_TTL'
+    max_overlay_setting = 'ROUTE_INDEX_MAX_OVERLAY'
+    refresh_setting = 'ROUTE_INDEX_REFRESH'
+
+    def load_rows(self):
+        from api.models import Report
+
+        return list(
+            open_hazards(Report.objects.all()).values_list('id', 'latitude', 'longitude').iterator(chunk_size=10000)
+        )
+
+    def load_changes(self, since):
+        from api.models import Report
+
+        updated = Report.objects.filter(updated_at__gte=since)
+        open_ids = set(open_hazards(updated).values_list('id', flat=True))
+        return [
+            (report_id, latitude, longitude, report_id in open_ids)
+            for report_id, latitude, longitude in updated.values_list('id', 'latitude', 'longitude')
+        ]
+
+    def build_index(self, rows):
+        return build_index(rows)
+
+    def near_route(self, latitudes, longitudes, max_distance):
+        """
+        Find the indexed reports within ``max_distance`` meters of a route.
+
+        Returns:
+            tuple: (report IDs, distances, offsets along the route), all in
+            meters, ordered along the route
+        """
+        import numpy as np
+
+        keys, distances, offsets = self.query('near_route', latitudes, longitudes, max_distance)
+        # Overlay matches come last
+        along = np.argsort(offsets, kind='stable')
+        return keys[along], distances[along], offsets[along]
+
+
+_index = HazardIndex()
+
+
+def get_index():
+    """Return this process's hazard index, brought up to date"""
+    _index.refresh()
+    return _index
+
+
+def reset_index():
+    """Drop this process's index; the next query rebuilds it (tests)"""
+    global _index
+    _index = HazardIndex()
+
+
+def hazards_along_route(points, width, sub_category_ids=None, limit=None):
+    """
+    Find the open hazard reports inside a corridor around a route.
+
+    Args:
+        points (list): Route vertices as (latitude, longitude) pairs
+        width (float): Corridor width in meters; reports up to half of it
+            from the route are included
+        sub_category_ids (list): Only reports of these sub-categories
+        limit (int): Maximum number of reports (default: ROUTE_MAX_RESULTS)
+
+    Returns:
+        tuple: (reports with ``distance_meters`` and ``route_offset_meters``
+        set, ordered along the route; whether more reports were left out)
+    """
+    from api.models import Report
+
+    limit = limit or settings.ROUTE_MAX_RESULTS
+    latitudes, longitudes = zip(*points)
+    keys, distances, offsets = get_index().near_route(latitudes, longitudes, width / 2)
+    # In route order
+    positions = dict(zip(keys.tolist(), zip(distances.tolist(), offsets.tolist())))
+
+    candidates = open_hazards(Report.objects.select_related('sub_category', 'status'))
+    if sub_category_ids:
+        candidates = candidates.filter(sub_category_id__in=sub_category_ids)
+
+    ids = list(positions)
+    reports = []
+    for start in range(0, len(ids), CHUNK_SIZE):
+        if len(reports) > limit:
+            break
+        reports.extend(candidates.filter(id__in=ids[start:start + CHUNK_SIZE]))
+    reports.sort(key=lambda report: positions[report.id][1])
+    truncated = len(reports) > limit
+    reports = reports[:limit]
+    for report in reports:
+        report.distance_meters, report.route_offset_meters = positions[report.id]
+    return reports, truncated
@@ -0,0 +1,154 @@
+"""
+Ranked full-text search over report titles and descriptions.
+
+PostgreSQL uses the generated ``reports.search_vector`` column (GIN
+indexed, see migration 0005). Other databases, i.e. SQLite test runs, use
+the ``report_search_terms`` inverted index, which is maintained from a
+post_save signal. Both rank title matches above description matches.
+"""
+import re
+from collections import Counter
+
+from django.db import connection
+from django.db.models import BooleanField, Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.expressions import RawSQL
+
+from api.models import ReportSearchTerm
+
+TITLE_WEIGHT = 4
+DESCRIPTION_WEIGHT = 1
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in is it its near of on or
+the there this to was were with
+""".split())
+
+SUFFIXES = ('ing', 'ed', 'es', 's')
+
+TS_QUERY = "websearch_to_tsquery('english', %s)"
+
+
+def uses_native_search():
+    return connection.vendor == 'postgresql'
+
+
+def normalize(word):
+    """Lowercase and crudely stem a word so 'Flooding' matches 'flooded'"""
+    word = word.lower()
+    for suffix in SUFFIXES:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    """
+    Split text into normalized search terms.
+
+    Args:
+        text (str): Free text (title, description or query)
+
+    Returns:
+        list: Terms in order of appearance, stop words removed
+    """
+    if not text:
+        return []
+    terms = []
+    for word in TOKEN_RE.findall(text):
+        if word.lower() in STOP_WORDS or len(word) < 2:
+            continue
+        terms.append(normalize(word)[:64])
+    return terms
+
+
+def build_terms(report):
+    """Compute the weighted inverted index entries for one report"""
+    weights = Counter()
+    for term in tokenize(report.title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(report.description):
+        weights[term] += DESCRIPTION_WEIGHT
+    return [
+        ReportSearchTerm(term=term, report_id=report.pk, weight=min(weight, 32767))
+        for term, weight in weights.items()
+    ]
+
+
+def index_report(report):
+    """Refresh the inverted index entries of a saved report"""
+    if uses_native_search():
+        return
+    ReportSearchTerm.objects.filter(report_id=report.pk).delete()
+    ReportSearchTerm.objects.bulk_create(build_terms(report))
+
+
+def rebuild_index(queryset, batch_size=2000):
+    """
+    Rebuild the inverted index for every report in ``queryset``.
+
+    Used to backfill after bulk imports, which bypass the post_save signal.
+
+    Returns:
+        int: Number of reports indexed
+    """
+    if uses_native_search():
+        return 0
+
+    indexed = 0
+    batch = []
+    for report in queryset.only('id', 'title', 'description').order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(report)
+        if len(batch) >= batch_size:
+            _index_batch(batch)
+            indexed += len(batch)
+            batch = []
+    if batch:
+        _index_batch(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def _index_batch(reports):
+    ReportSearchTerm.objects.filter(report_id__in=[r.pk for r in reports]).delete()
+    terms = []
+    for report in reports:
+        terms.extend(build_terms(report))
+    ReportSearchTerm.objects.bulk_create(terms, batch_size=5000)
+
+
+def search_reports(queryset, query):
+    """
+    Restrict a report queryset to matches of ``query`` and rank them.
+
+    All query terms must match. The queryset is annotated with
+    ``search_rank`` (higher is better); existing filters are kept, so search
+    combines with the category/sub_category/citizen filters.
+    """
+    if uses_native_search():
+        return queryset.alias(
+            search_match=RawSQL(
+                f"reports.search_vector @@ {TS_QUERY}", (query,), output_field=BooleanField()
+            )
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd(reports.search_vector, {TS_QUERY})", (query,), output_field=FloatField()
+            )
+        )
+
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return queryset.none()
+
+    postings = ReportSearchTerm.objects.filter(term__in=terms)
+    matching = postings.values('report_id').annotate(
+        matched=Count('term')
+    ).filter(matched=len(terms)).values('report_id')
+    rank = postings.filter(report_id=OuterRef('pk')).values('report_id').annotate(
+        total=Sum('weight')
+    ).values('total')
+
+    return queryset.filter(pk__in=matching).annotate(
+        search_rank=Subquery(rank, output_field=FloatField())
+    )
@@ -0,0 +1,270 @@
+"""
+Open-data snapshots of reports, as static files partitioned by day.
+
+``manage.py build_snapshots`` writes, for every day (UTC) reports were
+created on, one gzipped GeoJSON FeatureCollection and one gzipped CSV of
+those reports, hot and archived, with category, sub-category and status
+labels. Citizens and free text are left out. Layout under
+``SNAPSHOT_ROOT``::
+
+    reports/manifest.json             partitions, with file sizes and ETags
+    reports/2025-01-03.geojson.gz
+    reports/2025-01-03.csv.gz
+
+Builds are incremental: one aggregate query fingerprints every day (row
+count, sum of IDs and confirmations, newest ``updated_at``) and only the
+days whose fingerprint changed since the manifest are rewritten; days left
+without reports lose their files. Archiving a report changes none of
+these, so archived days are not rewritten.
+
+Rows are streamed from the database in chunks of ``SNAPSHOT_CHUNK_SIZE``
+(server-side cursors on PostgreSQL) straight into the gzip streams, so a
+day is never held in memory. Files, and then the manifest, are written
+under a temporary name, synced and renamed into place: readers see either
+the old file or the new one. gzip headers carry no timestamp, so the same
+rows always give the same bytes and SHA-256.
+"""
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+MANIFEST = 'manifest.json'
+
+# File name suffix of each format
+FORMATS = {'geojson': '.geojson.gz', 'csv': '.csv.gz'}
+
+COLUMNS = [
+    'id', 'created_at', 'updated_at', 'category', 'sub_category', 'sub_category_label',
+    'status', 'status_label', 'latitude', 'longitude', 'confirmation_count',
+]
+
+# Fields read per report, in the order of COLUMNS minus the labels
+FIELDS = [
+    'id', 'created_at', 'updated_at', 'report_type__report_type', 'sub_category__sub_category',
+    'status__code', 'latitude', 'longitude', 'confirmation_count',
+]
+
+
+def reports_dir():
+    return Path(settings.SNAPSHOT_ROOT) / 'reports'
+
+
+def read_manifest():
+    """The current manifest, or None before the first build"""
+    try:
+        with open(reports_dir() / MANIFEST, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def file_etag(size, mtime_ns):
+    """ETag of a snapshot file, from what os.stat tells of it"""
+    return f'"{size:x}-{mtime_ns:x}"'
+
+
+def fingerprints():
+    """
+    Fingerprint of every day with reports, hot and archived.
+
+    Returns:
+        dict: ISO date -> [rows, sum of IDs, sum of confirmations, newest updated_at]
+    """
+    from api.models import ArchivedReport, Report
+
+    days = {}
+    for model in (Report, ArchivedReport):
+        aggregates = (
+            model.objects.order_by().annotate(day=TruncDate('created_at', tzinfo=dt_timezone.utc))
+            .values('day').annotate(
+                rows=Count('id'), ids=Sum('id'), confirmations=Sum('confirmation_count'), updated=Max('updated_at')
+            ).values_list('day', 'rows', 'ids', 'confirmations', 'updated')
+        )
+        for day, rows, ids, confirmations, updated in aggregates:
+            previous = days.get(day)
+            if previous:
+                rows, ids, confirmations = rows + previous[0], ids + previous[1], confirmations + previous[2]
+                updated = max(updated, previous[3])
+            days[day] = [rows, ids, confirmations, updated]
+    # As the manifest stores them (PostgreSQL sums bigints into numerics)
+    return {
+        day.isoformat(): [rows, int(ids), int(confirmations), updated.isoformat()]
+        for day, (rows, ids, confirmations, updated) in days.items()
+    }
+
+
+def day_rows(day, chunk_size):
+    """
+    Stream the reports created on ``day``: hot ones, then archived ones
+    not already seen (a report archived in between shows up in both).
+
+    Yields:
+        tuple: Values of FIELDS
+    """
+    from api.models import ArchivedReport, Report
+
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    window = {'created_at__gte': start, 'created_at__lt': start + timedelta(days=1)}
+    seen = set()
+    for row in Report.objects.filter(**window).order_by('id').values_list(*FIELDS).iterator(chunk_size=chunk_size):
+        seen.add(row[0])
+        yield row
+    archived = ArchivedReport.objects.filter(**window).order_by('id').values_list(*FIELDS)
+    for row in archived.iterator(chunk_size=chunk_size):
+        if row[0] not in seen:
+            yield row
+
+
+def labelled(rows):
+    """Turn rows of FIELDS into rows of COLUMNS"""
+    from api.models import Status, SubCategory
+
+    sub_category_labels = dict(SubCategory.SubCategoryType.choices)
+    status_labels = dict(Status.CODES)
+    for id, created_at, updated_at, category, sub_category, status, latitude, longitude, confirmations in rows:
+        yield (
+            id, created_at.isoformat(), updated_at.isoformat(), category, sub_category or '',
+            sub_category_labels.get(sub_category, ''), status, status_labels.get(status, status),
+            float(latitude), float(longitude), confirmations,
+        )
+
+
+class HashingWriter(io.RawIOBase):
+    """Binary file wrapper hashing and counting what goes through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+
+def write_geojson(out, rows):
+    out.write('{"type":"FeatureCollection","features":[\n')
+    separator = ''
+    for row in rows:
+        properties = dict(zip(COLUMNS, row))
+        geometry = {'type': 'Point', 'coordinates': [properties.pop('longitude'), properties.pop('latitude')]}
+        feature = {'type': 'Feature', 'id': row[0], 'geometry': geometry, 'properties': properties}
+        out.write(separator + json.dumps(feature, separators=(',', ':'), ensure_ascii=False))
+        separator = ',\n'
+    out.write('\n]}\n')
+
+
+def write_csv(out, rows):
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    writer.writerows(rows)
+
+
+WRITERS = {'geojson': write_geojson, 'csv': write_csv}
+
+
+def atomic_write(path, write):
+    """
+    Write ``path`` through ``write(binary_file)`` under a temporary name,
+    then sync and rename it into place.
+    """
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            result = write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+    return result
+
+
+def write_partition(day, fmt, chunk_size):
+    """
+    Write the ``fmt`` file of one day.
+
+    Returns:
+        dict: Manifest entry of the file
+    """
+    path = reports_dir() / f'{day.isoformat()}{FORMATS[fmt]}'
+
+    def write(f):
+        hashing = HashingWriter(f)
+        # No file name or timestamp in the header: same rows, same bytes
+        with gzip.GzipFile(filename='', mode='wb', fileobj=hashing, mtime=0) as compressed:
+            with io.TextIOWrapper(compressed, encoding='utf-8', newline='') as out:
+                WRITERS[fmt](out, labelled(day_rows(day, chunk_size)))
+        return hashing
+
+    hashing = atomic_write(path, write)
+    stat = path.stat()
+    return {
+        'name': path.name,
+        'size': stat.st_size,
+        'etag': file_etag(stat.st_size, stat.st_mtime_ns),
+        'sha256': hashing.sha256.hexdigest(),
+    }
+
+
+def build(full=False, formats=None, chunk_size=None):
+    """
+    Bring the snapshot files up to date.
+
+    Args:
+        full (bool): Rewrite every day, changed or not
+        formats (list): Formats to write (default: all of FORMATS)
+
+    Returns:
+        dict: Numbers of days written, unchanged and removed
+    """
+    formats = formats or list(FORMATS)
+    chunk_size = chunk_size or settings.SNAPSHOT_CHUNK_SIZE
+    reports_dir().mkdir(parents=True, exist_ok=True)
+
+    manifest = read_manifest() or {}
+    previous = manifest.get('partitions', {})
+    current = fingerprints()
+    partitions, written = {}, 0
+    for key in sorted(current):
+        entry = previous.get(key)
+        if full or not entry or entry['fingerprint'] != current[key]:
+            # Formats left out this time are rewritten too rather than left stale
+            files = {}
+            todo = [fmt for fmt in FORMATS if fmt in formats or (entry and fmt in entry['files'])]
+        else:
+            files = dict(entry['files'])
+            todo = [fmt for fmt in formats if fmt not in files]
+        for fmt in todo:
+            files[fmt] = write_partition(date.fromisoformat(key), fmt, chunk_size)
+        partitions[key] = {'rows': current[key][0], 'fingerprint': current[key], 'files': files}
+        written += bool(todo)
+
+    removed = [key for key in previous if key not in current]
+    atomic_write(reports_dir() / MANIFEST, lambda f: f.write(json.dumps({
+        'generated_at': timezone.now().isoformat(),
+        'columns': COLUMNS,
+        'partitions': partitions,
+    }, indent=1).encode()))
+    # Only once the manifest no longer lists them
+    for key in removed:
+        for fmt in previous[key]['files']:
+            (reports_dir() / f'{key}{FORMATS[fmt]}').unlink(missing_ok=True)
+    return {'written': written, 'unchanged': len(current) - written, 'removed': len(removed)}
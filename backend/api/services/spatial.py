@@ -0,0 +1,209 @@
+"""
+In-memory spatial indexes.
+
+``PolygonGridIndex`` answers "which polygon contains this point" with a
+uniform grid laid over the polygons' extent. While building, every cell is
+classified per polygon as *interior* (entirely inside, answered without any
+geometry) or *boundary* (an edge passes through it, so an exact
+point-in-polygon test is needed). Most lookups therefore cost one dict
+access. Coordinates follow GeoJSON: ``[longitude, latitude]``.
+
+Routes arrive as encoded polylines, which ``decode_polyline()`` turns into
+(latitude, longitude) pairs.
+"""
+import math
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def polygon_rings(geometry):
+    """
+    Normalize a GeoJSON Polygon/MultiPolygon into a list of polygons, each a
+    list of rings (outer ring first, then holes) of (lon, lat) tuples.
+    """
+    kind = geometry.get('type')
+    if kind == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif kind == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        raise ValueError(f'Unsupported geometry type: {kind}')
+    return [[[(float(x), float(y)) for x, y, *_ in ring] for ring in polygon] for polygon in polygons]
+
+
+def ring_contains(ring, x, y):
+    """Even-odd ray casting test of one ring"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def polygons_contain(polygons, x, y):
+    """Point in (multi)polygon, honouring holes"""
+    for rings in polygons:
+        if ring_contains(rings[0], x, y) and not any(ring_contains(hole, x, y) for hole in rings[1:]):
+            return True
+    return False
+
+
+def polygons_area(polygons):
+    """Planar area in square degrees (only used to rank overlapping polygons)"""
+    def ring_area(ring):
+        return abs(sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]))) / 2
+    return sum(ring_area(rings[0]) - sum(ring_area(h) for h in rings[1:]) for rings in polygons)
+
+
+class PolygonGridIndex:
+    """
+    Point-to-polygon lookup over a uniform grid.
+
+    Overlapping polygons are resolved in favour of the smallest one, i.e.
+    the most specific jurisdiction.
+    """
+
+    def __init__(self, entries, cell_size=0.01):
+        """
+        Args:
+            entries (iterable): (key, GeoJSON geometry) pairs
+            cell_size (float): Grid cell edge in degrees
+        """
+        self.cell_size = cell_size
+        self.keys = set()
+        # cell -> list of (area, key, polygons or None); None means interior
+        self.cells = {}
+
+        for key, geometry in entries:
+            polygons = polygon_rings(geometry)
+            self.keys.add(key)
+            self._insert(key, polygons, polygons_area(polygons))
+
+        for candidates in self.cells.values():
+            candidates.sort(key=lambda c: c[0])
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _insert(self, key, polygons, area):
+        boundary = set()
+        for rings in polygons:
+            for ring in rings:
+                for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                    cx1, cy1 = self._cell(min(x1, x2), min(y1, y2))
+                    cx2, cy2 = self._cell(max(x1, x2), max(y1, y2))
+                    for cx in range(cx1, cx2 + 1):
+                        for cy in range(cy1, cy2 + 1):
+                            boundary.add((cx, cy))
+
+        xs = [x for rings in polygons for x, _ in rings[0]]
+        ys = [y for rings in polygons for _, y in rings[0]]
+        min_cx, min_cy = self._cell(min(xs), min(ys))
+        max_cx, max_cy = self._cell(max(xs), max(ys))
+
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                if (cx, cy) in boundary:
+                    entry = (area, key, polygons)
+                else:
+                    # No edge crosses the cell: its center decides for all of it
+                    center_x = (cx + 0.5) * self.cell_size
+                    center_y = (cy + 0.5) * self.cell_size
+                    if not polygons_contain(polygons, center_x, center_y):
+                        continue
+                    entry = (area, key, None)
+                self.cells.setdefault((cx, cy), []).append(entry)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, latitude, longitude):
+        """
+        Return the key of the polygon containing the point, or None.
+        """
+        x, y = float(longitude), float(latitude)
+        for _, key, polygons in self.cells.get(self._cell(x, y), ()):
+            if polygons is None or polygons_contain(polygons, x, y):
+                return key
+        return None
+
+    def lookup_all(self, latitude, longitude):
+        """
+        Return the keys of every polygon containing the point, smallest first.
+        """
+        x, y = float(longitude), float(latitude)
+        return [
+            key for _, key, polygons in self.cells.get(self._cell(x, y), ())
+            if polygons is None or polygons_contain(polygons, x, y)
+        ]
+
+
+def decode_polyline(encoded, precision=5):
+    """
+    Decode an encoded polyline (Google's format; OSRM and Valhalla use
+    ``precision=6``) into (latitude, longitude) pairs.
+
+    Raises:
+        ValueError: If the string is not a valid encoded polyline
+    """
+    factor = 10 ** precision
+    points = []
+    index, length = 0, len(encoded)
+    latitude = longitude = 0
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                if index >= length:
+                    raise ValueError('Truncated polyline')
+                byte = ord(encoded[index]) - 63
+                index += 1
+                if not 0 <= byte < 64:
+                    raise ValueError(f'Invalid polyline character at position {index - 1}')
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        latitude += deltas[0]
+        longitude += deltas[1]
+        points.append((latitude / factor, longitude / factor))
+    return points
+
+
+def encode_polyline(points, precision=5):
+    """Encode (latitude, longitude) pairs as a polyline (see decode_polyline)"""
+    factor = 10 ** precision
+    chunks = []
+    previous = (0, 0)
+    for point in points:
+        current = tuple(round(value * factor) for value in point)
+        for delta in (current[0] - previous[0], current[1] - previous[1]):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        previous = current
+    return ''.join(chunks)
+
+
+def segment_lengths(points):
+    """
+    Lengths in meters of the segments between consecutive (latitude,
+    longitude) pairs, on an equirectangular projection at each segment's
+    mid latitude (as ``api.services.corridor`` measures them).
+    """
+    lengths = []
+    for (a_lat, a_lon), (b_lat, b_lon) in zip(points, points[1:]):
+        dx = (b_lon - a_lon) * math.cos(math.radians((a_lat + b_lat) / 2))
+        lengths.append(math.hypot(dx, b_lat - a_lat) * METERS_PER_DEGREE)
+    return lengths
@@ -0,0 +1,69 @@
+"""
+Watermark helpers for the delta sync mode of the reports list.
+
+A watermark is an opaque string handed to clients; internally it is the
+number of microseconds since the Unix epoch of the last change the client
+has seen (report update or tombstone).
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidWatermark(ValueError):
+    """Raised when a client sends a watermark we cannot decode."""
+
+
+def encode_watermark(moment):
+    """
+    Encode a datetime into a watermark string.
+
+    Args:
+        moment (datetime): Aware datetime of the last seen change
+
+    Returns:
+        str: Opaque watermark
+    """
+    delta = moment - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return str(micros)
+
+
+def decode_watermark(value):
+    """
+    Decode a watermark string back into an aware datetime.
+
+    Raises:
+        InvalidWatermark: If the value is not a watermark we issued
+    """
+    try:
+        micros = int(value)
+    except (TypeError, ValueError):
+        raise InvalidWatermark('Invalid watermark.')
+    if micros < 0:
+        raise InvalidWatermark('Invalid watermark.')
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def next_watermark(since, last_change, has_more=False):
+    """
+    Compute the watermark to hand back after a sync page.
+
+    Rows become visible in commit order, not in timestamp order, so a row
+    stamped slightly before ``last_change`` may still be in flight. On the
+    last page the watermark is therefore held back by
+    ``SYNC_SAFETY_LAG_SECONDS``; clients may see a few rows twice, which is
+    harmless since they upsert by id.
+    """
+    if has_more:
+        return encode_watermark(last_change)
+
+    lag = timedelta(seconds=getattr(settings, 'SYNC_SAFETY_LAG_SECONDS', 2))
+    candidate = last_change if last_change else since
+    ceiling = timezone.now() - lag
+    if candidate > ceiling:
+        candidate = max(since, ceiling)
+    return encode_watermark(candidate)
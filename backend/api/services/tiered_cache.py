@@ -0,0 +1,271 @@
+"""
+Two-level caches for values that are expensive to compute or fetch.
+
+Each namespace (``geocode``, ``reference``, ``hotspots``, ``heatmap``; see
+``CACHE_NAMESPACES``) has an in-process LRU (L1) in front of the shared
+Django cache (L2, ``CACHE_URL``). A read that hits L1 costs a dict lookup
+and no network round-trip; L1 keeps values for at most the namespace's
+``l1_ttl``, which bounds how long processes can serve a value another
+process has invalidated.
+
+Values in L2 are stored with the time they stop being fresh and are kept
+for ``stale`` seconds beyond it. ``get_or_set()`` protects the loader
+against stampedes:
+
+- On a miss, the caller that wins ``cache.add()`` of a lock key runs the
+  loader; the others poll L2 until the value (or the lock's release)
+  shows up instead of all hitting the upstream at once.
+- On a stale value, the lock winner refreshes it while everyone else is
+  served the stale value right away (stale-while-revalidate). If the
+  refresh fails, the stale value is served instead of the error.
+
+Loaders returning None are not cached. ``invalidate()`` drops a whole
+namespace by bumping its version, which is part of every key.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+MISSING = object()
+
+# Seconds between L2 polls while another caller loads a value
+POLL_INTERVAL = 0.05
+
+
+class LRUCache:
+    """Thread-safe in-process LRU of values with an expiry time"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, now):
+        """Return the value of a key, or MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Namespace:
+    """
+    One namespace of the two-level cache.
+
+    TTLs are read from ``CACHE_NAMESPACES[name]`` on every call, so they
+    can be changed with ``override_settings``.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.local = LRUCache(settings.CACHE_L1_MAX_ENTRIES)
+
+    @property
+    def config(self):
+        return settings.CACHE_NAMESPACES[self.name]
+
+    @property
+    def version_key(self):
+        return f'cache:{self.name}:version'
+
+    def _remember(self, key, value, fresh_until, now):
+        """Keep a fresh value in L1, no longer than l1_ttl"""
+        l1_ttl = self.config['l1_ttl']
+        if l1_ttl > 0:
+            self.local.set(key, value, min(fresh_until, now + l1_ttl))
+
+    def _envelope(self, value, now):
+        """Return the L2 entry for a value and its L2 timeout"""
+        config = self.config
+        fresh_until = now + config['ttl']
+        return (fresh_until, value), config['ttl'] + config['stale']
+
+    def full_key(self, key):
+        """Return the versioned L2 key of a key"""
+        now = time.time()
+        version = self.local.get(self.version_key, now)
+        if version is MISSING:
+            version = cache.get(self.version_key)
+            if version is None:
+                cache.add(self.version_key, time.time_ns(), timeout=None)
+                version = cache.get(self.version_key)
+            self._remember(self.version_key, version, now + self.config['l1_ttl'], now)
+        return f'cache:{self.name}:{version}:{key}'
+
+    def get_or_set(self, key, loader):
+        """
+        Return the cached value of a key, loading it on a miss.
+
+        Args:
+            key (str): Key within the namespace
+            loader (callable): Computes the value; None is returned but not cached
+
+        Returns:
+            The value, possibly stale (see module docstring)
+        """
+        full_key = self.full_key(key)
+        lock_key = f'{full_key}:lock'
+        now = time.time()
+        value = self.local.get(full_key, now)
+        if value is not MISSING:
+            return value
+
+        stored = cache.get(full_key)
+        if stored is not None:
+            fresh_until, value = stored
+            if now < fresh_until:
+                self._remember(full_key, value, fresh_until, now)
+                return value
+            # Stale: one caller refreshes it, the others keep serving it
+            if not cache.add(lock_key, 1, timeout=settings.CACHE_LOCK_TIMEOUT):
+                return value
+            return self._load(full_key, lock_key, loader, stale=value)
+
+        if not cache.add(lock_key, 1, timeout=settings.CACHE_LOCK_TIMEOUT):
+            # Another caller is loading it: wait for its result
+            deadline = now + settings.CACHE_LOCK_TIMEOUT
+            while time.time() < deadline:
+                time.sleep(POLL_INTERVAL)
+                found = cache.get_many([full_key, lock_key])
+                if full_key in found:
+                    fresh_until, value = found[full_key]
+                    self._remember(full_key, value, fresh_until, time.time())
+                    return value
+                if lock_key not in found:
+                    break
+            # The other caller gave up or timed out: load it without the lock
+            return self._load(full_key, None, loader)
+        return self._load(full_key, lock_key, loader)
+
+    def _load(self, full_key, lock_key, loader, stale=MISSING):
+        try:
+            value = loader()
+        except Exception:
+            if stale is MISSING:
+                raise
+            return stale
+        else:
+            if value is not None:
+                now = time.time()
+                envelope, timeout = self._envelope(value, now)
+                cache.set(full_key, envelope, timeout=timeout)
+                self._remember(full_key, value, envelope[0], now)
+            elif stale is not MISSING:
+                return stale
+            return value
+        finally:
+            if lock_key is not None:
+                cache.delete(lock_key)
+
+    async def afull_key(self, key):
+        """Async version of full_key"""
+        now = time.time()
+        version = self.local.get(self.version_key, now)
+        if version is MISSING:
+            version = await cache.aget(self.version_key)
+            if version is None:
+                await cache.aadd(self.version_key, time.time_ns(), timeout=None)
+                version = await cache.aget(self.version_key)
+            self._remember(self.version_key, version, now + self.config['l1_ttl'], now)
+        return f'cache:{self.name}:{version}:{key}'
+
+    async def aget_or_set(self, key, loader):
+        """Async version of get_or_set; ``loader`` is a coroutine function"""
+        full_key = await self.afull_key(key)
+        lock_key = f'{full_key}:lock'
+        now = time.time()
+        value = self.local.get(full_key, now)
+        if value is not MISSING:
+            return value
+
+        stored = await cache.aget(full_key)
+        if stored is not None:
+            fresh_until, value = stored
+            if now < fresh_until:
+                self._remember(full_key, value, fresh_until, now)
+                return value
+            if not await cache.aadd(lock_key, 1, timeout=settings.CACHE_LOCK_TIMEOUT):
+                return value
+            return await self._aload(full_key, lock_key, loader, stale=value)
+
+        if not await cache.aadd(lock_key, 1, timeout=settings.CACHE_LOCK_TIMEOUT):
+            deadline = now + settings.CACHE_LOCK_TIMEOUT
+            while time.time() < deadline:
+                await asyncio.sleep(POLL_INTERVAL)
+                found = await cache.aget_many([full_key, lock_key])
+                if full_key in found:
+                    fresh_until, value = found[full_key]
+                    self._remember(full_key, value, fresh_until, time.time())
+                    return value
+                if lock_key not in found:
+                    break
+            return await self._aload(full_key, None, loader)
+        return await self._aload(full_key, lock_key, loader)
+
+    async def _aload(self, full_key, lock_key, loader, stale=MISSING):
+        try:
+            value = await loader()
+        except Exception:
+            if stale is MISSING:
+                raise
+            return stale
+        else:
+            if value is not None:
+                now = time.time()
+                envelope, timeout = self._envelope(value, now)
+                await cache.aset(full_key, envelope, timeout=timeout)
+                self._remember(full_key, value, envelope[0], now)
+            elif stale is not MISSING:
+                return stale
+            return value
+        finally:
+            if lock_key is not None:
+                await cache.adelete(lock_key)
+
+    def invalidate(self):
+        """Drop every value of the namespace (other processes' L1 within l1_ttl)"""
+        cache.set(self.version_key, time.time_ns(), timeout=None)
+        self.local.clear()
+
+
+_namespaces = {}
+_namespaces_lock = threading.Lock()
+
+
+def namespace(name):
+    """Return the process-wide Namespace of a name"""
+    try:
+        return _namespaces[name]
+    except KeyError:
+        with _namespaces_lock:
+            return _namespaces.setdefault(name, Namespace(name))
+
+
+def clear_local():
+    """Empty every namespace's L1 in this process (tests)"""
+    for ns in list(_namespaces.values()):
+        ns.local.clear()
@@ -0,0 +1,397 @@
+"""
+Priority scores for the authorities' triage queue.
+
+Each open report gets a score from its sub-category's ``severity``, how
+many other open reports of the same sub-category lie around it (likely
+duplicates, i.e. an issue many people run into), its age and its status:
+
+    priority = status factor * (10 * severity
+                                + DUPLICATE_WEIGHT * log2(1 + duplicates)
+                                + AGE_WEIGHT * min(age in days, PRIORITY_MAX_AGE_DAYS))
+
+The score is stored in the indexed ``Report.priority`` column, so the
+triage endpoint is a keyset scan of that index. It is maintained by a
+periodic job that one idle worker runs every ``PRIORITY_INTERVAL``
+seconds (see ``rescore_when_due()``). Each run only rescores the reports
+whose score can have changed since the previous one:
+
+- reports updated since then (``updated_at``, with ``SYNC_MARGIN`` for
+  transactions committing late), plus the open reports of the same group
+  around them, whose duplicate counts they change;
+- open reports whose age in whole days has grown since then, a bounded
+  sweep of the reports created on the same days 1 to
+  ``PRIORITY_MAX_AGE_DAYS + 1`` days ago.
+
+The open reports of their groups around them are loaded (at worst, when
+changes are spread out, as many as a full rescore loads), scores are
+computed for all of them at once with NumPy, and only the rows whose
+score changed are written. Closed reports drop to 0. Reports moved
+elsewhere or deleted, and severities edited in the admin, only change
+their former neighbours' scores at the next full rescore, which a run does on its own every
+``PRIORITY_FULL_INTERVAL`` seconds and whenever the state of the previous
+run (kept in the shared cache) is gone.
+
+New reports do not wait for the next run to be ranked: ``Report.save``
+gives them ``initial_priority()``, the score of a report with no
+duplicates and no age, from their sub-category's severity in the cached
+reference data. The next run refines it.
+
+Duplicates are counted on a grid of ``PRIORITY_DUPLICATE_METERS`` cells:
+the other open reports of the same sub-category (or category, for
+reports without one) in the report's cell and the 8 cells around it. The
+grid is laid out for the open reports' mean latitude by the first run,
+and kept as long as the shared cache keeps the runs' state.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from api.services.jobs import maintenance
+from api.services.overlay_index import SYNC_MARGIN
+from api.services.route_hazards import CLOSED_STATUSES
+
+RESCORE_LOCK_KEY = 'triage:rescore'
+# When the last run started, when the last full one did, and its grid
+RESCORE_STATE_KEY = 'triage:rescore-state'
+
+METERS_PER_DEGREE = 111_320
+
+DUPLICATE_WEIGHT = 10
+AGE_WEIGHT = 2
+# Work already started on a report makes it less urgent
+STATUS_FACTORS = {'pending': 1.0, 'approved': 1.0, 'in_progress': 0.5}
+DEFAULT_SEVERITY = 5
+
+# Rows written per UPDATE, and per transaction
+WRITE_BATCH_SIZE = 2000
+TRANSACTION_ROWS = 20000
+
+
+def grid(latitudes, longitudes, cell_size, reference_latitude):
+    """
+    Cell of each point on a grid of ``cell_size`` meters cells, laid out
+    for ``reference_latitude``.
+
+    Returns:
+        tuple: (cx, cy) int64 arrays
+    """
+    import numpy as np
+
+    size_lat, size_lon = cell_degrees(cell_size, reference_latitude)
+    return np.floor(longitudes / size_lon).astype(np.int64), np.floor(latitudes / size_lat).astype(np.int64)
+
+
+def cell_degrees(cell_size, reference_latitude):
+    """Edges in degrees of latitude and longitude of a grid cell"""
+    import numpy as np
+
+    size_lat = cell_size / METERS_PER_DEGREE
+    return size_lat, size_lat / np.cos(np.radians(reference_latitude))
+
+
+def group_cell_keys(groups, cx, cy):
+    """One key per (group, cell): cell numbers take 42 bits, the group the rest"""
+    from api.services.geofence import cell_number
+
+    return (groups << 42) | cell_number(cx, cy)
+
+
+def count_duplicates(groups, latitudes, longitudes, cell_size, reference_latitude=None):
+    """
+    Count, for each point, the other points of its group in its grid cell
+    and the 8 around it.
+
+    Args:
+        groups (ndarray): Integer group of each point
+        latitudes, longitudes (ndarray): Coordinates in degrees
+        cell_size (float): Cell edge in meters
+        reference_latitude (float): Latitude the grid is laid out for
+            (default: the points' mean)
+
+    Returns:
+        ndarray: int64 counts
+    """
+    import numpy as np
+
+    if not len(groups):
+        return np.zeros(0, dtype=np.int64)
+    if reference_latitude is None:
+        reference_latitude = latitudes.mean()
+    cx, cy = grid(latitudes, longitudes, cell_size, reference_latitude)
+
+    cells, counts = np.unique(group_cell_keys(groups, cx, cy), return_counts=True)
+    total = np.zeros(len(groups), dtype=np.int64)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            neighbour = group_cell_keys(groups, cx + dx, cy + dy)
+            position = np.minimum(np.searchsorted(cells, neighbour), len(cells) - 1)
+            total += np.where(cells[position] == neighbour, counts[position], 0)
+    # Each point counted itself in its own cell
+    return total - 1
+
+
+def compute_scores(severity, duplicates, age_days, status_factor):
+    """Vectorised priority formula (see module docstring)"""
+    import numpy as np
+
+    age = np.clip(age_days, 0, settings.PRIORITY_MAX_AGE_DAYS)
+    score = 10.0 * severity + DUPLICATE_WEIGHT * np.log2(1 + duplicates) + AGE_WEIGHT * age
+    # Whole points: plenty to rank by, and reports sharing a score are
+    # written with one UPDATE
+    return np.round(score * status_factor)
+
+
+def initial_priority(report):
+    """Score of a report being created, before any run has seen it (see module docstring)"""
+    from api.services.reference_data import get_reference_data
+
+    data = get_reference_data().data
+    code = next((status['code'] for status in data['statuses'] if status['id'] == report.status_id), None)
+    if code in CLOSED_STATUSES:
+        return 0.0
+    severity = next(
+        (sub['severity'] for sub in data['subcategories'] if sub['id'] == report.sub_category_id), None
+    )
+    severity = DEFAULT_SEVERITY if severity is None else severity
+    return float(compute_scores(severity, 0, 0, STATUS_FACTORS.get(code, 1.0)))
+
+
+def report_groups(sub_categories, categories):
+    """Group of each report: its sub-category, or for reports without one its (negative) category"""
+    import numpy as np
+
+    sub_categories = np.array([s or 0 for s in sub_categories], dtype=np.int64)
+    return np.where(sub_categories > 0, sub_categories, -np.array(categories, dtype=np.int64)) & 0xFFFFF
+
+
+def load_open_reports(where=None):
+    """
+    Load what the score of every open report (matching ``where``) depends on.
+
+    Creation dates are only loaded for reports young enough for their age
+    to still count; parsing a datetime per row is the costliest part of
+    the load.
+
+    Returns:
+        dict: Arrays ``id`` (ascending), ``group``, ``severity``,
+        ``status_factor``, ``age_days``, ``latitude``, ``longitude`` and
+        ``priority``
+    """
+    import numpy as np
+
+    from api.models import Report, Status
+
+    factors = {
+        status_id: STATUS_FACTORS.get(code, 1.0)
+        for status_id, code in Status.objects.exclude(code__in=CLOSED_STATUSES).values_list('id', 'code')
+    }
+    open_reports = Report.objects.filter(status_id__in=list(factors)).order_by('id')
+    if where is not None:
+        open_reports = open_reports.filter(where)
+    rows = open_reports.annotate(
+        lat=Cast('latitude', FloatField()),
+        lon=Cast('longitude', FloatField()),
+    ).values_list(
+        'id', 'sub_category_id', 'report_type_id', 'sub_category__severity', 'status_id', 'lat', 'lon', 'priority',
+    ).iterator(chunk_size=10000)
+    (ids, sub_categories, categories, severities, statuses,
+     latitudes, longitudes, priorities) = list(zip(*rows)) or [()] * 8
+    ids = np.array(ids, dtype=np.int64)
+
+    now = timezone.now()
+    max_age = settings.PRIORITY_MAX_AGE_DAYS
+    recent = open_reports.filter(created_at__gt=now - timedelta(days=max_age + 1)).values_list('id', 'created_at')
+    recent_ids, created = list(zip(*recent.iterator(chunk_size=10000))) or [(), ()]
+    age_days = np.full(len(ids), float(max_age))
+    # Reports may have opened since the first query
+    position = np.searchsorted(ids, np.array(recent_ids, dtype=np.int64))
+    found = position < len(ids)
+    found[found] = ids[position[found]] == np.array(recent_ids, dtype=np.int64)[found]
+    age_days[position[found]] = np.array([(now - c).days for c in created], dtype=np.float64)[found]
+
+    return {
+        'id': ids,
+        'group': report_groups(sub_categories, categories),
+        'severity': np.array([DEFAULT_SEVERITY if s is None else s for s in severities], dtype=np.float64),
+        'status_factor': np.array([factors[s] for s in statuses], dtype=np.float64),
+        'age_days': age_days,
+        'latitude': np.array(latitudes, dtype=np.float64),
+        'longitude': np.array(longitudes, dtype=np.float64),
+        'priority': np.array(priorities, dtype=np.float64),
+    }
+
+
+def load_changed_reports(since, now):
+    """
+    Load the reports whose score can have changed since ``since``: those
+    updated since then, whatever their status, and the open ones whose age
+    in whole days has grown.
+
+    Returns:
+        dict: Arrays ``id``, ``group``, ``sub_category`` (0 for none),
+        ``category``, ``latitude``, ``longitude`` and ``updated`` (whether
+        the report itself changed)
+    """
+    import numpy as np
+
+    from api.models import Report
+
+    # A report's age reaches n days when now - created_at passes n days
+    aging = Q()
+    for days in range(1, settings.PRIORITY_MAX_AGE_DAYS + 2):
+        aging |= Q(created_at__gt=since - timedelta(days=days), created_at__lte=now - timedelta(days=days))
+    # Two queries, so that each can use its index
+    rows = {}
+    for updated, reports in [
+        (False, Report.objects.filter(aging).exclude(status__code__in=CLOSED_STATUSES)),
+        (True, Report.objects.filter(updated_at__gte=since - SYNC_MARGIN)),
+    ]:
+        for row in reports.order_by().annotate(
+            lat=Cast('latitude', FloatField()),
+            lon=Cast('longitude', FloatField()),
+        ).values_list('id', 'sub_category_id', 'report_type_id', 'lat', 'lon').iterator(chunk_size=10000):
+            rows[row[0]] = (*row, updated)
+    ids, sub_categories, categories, latitudes, longitudes, updated = list(zip(*rows.values())) or [()] * 6
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'group': report_groups(sub_categories, categories),
+        'sub_category': np.array([s or 0 for s in sub_categories], dtype=np.int64),
+        'category': np.array(categories, dtype=np.int64),
+        'latitude': np.array(latitudes, dtype=np.float64),
+        'longitude': np.array(longitudes, dtype=np.float64),
+        'updated': np.array(updated, dtype=bool),
+    }
+
+
+def load_neighbourhoods(changed, reference_latitude):
+    """
+    Load the open reports of the changed reports' groups that lie within 3
+    cells of the group's changed reports' bounding box: enough to count the
+    duplicates of every report within a cell of a changed one.
+    """
+    import numpy as np
+
+    size_lat, size_lon = cell_degrees(settings.PRIORITY_DUPLICATE_METERS, reference_latitude)
+    reach_lat, reach_lon = 3 * size_lat, 3 * size_lon
+    where = Q()
+    for group in np.unique(changed['group']).tolist():
+        of_group = changed['group'] == group
+        sub_category, category = changed['sub_category'][of_group][0], changed['category'][of_group][0]
+        lat, lon = changed['latitude'][of_group], changed['longitude'][of_group]
+        in_group = Q(sub_category_id=sub_category) if sub_category else Q(
+            sub_category__isnull=True, report_type_id=category
+        )
+        where |= in_group & Q(
+            latitude__gte=lat.min() - reach_lat, latitude__lte=lat.max() + reach_lat,
+            longitude__gte=lon.min() - reach_lon, longitude__lte=lon.max() + reach_lon,
+        )
+    return load_open_reports(where)
+
+
+def write_priorities(ids, values):
+    """Write new priorities, one UPDATE per score value since many reports share one"""
+    import numpy as np
+
+    from api.models import Report
+
+    order = np.argsort(values, kind='stable')
+    ids, values = ids[order], values[order]
+    bounds = np.flatnonzero(np.diff(values)) + 1
+    statements = []
+    for group_ids, value in zip(np.split(ids, bounds), values[np.r_[0, bounds]] if len(values) else []):
+        group_ids = group_ids.tolist()
+        statements += [
+            (float(value), group_ids[start:start + WRITE_BATCH_SIZE])
+            for start in range(0, len(group_ids), WRITE_BATCH_SIZE)
+        ]
+    # A commit every TRANSACTION_ROWS rows: few commits, yet no long-held
+    # locks on reports being edited
+    while statements:
+        with transaction.atomic():
+            rows = 0
+            while statements and rows < TRANSACTION_ROWS:
+                value, chunk = statements.pop()
+                # update() leaves updated_at alone: a new score is not a
+                # change clients need to sync
+                Report.objects.filter(id__in=chunk).update(priority=value)
+                rows += len(chunk)
+
+
+def rescore(full=False):
+    """
+    Recompute the priority of the open reports whose score can have
+    changed since the last run, or of every open report when a full
+    rescore is due (see module docstring), writing the changed ones.
+
+    Args:
+        full (bool): Rescore every open report
+
+    Returns:
+        dict: Numbers of open reports scored, and of open and closed
+        reports whose priority was written
+    """
+    import numpy as np
+
+    from api.models import Report
+
+    now = timezone.now()
+    state = cache.get(RESCORE_STATE_KEY)
+    full = full or state is None or state['full_at'] < now - timedelta(seconds=settings.PRIORITY_FULL_INTERVAL)
+
+    closed = Report.objects.filter(status__code__in=CLOSED_STATUSES).filter(~Q(priority=0))
+    if full:
+        reports = load_open_reports()
+        # The grid stays put once laid out, so that scores only move with their inputs
+        if state is not None:
+            reference_latitude = state['reference_latitude']
+        else:
+            reference_latitude = float(reports['latitude'].mean()) if len(reports['id']) else 0.0
+        state = {'full_at': now, 'reference_latitude': reference_latitude}
+        scored = np.ones(len(reports['id']), dtype=bool)
+    else:
+        reference_latitude = state['reference_latitude']
+        changed = load_changed_reports(state['at'], now)
+        closed = closed.filter(updated_at__gte=state['at'] - SYNC_MARGIN)
+        if not len(changed['id']):
+            reports = load_open_reports(Q(pk__in=[]))
+            scored = np.zeros(0, dtype=bool)
+        else:
+            reports = load_neighbourhoods(changed, reference_latitude)
+            # The changed reports, and those within a cell of a report that
+            # was itself updated (opened, closed, edited)
+            scored = np.isin(reports['id'], changed['id'])
+            updated = {key: values[changed['updated']] for key, values in changed.items()}
+            cx, cy = grid(updated['latitude'], updated['longitude'], settings.PRIORITY_DUPLICATE_METERS, reference_latitude)
+            around = np.concatenate([
+                group_cell_keys(updated['group'], cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+            ])
+            cx, cy = grid(reports['latitude'], reports['longitude'], settings.PRIORITY_DUPLICATE_METERS, reference_latitude)
+            scored |= np.isin(group_cell_keys(reports['group'], cx, cy), around)
+
+    duplicates = count_duplicates(
+        reports['group'], reports['latitude'], reports['longitude'], settings.PRIORITY_DUPLICATE_METERS,
+        reference_latitude,
+    )[scored]
+    scores = compute_scores(
+        reports['severity'][scored], duplicates, reports['age_days'][scored], reports['status_factor'][scored]
+    )
+
+    changed = np.flatnonzero(scores != reports['priority'][scored])
+    write_priorities(reports['id'][scored][changed], scores[changed])
+    closed = closed.update(priority=0)
+
+    cache.set(RESCORE_STATE_KEY, {**state, 'at': now}, timeout=None)
+    return {'scored': len(scores), 'updated': len(changed), 'closed': closed}
+
+
+@maintenance
+def rescore_when_due():
+    """Rescore on one idle worker every PRIORITY_INTERVAL seconds"""
+    # The shared cache elects the worker: the first to add the key runs
+    if cache.add(RESCORE_LOCK_KEY, True, timeout=settings.PRIORITY_INTERVAL):
+        return rescore()
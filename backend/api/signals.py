@@ -0,0 +1,62 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.middleware import install_query_dispatch
+from api.models import Authority, Category, Report, ReportTombstone, Status, SubCategory
+from api.services import alerts, jurisdictions, notifications, search, tiered_cache
+
+
+@receiver(post_delete, sender=Report)
+def record_report_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone so delta sync clients learn about the deletion"""
+    ReportTombstone.objects.create(
+        report_id=instance.pk,
+        citizen_id=instance.citizen_id,
+    )
+
+
+@receiver(post_save, sender=Report)
+def update_report_search_index(sender, instance, **kwargs):
+    """Keep the fallback inverted index in sync with title/description"""
+    search.index_report(instance)
+
+
+@receiver(post_save, sender=Report)
+def notify_status_change(sender, instance, created, **kwargs):
+    """Queue a digest email entry for the citizen when the status changes"""
+    old_status_id = getattr(instance, '_loaded_status_id', None)
+    instance._loaded_status_id = instance.status_id
+    if not created and old_status_id is not None and old_status_id != instance.status_id:
+        notifications.record_status_change(instance, old_status_id)
+
+
+@receiver(post_save, sender=Report)
+def match_hazard_alerts(sender, instance, created, **kwargs):
+    """Queue matching of a new hazard report against citizens' alert areas"""
+    if created:
+        alerts.queue_match(instance)
+
+
+@receiver(post_save, sender=Authority)
+@receiver(post_delete, sender=Authority)
+def invalidate_jurisdiction_index(sender, instance, **kwargs):
+    """Rebuild the report routing index when jurisdictions change"""
+    jurisdictions.invalidate()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def invalidate_reference_data(sender, instance, **kwargs):
+    """Drop cached category and subcategory responses and the bootstrap reference data"""
+    tiered_cache.namespace('reference').invalidate()
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Let the request metrics middleware count and time this connection's queries"""
+    install_query_dispatch(connection)
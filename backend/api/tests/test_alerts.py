@@ -0,0 +1,206 @@
+from unittest import mock
+
+import numpy as np
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import AlertSubscription, Category, Citizen, HazardAlert, Job, Report, Status, SubCategory
+from api.services import alerts, jobs
+from api.services.geofence import GeofenceIndex
+from api.views.auth import get_tokens_for_user
+
+# Near Manila City Hall, inside SQUARE, and well away from it
+NEAR = ('14.599500', '120.984200')
+FAR = ('14.700000', '121.100000')
+SQUARE = {
+    'type': 'Polygon',
+    'coordinates': [[[120.98, 14.59], [121.0, 14.59], [121.0, 14.61], [120.98, 14.61], [120.98, 14.59]]],
+}
+
+
+@override_settings(ALERT_DIGEST_SECONDS=60)
+class HazardAlertTestCase(TestCase):
+    """Test cases for geofenced hazard alerts"""
+
+    def setUp(self):
+        """Set up a reporter and two subscribed citizens"""
+        alerts.reset_index()
+        self.status = Status.objects.get_or_create(code='pending')[0]
+        self.hazard = Category.objects.get(report_type='Hazard')
+        self.flooding = SubCategory.objects.get(report_type=self.hazard, sub_category='FLOODING')
+        self.accident = SubCategory.objects.get(report_type=self.hazard, sub_category='ROAD_ACCIDENT')
+        self.reporter = Citizen.objects.create(name='Rey Porter', email='rey@example.com', password='x')
+        self.jane = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.john = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        self.home = AlertSubscription.objects.create(
+            citizen=self.jane, name='Home', latitude='14.600000', longitude='120.985000', radius_meters=500
+        )
+        self.office = AlertSubscription.objects.create(citizen=self.jane, name='Office', area=SQUARE)
+        self.commute = AlertSubscription.objects.create(
+            citizen=self.john, name='Commute', latitude='14.600000', longitude='120.985000',
+            radius_meters=1000, sub_categories=['ROAD_ACCIDENT'],
+        )
+
+    def create_report(self, sub_category, location=NEAR, citizen=None, title='Flooded street'):
+        return Report.objects.create(
+            citizen=citizen or self.reporter, status=self.status, report_type=self.hazard,
+            sub_category=sub_category, title=title, latitude=location[0], longitude=location[1],
+        )
+
+    def run_jobs(self):
+        """Run the match jobs, then the digests they scheduled"""
+        for _ in range(2):
+            Job.objects.update(run_at=timezone.now())
+            jobs.Worker(poll_interval=0, batch_size=50).run(burst=True)
+
+    def test_hazard_reports_queue_matching(self):
+        """Test that only new hazard reports are matched, off the request path"""
+        report = self.create_report(self.flooding)
+        Report.objects.create(
+            citizen=self.reporter, status=self.status, report_type=Category.objects.get(report_type='Infrastructure'),
+            title='Pothole', latitude=NEAR[0], longitude=NEAR[1],
+        )
+        report.save()
+        self.assertEqual(list(Job.objects.values_list('task', 'payload')), [(alerts.MATCH_TASK, {'report_id': report.id})])
+        self.assertFalse(HazardAlert.objects.exists())
+
+    def test_match_and_digest(self):
+        """Test that citizens get one alert per report in their areas and sub-categories"""
+        flood = self.create_report(self.flooding)
+        accident = self.create_report(self.accident, title='Crash on Taft')
+        self.create_report(self.flooding, location=FAR)
+        self.run_jobs()
+
+        # Jane's two areas both contain the flood: she is alerted once
+        self.assertEqual(
+            sorted(HazardAlert.objects.values_list('citizen_id', 'report_id')),
+            sorted([(self.jane.id, flood.id), (self.jane.id, accident.id), (self.john.id, accident.id)]),
+        )
+        self.assertEqual(len(mail.outbox), 2)
+        jane = next(m for m in mail.outbox if m.to == ['jane@example.com'])
+        self.assertEqual(jane.subject, '2 hazards reported near you')
+        self.assertIn('- Road accident: "Crash on Taft" near', jane.body)
+        john = next(m for m in mail.outbox if m.to == ['john@example.com'])
+        self.assertEqual(john.subject, 'Hazard reported near you')
+        self.assertIn(f'near Commute (report #{accident.id})', john.body)
+        self.assertFalse(HazardAlert.objects.filter(sent_at__isnull=True).exists())
+
+    def test_reporter_is_not_alerted(self):
+        """Test that citizens are not alerted about their own reports"""
+        self.create_report(self.accident, citizen=self.john)
+        self.run_jobs()
+        self.assertEqual(list(HazardAlert.objects.values_list('citizen_id', flat=True)), [self.jane.id])
+
+    def test_index_follows_subscription_changes(self):
+        """Test that edits and deactivations apply without rebuilding the index"""
+        self.create_report(self.flooding)
+        self.run_jobs()
+        base = alerts._index.base
+
+        AlertSubscription.objects.filter(citizen=self.jane).update(is_active=False, updated_at=timezone.now())
+        AlertSubscription.objects.filter(id=self.commute.id).update(sub_categories=[], updated_at=timezone.now())
+        report = self.create_report(self.flooding)
+        self.run_jobs()
+
+        self.assertIs(alerts._index.base, base)
+        self.assertEqual(
+            list(HazardAlert.objects.filter(report_id=report.id).values_list('citizen_id', flat=True)), [self.john.id]
+        )
+
+    @override_settings(ALERT_INDEX_MAX_OVERLAY=1)
+    def test_index_rebuilt_after_many_changes(self):
+        """Test that the index is rebuilt once too many subscriptions changed"""
+        self.create_report(self.flooding)
+        self.run_jobs()
+        base = alerts._index.base
+        AlertSubscription.objects.filter(citizen=self.jane).update(radius_meters=400, updated_at=timezone.now())
+        self.create_report(self.flooding)
+        self.run_jobs()
+        self.assertIsNot(alerts._index.base, base)
+        self.assertEqual(alerts._index.changed, {})
+
+    def test_stale_index_entries_are_dropped(self):
+        """Test that subscriptions deleted since the index was built are not alerted"""
+        alerts.get_index()
+        with mock.patch.object(alerts.SubscriptionIndex, 'refresh'):
+            self.jane.delete()
+            self.create_report(self.flooding)
+            self.run_jobs()
+        self.assertFalse(HazardAlert.objects.exists())
+
+    def test_geofence_index_matches_brute_force(self):
+        """Test that the grid index finds exactly the circles containing each point"""
+        rng = np.random.default_rng(7)
+        lat, lon = rng.uniform(14.35, 14.80, 2000), rng.uniform(120.90, 121.15, 2000)
+        radius, masks = rng.uniform(50, 3000, 2000), rng.integers(1, 8, 2000)
+        index = GeofenceIndex(zip(range(2000), range(2000, 4000), lat, lon, radius, masks), cell_size=0.02)
+
+        for y, x in zip(rng.uniform(14.35, 14.80, 50), rng.uniform(120.90, 121.15, 50)):
+            keys, owners = index.match(y, x, 2)
+            dx = (lon - x) * np.cos(np.radians(y)) * 111_320.0
+            dy = (lat - y) * 111_320.0
+            distance = np.sqrt(dx * dx + dy * dy)
+            expected = np.flatnonzero((distance <= radius - 1) & (masks & 2 != 0))
+            borderline = np.flatnonzero((np.abs(distance - radius) < 1) & (masks & 2 != 0))
+            self.assertTrue(set(expected) <= set(keys.tolist()) <= set(expected) | set(borderline))
+            self.assertEqual(owners.tolist(), (keys + 2000).tolist())
+
+
+class AlertSubscriptionAPITestCase(TestCase):
+    """Test cases for the alert subscriptions endpoint"""
+
+    def setUp(self):
+        """Set up two citizens"""
+        self.jane = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.john = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        self.client = APIClient()
+        token = get_tokens_for_user(self.jane.id, 'citizen', self.jane.email)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_crud(self):
+        """Test that citizens manage their own areas and deleting deactivates"""
+        response = self.client.post('/api/alerts/subscriptions/', {
+            'name': 'Home', 'latitude': '14.600000', 'longitude': '120.985000',
+            'radius_meters': 500, 'sub_categories': ['FLOODING', 'FLOODING'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        subscription = AlertSubscription.objects.get(id=response.json()['data']['id'])
+        self.assertEqual((subscription.citizen_id, subscription.sub_categories), (self.jane.id, ['FLOODING']))
+
+        response = self.client.patch(
+            f'/api/alerts/subscriptions/{subscription.id}/',
+            {'latitude': None, 'longitude': None, 'radius_meters': None, 'area': SQUARE}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        other = AlertSubscription.objects.create(citizen=self.john, area=SQUARE)
+        self.assertEqual(self.client.get('/api/alerts/subscriptions/').json()['count'], 1)
+        self.assertEqual(self.client.delete(f'/api/alerts/subscriptions/{other.id}/').status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(self.client.delete(f'/api/alerts/subscriptions/{subscription.id}/').status_code, status.HTTP_200_OK)
+        subscription.refresh_from_db()
+        self.assertFalse(subscription.is_active)
+        self.assertEqual(self.client.get('/api/alerts/subscriptions/').json()['count'], 0)
+
+        self.assertEqual(APIClient().get('/api/alerts/subscriptions/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ALERT_MAX_SUBSCRIPTIONS=1, ALERT_MAX_RADIUS_METERS=1000)
+    def test_validation(self):
+        """Test that areas must be one bounded circle or polygon, within the citizen's limit"""
+        circle = {'latitude': '14.600000', 'longitude': '120.985000', 'radius_meters': 500}
+        invalid = [
+            {'latitude': '14.600000', 'radius_meters': 500},
+            {**circle, 'area': SQUARE},
+            {**circle, 'radius_meters': 5000},
+            {**circle, 'sub_categories': ['ROAD_DAMAGE']},
+            {'area': {'type': 'Point', 'coordinates': [120.98, 14.59]}},
+            {'area': {**SQUARE, 'coordinates': [[[120.0, 14.0], [121.0, 14.0], [121.0, 15.0], [120.0, 14.0]]]}},
+        ]
+        for body in invalid:
+            response = self.client.post('/api/alerts/subscriptions/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, body)
+
+        self.assertEqual(self.client.post('/api/alerts/subscriptions/', circle, format='json').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post('/api/alerts/subscriptions/', circle, format='json').status_code, status.HTTP_400_BAD_REQUEST)
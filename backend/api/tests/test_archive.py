@@ -0,0 +1,156 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import (
+    ArchivedReport, ArchivedReportMedia, Category, Citizen, Report, ReportMedia, ReportSearchTerm,
+    ReportTombstone, Status,
+)
+from api.services.archive import archive_batches, months_ago
+from api.views.auth import get_tokens_for_user
+
+
+class ReportArchiveTestCase(TestCase):
+    """Test cases for moving old resolved reports to the archive table"""
+
+    def setUp(self):
+        """Set up a citizen with recent and old reports"""
+        cache.clear()
+        self.client = APIClient()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.resolved = Status.objects.get_or_create(code='resolved')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.other = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        tokens = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        self.now = timezone.now()
+        self.old_resolved = self.create_report('Old resolved pothole', self.resolved, days_ago=400)
+        self.old_pending = self.create_report('Old pending pothole', self.pending, days_ago=300)
+        self.recent_resolved = self.create_report('Recent resolved pothole', self.resolved, days_ago=10)
+        self.others_old = self.create_report('Other citizen', self.resolved, days_ago=500, citizen=self.other)
+        ReportMedia.objects.create(
+            report=self.old_resolved, sha256='a' * 64, content_type='image/jpeg', size=1234,
+            processing_status=ReportMedia.ProcessingStatus.READY
+        )
+
+    def create_report(self, title, report_status, days_ago, citizen=None):
+        report = Report.objects.create(
+            citizen=citizen or self.citizen, status=report_status, report_type=self.category,
+            title=title, latitude='14.599500', longitude='120.984200'
+        )
+        created_at = self.now - timedelta(days=days_ago)
+        Report.objects.filter(id=report.id).update(created_at=created_at, updated_at=created_at)
+        return report
+
+    def archive(self, months=6, batch_size=1000):
+        return sum(archive_batches(months_ago(months), batch_size=batch_size))
+
+    def test_months_ago(self):
+        """Test calendar month arithmetic, clamping to the end of shorter months"""
+        moment = timezone.datetime(2026, 5, 31, 12, tzinfo=timezone.get_current_timezone())
+        self.assertEqual(months_ago(3, moment).date().isoformat(), '2026-02-28')
+        self.assertEqual(months_ago(17, moment).date().isoformat(), '2024-12-31')
+
+    def test_archive_moves_old_resolved_reports_only(self):
+        """Test that batches move old resolved reports with their IDs and photos"""
+        self.assertEqual(self.archive(batch_size=1), 2)
+
+        self.assertEqual(
+            set(ArchivedReport.objects.values_list('id', flat=True)),
+            {self.old_resolved.id, self.others_old.id}
+        )
+        self.assertEqual(
+            set(Report.objects.values_list('id', flat=True)),
+            {self.old_pending.id, self.recent_resolved.id}
+        )
+        archived = ArchivedReport.objects.get(id=self.old_resolved.id)
+        self.assertEqual(archived.title, 'Old resolved pothole')
+        self.assertEqual(archived.created_at, self.now - timedelta(days=400))
+        self.assertEqual(ArchivedReportMedia.objects.get().report_id, self.old_resolved.id)
+        self.assertFalse(ReportMedia.objects.exists())
+        self.assertFalse(ReportSearchTerm.objects.filter(report_id=self.old_resolved.id).exists())
+        # Archiving is not a deletion: delta sync clients keep their copies
+        self.assertFalse(ReportTombstone.objects.exists())
+
+        self.assertEqual(self.archive(), 0)
+
+    def test_list_includes_archive_unless_window_is_recent(self):
+        """Test that the list reads the archive only when the date range reaches it"""
+        self.archive()
+
+        response = self.client.get('/api/reports/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [r['id'] for r in response.data['results']],
+            [self.recent_resolved.id, self.old_pending.id, self.old_resolved.id]
+        )
+        archived = response.data['results'][2]
+        self.assertEqual(archived['status_name'], 'Resolved')
+        self.assertEqual(archived['media'][0]['size'], 1234)
+        self.assertEqual(set(archived), set(response.data['results'][0]))
+
+        since = (self.now - timedelta(days=30)).date().isoformat()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/reports/', {'created_after': since})
+        self.assertEqual([r['id'] for r in response.data['results']], [self.recent_resolved.id])
+        self.assertFalse(any('reports_archive' in q['sql'] for q in queries.captured_queries))
+
+        response = self.client.get('/api/reports/', {
+            'created_after': (self.now - timedelta(days=450)).isoformat(),
+            'created_before': (self.now - timedelta(days=350)).isoformat(),
+        })
+        self.assertEqual([r['id'] for r in response.data['results']], [self.old_resolved.id])
+
+        response = self.client.get('/api/reports/', {'created_after': 'last year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('created_after', response.data)
+
+    def test_retrieve_and_stats_include_archive(self):
+        """Test that archived reports can be retrieved by ID and count in stats"""
+        self.archive()
+
+        response = self.client.get(f'/api/reports/{self.old_resolved.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Old resolved pothole')
+        # Still scoped to the citizen's own reports
+        response = self.client.get(f'/api/reports/{self.others_old.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/api/reports/stats/')
+        self.assertEqual(response.data['total_reports'], 4)
+        self.assertEqual(response.data['by_category'], [
+            {'report_type__report_type': 'Infrastructure', 'count': 4}
+        ])
+
+    @override_settings(ROOT_URLCONF='smartwayz_backend.urls_asgi')
+    def test_async_list_hands_archive_lists_to_viewset(self):
+        """Test that the ASGI profile's list includes archived reports too"""
+        self.archive()
+        response = self.client.get('/api/reports/')
+        self.assertEqual(response.json()['count'], 3)
+        response = self.client.get('/api/reports/', {'created_after': self.now.date().isoformat()})
+        self.assertEqual(response.json()['count'], 0)
+        response = self.client.get('/api/reports/', {'created_before': '2026-13-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        """Test the archive_reports command and its dry run"""
+        out = StringIO()
+        call_command('archive_reports', '--dry-run', stdout=out)
+        self.assertIn('2 resolved reports', out.getvalue())
+        self.assertFalse(ArchivedReport.objects.exists())
+
+        out = StringIO()
+        call_command('archive_reports', '--months', '15', stdout=out)
+        self.assertIn('✓ Archived 1 reports', out.getvalue())
+        self.assertEqual(ArchivedReport.objects.get().id, self.others_old.id)
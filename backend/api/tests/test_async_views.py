@@ -0,0 +1,136 @@
+import threading
+from unittest import mock
+
+import httpx
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Report, Status
+from api.services import passwords, tiered_cache
+from api.views.auth import get_tokens_for_user
+
+
+@override_settings(ROOT_URLCONF='smartwayz_backend.urls_asgi')
+class AsyncViewsTestCase(TestCase):
+    """Test cases for the async endpoints of the ASGI profile"""
+
+    def setUp(self):
+        """Set up a citizen with a dozen reports"""
+        # API clients never send CSRF tokens
+        self.async_client = AsyncClient(enforce_csrf_checks=True)
+        self.status = Status.objects.get_or_create(code='pending')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.sub_category = self.category.subcategories.first()
+        self.citizen = Citizen.objects.create(
+            name='Jane Doe', email='jane@example.com', password=make_password('secret-pass')
+        )
+        self.token = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)['access']
+        for i in range(12):
+            Report.objects.create(
+                citizen=self.citizen, report_type=self.category, sub_category=self.sub_category,
+                status=self.status, title=f'Pothole {i}', description='Deep pothole',
+                latitude='14.599500', longitude='120.984200'
+            )
+
+    def auth(self):
+        return {'headers': {'Authorization': f'Bearer {self.token}'}}
+
+    async def test_login(self):
+        """Test async login success and failure responses"""
+        response = await self.async_client.post(
+            '/api/auth/login/citizen/', {'email': 'jane@example.com', 'password': 'secret-pass'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['user']['id'], self.citizen.id)
+        self.assertIn('access', response.json()['data']['tokens'])
+
+        response = await self.async_client.post(
+            '/api/auth/login/citizen/', {'email': 'jane@example.com', 'password': 'wrong'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_password_check_runs_in_hashing_pool(self):
+        """Test that password hashing is kept off the event loop thread"""
+        threads = []
+        original = Citizen.check_password
+
+        def check_password(citizen, raw_password):
+            threads.append(threading.current_thread().name)
+            return original(citizen, raw_password)
+
+        with mock.patch.object(Citizen, 'check_password', check_password):
+            self.assertTrue(await passwords.acheck_password(self.citizen, 'secret-pass'))
+        self.assertTrue(threads[0].startswith('password-hashing'))
+
+    def test_report_list_matches_sync_view(self):
+        """Test that the async list returns the same pages as the DRF viewset"""
+        sync_client = APIClient()
+        sync_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        for query in ['', '?page=2', f'?sub_category={self.sub_category.id}']:
+            with override_settings(ROOT_URLCONF='smartwayz_backend.urls'):
+                expected = sync_client.get(f'/api/reports/{query}').json()
+            response = self.client.get(f'/api/reports/{query}', **self.auth())
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), expected)
+
+        self.assertEqual(self.client.get('/api/reports/?page=9', **self.auth()).status_code, 404)
+
+    def test_report_list_delegates_delta_sync(self):
+        """Test that ?since= requests are served by the viewset"""
+        response = self.client.get('/api/reports/?since=0', **self.auth())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['data']), 12)
+        self.assertIn('watermark', response.json())
+
+    async def test_create_report(self):
+        """Test async report creation, validation and authentication"""
+        payload = {
+            'report_type': self.category.id, 'sub_category': self.sub_category.id,
+            'title': 'Broken streetlight', 'description': 'Dark corner',
+            'latitude': '14.599500', 'longitude': '120.984200',
+        }
+        response = await self.async_client.post(
+            '/api/reports/', payload, content_type='application/json', **self.auth()
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['data']['status'], self.status.id)
+        self.assertTrue(await Report.objects.filter(title='Broken streetlight').aexists())
+
+        response = await self.async_client.post(
+            '/api/reports/', {**payload, 'latitude': 'north'}, content_type='application/json', **self.auth()
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('latitude', response.json())
+
+        response = await self.async_client.post('/api/reports/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(NOMINATIM_MIN_INTERVAL=0)
+    async def test_reverse_geocode(self):
+        """Test the async geocoding proxy, its fallback and cache"""
+        cache.clear()
+        tiered_cache.clear_local()
+        calls = []
+
+        def upstream(request):
+            calls.append(request.url.host)
+            if 'nominatim' in request.url.host:
+                return httpx.Response(503)
+            return httpx.Response(200, json={'locality': 'Manila', 'countryName': 'Philippines'})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        with mock.patch('api.views.geocoding.get_async_client', return_value=client):
+            response = await self.async_client.get('/api/geocoding/reverse/?lat=14.5995&lon=120.9842')
+            cached = await self.async_client.get('/api/geocoding/reverse/?lat=14.5995&lon=120.9842')
+
+        self.assertEqual(response.json()['provider'], 'bigdatacloud')
+        self.assertEqual(response.json()['address'], 'Manila, Philippines')
+        self.assertEqual(cached.json(), response.json())
+        self.assertEqual(len(calls), 2)
+
+        response = await self.async_client.get('/api/geocoding/reverse/?lat=100&lon=0')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,105 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Report, Status, SubCategory
+from api.services import tiered_cache
+from api.views.auth import get_tokens_for_user
+
+
+class BootstrapTestCase(TestCase):
+    """Test cases for the app start-up endpoint"""
+
+    def setUp(self):
+        """Set up two citizens with reports"""
+        cache.clear()
+        tiered_cache.clear_local()
+        self.client = APIClient()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        other = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        for n in range(12):
+            self.create_report(self.citizen, f'Pothole {n}')
+        self.create_report(other, 'Not Jane')
+
+    def create_report(self, citizen, title):
+        return Report.objects.create(
+            citizen=citizen, status=self.pending, report_type=self.category,
+            title=title, latitude='14.599500', longitude='120.984200'
+        )
+
+    def sign_in(self):
+        tokens = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def test_reference_data(self):
+        """Test that anonymous callers get all reference data and no reports"""
+        response = self.client.get('/api/bootstrap/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()['data']
+        self.assertEqual(response['ETag'], f'"{data["reference_version"]}"')
+        self.assertIsNone(data['reports'])
+
+        reference = data['reference']
+        self.assertEqual([c['report_type'] for c in reference['categories']], ['Hazard', 'Infrastructure'])
+        self.assertEqual(len(reference['subcategories']), SubCategory.objects.count())
+        self.assertEqual(
+            [s['sub_category'] for s in reference['category_mapping']['Hazard']],
+            [str(code) for code in SubCategory.CATEGORY_MAPPING['Hazard']]
+        )
+        self.assertEqual(reference['category_mapping']['Infrastructure'][0]['sub_category_display'], 'Road damage/Potholes')
+        self.assertIn({'id': self.pending.id, 'code': 'pending', 'name': 'Pending'}, reference['statuses'])
+
+    def test_not_modified(self):
+        """Test that a known version gets 304, or no reference data when signed in"""
+        etag = self.client.get('/api/bootstrap/')['ETag']
+        response = self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        self.sign_in()
+        response = self.client.get('/api/bootstrap/', {'reference_version': etag.strip('"')})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()['data']['reference'])
+        self.assertEqual(response.json()['data']['reports']['count'], 12)
+        self.assertEqual(response['Cache-Control'], 'private, no-store')
+
+    def test_first_page_of_own_reports(self):
+        """Test that signed-in callers get the first page of GET /api/reports/"""
+        self.sign_in()
+        reports = self.client.get('/api/bootstrap/').json()['data']['reports']
+        listed = self.client.get('/api/reports/').json()
+
+        self.assertEqual(reports['count'], 12)
+        self.assertEqual(reports['results'], listed['results'])
+        self.assertTrue(reports['next'].endswith('/api/reports/?page=2'))
+        self.assertIsNone(reports['previous'])
+
+    def test_warm_start_queries_no_reference_data(self):
+        """Test that cached reference data costs no query"""
+        self.client.get('/api/bootstrap/')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/bootstrap/').status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
+
+        self.sign_in()
+        # Count, page, photos
+        with self.assertNumQueries(3):
+            self.client.get('/api/bootstrap/')
+
+    def test_version_follows_changes(self):
+        """Test that editing reference data changes the version"""
+        version = self.client.get('/api/bootstrap/').json()['data']['reference_version']
+        tiered_cache.clear_local()
+        self.assertEqual(self.client.get('/api/bootstrap/').json()['data']['reference_version'], version)
+
+        road_damage = SubCategory.objects.get(sub_category='ROAD_DAMAGE')
+        road_damage.severity = 9
+        road_damage.save()
+        tiered_cache.clear_local()
+        response = self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=f'"{version}"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.json()['data']['reference_version'], version)
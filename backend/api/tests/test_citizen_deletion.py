@@ -0,0 +1,198 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import (
+    ArchivedReport, Authority, Category, Citizen, CitizenDeletion, Job, Report, ReportConfirmation, ReportSearchTerm, Status,
+)
+from api.services import citizen_deletion, confirmations
+from api.services.jobs import claim_jobs, run_jobs
+from api.views.auth import get_tokens_for_user
+
+
+class CitizenDeletionTestCase(TestCase):
+    """Test cases for deleting a citizen's account in the background"""
+
+    def setUp(self):
+        """Set up a citizen with reports and a confirmation of someone else's"""
+        cache.clear()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.other = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        self.reports = [self.create_report(self.citizen, f'Pothole {n}') for n in range(5)]
+        self.other_report = self.create_report(self.other, 'Flooding')
+        confirmations.confirm(self.citizen.id, self.other_report.id)
+        confirmations.confirm(self.other.id, self.reports[0].id)
+        ArchivedReport.objects.create(
+            id=10_000, citizen=self.citizen, status=self.pending, report_type=self.category,
+            title='Old pothole', latitude='14.599500', longitude='120.984200',
+            created_at=timezone.now(), updated_at=timezone.now(),
+        )
+
+    def create_report(self, citizen, title):
+        return Report.objects.create(
+            citizen=citizen, status=self.pending, report_type=self.category,
+            title=title, latitude='14.599500', longitude='120.984200'
+        )
+
+    def client_for(self, user_id, user_type='citizen'):
+        client = APIClient()
+        access = get_tokens_for_user(user_id, user_type, 'user@example.com')['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def run_queued_jobs(self):
+        while jobs := claim_jobs('test-worker'):
+            run_jobs(jobs)
+
+    def test_delete_deactivates_then_deletes_in_background(self):
+        """Test that DELETE deactivates the account and a job deletes its data"""
+        client = self.client_for(self.citizen.id)
+        response = client.delete(f'/api/citizens/{self.citizen.id}/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        data = response.json()['data']
+        self.assertEqual((data['state'], data['total_reports'], data['progress']), ('queued', 6, 0))
+
+        self.citizen.refresh_from_db()
+        self.assertFalse(self.citizen.is_active)
+        self.assertIsNotNone(self.citizen.deactivated_at)
+        self.assertEqual(Report.objects.filter(citizen=self.citizen).count(), 5)
+        # Deactivated citizens can no longer sign in
+        login = APIClient().post('/api/auth/login/', {'email': 'jane@example.com', 'password': 'x'}, format='json')
+        self.assertNotEqual(login.status_code, status.HTTP_200_OK)
+
+        self.run_queued_jobs()
+        self.assertFalse(Citizen.objects.filter(id=self.citizen.id).exists())
+        self.assertFalse(Report.objects.filter(id__in=[r.id for r in self.reports]).exists())
+        self.assertFalse(ArchivedReport.objects.filter(id=10_000).exists())
+        self.assertFalse(ReportConfirmation.objects.filter(citizen_id=self.citizen.id).exists())
+        self.assertFalse(ReportSearchTerm.objects.filter(report_id__in=[r.id for r in self.reports]).exists())
+        self.assertEqual(confirmations.confirmation_counts([self.other_report.id]), {self.other_report.id: 0})
+        self.assertTrue(Report.objects.filter(id=self.other_report.id).exists())
+
+        data = client.get(f'/api/citizens/{self.citizen.id}/deletion/').json()['data']
+        self.assertEqual((data['state'], data['processed_reports'], data['progress']), ('done', 6, 100))
+
+    def test_delta_sync_lists_deleted_reports(self):
+        """Test that an authority's delta sync lists the deleted reports as deleted"""
+        authority = Authority.objects.create(authority_name='Manila', email='manila@example.com', password='x')
+        client = self.client_for(authority.id, 'authority')
+        with self.settings(SYNC_SAFETY_LAG_SECONDS=0):
+            watermark = client.get('/api/reports/', {'since': '0'}).data['watermark']
+
+        citizen_deletion.request_deletion(self.citizen.id)
+        self.run_queued_jobs()
+        self.assertFalse(Citizen.objects.filter(id=self.citizen.id).exists())
+
+        response = client.get('/api/reports/', {'since': watermark})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['deleted']), sorted(r.id for r in self.reports))
+
+    def test_only_own_account(self):
+        """Test that citizens can only delete their own account"""
+        url = f'/api/citizens/{self.citizen.id}/'
+        self.assertEqual(APIClient().delete(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client_for(self.other.id).delete(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client_for(self.citizen.id, 'authority').delete(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Citizen.objects.get(id=self.citizen.id).is_active)
+        self.assertFalse(Job.objects.exists())
+
+    def test_repeated_request_queues_one_job(self):
+        """Test that asking again returns the deletion in progress"""
+        client = self.client_for(self.citizen.id)
+        client.delete(f'/api/citizens/{self.citizen.id}/')
+        response = client.delete(f'/api/citizens/{self.citizen.id}/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(Job.objects.filter(task=citizen_deletion.DELETE_TASK).count(), 1)
+
+    def test_resumes_after_interruption(self):
+        """Test that a batch failing midway is rolled back and the job resumes"""
+        deletion = citizen_deletion.request_deletion(self.citizen.id)
+        self.assertTrue(citizen_deletion.run_batch(deletion.id, batch_size=2))
+
+        original = citizen_deletion.delete_reports
+
+        def crash(ids, citizen_id):
+            original(ids, citizen_id)
+            raise RuntimeError('worker killed')
+
+        with mock.patch.object(citizen_deletion, 'delete_reports', crash):
+            with self.assertRaises(RuntimeError):
+                citizen_deletion.run_batch(deletion.id, batch_size=2)
+        deletion.refresh_from_db()
+        self.assertEqual((deletion.step, deletion.processed_reports, deletion.batches), ('reports', 2, 1))
+        self.assertEqual(Report.objects.filter(citizen=self.citizen).count(), 3)
+
+        citizen_deletion.run_deletion(deletion.id, batch_size=2)
+        deletion.refresh_from_db()
+        self.assertEqual((deletion.state, deletion.processed_reports), ('done', 6))
+        self.assertFalse(Citizen.objects.filter(id=self.citizen.id).exists())
+        # Running a finished deletion again does nothing
+        self.assertFalse(citizen_deletion.run_batch(deletion.id))
+
+    @override_settings(CITIZEN_DELETION_JOB_SECONDS=0)
+    def test_job_hands_over(self):
+        """Test that a job out of time queues another to carry on"""
+        deletion = citizen_deletion.request_deletion(self.citizen.id)
+        Job.objects.all().delete()
+        citizen_deletion.run_deletion(deletion.id, batch_size=2)
+        self.assertEqual(
+            list(Job.objects.values_list('payload', flat=True)), [{'deletion': deletion.id, 'batch_size': 2}]
+        )
+        self.run_queued_jobs()
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.state, CitizenDeletion.State.DONE)
+
+    def test_anonymize(self):
+        """Test that anonymizing keeps the reports under a placeholder account"""
+        citizen_deletion.request_deletion(self.citizen.id, mode=CitizenDeletion.Mode.ANONYMIZE)
+        self.run_queued_jobs()
+
+        placeholder = Citizen.objects.get(email=citizen_deletion.PLACEHOLDER_EMAIL)
+        self.assertFalse(placeholder.is_active)
+        self.assertFalse(Citizen.objects.filter(id=self.citizen.id).exists())
+        self.assertEqual(Report.objects.filter(citizen=placeholder).count(), 5)
+        self.assertEqual(ArchivedReport.objects.get(id=10_000).citizen_id, placeholder.id)
+        # Confirmations are the citizen's own, so they go either way
+        self.assertEqual(confirmations.confirmation_counts([self.other_report.id]), {self.other_report.id: 0})
+        self.assertEqual(confirmations.confirmation_counts([self.reports[0].id]), {self.reports[0].id: 1})
+
+
+class LargeCitizenDeletionTestCase(TestCase):
+    """Test that deleting a citizen with many reports holds locks briefly"""
+
+    REPORTS = 100_000
+    BATCH_SIZE = 1000
+
+    def test_lock_hold_per_batch(self):
+        """Test that 100k reports go in bounded batches, each a short transaction"""
+        pending = Status.objects.get_or_create(code='pending')[0]
+        category = Category.objects.get(report_type='Infrastructure')
+        citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        Report.objects.bulk_create([
+            Report(citizen=citizen, status=pending, report_type=category, title=f'Pothole {n}',
+                   latitude='14.599500', longitude='120.984200')
+            for n in range(self.REPORTS)
+        ], batch_size=5000)
+
+        deletion = citizen_deletion.request_deletion(citizen.id)
+        holds = []
+        while True:
+            started = time.perf_counter()
+            more = citizen_deletion.run_batch(deletion.id, batch_size=self.BATCH_SIZE)
+            holds.append(time.perf_counter() - started)
+            if not more:
+                break
+
+        deletion.refresh_from_db()
+        self.assertEqual(deletion.processed_reports, self.REPORTS)
+        self.assertFalse(Report.objects.exists())
+        # 100 full batches, an empty one ending the step, then one each
+        # for archived reports, confirmations and the account
+        self.assertEqual(deletion.batches, self.REPORTS // self.BATCH_SIZE + 4)
+        self.assertLess(max(holds), 1.0, f'slowest batch held its transaction for {max(holds):.3f}s')
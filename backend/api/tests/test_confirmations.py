@@ -0,0 +1,205 @@
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import (
+    ArchivedReport, Authority, Category, Citizen, Report, ReportConfirmation, ReportConfirmationShard, Status,
+)
+from api.services import confirmations
+from api.services.archive import archive_batches, months_ago
+from api.views.auth import get_tokens_for_user
+
+
+class ConfirmationMixin:
+    def set_up_report(self, citizens=2):
+        self.statuses = {code: Status.objects.get_or_create(code=code)[0] for code in ('pending', 'resolved')}
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.author = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.citizens = [
+            Citizen.objects.create(name=f'Citizen {n}', email=f'citizen{n}@example.com', password='x')
+            for n in range(citizens)
+        ]
+        self.report = self.create_report()
+
+    def create_report(self, code='pending'):
+        return Report.objects.create(
+            citizen=self.author, status=self.statuses[code], report_type=self.category,
+            title='Pothole', latitude='14.599500', longitude='120.984200'
+        )
+
+    def client_for(self, user_id, user_type='citizen'):
+        client = APIClient()
+        access = get_tokens_for_user(user_id, user_type, 'user@example.com')['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def confirm_url(self, report=None):
+        return f'/api/reports/{(report or self.report).id}/confirm/'
+
+
+class ConfirmationTestCase(ConfirmationMixin, TestCase):
+    """Test cases for "me too" confirmations of reports"""
+
+    def setUp(self):
+        """Set up a report and citizens to confirm it"""
+        cache.clear()
+        self.set_up_report(citizens=3)
+
+    def test_confirm_counts_once_per_citizen(self):
+        """Test that confirming twice records one confirmation"""
+        client = self.client_for(self.citizens[0].id)
+        response = client.post(self.confirm_url())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['data'], {'report': self.report.id, 'confirmed': True, 'confirmation_count': 1})
+
+        response = client.post(self.confirm_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['message'], 'You already confirmed this report.')
+        self.assertEqual(response.json()['data']['confirmation_count'], 1)
+
+        response = self.client_for(self.citizens[1].id).post(self.confirm_url())
+        self.assertEqual(response.json()['data']['confirmation_count'], 2)
+        self.assertEqual(ReportConfirmation.objects.filter(report=self.report).count(), 2)
+
+    def test_withdraw(self):
+        """Test that DELETE withdraws a confirmation"""
+        client = self.client_for(self.citizens[0].id)
+        client.post(self.confirm_url())
+        self.client_for(self.citizens[1].id).post(self.confirm_url())
+
+        response = client.delete(self.confirm_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data'], {'report': self.report.id, 'confirmed': False, 'confirmation_count': 1})
+        response = client.delete(self.confirm_url())
+        self.assertEqual(response.json()['message'], 'You had not confirmed this report.')
+        self.assertEqual(response.json()['data']['confirmation_count'], 1)
+
+    def test_who_can_confirm_what(self):
+        """Test that only citizens confirm, and only open reports of others"""
+        self.assertEqual(APIClient().post(self.confirm_url()).status_code, status.HTTP_401_UNAUTHORIZED)
+        authority = Authority.objects.create(authority_name='Manila', email='manila@example.com', password='x')
+        response = self.client_for(authority.id, 'authority').post(self.confirm_url())
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client_for(self.author.id).post(self.confirm_url())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['message'], 'You cannot confirm your own report.')
+
+        client = self.client_for(self.citizens[0].id)
+        resolved = self.create_report('resolved')
+        self.assertEqual(client.post(self.confirm_url(resolved)).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(client.post('/api/reports/999999/confirm/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(ReportConfirmation.objects.exists())
+
+    def test_fold(self):
+        """Test that folding moves shard counts into the report and keeps totals exact"""
+        for citizen in self.citizens:
+            confirmations.confirm(citizen.id, self.report.id)
+        confirmations.withdraw(self.citizens[0].id, self.report.id)
+        self.assertTrue(ReportConfirmationShard.objects.exists())
+        self.assertEqual(Report.objects.get(id=self.report.id).confirmation_count, 0)
+        self.assertEqual(confirmations.confirmation_counts([self.report.id]), {self.report.id: 2})
+
+        updated_at = Report.objects.get(id=self.report.id).updated_at
+        self.assertGreater(confirmations.fold(batch_size=1), 0)
+        report = Report.objects.get(id=self.report.id)
+        self.assertEqual(report.confirmation_count, 2)
+        # A new count is not a change for delta sync
+        self.assertEqual(report.updated_at, updated_at)
+        self.assertFalse(ReportConfirmationShard.objects.exists())
+        self.assertEqual(confirmations.confirmation_counts([self.report.id]), {self.report.id: 2})
+
+        # Listings show the folded count
+        response = self.client_for(self.author.id).get('/api/reports/')
+        self.assertEqual(response.json()['results'][0]['confirmation_count'], 2)
+
+        confirmations.withdraw(self.citizens[1].id, self.report.id)
+        self.assertEqual(confirmations.fold(), 1)
+        self.assertEqual(Report.objects.get(id=self.report.id).confirmation_count, 1)
+
+    def test_fold_when_due_runs_on_one_worker(self):
+        """Test that the maintenance hook folds once per CONFIRMATION_FOLD_INTERVAL"""
+        confirmations.confirm(self.citizens[0].id, self.report.id)
+        self.assertEqual(confirmations.fold_when_due(), 1)
+        confirmations.confirm(self.citizens[1].id, self.report.id)
+        self.assertIsNone(confirmations.fold_when_due())
+        self.assertEqual(Report.objects.get(id=self.report.id).confirmation_count, 1)
+
+    def test_archive_keeps_count(self):
+        """Test that archiving a report keeps its count, folded or not"""
+        for citizen in self.citizens[:2]:
+            confirmations.confirm(citizen.id, self.report.id)
+        confirmations.fold()
+        confirmations.confirm(self.citizens[2].id, self.report.id)
+        created_at = timezone.now() - timedelta(days=400)
+        Report.objects.filter(id=self.report.id).update(status=self.statuses['resolved'], created_at=created_at)
+
+        self.assertEqual(sum(archive_batches(months_ago(6))), 1)
+        self.assertEqual(ArchivedReport.objects.get(id=self.report.id).confirmation_count, 3)
+        self.assertFalse(ReportConfirmation.objects.exists())
+        self.assertFalse(ReportConfirmationShard.objects.exists())
+
+
+class ConcurrentConfirmationTestCase(ConfirmationMixin, TransactionTestCase):
+    """Test cases for confirmations of one report arriving at the same time"""
+
+    serialized_rollback = True
+
+    def setUp(self):
+        """Set up a report and citizens to confirm it"""
+        cache.clear()
+        self.set_up_report(citizens=6)
+
+    @override_settings(CONFIRMATION_SHARDS=2)
+    def test_concurrent_confirmations_are_all_counted(self):
+        """Test that simultaneous confirmations, repeats and folds count each citizen once"""
+        responses = []
+        barrier = threading.Barrier(len(self.citizens) + 1)
+
+        def retry(request):
+            while True:
+                try:
+                    return request()
+                except OperationalError:
+                    # SQLite's shared in-memory test database turns
+                    # queries on a locked table away instead of making
+                    # them wait; the client retries, as after a timeout
+                    pass
+
+        def confirm(citizen):
+            try:
+                client = self.client_for(citizen.id)
+                barrier.wait()
+                for _ in range(2):
+                    responses.append(retry(lambda: client.post(self.confirm_url())))
+            finally:
+                connections.close_all()
+
+        def fold():
+            try:
+                barrier.wait()
+                for _ in range(3):
+                    retry(confirmations.fold)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=confirm, args=(citizen,)) for citizen in self.citizens]
+        threads.append(threading.Thread(target=fold))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # A retried request may find its confirmation already recorded
+        self.assertEqual(len(responses), 12)
+        self.assertTrue(all(r.status_code in (status.HTTP_200_OK, status.HTTP_201_CREATED) for r in responses))
+        self.assertEqual(ReportConfirmation.objects.count(), 6)
+        self.assertEqual(confirmations.confirmation_counts([self.report.id]), {self.report.id: 6})
+        confirmations.fold()
+        self.assertEqual(Report.objects.get(id=self.report.id).confirmation_count, 6)
+        self.assertFalse(ReportConfirmationShard.objects.exists())
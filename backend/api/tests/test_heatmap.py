@@ -0,0 +1,94 @@
+import io
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Report, Status, SubCategory
+from api.services import heatmap
+
+BBOX = '120.98,14.59,121.0,14.61'
+
+
+class HeatmapTestCase(TestCase):
+    """Test cases for the report heatmap endpoint"""
+
+    def setUp(self):
+        """Set up reports inside and outside BBOX"""
+        cache.clear()
+        self.client = APIClient()
+        pending = Status.objects.get_or_create(code='pending')[0]
+        self.hazard = Category.objects.get(report_type='Hazard')
+        infrastructure = Category.objects.get(report_type='Infrastructure')
+        flooding = SubCategory.objects.get(report_type=self.hazard, sub_category='FLOODING')
+        citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        # Three hazards near the north-west corner, one infrastructure
+        # report near the south-east corner, one report outside
+        for category, latitude, longitude in [
+            (self.hazard, '14.609500', '120.980500'),
+            (self.hazard, '14.609500', '120.980500'),
+            (self.hazard, '14.609000', '120.981000'),
+            (infrastructure, '14.590500', '120.999500'),
+            (infrastructure, '14.700000', '121.100000'),
+        ]:
+            Report.objects.create(
+                citizen=citizen, status=pending, report_type=category,
+                sub_category=flooding if category == self.hazard else None, title='Report', latitude=latitude, longitude=longitude,
+            )
+
+    def get_heatmap(self, **params):
+        params = {'bbox': BBOX, 'width': 20, 'height': 20, 'output': 'raw', **params}
+        return self.client.get('/api/reports/heatmap/', params)
+
+    def test_raw_counts(self):
+        """Test that reports are binned north-up and filters apply"""
+        response = self.get_heatmap()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertEqual(response['X-Heatmap-Bbox'], '120.98,14.59,121.0,14.61')
+        self.assertEqual((response['X-Heatmap-Total'], response['X-Heatmap-Peak']), ('4', '3'))
+        pixels = np.frombuffer(response.content, dtype=np.uint8).reshape(20, 20)
+        self.assertEqual(pixels[0, 0], 255)
+        self.assertGreater(pixels[19, 19], 0)
+        self.assertEqual(np.count_nonzero(pixels), 2)
+
+        response = self.get_heatmap(category=self.hazard.id)
+        self.assertEqual(response['X-Heatmap-Total'], '3')
+        self.assertEqual(np.count_nonzero(np.frombuffer(response.content, dtype=np.uint8)), 1)
+
+    def test_png_smoothed_and_cached(self):
+        """Test that PNGs are grayscale, smoothing spreads counts, and results are cached"""
+        response = self.get_heatmap(output='png', sigma=2)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        image = Image.open(io.BytesIO(response.content))
+        self.assertEqual((image.mode, image.size), ('L', (20, 20)))
+        self.assertGreater(np.count_nonzero(np.asarray(image)), 20)
+
+        Report.objects.all().delete()
+        self.assertEqual(self.get_heatmap(output='png', sigma=2).content, response.content)
+        self.assertEqual(self.get_heatmap(output='png', sigma=1)['X-Heatmap-Total'], '0')
+
+    def test_validation(self):
+        """Test that malformed boxes, sizes and formats are rejected"""
+        for params in [
+            {'bbox': '120.98,14.59,121.0'},
+            {'bbox': '121.0,14.59,120.98,14.61'},
+            {'bbox': 'a,b,c,d'},
+            {'width': 5000},
+            {'height': 0},
+            {'sigma': 50},
+            {'output': 'gif'},
+        ]:
+            self.assertEqual(self.get_heatmap(**params).status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_snap_bbox_and_histogram(self):
+        """Test that boxes snap outward below a pixel and binning matches histogram2d"""
+        self.assertEqual(heatmap.snap_bbox((120.98123, 14.59987, 121.00042, 14.61), 256, 256), (120.98122, 14.59986, 121.00042, 14.61))
+
+        rng = np.random.default_rng(7)
+        lat, lon = rng.uniform(14.35, 14.80, 5000), rng.uniform(120.90, 121.15, 5000)
+        counts = heatmap.histogram(lat, lon, (120.90, 14.35, 121.15, 14.80), 40, 30)
+        expected, _, _ = np.histogram2d(lat, lon, bins=(30, 40), range=[(14.35, 14.80), (120.90, 121.15)])
+        np.testing.assert_array_equal(counts, expected[::-1])
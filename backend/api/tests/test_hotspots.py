@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Hotspot, HotspotCell, Report, Status, SubCategory
+from api.services import tiered_cache
+from api.services.hotspots import cluster_cells, detect_hotspots
+
+
+@override_settings(HOTSPOT_CELL_SIZE_METERS=200, HOTSPOT_MIN_REPORTS=3, HOTSPOT_SAFETY_LAG_SECONDS=0)
+class HotspotDetectionTestCase(TestCase):
+    """Test cases for hotspot detection and the hotspots endpoint"""
+
+    def setUp(self):
+        """Set up a citizen and the Flooding sub-category"""
+        cache.clear()
+        tiered_cache.clear_local()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.hazard = Category.objects.get(report_type='Hazard')
+        self.flooding = SubCategory.objects.get(sub_category='FLOODING')
+        self.landslide = SubCategory.objects.get(sub_category='LANDSLIDE')
+        self.citizen = Citizen.objects.create(
+            name='Jane Doe', email='jane@example.com', password='x'
+        )
+
+    def create_reports(self, count, latitude, longitude, sub_category=None):
+        for i in range(count):
+            Report.objects.create(
+                citizen=self.citizen,
+                status=self.pending,
+                report_type=self.hazard,
+                sub_category=sub_category or self.flooding,
+                title='Flooding',
+                latitude=f'{latitude + i * 0.00001:.6f}',
+                longitude=f'{longitude:.6f}',
+            )
+
+    def test_cluster_cells_joins_neighbours(self):
+        """Test that touching dense cells merge and border cells attach"""
+        cells = {(0, 0): 5, (1, 1): 4, (2, 1): 1, (10, 10): 6, (20, 20): 1}
+        clusters = sorted(sorted(c) for c in cluster_cells(cells, min_reports=3))
+        self.assertEqual(clusters, [[(0, 0), (1, 1), (2, 1)], [(10, 10)]])
+
+    def test_dense_area_becomes_hotspot(self):
+        """Test that concentrated reports form a hotspot and scattered ones do not"""
+        self.create_reports(5, 14.600100, 120.984100)
+        self.create_reports(1, 14.700100, 121.084100)
+
+        run = detect_hotspots()
+        self.assertEqual(run.reports_processed, 6)
+
+        hotspot = Hotspot.objects.get()
+        self.assertEqual(hotspot.sub_category, self.flooding)
+        self.assertEqual(hotspot.report_count, 5)
+        self.assertAlmostEqual(float(hotspot.centroid_latitude), 14.6, delta=0.01)
+        ring = hotspot.polygon['coordinates'][0]
+        self.assertEqual(ring[0], ring[-1])
+
+    def test_incremental_run_only_processes_new_reports(self):
+        """Test that a second run folds new reports into the stored cells"""
+        self.create_reports(2, 14.600100, 120.984100)
+        detect_hotspots()
+        self.assertFalse(Hotspot.objects.exists())
+
+        self.create_reports(2, 14.600100, 120.984100)
+        self.create_reports(4, 14.650100, 121.000100, sub_category=self.landslide)
+        run = detect_hotspots()
+
+        self.assertEqual(run.reports_processed, 6)
+        self.assertEqual(
+            sorted(Hotspot.objects.values_list('sub_category__sub_category', 'report_count')),
+            [('FLOODING', 4), ('LANDSLIDE', 4)]
+        )
+        self.assertEqual(
+            HotspotCell.objects.filter(sub_category=self.flooding).get().report_count, 4
+        )
+
+    def test_recent_reports_wait_for_the_next_run(self):
+        """Test that reports younger than the safety lag are folded in by a later run"""
+        self.create_reports(3, 14.600100, 120.984100)
+        with self.settings(HOTSPOT_SAFETY_LAG_SECONDS=60):
+            self.assertEqual(detect_hotspots().reports_processed, 0)
+        run = detect_hotspots()
+        self.assertEqual((run.reports_processed, run.full_rebuild), (3, False))
+        self.assertEqual(Hotspot.objects.get().report_count, 3)
+
+    def test_full_rebuild_drops_deleted_reports(self):
+        """Test that deleted reports stay counted until the periodic full rebuild"""
+        self.create_reports(3, 14.600100, 120.984100)
+        detect_hotspots()
+        Report.objects.order_by('id').first().delete()
+
+        self.assertFalse(detect_hotspots().full_rebuild)
+        self.assertEqual(Hotspot.objects.get().report_count, 3)
+        with self.settings(HOTSPOT_FULL_REBUILD_INTERVAL=0):
+            self.assertTrue(detect_hotspots().full_rebuild)
+        self.assertFalse(Hotspot.objects.exists())
+        self.assertEqual(HotspotCell.objects.get().report_count, 2)
+
+    def test_hotspots_endpoint(self):
+        """Test listing hotspots, filtered by sub-category"""
+        self.create_reports(3, 14.600100, 120.984100)
+        self.create_reports(3, 14.650100, 121.000100, sub_category=self.landslide)
+        detect_hotspots()
+
+        client = APIClient()
+        response = client.get('/api/reports/hotspots/', {'sub_category': self.landslide.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(response.data['data'][0]['sub_category_name'], 'Landslide/Soil Erosion')
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_hotspots_endpoint_validation(self):
+        """Test that a bad limit or sub-category is a client error"""
+        client = APIClient()
+        for params in [{'limit': -1}, {'limit': 0}, {'limit': 'many'}, {'sub_category': 'abc'}]:
+            response = client.get('/api/reports/hotspots/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
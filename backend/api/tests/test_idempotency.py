@@ -0,0 +1,183 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.db import OperationalError, connections
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, IdempotencyKey, MediaUpload, Report, Status
+from api.serializers import ReportSerializer
+from api.services import idempotency
+from api.views.auth import get_tokens_for_user
+
+
+class IdempotencyMixin:
+    def set_up_citizens(self):
+        Status.objects.get_or_create(code='pending')
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.jane = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.john = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+
+    def token_for(self, citizen):
+        return get_tokens_for_user(citizen.id, 'citizen', citizen.email)['access']
+
+    def client_for(self, citizen):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_for(citizen)}')
+        return client
+
+    def report_body(self, title='Pothole'):
+        return {
+            'title': title, 'report_type': self.category.id,
+            'latitude': '14.599500', 'longitude': '120.984200',
+        }
+
+    def create_report(self, client, key, body=None):
+        return client.post(
+            '/api/reports/', body or self.report_body(), format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+
+class IdempotencyKeyTestCase(IdempotencyMixin, TestCase):
+    """Test cases for Idempotency-Key on report creation"""
+
+    def setUp(self):
+        """Set up two citizens"""
+        self.set_up_citizens()
+
+    def test_retry_replays_stored_response(self):
+        """Test that a retry gets the stored response without validating or inserting"""
+        client = self.client_for(self.jane)
+        first = self.create_report(client, 'retry-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', first)
+
+        with mock.patch.object(ReportSerializer, 'is_valid', side_effect=AssertionError('validated')):
+            retry = self.create_report(client, 'retry-1')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Report.objects.count(), 1)
+
+        # Keys belong to their citizen
+        other = self.create_report(self.client_for(self.john), 'retry-1')
+        self.assertEqual(other.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(other.json()['data']['id'], first.json()['data']['id'])
+
+    def test_concurrent_duplicate_replays(self):
+        """Test that a duplicate losing the race on the unique key replays the winner's response"""
+        client = self.client_for(self.jane)
+        first = self.create_report(client, 'race')
+        # The duplicate checked for the key before the first one committed
+        with mock.patch('api.services.idempotency._stored', side_effect=[None, IdempotencyKey.objects.get()]):
+            duplicate = self.create_report(client, 'race')
+
+        self.assertEqual(duplicate.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(duplicate['Idempotent-Replayed'], 'true')
+        self.assertEqual(duplicate.json(), first.json())
+        self.assertEqual(Report.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        """Test that reusing a key with another body is rejected"""
+        client = self.client_for(self.jane)
+        self.create_report(client, 'reused')
+        response = self.create_report(client, 'reused', self.report_body('Flooding'))
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Report.objects.count(), 1)
+
+        too_long = self.create_report(client, 'k' * 256)
+        self.assertEqual(too_long.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_request_is_not_stored(self):
+        """Test that a rejected request leaves its key free for the corrected one"""
+        client = self.client_for(self.jane)
+        invalid = self.create_report(client, 'fix-me', {'title': 'Pothole'})
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        fixed = self.create_report(client, 'fix-me')
+        self.assertEqual(fixed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Report.objects.count(), 1)
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=60)
+    def test_expired_keys(self):
+        """Test that expired keys are reusable and pruned"""
+        client = self.client_for(self.jane)
+        self.create_report(client, 'old')
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+
+        response = self.create_report(client, 'old')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Report.objects.count(), 2)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual(idempotency.prune_expired(), 1)
+
+    def test_media_upload_start(self):
+        """Test that starting a photo upload is idempotent too"""
+        client = self.client_for(self.jane)
+        report_id = self.create_report(client, 'report').json()['data']['id']
+        body = {'content_type': 'image/jpeg', 'size': 1000}
+        first = client.post(f'/api/reports/{report_id}/media/', body, format='json', HTTP_IDEMPOTENCY_KEY='photo')
+        retry = client.post(f'/api/reports/{report_id}/media/', body, format='json', HTTP_IDEMPOTENCY_KEY='photo')
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(MediaUpload.objects.count(), 1)
+
+    @override_settings(ROOT_URLCONF='smartwayz_backend.urls_asgi')
+    async def test_async_create(self):
+        """Test that the ASGI profile's create replays the same way"""
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {self.token_for(self.jane)}', 'Idempotency-Key': 'async'}
+        first = await client.post('/api/reports/', self.report_body(), content_type='application/json', headers=headers)
+        retry = await client.post('/api/reports/', self.report_body(), content_type='application/json', headers=headers)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(await Report.objects.acount(), 1)
+
+
+class ParallelRetryTestCase(IdempotencyMixin, TransactionTestCase):
+    """Test cases for duplicates of a request arriving at the same time"""
+
+    serialized_rollback = True
+
+    def setUp(self):
+        """Set up two citizens"""
+        self.set_up_citizens()
+
+    def test_parallel_retries_create_one_report(self):
+        """Test that simultaneous retries create one report and all get its response"""
+        responses = []
+        barrier = threading.Barrier(6)
+
+        def retry():
+            try:
+                client = self.client_for(self.jane)
+                barrier.wait()
+                while True:
+                    try:
+                        responses.append(self.create_report(client, 'parallel'))
+                        return
+                    except OperationalError:
+                        # SQLite's shared in-memory test database turns
+                        # queries on a locked table away instead of making
+                        # them wait; the client retries, as after a timeout
+                        pass
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=retry) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([r.status_code for r in responses], [status.HTTP_201_CREATED] * 6)
+        self.assertEqual(len({r.json()['data']['id'] for r in responses}), 1)
+        self.assertEqual(Report.objects.count(), 1)
@@ -0,0 +1,189 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from api.models import Job
+from api.services import jobs
+from api.services.mail import queue_email, queue_emails
+
+calls = []
+
+
+@jobs.task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@jobs.task('tests.flaky', max_attempts=3)
+def flaky(fail_times):
+    calls.append('flaky')
+    if calls.count('flaky') <= fail_times:
+        raise RuntimeError('upstream unavailable')
+
+
+@jobs.task('tests.batch', batch=True)
+def batch(payloads):
+    calls.append(len(payloads))
+    return [None if p['ok'] else ValueError('bad payload') for p in payloads]
+
+
+@jobs.task('tests.short_batch', batch=True)
+def short_batch(payloads):
+    return [None]
+
+
+class JobQueueTestCase(TestCase):
+    """Test cases for the database-backed job queue"""
+
+    def setUp(self):
+        calls.clear()
+
+    def run_worker(self, **options):
+        return jobs.Worker(poll_interval=0, **options).run(burst=True)
+
+    def test_enqueue_and_run(self):
+        """Test that due jobs run in priority order and are marked done"""
+        jobs.enqueue('tests.record', {'value': 'low'})
+        jobs.enqueue('tests.record', {'value': 'high'}, priority=5)
+        jobs.enqueue('tests.record', {'value': 'later'}, delay=60)
+
+        self.assertEqual(self.run_worker(batch_size=1), 2)
+        self.assertEqual(calls, ['high', 'low'])
+        self.assertEqual(Job.objects.filter(state=Job.State.DONE).count(), 2)
+        later = Job.objects.get(state=Job.State.QUEUED)
+        self.assertEqual(later.payload, {'value': 'later'})
+
+        with self.assertRaises(jobs.UnknownTask):
+            jobs.enqueue('tests.missing')
+
+    def test_batch_claiming(self):
+        """Test that a claim takes at most batch_size jobs and counts the attempt"""
+        jobs.enqueue_many('tests.record', [{'value': i} for i in range(5)])
+
+        claimed = jobs.claim_jobs('worker-a', batch_size=3)
+        self.assertEqual([job.payload['value'] for job in claimed], [0, 1, 2])
+        self.assertTrue(all(job.attempts == 1 and job.state == Job.State.RUNNING for job in claimed))
+        # Claimed jobs are not handed to another worker
+        self.assertEqual(len(jobs.claim_jobs('worker-b', batch_size=10)), 2)
+        self.assertEqual(jobs.claim_jobs('worker-c'), [])
+
+    def test_queues(self):
+        """Test that workers only take jobs from their queues"""
+        jobs.enqueue('tests.record', {'value': 'default'})
+        queue_email('jane@example.com', 'Hello', 'Body')
+
+        self.assertEqual(self.run_worker(queues=['mail']), 1)
+        self.assertEqual(calls, [])
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(JOB_BACKOFF_BASE=10, JOB_BACKOFF_MAX=15)
+    def test_retry_with_backoff(self):
+        """Test that failures are retried later, then given up after max_attempts"""
+        job = jobs.enqueue('tests.flaky', {'fail_times': 5})
+        before = timezone.now()
+        with self.assertLogs('api.services.jobs', 'WARNING'):
+            self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.State.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('upstream unavailable', job.last_error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=5))
+        self.assertLessEqual(job.run_at, timezone.now() + timedelta(seconds=10))
+        # Not due yet
+        self.assertEqual(self.run_worker(), 0)
+
+        for attempt in (2, 3):
+            Job.objects.filter(id=job.id).update(run_at=timezone.now())
+            with self.assertLogs('api.services.jobs', 'WARNING'):
+                self.run_worker()
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+        self.assertEqual(job.state, Job.State.FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+        self.assertLessEqual(jobs.backoff(10), 15)
+
+    def test_batch_task_errors_are_per_job(self):
+        """Test that a batch task is called once and only its failed items retry"""
+        jobs.enqueue_many('tests.batch', [{'ok': True}, {'ok': False}, {'ok': True}])
+        with self.assertLogs('api.services.jobs', 'WARNING') as logs:
+            self.run_worker()
+        self.assertEqual(len(logs.records), 1)
+
+        self.assertEqual(calls, [3])
+        states = list(Job.objects.order_by('id').values_list('state', flat=True))
+        self.assertEqual(states, [Job.State.DONE, Job.State.QUEUED, Job.State.DONE])
+
+    def test_batch_task_with_missing_results(self):
+        """Test that a batch task returning too few results fails all its jobs"""
+        jobs.enqueue_many('tests.short_batch', [{}, {}])
+        with self.assertLogs('api.services.jobs', 'WARNING') as logs:
+            self.run_worker()
+        self.assertEqual(len(logs.records), 2)
+
+        for job in Job.objects.all():
+            self.assertEqual(job.state, Job.State.QUEUED)
+            self.assertIn('returned 1 results for 2 payloads', job.last_error)
+
+    def test_outcome_of_a_lost_job_is_not_recorded(self):
+        """Test that a worker whose job was taken back leaves it alone"""
+        jobs.enqueue('tests.record', {'value': 'slow'})
+        claimed = jobs.claim_jobs('slow-worker')
+        # Requeued as stale and claimed by another worker meanwhile
+        Job.objects.update(locked_by='other-worker')
+
+        self.assertEqual(jobs.run_jobs(claimed), 0)
+        job = Job.objects.get()
+        self.assertEqual((job.state, job.locked_by), (Job.State.RUNNING, 'other-worker'))
+
+    @override_settings(JOB_LOCK_TIMEOUT=60)
+    def test_stale_jobs_are_requeued(self):
+        """Test that jobs of a dead worker go back to the queue"""
+        job = jobs.enqueue('tests.record', {'value': 'orphan'})
+        jobs.claim_jobs('dead-worker')
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(self.run_worker(), 0)
+        self.assertEqual(self.run_worker(), 1)
+        self.assertEqual(calls, ['orphan'])
+
+    @override_settings(JOB_LOCK_TIMEOUT=60)
+    def test_stale_jobs_out_of_attempts_fail(self):
+        """Test that a job whose last attempt outlived its worker is not retried"""
+        job = jobs.enqueue('tests.flaky', {'fail_times': 0})
+        Job.objects.filter(id=job.id).update(attempts=2)
+        jobs.claim_jobs('dead-worker')
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.attempts), (Job.State.FAILED, 3))
+        self.assertEqual(calls, [])
+
+    def test_emails_share_one_connection(self):
+        """Test that a batch of emails is sent over a single backend connection"""
+        queue_emails([
+            {'to': f'citizen{i}@example.com', 'subject': f'Update {i}', 'body': 'Your report changed',
+             'html_body': '<p>Your report changed</p>'}
+            for i in range(4)
+        ])
+        with mock.patch('api.services.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            self.run_worker(batch_size=10)
+
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual([m.to for m in mail.outbox], [[f'citizen{i}@example.com'] for i in range(4)])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(Job.objects.exclude(state=Job.State.DONE).exists())
+
+    def test_run_workers_command(self):
+        """Test the run_workers command in burst mode"""
+        jobs.enqueue_many('tests.record', [{'value': i} for i in range(3)])
+        out = StringIO()
+        call_command('run_workers', '--burst', '--batch-size', '2', stdout=out)
+        self.assertIn('✓ Workers stopped after processing 3 jobs', out.getvalue())
+        self.assertEqual(sorted(calls), [0, 1, 2])
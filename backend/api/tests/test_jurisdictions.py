@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Authority, Category, Citizen, Report, Status
+from api.services.spatial import PolygonGridIndex
+from api.views.auth import get_tokens_for_user
+
+
+def square(min_lon, min_lat, size, hole=None):
+    ring = [
+        [min_lon, min_lat], [min_lon + size, min_lat], [min_lon + size, min_lat + size],
+        [min_lon, min_lat + size], [min_lon, min_lat]
+    ]
+    return {'type': 'Polygon', 'coordinates': [ring] + ([hole] if hole else [])}
+
+
+class PolygonGridIndexTestCase(TestCase):
+    """Test cases for the point-in-polygon grid index"""
+
+    def test_lookup_interior_boundary_and_outside(self):
+        """Test lookups in interior cells, near edges and outside any polygon"""
+        index = PolygonGridIndex([(1, square(120.9, 14.5, 0.1))], cell_size=0.01)
+        self.assertEqual(index.lookup(14.55, 120.95), 1)
+        self.assertEqual(index.lookup(14.5001, 120.9001), 1)
+        self.assertIsNone(index.lookup(14.65, 120.95))
+
+    def test_holes_and_overlaps(self):
+        """Test that holes are excluded and the smallest polygon wins"""
+        hole = [[120.94, 14.54], [120.96, 14.54], [120.96, 14.56], [120.94, 14.56], [120.94, 14.54]]
+        index = PolygonGridIndex(
+            [(1, square(120.9, 14.5, 0.1, hole=hole)), (2, square(120.91, 14.51, 0.02))],
+            cell_size=0.01
+        )
+        self.assertIsNone(index.lookup(14.55, 120.95))
+        self.assertEqual(index.lookup(14.52, 120.92), 2)
+        self.assertEqual(index.lookup(14.58, 120.98), 1)
+
+
+class JurisdictionRoutingTestCase(TestCase):
+    """Test cases for routing new reports to authorities"""
+
+    def setUp(self):
+        """Set up two authorities with jurisdictions loaded from GeoJSON"""
+        self.client = APIClient()
+        Status.objects.get_or_create(code='pending')
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.manila = Authority.objects.create(authority_name='Manila', email='manila@example.com', password='x')
+        self.makati = Authority.objects.create(authority_name='Makati', email='makati@example.com', password='x')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+
+        collection = {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'authority_email': 'manila@example.com'},
+             'geometry': square(120.95, 14.57, 0.05)},
+            {'type': 'Feature', 'properties': {'authority_id': self.makati.id},
+             'geometry': square(121.0, 14.53, 0.05)},
+        ]}
+        fd, self.geojson = tempfile.mkstemp(suffix='.geojson')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(collection, f)
+        call_command('load_jurisdictions', self.geojson, stdout=io.StringIO())
+
+    def tearDown(self):
+        os.unlink(self.geojson)
+
+    def authenticate(self, user_id, user_type, email):
+        tokens = get_tokens_for_user(user_id, user_type, email)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def create_report(self, latitude, longitude):
+        self.authenticate(self.citizen.id, 'citizen', self.citizen.email)
+        response = self.client.post('/api/reports/', {
+            'report_type': self.category.id,
+            'title': 'Pothole',
+            'latitude': latitude,
+            'longitude': longitude,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['data']
+
+    def test_new_reports_are_routed(self):
+        """Test that reports are assigned by location"""
+        self.assertEqual(self.create_report('14.590000', '120.970000')['assigned_authority'], self.manila.id)
+        self.assertEqual(self.create_report('14.550000', '121.020000')['assigned_authority'], self.makati.id)
+        self.assertIsNone(self.create_report('14.700000', '121.100000')['assigned_authority'])
+
+    def test_authority_listing_is_scoped(self):
+        """Test that an authority with a jurisdiction only sees its reports"""
+        mine = self.create_report('14.590000', '120.970000')
+        self.create_report('14.550000', '121.020000')
+
+        self.authenticate(self.manila.id, 'authority', self.manila.email)
+        response = self.client.get('/api/reports/')
+        self.assertEqual([r['id'] for r in response.data['results']], [mine['id']])
+
+    def test_assign_existing_reports(self):
+        """Test that --assign-existing routes reports created before loading"""
+        report = Report.objects.create(
+            citizen=self.citizen, status=Status.objects.get(code='pending'),
+            report_type=self.category, title='Old', latitude='14.550000', longitude='121.020000',
+        )
+        call_command('load_jurisdictions', self.geojson, '--assign-existing', stdout=io.StringIO())
+        report.refresh_from_db()
+        self.assertEqual(report.assigned_authority, self.makati)
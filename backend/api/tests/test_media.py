@@ -0,0 +1,181 @@
+import io
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Job, Report, ReportMedia, Status
+from api.services import jobs, media_storage
+from api.views.auth import get_tokens_for_user
+
+
+def make_jpeg_with_exif():
+    """Return the bytes of a small JPEG carrying a GPS-like EXIF tag"""
+    image = Image.new('RGB', (800, 600), color=(120, 80, 40))
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'  # Make
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+class ReportMediaTestCase(TestCase):
+    """Test cases for resumable photo uploads"""
+
+    def setUp(self):
+        """Set up a citizen, a report and an isolated media root"""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_PIPELINE_EAGER=True
+        )
+        self.settings_override.enable()
+
+        self.client = APIClient()
+        pending = Status.objects.get_or_create(code='pending')[0]
+        self.citizen = Citizen.objects.create(
+            name='Jane Doe', email='jane@example.com', password='x'
+        )
+        self.report = Report.objects.create(
+            citizen=self.citizen,
+            status=pending,
+            report_type=Category.objects.get(report_type='Infrastructure'),
+            title='Pothole',
+            latitude='14.599500',
+            longitude='120.984200',
+        )
+        tokens = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.photo = make_jpeg_with_exif()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def start_upload(self):
+        response = self.client.post(
+            f'/api/reports/{self.report.id}/media/',
+            {'content_type': 'image/jpeg', 'size': len(self.photo)},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['data']['upload_id']
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.generic(
+            'PUT',
+            f'/api/media/uploads/{upload_id}/',
+            self.photo[start:end],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(self.photo)}'
+        )
+
+    def upload_in_chunks(self, chunk_size=1024):
+        upload_id = self.start_upload()
+        response = None
+        for start in range(0, len(self.photo), chunk_size):
+            response = self.put_chunk(upload_id, start, min(start + chunk_size, len(self.photo)))
+        return response
+
+    def test_chunked_upload_creates_processed_media(self):
+        """Test that a chunked upload is stored, stripped and thumbnailed"""
+        response = self.upload_in_chunks()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['processing_status'], 'ready')
+
+        media = ReportMedia.objects.get()
+        with Image.open(media_storage.blob_path(media.sha256)) as stored:
+            self.assertEqual(len(stored.getexif()), 0)
+        with Image.open(media_storage.thumbnail_path(media.sha256)) as thumb:
+            self.assertLessEqual(max(thumb.size), 320)
+
+        thumbnail = self.client.get(response.data['data']['thumbnail_url'])
+        self.assertEqual(thumbnail.status_code, status.HTTP_200_OK)
+        self.assertIn('immutable', thumbnail['Cache-Control'])
+
+    def test_resume_after_offset_mismatch(self):
+        """Test that a chunk sent at the wrong offset reports where to resume"""
+        upload_id = self.start_upload()
+        self.put_chunk(upload_id, 0, 1000)
+
+        response = self.put_chunk(upload_id, 2000, 3000)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Upload-Offset'], '1000')
+
+        state = self.client.get(f'/api/media/uploads/{upload_id}/')
+        self.assertEqual(state.data['data']['offset'], 1000)
+
+        response = self.put_chunk(upload_id, 1000, len(self.photo))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_concurrent_chunk_is_turned_away(self):
+        """Test that a chunk arriving while another is written gets a 409"""
+        upload_id = self.start_upload()
+        with media_storage.part_lock(upload_id):
+            response = self.put_chunk(upload_id, 0, 1000)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Upload-Offset'], '0')
+
+        self.assertEqual(self.put_chunk(upload_id, 0, 1000).status_code, status.HTTP_200_OK)
+
+    def test_missing_part_file_is_not_zero_filled(self):
+        """Test that a chunk past the end of the stored part file is turned away"""
+        upload_id = self.start_upload()
+        self.put_chunk(upload_id, 0, 1000)
+        media_storage.part_path(upload_id).unlink()
+
+        response = self.put_chunk(upload_id, 1000, len(self.photo))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertFalse(ReportMedia.objects.exists())
+
+    @override_settings(MEDIA_PIPELINE_EAGER=False)
+    def test_processing_is_a_background_job(self):
+        """Test that a finished upload queues its processing and frees its lock on commit"""
+        upload_id = self.start_upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.put_chunk(upload_id, 0, len(self.photo))
+        self.assertEqual(response.data['data']['processing_status'], 'pending')
+        self.assertFalse(media_storage.part_path(upload_id).with_suffix('.lock').exists())
+        self.assertEqual(Job.objects.get().task, 'media.process')
+
+        jobs.Worker(queues=['media'], poll_interval=0).run(burst=True)
+        self.assertEqual(ReportMedia.objects.get().processing_status, ReportMedia.ProcessingStatus.READY)
+
+    def test_content_length_is_validated(self):
+        """Test that a missing or malformed Content-Length is a client error"""
+        upload_id = self.start_upload()
+        url = f'/api/media/uploads/{upload_id}/'
+        response = self.client.generic('PUT', url, b'', content_type='application/octet-stream')
+        self.assertEqual(response.status_code, status.HTTP_411_LENGTH_REQUIRED)
+        response = self.client.generic(
+            'PUT', url, self.photo, content_type='application/octet-stream', CONTENT_LENGTH='many'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_identical_uploads_are_deduplicated(self):
+        """Test that the same photo uploaded twice is stored once"""
+        self.upload_in_chunks()
+        self.upload_in_chunks()
+
+        self.assertEqual(ReportMedia.objects.count(), 2)
+        self.assertEqual(ReportMedia.objects.values('sha256').distinct().count(), 1)
+
+    def test_report_list_includes_thumbnail_urls(self):
+        """Test that reports expose their photos' thumbnail URLs"""
+        self.upload_in_chunks()
+        response = self.client.get('/api/reports/')
+        media = response.data['results'][0]['media']
+        self.assertEqual(len(media), 1)
+        self.assertTrue(media[0]['thumbnail_url'].endswith('/thumbnail/'))
+
+    def test_rejects_unsupported_content_type(self):
+        """Test that only image uploads are accepted"""
+        response = self.client.post(
+            f'/api/reports/{self.report.id}/media/',
+            {'content_type': 'application/pdf', 'size': 100},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
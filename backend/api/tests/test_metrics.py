@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.middleware import QueryRecorder, RequestMetricsMiddleware
+from api.models import Category, Citizen, Report, Status
+from api.services import metrics
+from api.views.auth import get_tokens_for_user
+
+
+class RequestMetricsTestCase(TestCase):
+    """Test cases for the request instrumentation middleware"""
+
+    def setUp(self):
+        """Set up a citizen with a few reports"""
+        self.client = APIClient()
+        metrics.reset_metrics()
+        self.status = Status.objects.get_or_create(code='pending')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.sub_category = self.category.subcategories.first()
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        tokens = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        self.create_reports(3)
+
+    def create_reports(self, count):
+        for i in range(count):
+            Report.objects.create(
+                citizen=self.citizen, report_type=self.category, sub_category=self.sub_category,
+                status=self.status, title=f'Pothole {i}', description='Deep pothole',
+                latitude='14.599500', longitude='120.984200'
+            )
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    def test_sampled_request_records_queries_and_server_timing(self):
+        """Test that sampled requests report DB time, serialization and total latency"""
+        response = self.client.get('/api/reports/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('total;dur=', timing)
+        _, _, count = metrics.REQUEST_DB_QUERIES.samples(view='report-list', method='GET')
+        self.assertEqual(count, 1)
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_request_skips_query_metrics(self):
+        """Test that only latency is recorded outside the sample"""
+        response = self.client.get('/api/reports/')
+
+        self.assertNotIn('db;dur=', response['Server-Timing'])
+        self.assertIsNone(metrics.REQUEST_DB_QUERIES.samples(view='report-list', method='GET'))
+        self.assertEqual(metrics.REQUEST_DURATION.samples(view='report-list', method='GET')[2], 1)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint(self):
+        """Test the Prometheus exposition of recorded histograms"""
+        self.client.get('/api/reports/')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE smartwayz_request_duration_seconds histogram', body)
+        self.assertIn('smartwayz_request_duration_seconds_bucket{view="report-list",method="GET",le="+Inf"} 1', body)
+        self.assertIn('smartwayz_request_duration_seconds_count{view="report-list",method="GET"} 1', body)
+        self.assertNotIn('view="metrics"', body)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint_requires_token(self):
+        """Test that a configured scrape token is enforced"""
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_disabled_without_token(self):
+        """Test that /metrics is not exposed unless a scrape token is configured"""
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_workers_share_histograms(self):
+        """Test that with a shared directory, the histograms of all workers are summed"""
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            self.client.get('/api/reports/')
+            # Another worker that served the same view once
+            shutil.copy(Path(directory) / f'{os.getpid()}.json', Path(directory) / '1.json')
+            self.client.get('/api/reports/')
+
+            body = metrics.render_metrics()
+            self.assertIn('smartwayz_request_duration_seconds_count{view="report-list",method="GET"} 3', body)
+
+            # A new process with the pid of an exited worker carries on from its totals
+            metrics.reset_metrics()
+            metrics.flush(Path(directory))
+            _, _, count = metrics.REQUEST_DURATION.samples(view='report-list', method='GET')
+            self.assertEqual(count, 2)
+        metrics.reset_metrics()
+
+    def test_report_list_queries_do_not_grow_with_page(self):
+        """Test that listing reports does not issue a query per report"""
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/api/reports/')
+        self.create_reports(7)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get('/api/reports/')
+        self.assertEqual(len(few), len(many))
+
+    @override_settings(METRICS_DEBUG_SQL=True)
+    def test_debug_mode_logs_duplicate_sql(self):
+        """Test that repeated statements are logged with the issuing stack"""
+        def view(request):
+            for report in Report.objects.all():
+                report.status.code
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(view)
+        with self.assertLogs('api.middleware', level='WARNING') as logs:
+            middleware(RequestFactory().get('/n-plus-one/'))
+
+        self.assertIn('Duplicate SQL executed 3 times', logs.output[0])
+        self.assertIn('test_metrics.py', logs.output[0])
+
+
+class QueryRecorderTestCase(TestCase):
+    """Test cases for the query counting execute wrapper"""
+
+    def test_counts_and_groups_statements(self):
+        """Test counting queries and detecting repeated statements"""
+        Status.objects.get_or_create(code='pending')
+        recorder = QueryRecorder(capture_stacks=True)
+        with connection.execute_wrapper(recorder):
+            Status.objects.filter(code='pending').exists()
+            Status.objects.filter(code='resolved').exists()
+            Category.objects.count()
+
+        self.assertEqual(recorder.count, 3)
+        self.assertGreater(recorder.duration, 0)
+        duplicates = list(recorder.duplicates())
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0][1], 2)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from api.models import Category, Citizen, Job, Notification, Report, Status
+from api.services import jobs
+from api.services.mail import SEND_TASK
+from api.services.notifications import DIGEST_TASK
+
+
+class BouncingEmailBackend(locmem.EmailBackend):
+    """locmem backend rejecting addresses at bounce.example.com"""
+
+    def send_messages(self, messages):
+        if any(address.endswith('@bounce.example.com') for m in messages for address in m.to):
+            raise ConnectionError('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(NOTIFICATION_DIGEST_SECONDS=300)
+class StatusNotificationTestCase(TestCase):
+    """Test cases for digest emails about report status changes"""
+
+    def setUp(self):
+        """Set up two citizens with reports"""
+        self.statuses = {code: Status.objects.get_or_create(code=code)[0] for code, _ in Status.CODES}
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.jane = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.john = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        self.pothole = self.create_report(self.jane, 'Pothole')
+        self.streetlight = self.create_report(self.jane, 'Broken streetlight')
+        self.flood = self.create_report(self.john, 'Flooding')
+
+    def create_report(self, citizen, title):
+        return Report.objects.create(
+            citizen=citizen, status=self.statuses['pending'], report_type=self.category,
+            title=title, latitude='14.599500', longitude='120.984200'
+        )
+
+    def change_status(self, report, code):
+        # Load it like a view would, so only the status differs
+        report = Report.objects.get(id=report.id)
+        report.status = self.statuses[code]
+        report.save()
+
+    def send_due_digests(self):
+        """Run the due digests and the emails they queue"""
+        Job.objects.filter(task=DIGEST_TASK).update(run_at=timezone.now())
+        return jobs.Worker(poll_interval=0, batch_size=50).run(burst=True)
+
+    def test_status_change_schedules_one_digest_per_window(self):
+        """Test that changes are recorded and only the first schedules a digest"""
+        before = timezone.now()
+        self.change_status(self.pothole, 'approved')
+        self.change_status(self.pothole, 'in_progress')
+        self.change_status(self.streetlight, 'rejected')
+
+        self.assertEqual(Notification.objects.filter(citizen=self.jane).count(), 3)
+        digest = Job.objects.get(task=DIGEST_TASK)
+        self.assertEqual(digest.payload, {'citizen_id': self.jane.id})
+        self.assertGreaterEqual(digest.run_at, before + timedelta(seconds=300))
+        # Nothing is sent before the window closes
+        self.assertEqual(jobs.Worker(poll_interval=0).run(burst=True), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_saves_without_status_change_do_not_notify(self):
+        """Test that creating reports and editing other fields records nothing"""
+        report = Report.objects.get(id=self.pothole.id)
+        report.title = 'Deep pothole'
+        report.save()
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_digest_coalesces_changes(self):
+        """Test that a digest lists each report once, from first to last status"""
+        self.change_status(self.pothole, 'approved')
+        self.change_status(self.pothole, 'in_progress')
+        self.change_status(self.pothole, 'resolved')
+        self.change_status(self.streetlight, 'rejected')
+        self.send_due_digests()
+
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['jane@example.com'])
+        self.assertEqual(message.subject, 'Updates on 2 of your reports')
+        self.assertIn(f'Report #{self.pothole.id} "Pothole": Pending -> Resolved', message.body)
+        self.assertIn(f'Report #{self.streetlight.id} "Broken streetlight": Pending -> Rejected', message.body)
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+
+    def test_reverted_change_sends_nothing(self):
+        """Test that a report changed back within the window is not reported"""
+        self.change_status(self.pothole, 'approved')
+        self.change_status(self.pothole, 'pending')
+        self.send_due_digests()
+
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+
+    def test_batch_shares_one_connection(self):
+        """Test that the digests claimed together go over one connection"""
+        self.change_status(self.pothole, 'resolved')
+        self.change_status(self.flood, 'approved')
+        with mock.patch('api.services.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            self.send_due_digests()
+
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['jane@example.com', 'john@example.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Update on your report')
+
+    @override_settings(EMAIL_BACKEND='api.tests.test_notifications.BouncingEmailBackend')
+    def test_failed_digest_is_retried_alone(self):
+        """Test that a failing address has its email retried without resending the others"""
+        Citizen.objects.filter(id=self.john.id).update(email='john@bounce.example.com')
+        self.change_status(self.pothole, 'resolved')
+        self.change_status(self.flood, 'approved')
+        with self.assertLogs('api.services.jobs', 'WARNING'):
+            self.send_due_digests()
+
+        self.assertEqual([m.to for m in mail.outbox], [['jane@example.com']])
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+        retry = Job.objects.get(state=Job.State.QUEUED)
+        self.assertEqual(retry.task, SEND_TASK)
+        self.assertEqual(retry.payload['to'], ['john@bounce.example.com'])
+        self.assertEqual(retry.payload['subject'], 'Update on your report')
+        self.assertEqual(retry.attempts, 1)
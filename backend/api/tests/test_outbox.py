@@ -0,0 +1,170 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from api.models import Category, Citizen, OutboxCheckpoint, OutboxEvent, Report, Status
+from api.services import outbox, tiered_cache
+
+
+class ListSink:
+    """Sink keeping batches in memory, failing on demand"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def write(self, batch):
+        if self.fail:
+            raise OSError('sink unavailable')
+        self.batches.append(batch)
+
+    def close(self):
+        pass
+
+    def events(self):
+        return [json.loads(line) for batch in self.batches for line in batch.lines]
+
+
+class OutboxTestCase(TestCase):
+    """Test cases for the transactional outbox of report changes"""
+
+    def setUp(self):
+        """Set up a citizen and statuses"""
+        cache.clear()
+        tiered_cache.clear_local()
+        self.statuses = {code: Status.objects.get_or_create(code=code)[0] for code in ('pending', 'in_progress')}
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def create_report(self, title='Pothole'):
+        return Report.objects.create(
+            citizen=self.citizen, status=self.statuses['pending'], report_type=self.category,
+            title=title, latitude='14.599500', longitude='120.984200'
+        )
+
+    def test_creation_and_status_change_recorded(self):
+        """Test that creations and status changes are recorded, other edits not"""
+        report = self.create_report()
+        report.title = 'Big pothole'
+        report.save()
+        report.status = self.statuses['in_progress']
+        report.save()
+
+        events = list(OutboxEvent.objects.values_list('event_type', 'report_id', 'payload'))
+        self.assertEqual([e[:2] for e in events], [
+            ('report.created', report.id), ('report.status_changed', report.id),
+        ])
+        self.assertEqual(events[0][2]['status'], 'pending')
+        self.assertEqual(events[0][2]['latitude'], 14.5995)
+        self.assertNotIn('title', events[0][2])
+        self.assertEqual(
+            (events[1][2]['old_status'], events[1][2]['status']), ('pending', 'in_progress')
+        )
+
+    def test_rolled_back_save_leaves_no_event(self):
+        """Test that the event is written in the report's transaction"""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.create_report()
+                raise RuntimeError('request failed')
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_stream_to_ndjson_files(self):
+        """Test that batches become NDJSON files and the checkpoint follows"""
+        reports = [self.create_report(f'Pothole {n}') for n in range(5)]
+        call_command('stream_outbox', '--once', '--batch-size', '2', '--output', self.directory.name, stdout=StringIO())
+
+        files = sorted(Path(self.directory.name).glob('*.ndjson'))
+        self.assertEqual(len(files), 3)
+        lines = [json.loads(line) for path in files for line in path.read_text().splitlines()]
+        self.assertEqual([line['report_id'] for line in lines], [r.id for r in reports])
+        self.assertEqual([line['offset'] for line in lines], list(OutboxEvent.objects.values_list('id', flat=True)))
+        self.assertEqual(lines[0]['payload']['id'], reports[0].id)
+
+        checkpoint = OutboxCheckpoint.objects.get(consumer='default')
+        self.assertEqual((checkpoint.offset, checkpoint.delivered), (lines[-1]['offset'], 5))
+        self.assertEqual(outbox.stream_batch('default', ListSink()), (0, 0))
+
+    def test_failed_delivery_is_retried(self):
+        """Test that the checkpoint only moves once the sink took the batch"""
+        self.create_report()
+        with self.assertRaises(OSError):
+            outbox.stream_batch('warehouse', ListSink(fail=True))
+        self.assertFalse(OutboxCheckpoint.objects.filter(consumer='warehouse', offset__gt=0).exists())
+
+        sink = ListSink()
+        self.assertEqual(outbox.stream_batch('warehouse', sink), (1, 1))
+        self.assertEqual(sink.events()[0]['type'], 'report.created')
+        # Consumers have their own checkpoints
+        self.assertEqual(outbox.stream_batch('other', ListSink()), (1, 1))
+
+    def test_compaction(self):
+        """Test that compaction keeps the last event of each report in a batch"""
+        first, second = self.create_report(), self.create_report()
+        first.status = self.statuses['in_progress']
+        first.save()
+
+        sink = ListSink()
+        self.assertEqual(outbox.stream_batch('warehouse', sink, compact_batch=True), (3, 2))
+        self.assertEqual(
+            [(e['report_id'], e['type']) for e in sink.events()],
+            [(second.id, 'report.created'), (first.id, 'report.status_changed')]
+        )
+
+    def test_waits_for_missing_offsets(self):
+        """Test that a batch stops at a recent gap but skips an old one"""
+        now = timezone.now()
+        rows = [(11, 't', 1, now - timedelta(hours=1), '{}'), (13, 't', 1, now, '{}'), (14, 't', 1, now, '{}')]
+        self.assertEqual(outbox.committed_prefix(rows, 10, now), (rows[:1], []))
+        with override_settings(OUTBOX_GAP_SECONDS=0):
+            self.assertEqual(outbox.committed_prefix(rows, 10, now + timedelta(seconds=1)), (rows, [12]))
+        # A gap before the first event too
+        self.assertEqual(outbox.committed_prefix(rows[1:], 11, now), ([], []))
+
+    def test_skipped_offset_delivered_when_it_commits(self):
+        """Test that an event committing after the stream skipped its offset is still delivered"""
+        first = self.create_report()
+        event = OutboxEvent.objects.get()
+        # A transaction holding the next offset has not committed yet
+        OutboxEvent.objects.create(
+            id=event.id + 2, event_type=event.event_type, report_id=first.id, payload=event.payload,
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        sink = ListSink()
+        self.assertEqual(outbox.stream_batch('warehouse', sink), (2, 2))
+        self.assertEqual(OutboxCheckpoint.objects.get().pending.keys(), {str(event.id + 1)})
+
+        OutboxEvent.objects.create(id=event.id + 1, event_type=event.event_type, report_id=first.id, payload={})
+        self.assertEqual(outbox.stream_batch('warehouse', sink), (1, 1))
+        self.assertEqual(sink.batches[-1].first_offset, event.id + 1)
+        checkpoint = OutboxCheckpoint.objects.get()
+        self.assertEqual((checkpoint.offset, checkpoint.pending), (event.id + 2, {}))
+
+    def test_skipped_offset_given_up(self):
+        """Test that an offset still missing after OUTBOX_GAP_RECHECK_SECONDS is forgotten"""
+        OutboxCheckpoint.objects.create(consumer='warehouse', offset=10, pending={'7': 0.0})
+        self.assertEqual(outbox.stream_batch('warehouse', ListSink()), (0, 0))
+        self.assertEqual(OutboxCheckpoint.objects.get().pending, {})
+
+    @override_settings(OUTBOX_RETENTION_SECONDS=3600)
+    def test_prune(self):
+        """Test that only old events every consumer received are pruned"""
+        for n in range(4):
+            self.create_report(f'Pothole {n}')
+        ids = list(OutboxEvent.objects.values_list('id', flat=True))
+        OutboxEvent.objects.filter(id__in=ids[:3]).update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(outbox.prune(), 0)
+
+        OutboxCheckpoint.objects.create(consumer='warehouse', offset=ids[-1])
+        OutboxCheckpoint.objects.create(consumer='audit', offset=ids[1])
+        self.assertEqual(outbox.prune(), 2)
+        self.assertEqual(list(OutboxEvent.objects.values_list('id', flat=True)), ids[2:])
@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.db_routers import ReplicaRouter, replica_reads
+from api.models import Category, Citizen, Report, Status
+from api.services import tiered_cache
+from api.views.auth import get_tokens_for_user
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """
+    Test cases for read-replica routing.
+
+    'replica' is a second connection to the test database (a test mirror
+    of default), so the tests can tell which alias served each query.
+    """
+
+    databases = {'default', 'replica'}
+    serialized_rollback = True
+
+    def setUp(self):
+        """Set up two citizens, one with a report"""
+        cache.clear()
+        tiered_cache.clear_local()
+        self.status = Status.objects.get_or_create(code='pending')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.sub_category = self.category.subcategories.first()
+        self.jane = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.john = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+        Report.objects.create(
+            citizen=self.jane, report_type=self.category, sub_category=self.sub_category,
+            status=self.status, title='Pothole', description='Deep pothole',
+            latitude='14.599500', longitude='120.984200'
+        )
+
+    def client_for(self, citizen):
+        client = APIClient()
+        token = get_tokens_for_user(citizen.id, 'citizen', citizen.email)['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def replica_queries(self, func):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = func()
+        self.assertLess(response.status_code, 400)
+        return len(queries)
+
+    def test_router(self):
+        """Test that only reads inside replica_reads() use a replica"""
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Report), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Report), 'replica')
+            self.assertEqual(router.db_for_write(Report), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'api'))
+        self.assertIsNone(router.allow_migrate('default', 'api'))
+
+    def test_read_only_actions_use_replica(self):
+        """Test that list, retrieve, stats and categories read from the replica"""
+        client = self.client_for(self.jane)
+        report = Report.objects.get()
+        self.assertGreater(self.replica_queries(lambda: client.get('/api/reports/')), 0)
+        self.assertGreater(self.replica_queries(lambda: client.get(f'/api/reports/{report.id}/')), 0)
+        self.assertGreater(self.replica_queries(lambda: client.get('/api/reports/stats/')), 0)
+        self.assertGreater(self.replica_queries(lambda: client.get('/api/categories/')), 0)
+        self.assertGreater(self.replica_queries(lambda: client.get('/api/subcategories/')), 0)
+
+    def test_writes_and_delta_sync_use_primary(self):
+        """Test that creating reports and delta sync never touch the replica"""
+        client = self.client_for(self.john)
+        self.assertEqual(self.replica_queries(lambda: client.get('/api/reports/?since=0')), 0)
+        self.assertEqual(self.replica_queries(lambda: client.post('/api/reports/', {
+            'report_type': self.category.id, 'sub_category': self.sub_category.id,
+            'title': 'Broken streetlight', 'description': 'Dark corner',
+            'latitude': '14.599500', 'longitude': '120.984200',
+        }, format='json')), 0)
+
+    def test_read_your_writes_after_create(self):
+        """Test that a citizen's reads stick to the primary after they create a report"""
+        john = self.client_for(self.john)
+        response = john.post('/api/reports/', {
+            'report_type': self.category.id, 'sub_category': self.sub_category.id,
+            'title': 'Broken streetlight', 'description': 'Dark corner',
+            'latitude': '14.599500', 'longitude': '120.984200',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.replica_queries(lambda: john.get('/api/reports/')), 0)
+        self.assertEqual(john.get('/api/reports/').json()['count'], 1)
+        # Other citizens are unaffected
+        jane = self.client_for(self.jane)
+        self.assertGreater(self.replica_queries(lambda: jane.get('/api/reports/')), 0)
+
+        cache.clear()  # stickiness expired
+        self.assertGreater(self.replica_queries(lambda: john.get('/api/reports/')), 0)
+
+    @override_settings(ROOT_URLCONF='smartwayz_backend.urls_asgi')
+    def test_async_views_route_the_same_way(self):
+        """Test replica reads and stickiness in the ASGI profile's report endpoint"""
+        john = self.client_for(self.john)
+        self.assertGreater(self.replica_queries(lambda: john.get('/api/reports/')), 0)
+        response = john.post('/api/reports/', {
+            'report_type': self.category.id, 'sub_category': self.sub_category.id,
+            'title': 'Broken streetlight', 'description': 'Dark corner',
+            'latitude': '14.599500', 'longitude': '120.984200',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.replica_queries(lambda: john.get('/api/reports/')), 0)
@@ -0,0 +1,96 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Report, Status
+from api.views.auth import get_tokens_for_user
+
+
+class ReportDeltaSyncTestCase(TestCase):
+    """Test cases for the ?since= delta sync mode of the reports list"""
+
+    def setUp(self):
+        """Set up a citizen with a couple of reports"""
+        self.client = APIClient()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.citizen = Citizen.objects.create(
+            name='Jane Doe', email='jane@example.com', password='x'
+        )
+        self.other = Citizen.objects.create(
+            name='John Doe', email='john@example.com', password='x'
+        )
+        tokens = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def create_report(self, citizen=None, title='Pothole'):
+        return Report.objects.create(
+            citizen=citizen or self.citizen,
+            status=self.pending,
+            report_type=self.category,
+            title=title,
+            latitude='14.599500',
+            longitude='120.984200',
+        )
+
+    def sync(self, watermark):
+        response = self.client.get('/api/reports/', {'since': watermark})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync_returns_own_reports(self):
+        """Test that ?since=0 returns all of the citizen's reports"""
+        first = self.create_report()
+        self.create_report(citizen=self.other)
+
+        data = self.sync('0')
+        self.assertEqual([r['id'] for r in data['data']], [first.id])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_incremental_sync_returns_only_changes(self):
+        """Test that a later sync only returns changed and deleted reports"""
+        kept = self.create_report(title='Kept')
+        removed = self.create_report(title='Removed')
+        with self.settings(SYNC_SAFETY_LAG_SECONDS=0):
+            watermark = self.sync('0')['watermark']
+
+        kept.title = 'Kept (edited)'
+        kept.save()
+        removed_id = removed.id
+        removed.delete()
+        added = self.create_report(title='Added')
+        self.create_report(citizen=self.other, title='Not mine')
+
+        data = self.sync(watermark)
+        self.assertEqual(
+            sorted(r['id'] for r in data['data']),
+            sorted([kept.id, added.id])
+        )
+        self.assertEqual(data['deleted'], [removed_id])
+
+    def test_paging_does_not_skip_reports(self):
+        """Test that following has_more pages returns every report once"""
+        created = {self.create_report(title=f'Report {i}').id for i in range(7)}
+
+        seen = []
+        watermark = '0'
+        with self.settings(SYNC_SAFETY_LAG_SECONDS=0):
+            with self.modify_page_size(3):
+                while True:
+                    data = self.sync(watermark)
+                    seen.extend(r['id'] for r in data['data'])
+                    watermark = data['watermark']
+                    if not data['has_more']:
+                        break
+        self.assertEqual(set(seen), created)
+        self.assertEqual(len(seen), len(created))
+
+    def test_invalid_watermark(self):
+        """Test that a malformed watermark is rejected"""
+        response = self.client.get('/api/reports/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def modify_page_size(self, size):
+        from unittest import mock
+        from api.views.report import ReportViewSet
+        return mock.patch.object(ReportViewSet, 'sync_page_size', size)
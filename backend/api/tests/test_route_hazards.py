@@ -0,0 +1,160 @@
+import numpy as np
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Report, Status, SubCategory
+from api.services import route_hazards
+from api.services.corridor import PointGridIndex
+from api.services.spatial import decode_polyline, encode_polyline
+from api.views.auth import get_tokens_for_user
+
+# A route due east along latitude 14.6, about 2.15 km long
+ROUTE = [(14.6, 120.98), (14.6, 121.0)]
+
+
+@override_settings(ROUTE_INDEX_REFRESH=0)
+class RouteHazardsTestCase(TestCase):
+    """Test cases for hazards along a route"""
+
+    def setUp(self):
+        """Set up a citizen, hazards around ROUTE and a signed-in client"""
+        route_hazards.reset_index()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.resolved = Status.objects.get_or_create(code='resolved')[0]
+        self.hazard = Category.objects.get(report_type='Hazard')
+        self.flooding = SubCategory.objects.get(report_type=self.hazard, sub_category='FLOODING')
+        self.accident = SubCategory.objects.get(report_type=self.hazard, sub_category='ROAD_ACCIDENT')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.client = APIClient()
+        token = get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        # About 33 m north of the route near its end, 22 m south near its start
+        self.east = self.create_report(self.flooding, '14.600300', '120.995000')
+        self.west = self.create_report(self.accident, '14.599800', '120.982000')
+        # 110 m off the route, past its end, closed, and not a hazard
+        self.create_report(self.flooding, '14.601000', '120.990000')
+        self.create_report(self.flooding, '14.600000', '121.005000')
+        self.create_report(self.flooding, '14.600000', '120.990000', status=self.resolved)
+        self.create_report(None, '14.600000', '120.990000', category=Category.objects.get(report_type='Infrastructure'))
+
+    def create_report(self, sub_category, latitude, longitude, status=None, category=None):
+        return Report.objects.create(
+            citizen=self.citizen, status=status or self.pending, report_type=category or self.hazard,
+            sub_category=sub_category, title='Hazard', latitude=latitude, longitude=longitude,
+        )
+
+    def along_route(self, **body):
+        body.setdefault('polyline', encode_polyline(ROUTE))
+        return self.client.post('/api/reports/along_route/', body, format='json')
+
+    def test_open_hazards_in_corridor_in_route_order(self):
+        """Test that only open hazards within half the width are returned, along the route"""
+        response = self.along_route(width=100)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual([row['id'] for row in data['data']], [self.west.id, self.east.id])
+        self.assertEqual((data['count'], data['truncated']), (2, False))
+        west = data['data'][0]
+        self.assertAlmostEqual(west['distance_meters'], 22.3, delta=0.5)
+        self.assertAlmostEqual(west['route_offset_meters'], 215.6, delta=1)
+        self.assertNotIn('citizen', west)
+
+        ids = [row['id'] for row in self.along_route(width=50, sub_categories=[self.flooding.id]).json()['data']]
+        self.assertEqual(ids, [])
+        ids = [row['id'] for row in self.along_route(width=300, sub_categories=[self.flooding.id]).json()['data']]
+        self.assertEqual(len(ids), 2)
+        self.assertIn(self.east.id, ids)
+
+    def test_index_follows_report_changes(self):
+        """Test that new, moved and closed reports apply without rebuilding the index"""
+        self.along_route()
+        base = route_hazards._index.base
+
+        near = self.create_report(self.flooding, '14.600100', '120.990000')
+        Report.objects.filter(id=self.east.id).update(status=self.resolved, updated_at=timezone.now())
+        Report.objects.filter(id=self.west.id).update(latitude='14.700000', updated_at=timezone.now())
+
+        ids = [row['id'] for row in self.along_route().json()['data']]
+        self.assertEqual(ids, [near.id])
+        self.assertIs(route_hazards._index.base, base)
+
+    @override_settings(ROUTE_MAX_RESULTS=1)
+    def test_results_are_limited(self):
+        """Test that results past the limit are cut, closest to the start kept"""
+        data = self.along_route().json()
+        self.assertEqual([row['id'] for row in data['data']], [self.west.id])
+        self.assertTrue(data['truncated'])
+
+    @override_settings(ROUTE_MAX_WIDTH_METERS=1000, ROUTE_MAX_POINTS=2)
+    def test_validation(self):
+        """Test that bad routes and widths are rejected, and a token is required"""
+        invalid = [
+            {'polyline': ''},
+            {'polyline': '_p~iF~ps|U_ulL'},
+            {'width': 5000},
+            {'width': 'wide'},
+            {'precision': 7},
+            {'polyline': encode_polyline(ROUTE * 2)},
+            {'polyline': encode_polyline([(14.6, 120.98)], precision=6)},
+        ]
+        for body in invalid:
+            self.assertEqual(self.along_route(**body).status_code, status.HTTP_400_BAD_REQUEST, body)
+
+        response = APIClient().post('/api/reports/along_route/', {'polyline': encode_polyline(ROUTE)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ROUTE_MAX_SEGMENT_METERS=2000, ROUTE_MAX_LENGTH_METERS=3000)
+    def test_route_length_limits(self):
+        """Test that routes with too long a segment, or too long in all, are rejected"""
+        halves = [ROUTE[0], (14.6, 120.99), ROUTE[1]]
+        self.assertEqual(self.along_route(polyline=encode_polyline(halves)).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.along_route().status_code, status.HTTP_400_BAD_REQUEST)
+        there_and_back = halves + [(14.6, 120.99), ROUTE[0]]
+        self.assertEqual(
+            self.along_route(polyline=encode_polyline(there_and_back)).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_polyline_round_trip(self):
+        """Test decoding Google's reference polyline and re-encoding it"""
+        points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        self.assertEqual(decode_polyline('_p~iF~ps|U_ulLnnqC_mqNvxq`@'), points)
+        self.assertEqual(encode_polyline(points), '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+
+    def test_point_grid_index_matches_brute_force(self):
+        """Test that the corridor query finds exactly the points near a route"""
+        rng = np.random.default_rng(7)
+        lat, lon = rng.uniform(14.35, 14.80, 20000), rng.uniform(120.90, 121.15, 20000)
+        index = PointGridIndex(np.arange(20000), lat, lon, cell_size=0.002)
+        route_lat = 14.5 + np.cumsum(rng.normal(0, 0.002, 300))
+        route_lon = 121.0 + np.cumsum(rng.normal(0, 0.002, 300))
+
+        keys, distances, _ = index.near_route(route_lat, route_lon, 150)
+
+        ax, ay = route_lon[:-1], route_lat[:-1]
+        kx = np.cos(np.radians((route_lat[:-1] + route_lat[1:]) / 2)) * 111_320.0
+        sx, sy = (route_lon[1:] - ax) * kx, (route_lat[1:] - ay) * 111_320.0
+        dx = (lon[:, None] - ax) * kx
+        dy = (lat[:, None] - ay) * 111_320.0
+        t = np.clip((dx * sx + dy * sy) / (sx * sx + sy * sy), 0, 1)
+        nearest = np.hypot(dx - t * sx, dy - t * sy).min(axis=1)
+
+        self.assertEqual(sorted(keys.tolist()), np.flatnonzero(nearest <= 150).tolist())
+        np.testing.assert_allclose(distances, nearest[keys], atol=1e-6)
+
+    def test_point_grid_index_long_segment(self):
+        """Test that a segment spanning many cells is split without missing points"""
+        rng = np.random.default_rng(7)
+        lat, lon = rng.uniform(14.0, 15.0, 20000), rng.uniform(120.5, 121.5, 20000)
+        index = PointGridIndex(np.arange(20000), lat, lon)
+
+        keys, distances, offsets = index.near_route([14.1, 14.9], [120.6, 121.4], 500)
+
+        kx = np.cos(np.radians(14.5)) * 111_320.0
+        sx, sy = 0.8 * kx, 0.8 * 111_320.0
+        dx, dy = (lon - 120.6) * kx, (lat - 14.1) * 111_320.0
+        t = np.clip((dx * sx + dy * sy) / (sx * sx + sy * sy), 0, 1)
+        nearest = np.hypot(dx - t * sx, dy - t * sy)
+        self.assertEqual(sorted(keys.tolist()), np.flatnonzero(nearest <= 500).tolist())
+        self.assertTrue(np.all(np.diff(offsets) >= 0))
@@ -0,0 +1,77 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Report, ReportSearchTerm, Status, SubCategory
+from api.services.search import tokenize
+
+
+class ReportSearchTestCase(TestCase):
+    """Test cases for ?q= full-text search on the reports list"""
+
+    def setUp(self):
+        """Set up reports with varied titles and descriptions"""
+        self.client = APIClient()
+        self.pending = Status.objects.get_or_create(code='pending')[0]
+        self.hazard = Category.objects.get(report_type='Hazard')
+        self.infrastructure = Category.objects.get(report_type='Infrastructure')
+        self.flooding = SubCategory.objects.get(sub_category='FLOODING')
+        self.citizen = Citizen.objects.create(
+            name='Jane Doe', email='jane@example.com', password='x'
+        )
+
+        self.in_title = self.create_report(
+            'Flooding on Rizal Avenue', 'Water up to the knees', self.hazard, self.flooding
+        )
+        self.in_description = self.create_report(
+            'Road blocked', 'Heavy flooding after the storm', self.hazard, self.flooding
+        )
+        self.unrelated = self.create_report(
+            'Broken streetlight', 'Dark corner near the school', self.infrastructure
+        )
+
+    def create_report(self, title, description, category, sub_category=None):
+        return Report.objects.create(
+            citizen=self.citizen,
+            status=self.pending,
+            report_type=category,
+            sub_category=sub_category,
+            title=title,
+            description=description,
+            latitude='14.599500',
+            longitude='120.984200',
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/reports/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [r['id'] for r in response.data['results']]
+
+    def test_tokenize_normalizes_terms(self):
+        """Test that stop words are dropped and words are stemmed"""
+        self.assertEqual(tokenize('The Flooding of roads'), ['flood', 'road'])
+
+    def test_title_matches_rank_first(self):
+        """Test that title matches outrank description matches"""
+        self.assertEqual(self.search(q='flooded'), [self.in_title.id, self.in_description.id])
+
+    def test_all_terms_must_match(self):
+        """Test that multi-word queries only return reports matching every term"""
+        self.assertEqual(self.search(q='flooding storm'), [self.in_description.id])
+
+    def test_search_combines_with_filters(self):
+        """Test that search respects the category filter"""
+        self.assertEqual(self.search(q='dark', category=self.hazard.id), [])
+        self.assertEqual(self.search(q='dark', category=self.infrastructure.id), [self.unrelated.id])
+
+    def test_index_follows_edits_and_rebuild(self):
+        """Test that the inverted index tracks edits and can be rebuilt"""
+        self.unrelated.title = 'Flickering streetlight'
+        self.unrelated.save()
+        self.assertEqual(self.search(q='flickering'), [self.unrelated.id])
+
+        ReportSearchTerm.objects.all().delete()
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(self.search(q='flickering'), [self.unrelated.id])
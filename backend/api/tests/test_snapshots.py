@@ -0,0 +1,164 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from api.models import ArchivedReport, Category, Citizen, Report, Status, SubCategory
+from api.services import snapshots
+
+JAN_3 = datetime(2025, 1, 3, 8, 30, tzinfo=dt_timezone.utc)
+JAN_4 = datetime(2025, 1, 4, 23, 59, tzinfo=dt_timezone.utc)
+
+
+class SnapshotTestCase(TestCase):
+    """Test cases for open-data snapshots of reports"""
+
+    def setUp(self):
+        """Set up reports on two days, one of them archived"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(SNAPSHOT_ROOT=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.statuses = {code: Status.objects.get_or_create(code=code)[0] for code in ('pending', 'resolved')}
+        self.hazard = Category.objects.get(report_type='Hazard')
+        self.flooding = SubCategory.objects.get(sub_category='FLOODING')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.jan_3 = [self.create_report(JAN_3, f'Flooding {n}') for n in range(3)]
+        self.jan_4 = self.create_report(JAN_4, 'Flooding on my street')
+        ArchivedReport.objects.create(
+            id=10_000, citizen=self.citizen, status=self.statuses['resolved'], report_type=self.hazard,
+            sub_category=self.flooding, title='Old flooding', latitude='14.600000', longitude='121.000000',
+            created_at=JAN_3, updated_at=JAN_3,
+        )
+
+    def create_report(self, created_at, title):
+        report = Report.objects.create(
+            citizen=self.citizen, status=self.statuses['pending'], report_type=self.hazard,
+            sub_category=self.flooding, title=title, latitude='14.599500', longitude='120.984200'
+        )
+        Report.objects.filter(id=report.id).update(created_at=created_at, updated_at=created_at)
+        return report
+
+    def read(self, name):
+        return gzip.decompress((snapshots.reports_dir() / name).read_bytes()).decode()
+
+    def test_day_partitions(self):
+        """Test that each day gets a GeoJSON and a CSV file with labelled rows"""
+        self.assertEqual(snapshots.build(), {'written': 2, 'unchanged': 0, 'removed': 0})
+
+        features = json.loads(self.read('2025-01-03.geojson.gz'))['features']
+        self.assertEqual([f['id'] for f in features], [r.id for r in self.jan_3] + [10_000])
+        self.assertEqual(features[0]['geometry'], {'type': 'Point', 'coordinates': [120.9842, 14.5995]})
+        properties = features[0]['properties']
+        self.assertEqual(
+            (properties['category'], properties['sub_category_label'], properties['status_label']),
+            ('Hazard', 'Flooding/Water Overflow', 'Pending')
+        )
+        self.assertEqual(features[-1]['properties']['status'], 'resolved')
+
+        rows = list(csv.DictReader(io.StringIO(self.read('2025-01-04.csv.gz'))))
+        self.assertEqual([int(row['id']) for row in rows], [self.jan_4.id])
+        self.assertEqual(list(rows[0]), snapshots.COLUMNS)
+        # Neither citizens nor free text
+        self.assertNotIn('Flooding on my street', self.read('2025-01-04.csv.gz'))
+
+        manifest = snapshots.read_manifest()
+        self.assertEqual({day: p['rows'] for day, p in manifest['partitions'].items()}, {
+            '2025-01-03': 4, '2025-01-04': 1,
+        })
+
+    def test_incremental(self):
+        """Test that only changed days are rewritten and emptied days removed"""
+        snapshots.build()
+        before = snapshots.read_manifest()['partitions']
+        self.assertEqual(snapshots.build(), {'written': 0, 'unchanged': 2, 'removed': 0})
+
+        report = Report.objects.get(id=self.jan_3[0].id)
+        report.status = self.statuses['resolved']
+        report.save()
+        Report.objects.filter(id=report.id).update(updated_at=JAN_4)
+        self.jan_4.delete()
+        self.assertEqual(snapshots.build(), {'written': 1, 'unchanged': 0, 'removed': 1})
+
+        after = snapshots.read_manifest()['partitions']
+        self.assertNotEqual(after['2025-01-03']['files']['csv']['sha256'], before['2025-01-03']['files']['csv']['sha256'])
+        self.assertNotIn('2025-01-04', after)
+        self.assertFalse((snapshots.reports_dir() / '2025-01-04.csv.gz').exists())
+        self.assertIn(',resolved,Resolved,', self.read('2025-01-03.csv.gz').splitlines()[1])
+
+    def test_rebuild_is_byte_identical(self):
+        """Test that the same rows give the same bytes"""
+        snapshots.build()
+        before = snapshots.read_manifest()['partitions']
+        self.assertEqual(snapshots.build(full=True)['written'], 2)
+        after = snapshots.read_manifest()['partitions']
+        for day in before:
+            for fmt in snapshots.FORMATS:
+                self.assertEqual(after[day]['files'][fmt]['sha256'], before[day]['files'][fmt]['sha256'])
+        self.assertEqual(list(Path(snapshots.reports_dir()).glob('.*.tmp')), [])
+
+    def test_command(self):
+        """Test that the command builds the requested formats"""
+        call_command('build_snapshots', '--formats', 'csv', stdout=StringIO())
+        self.assertEqual(
+            sorted(p.name for p in snapshots.reports_dir().iterdir()),
+            ['2025-01-03.csv.gz', '2025-01-04.csv.gz', 'manifest.json']
+        )
+
+    def test_index(self):
+        """Test that the index lists the files with their sizes and ETags"""
+        self.assertEqual(self.client.get('/api/open-data/reports/').status_code, status.HTTP_404_NOT_FOUND)
+        snapshots.build()
+        response = self.client.get('/api/open-data/reports/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        partitions = response.json()['data']['partitions']
+        self.assertEqual([p['day'] for p in partitions], ['2025-01-03', '2025-01-04'])
+        self.assertTrue(partitions[0]['files']['geojson']['url'].endswith('/api/open-data/reports/2025-01-03.geojson.gz'))
+
+        again = self.client.get('/api/open-data/reports/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_file_download(self):
+        """Test full downloads, conditional requests and byte ranges"""
+        snapshots.build()
+        url = '/api/open-data/reports/2025-01-03.csv.gz'
+        content = (snapshots.reports_dir() / '2025-01-03.csv.gz').read_bytes()
+        entry = snapshots.read_manifest()['partitions']['2025-01-03']['files']['csv']
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), content)
+        self.assertEqual(int(response['Content-Length']), len(content))
+        self.assertEqual((response['ETag'], response['Accept-Ranges']), (entry['etag'], 'bytes'))
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=entry['etag']).status_code, 304)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(content)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+        response = self.client.get(url, HTTP_RANGE='bytes=-5', HTTP_IF_RANGE=entry['etag'])
+        self.assertEqual(b''.join(response.streaming_content), content[-5:])
+
+        # A stale If-Range gets the whole (new) file
+        response = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(content)}')
+
+        self.assertEqual(self.client.get('/api/open-data/reports/2025-02-01.csv.gz').status_code, 404)
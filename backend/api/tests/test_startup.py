@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+BOOT = """
+import json, sys
+from smartwayz_backend.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps(sorted(sys.modules)))
+"""
+
+# Milliseconds spent importing while booting an API worker; generous for
+# slow machines (about 0.4 s on a laptop), overridable on slower CI
+IMPORT_BUDGET_MS = float(os.environ.get('STARTUP_IMPORT_BUDGET_MS', 1500))
+
+# Only needed by the admin, the ASGI profile or background work
+NOT_LOADED = [
+    'httpx',
+    'numpy',
+    'PIL',
+    'uvicorn',
+    'api.admin',
+    'django.contrib.sessions',
+    'django.contrib.staticfiles',
+]
+
+
+class StartupTestCase(SimpleTestCase):
+    """Test cases for the boot cost of the API-only profile"""
+
+    def boot(self):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'smartwayz_backend.settings_api'},
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        import_ms = 0
+        for line in result.stderr.splitlines():
+            # Top-level imports only; nested ones are in their parent's cumulative time
+            if line.startswith('import time:') and 'cumulative' not in line:
+                _, cumulative, name = line.split('|')
+                if not name[1:].startswith(' '):
+                    import_ms += int(cumulative) / 1000
+        return set(json.loads(result.stdout)), import_ms
+
+    def test_api_profile_boot(self):
+        """Test that an API worker boots within budget without optional dependencies"""
+        modules, import_ms = self.boot()
+
+        self.assertIn('api.views.report', modules)
+        self.assertEqual([name for name in NOT_LOADED if name in modules], [])
+        self.assertLess(import_ms, IMPORT_BUDGET_MS)
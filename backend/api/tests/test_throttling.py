@@ -0,0 +1,145 @@
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Category, Citizen, Status
+from api.throttling import consume
+from api.views.auth import get_tokens_for_user
+
+RATES = {
+    'report_create.citizen': '2/min',
+    'report_create.ip': '3/min',
+    'report_list.citizen': '5/min',
+    'geocode.ip': '2/min',
+    'bootstrap.ip': '2/min',
+    'open_data.ip': '1/min',
+}
+
+
+@override_settings(
+    THROTTLE_ENABLED=True,
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES},
+)
+class ThrottlingTestCase(TestCase):
+    """Test cases for the token-bucket throttles"""
+
+    def setUp(self):
+        """Set up two citizens and an empty cache"""
+        cache.clear()
+        Status.objects.get_or_create(code='pending')
+        self.category = Category.objects.get(report_type='Infrastructure')
+        self.jane = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.john = Citizen.objects.create(name='John Doe', email='john@example.com', password='x')
+
+    def client_for(self, citizen, ip='10.0.0.1'):
+        client = APIClient(REMOTE_ADDR=ip)
+        token = get_tokens_for_user(citizen.id, 'citizen', citizen.email)['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def create_report(self, client):
+        return client.post('/api/reports/', {
+            'title': 'Pothole', 'report_type': self.category.id,
+            'latitude': '14.599500', 'longitude': '120.984200',
+        }, format='json')
+
+    def test_citizen_bucket(self):
+        """Test that a citizen is throttled after a burst, with a Retry-After header"""
+        jane = self.client_for(self.jane)
+        for _ in range(2):
+            self.assertEqual(self.create_report(jane).status_code, status.HTTP_201_CREATED)
+
+        response = self.create_report(jane)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # One token comes back every 30 seconds
+        self.assertIn(response['Retry-After'], ('29', '30'))
+        # Other citizens and other endpoints have their own buckets
+        john = self.client_for(self.john, ip='10.0.0.2')
+        self.assertEqual(self.create_report(john).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(jane.get('/api/reports/').status_code, status.HTTP_200_OK)
+
+    def test_ip_bucket(self):
+        """Test that clients sharing an address share its bucket"""
+        self.assertEqual(self.create_report(self.client_for(self.jane)).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.create_report(self.client_for(self.jane)).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.create_report(self.client_for(self.john)).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.create_report(self.client_for(self.john)).status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+
+        # Anonymous geocoding is limited by address only
+        client = APIClient(REMOTE_ADDR='10.0.0.3')
+        for _ in range(2):
+            self.assertEqual(client.get('/api/geocoding/reverse/').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(client.get('/api/geocoding/reverse/').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_bootstrap_is_throttled(self):
+        """Test that the function-based bootstrap view has its own scope"""
+        client = APIClient(REMOTE_ADDR='10.0.0.4')
+        for _ in range(2):
+            self.assertEqual(client.get('/api/bootstrap/').status_code, status.HTTP_200_OK)
+        self.assertEqual(client.get('/api/bootstrap/').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_open_data_index_is_throttled(self):
+        """Test that the open-data index has its own scope"""
+        client = APIClient(REMOTE_ADDR='10.0.0.5')
+        self.assertEqual(client.get('/api/open-data/reports/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(client.get('/api/open-data/reports/').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_bucket_refills(self):
+        """Test that tokens come back at the steady rate, without banking idle time"""
+        now = time.time()
+        with mock.patch('api.throttling.time.time', side_effect=lambda: now):
+            self.assertIsNone(consume('bucket', 2, 1000))
+            self.assertIsNone(consume('bucket', 2, 1000))
+            self.assertAlmostEqual(consume('bucket', 2, 1000), 1.0, places=2)
+            now += 1
+            self.assertIsNone(consume('bucket', 2, 1000))
+            self.assertIsNotNone(consume('bucket', 2, 1000))
+            # A long pause refills the bucket, but no more than its capacity
+            now += 3600
+            self.assertIsNone(consume('bucket', 2, 1000))
+            self.assertIsNone(consume('bucket', 2, 1000))
+            self.assertIsNotNone(consume('bucket', 2, 1000))
+
+    def test_concurrent_threads(self):
+        """Test that concurrent requests never get more tokens than the bucket holds"""
+        allowed = []
+        barrier = threading.Barrier(8)
+
+        def client():
+            barrier.wait()
+            results = [consume('shared', 50, 60_000) is None for _ in range(25)]
+            allowed.append(sum(results))
+
+        threads = [threading.Thread(target=client) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(allowed), 50)
+
+    @override_settings(ROOT_URLCONF='smartwayz_backend.urls_asgi')
+    async def test_async_views(self):
+        """Test that the ASGI profile's views use the same buckets"""
+        client = AsyncClient(REMOTE_ADDR='10.0.0.4')
+        for _ in range(2):
+            response = await client.get('/api/geocoding/reverse/')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await client.get('/api/geocoding/reverse/')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(response.json()['detail'].startswith('Request was throttled.'))
+        self.assertIn('Retry-After', response.headers)
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        """Test that THROTTLE_ENABLED=False turns every bucket off"""
+        client = APIClient(REMOTE_ADDR='10.0.0.5')
+        for _ in range(5):
+            self.assertEqual(client.get('/api/geocoding/reverse/').status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,212 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import SubCategory
+from api.services import tiered_cache
+from api.services.tiered_cache import LRUCache, MISSING, Namespace
+from api.views.geocoding import respect_rate_limit
+from smartwayz_backend.settings import cache_config
+
+NAMESPACES = {
+    'geocode': {'ttl': 10, 'stale': 100, 'l1_ttl': 5},
+    'reference': {'ttl': 1000, 'stale': 100, 'l1_ttl': 5},
+}
+
+
+class Loader:
+    """Loader counting its calls"""
+
+    def __init__(self, value, delay=0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+@override_settings(CACHE_NAMESPACES=NAMESPACES)
+class TieredCacheTestCase(TestCase):
+    """
+    Test cases for the two-level cache.
+
+    The test cache (local memory) stands in for the shared L2; separate
+    Namespace instances stand in for processes, each with its own L1.
+    """
+
+    def setUp(self):
+        """Start from empty caches and a controllable clock"""
+        cache.clear()
+        tiered_cache.clear_local()
+        self.now = time.time()
+        clock = mock.patch('time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_l1_in_front_of_l2(self):
+        """Test that L1 answers without L2 and other processes share L2"""
+        first, second = Namespace('geocode'), Namespace('geocode')
+        loader = Loader({'address': 'Manila'})
+        self.assertEqual(first.get_or_set('14_121', loader), {'address': 'Manila'})
+        self.assertEqual(second.get_or_set('14_121', loader), {'address': 'Manila'})
+        self.assertEqual(loader.calls, 1)
+
+        key = first.full_key('14_121')
+        cache.delete(key)
+        self.assertEqual(first.get_or_set('14_121', loader), {'address': 'Manila'})
+        # L1 holds values for l1_ttl at most, then goes back to L2
+        self.now += 6
+        first.get_or_set('14_121', loader)
+        self.assertEqual(loader.calls, 2)
+
+    def test_lru_eviction(self):
+        """Test that L1 evicts the least recently used entries and expired ones"""
+        lru = LRUCache(2)
+        lru.set('a', 1, self.now + 10)
+        lru.set('b', 2, self.now + 10)
+        lru.get('a', self.now)
+        lru.set('c', 3, self.now + 1)
+        self.assertIs(lru.get('b', self.now), MISSING)
+        self.assertEqual(lru.get('a', self.now), 1)
+        self.assertIs(lru.get('c', self.now + 1), MISSING)
+        self.assertEqual(len(lru), 1)
+
+    def test_namespace_ttls(self):
+        """Test that each namespace has its own freshness"""
+        geocode, reference = Namespace('geocode'), Namespace('reference')
+        geocode.get_or_set('key', Loader('old address'))
+        reference.get_or_set('key', Loader('old categories'))
+
+        self.now += 11
+        tiered_cache.clear_local()
+        geocode, reference = Namespace('geocode'), Namespace('reference')
+        self.assertEqual(reference.get_or_set('key', Loader('new categories')), 'old categories')
+        self.assertEqual(geocode.get_or_set('key', Loader('new address')), 'new address')
+
+        # Past ttl + stale, L2 has dropped the value
+        self.now += 111
+        geocode = Namespace('geocode')
+        self.assertEqual(geocode.get_or_set('key', Loader('newest address')), 'newest address')
+
+    def test_stale_while_revalidate(self):
+        """Test that stale values are served while one caller refreshes them"""
+        Namespace('geocode').get_or_set('key', Loader('old'))
+        self.now += 11
+
+        refresher = Namespace('geocode')
+        cache.add(f"{refresher.full_key('key')}:lock", 1)
+        waiting = Loader('new')
+        self.assertEqual(Namespace('geocode').get_or_set('key', waiting), 'old')
+        self.assertEqual(waiting.calls, 0)
+
+        cache.delete(f"{refresher.full_key('key')}:lock")
+        self.assertEqual(refresher.get_or_set('key', Loader('new')), 'new')
+        self.assertEqual(Namespace('geocode').get_or_set('key', waiting), 'new')
+
+    def test_stale_if_error(self):
+        """Test that a failed refresh serves the stale value and uncacheable results are not stored"""
+        namespace = Namespace('geocode')
+        self.assertIsNone(namespace.get_or_set('key', Loader(None)))
+        namespace.get_or_set('key', Loader('old'))
+        self.now += 11
+
+        def failing():
+            raise ConnectionError('upstream down')
+
+        self.assertEqual(Namespace('geocode').get_or_set('key', failing), 'old')
+        with self.assertRaises(ConnectionError):
+            Namespace('geocode').get_or_set('other', failing)
+
+    def test_stampede(self):
+        """Test that concurrent misses from several processes load the value once"""
+        # Real clock: the other processes poll L2 until the loader finishes
+        mock.patch.stopall()
+        loader = Loader('value', delay=0.2)
+        results = []
+        barrier = threading.Barrier(8)
+
+        def process():
+            namespace = Namespace('geocode')
+            barrier.wait()
+            results.append(namespace.get_or_set('hot', loader))
+
+        threads = [threading.Thread(target=process) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(loader.calls, 1)
+
+    async def test_async(self):
+        """Test that the async path shares values with the sync one"""
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return 'value'
+
+        namespace = Namespace('geocode')
+        self.assertEqual(await namespace.aget_or_set('key', loader), 'value')
+        self.assertEqual(await Namespace('geocode').aget_or_set('key', loader), 'value')
+        self.assertEqual(Namespace('geocode').get_or_set('key', Loader('other')), 'value')
+        self.assertEqual(len(calls), 1)
+
+    def test_reference_data_invalidation(self):
+        """Test that category responses are cached until a category changes"""
+        client = APIClient()
+        client.get('/api/subcategories/')
+        with self.assertNumQueries(0):
+            response = client.get('/api/subcategories/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        count = response.json()['count']
+        SubCategory.objects.get(id=response.json()['results'][0]['id']).delete()
+        response = client.get('/api/subcategories/')
+        self.assertEqual(response.json()['count'], count - 1)
+
+        # Errors are not cached
+        self.assertEqual(client.get('/api/categories/0/').status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(1):
+            client.get('/api/categories/0/')
+
+    @override_settings(NOMINATIM_MIN_INTERVAL=1.0)
+    def test_nominatim_slot_shared(self):
+        """Test that Nominatim requests are spaced out through the shared cache"""
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            self.now += seconds
+
+        with mock.patch('api.views.geocoding.time.sleep', side_effect=sleep):
+            respect_rate_limit()
+            respect_rate_limit()
+            self.now += 0.4
+            respect_rate_limit()
+        self.assertEqual([round(wait, 3) for wait in waits], [1.0, 0.6])
+
+
+class CacheConfigTestCase(TestCase):
+    """Test cases for CACHE_URL parsing"""
+
+    def test_cache_urls(self):
+        """Test that each supported scheme picks its backend"""
+        self.assertEqual(
+            cache_config('redis://cache:6379/1'),
+            {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379/1'},
+        )
+        self.assertEqual(cache_config('memcached://a:11211,b:11211')['LOCATION'], ['a:11211', 'b:11211'])
+        self.assertEqual(cache_config('file:///var/tmp/cache')['LOCATION'], '/var/tmp/cache')
+        self.assertEqual(cache_config('db://cache_table')['LOCATION'], 'cache_table')
+        self.assertTrue(cache_config('locmem://')['BACKEND'].endswith('LocMemCache'))
+        with self.assertRaises(ValueError):
+            cache_config('ftp://cache')
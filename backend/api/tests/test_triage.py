@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from api.models import Authority, Category, Citizen, Report, Status, SubCategory
+from api.services import jobs, triage
+from api.views.auth import get_tokens_for_user
+
+
+class TriageTestCase(TestCase):
+    """Test cases for report priorities and the triage queue"""
+
+    def setUp(self):
+        """Set up reports of different severity, age, status and crowding"""
+        self.statuses = {code: Status.objects.get_or_create(code=code)[0] for code in ('pending', 'in_progress', 'resolved')}
+        self.hazard = Category.objects.get(report_type='Hazard')
+        self.infrastructure = Category.objects.get(report_type='Infrastructure')
+        self.citizen = Citizen.objects.create(name='Jane Doe', email='jane@example.com', password='x')
+        self.authority = Authority.objects.create(authority_name='Manila', email='manila@example.com', password='x')
+
+        self.collapse = self.create_report('STRUCTURAL_COLLAPSE', '14.600000', '120.980000')
+        self.sidewalk = self.create_report('SIDEWALKS', '14.600000', '120.990000')
+        # Three floods within 100 m of each other, one of them being handled
+        self.floods = [
+            self.create_report('FLOODING', '14.610000', '121.000000'),
+            self.create_report('FLOODING', '14.610300', '121.000300'),
+            self.create_report('FLOODING', '14.610500', '121.000000', code='in_progress'),
+        ]
+        self.resolved = self.create_report('FLOODING', '14.610000', '121.000100', code='resolved')
+        # Old reports stop gaining priority after PRIORITY_MAX_AGE_DAYS
+        Report.objects.filter(id=self.sidewalk.id).update(created_at=timezone.now() - timedelta(days=45, hours=1))
+        cache.delete(triage.RESCORE_STATE_KEY)
+
+    def create_report(self, sub_category, latitude, longitude, code='pending'):
+        sub_category = SubCategory.objects.get(sub_category=sub_category)
+        return Report.objects.create(
+            citizen=self.citizen, status=self.statuses[code], report_type=sub_category.report_type,
+            sub_category=sub_category, title='Report', latitude=latitude, longitude=longitude,
+        )
+
+    def priorities(self):
+        return dict(Report.objects.values_list('id', 'priority'))
+
+    def settle(self):
+        """Date every change back to before the last run"""
+        Report.objects.update(updated_at=F('updated_at') - timedelta(hours=1))
+
+    def test_rescore(self):
+        """Test that scores follow severity, duplicates, age and status"""
+        result = triage.rescore()
+        # The collapse already had its full score from creation
+        self.assertEqual(result, {'scored': 5, 'updated': 4, 'closed': 0})
+
+        priorities = self.priorities()
+        self.assertEqual(priorities[self.collapse.id], 100.0)
+        self.assertEqual(priorities[self.sidewalk.id], 20.0 + 2 * 30)
+        # Two duplicates each: 10 * 7 + 10 * log2(3)
+        self.assertEqual(priorities[self.floods[0].id], 86.0)
+        self.assertEqual(priorities[self.floods[2].id], 43.0)
+        self.assertEqual(priorities[self.resolved.id], 0)
+
+    def test_initial_priority(self):
+        """Test that new reports are ranked by severity and status before any rescore"""
+        priorities = self.priorities()
+        self.assertEqual(priorities[self.collapse.id], 100.0)
+        self.assertEqual(priorities[self.sidewalk.id], 20.0)
+        self.assertEqual(priorities[self.floods[0].id], 70.0)
+        self.assertEqual(priorities[self.floods[2].id], 35.0)
+        self.assertEqual(priorities[self.resolved.id], 0)
+
+    def test_rescore_writes_only_changes(self):
+        """Test that reruns only write changed scores and leave updated_at alone"""
+        triage.rescore()
+        self.settle()
+        updated_at = dict(Report.objects.values_list('id', 'updated_at'))
+        self.assertEqual(triage.rescore(), {'scored': 0, 'updated': 0, 'closed': 0})
+
+        # Only the closed flood and the floods around it are rescored
+        flood = Report.objects.get(id=self.floods[1].id)
+        flood.status = self.statuses['resolved']
+        flood.save()
+        self.assertEqual(triage.rescore(), {'scored': 2, 'updated': 2, 'closed': 1})
+
+        priorities = self.priorities()
+        self.assertEqual(priorities[flood.id], 0)
+        self.assertEqual(priorities[self.floods[0].id], 80.0)
+        unchanged = set(updated_at) - {flood.id}
+        self.assertEqual({i: updated_at[i] for i in unchanged}, {i: t for i, t in Report.objects.values_list('id', 'updated_at') if i in unchanged})
+
+    def test_rescore_ages_reports(self):
+        """Test that runs rescore the open reports a day older than at the last run"""
+        triage.rescore()
+        self.settle()
+        Report.objects.filter(id=self.collapse.id).update(created_at=timezone.now() - timedelta(days=1, minutes=1))
+        state = cache.get(triage.RESCORE_STATE_KEY)
+        cache.set(triage.RESCORE_STATE_KEY, {**state, 'at': timezone.now() - timedelta(minutes=2)})
+
+        self.assertEqual(triage.rescore(), {'scored': 1, 'updated': 1, 'closed': 0})
+        self.assertEqual(self.priorities()[self.collapse.id], 102.0)
+
+    def test_full_rescore_when_due(self):
+        """Test that a full rescore catches what runs in between miss"""
+        triage.rescore()
+        self.settle()
+        # Moves bypassing save() are not seen by the runs in between
+        Report.objects.filter(id=self.floods[0].id).update(latitude='14.700000')
+        self.assertEqual(triage.rescore()['scored'], 0)
+        with override_settings(PRIORITY_FULL_INTERVAL=0):
+            self.assertEqual(triage.rescore(), {'scored': 5, 'updated': 3, 'closed': 0})
+        self.assertEqual(self.priorities()[self.floods[0].id], 70.0)
+
+    def test_rescoring_runs_once_per_interval(self):
+        """Test that idle workers rescore once per PRIORITY_INTERVAL between them"""
+        cache.delete(triage.RESCORE_LOCK_KEY)
+        jobs.Worker(poll_interval=0).run(burst=True)
+        self.assertEqual(self.priorities()[self.collapse.id], 100.0)
+
+        Report.objects.update(priority=0)
+        jobs.Worker(poll_interval=0).run(burst=True)
+        self.assertEqual(self.priorities()[self.collapse.id], 0)
+
+    def test_triage_queue(self):
+        """Test that authorities page through open reports by priority"""
+        triage.rescore()
+        client = APIClient()
+        token = get_tokens_for_user(self.authority.id, 'authority', self.authority.email)['access']
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            response = client.get('/api/reports/triage/', params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = response.json()
+            seen += [(row['id'], row['priority']) for row in body['data']]
+            cursor = body['next_cursor']
+            if not body['has_more']:
+                break
+        # Ties are broken by newest first
+        expected = [self.collapse, self.floods[1], self.floods[0], self.sidewalk, self.floods[2]]
+        self.assertEqual([report_id for report_id, _ in seen], [report.id for report in expected])
+
+        self.assertEqual(client.get('/api/reports/triage/', {'cursor': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(APIClient().get('/api/reports/triage/').status_code, status.HTTP_401_UNAUTHORIZED)
+        citizen = APIClient()
+        citizen.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.citizen.id, 'citizen', self.citizen.email)['access']}")
+        self.assertEqual(citizen.get('/api/reports/triage/').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_count_duplicates(self):
+        """Test that duplicates are the same-group points in the 3x3 cells around each point"""
+        rng = np.random.default_rng(7)
+        groups = rng.integers(1, 4, 3000)
+        lat, lon = rng.uniform(14.5, 14.52, 3000), rng.uniform(121.0, 121.02, 3000)
+        counts = triage.count_duplicates(groups, lat, lon, 100)
+
+        size_lat = 100 / triage.METERS_PER_DEGREE
+        size_lon = size_lat / np.cos(np.radians(lat.mean()))
+        cx, cy = np.floor(lon / size_lon), np.floor(lat / size_lat)
+        near = (np.abs(cx[:, None] - cx) <= 1) & (np.abs(cy[:, None] - cy) <= 1) & (groups[:, None] == groups)
+        np.testing.assert_array_equal(counts, near.sum(axis=1) - 1)
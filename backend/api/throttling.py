@@ -0,0 +1,198 @@
+"""
+Token-bucket request throttles, per citizen and per client IP.
+
+Each throttled endpoint has a scope (``report_create``, ``report_list``,
+``report_confirm``, ``geocode``, ``bootstrap``, ``open_data``) and every scope has one bucket per citizen (from the JWT) and
+one per client IP, with rates in ``DEFAULT_THROTTLE_RATES`` under
+``<scope>.citizen`` and ``<scope>.ip``. A rate of ``N/period`` is a bucket
+of N requests refilling at N per period, so clients can burst up to N
+requests and then keep going at the steady rate.
+
+A bucket is a single integer in the cache: its theoretical arrival time
+(TAT), the time in milliseconds at which it would be full again. Taking a
+token adds one refill interval to it with an atomic ``cache.incr``, and the
+request is allowed if the new TAT is at most N intervals ahead of now. A
+client using its bucket costs one cache round-trip per check. A rejected
+request takes its token back (a second round-trip), and so does re-filling
+a bucket that was left alone for longer than an interval.
+
+Buckets need a cache whose increments are atomic and shared by all
+processes: Redis or Memcached (``CACHE_URL``). The file and database
+fallbacks are shared, but their increments can lose updates under
+contention; a local-memory cache gives each process its own buckets.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from api.views.auth import get_token_claims
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Lifetime of a bucket key. Increments do not extend it, so a client that
+# never pauses gets a fresh bucket this often.
+KEY_TIMEOUT = 3600
+
+
+def parse_rate(rate):
+    """
+    Parse a rate such as ``10/min``.
+
+    Returns:
+        tuple: (capacity, refill interval in milliseconds)
+    """
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, PERIODS[period[0]] * 1000 / capacity
+
+
+def get_bucket(scope, kind):
+    """Return the (capacity, interval) of a scope's bucket, or None when it is not throttled"""
+    if not settings.THROTTLE_ENABLED or scope is None:
+        return None
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}.{kind}')
+    return parse_rate(rate) if rate else None
+
+
+def bucket_key(scope, kind, ident):
+    return f'throttle:{scope}:{kind}:{ident}'
+
+
+def wait_ms(tat, now, capacity, interval):
+    """Milliseconds to wait before the token just taken is available, 0 if it is"""
+    return max(0, tat - now - capacity * interval)
+
+
+def consume(key, capacity, interval):
+    """
+    Take a token from a bucket.
+
+    Returns:
+        float: Seconds until a token is available if the bucket is empty,
+        else None
+    """
+    now = int(time.time() * 1000)
+    step = math.ceil(interval)
+    try:
+        tat = cache.incr(key, step)
+    except ValueError:
+        tat = None
+    if tat is None or tat < now + step:
+        # New or refilled bucket: restart it from now
+        tat = now + step
+        cache.set(key, tat, timeout=KEY_TIMEOUT)
+        return None
+    wait = wait_ms(tat, now, capacity, step)
+    if wait:
+        cache.decr(key, step)
+        return wait / 1000
+    return None
+
+
+async def aconsume(key, capacity, interval):
+    """Async version of consume"""
+    now = int(time.time() * 1000)
+    step = math.ceil(interval)
+    try:
+        tat = await cache.aincr(key, step)
+    except ValueError:
+        tat = None
+    if tat is None or tat < now + step:
+        tat = now + step
+        await cache.aset(key, tat, timeout=KEY_TIMEOUT)
+        return None
+    wait = wait_ms(tat, now, capacity, step)
+    if wait:
+        await cache.adecr(key, step)
+        return wait / 1000
+    return None
+
+
+def get_view_scope(view):
+    """
+    Return the throttle scope of a view.
+
+    ``throttle_scope`` is either a scope or, on viewsets, a dict mapping
+    actions to scopes; actions without one are not throttled.
+    """
+    scope = getattr(view, 'throttle_scope', None)
+    if isinstance(scope, dict):
+        scope = scope.get(getattr(view, 'action', None))
+    return scope
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """DRF throttle taking a token from the bucket of the client it identifies"""
+
+    # Suffix of the rate names ('<scope>.<kind>')
+    kind = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_client(self, request):
+        """Return what identifies the client, or None if this throttle does not apply"""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = get_view_scope(view)
+        bucket = get_bucket(scope, self.kind)
+        if bucket is None:
+            return True
+        ident = self.get_client(request)
+        if ident is None:
+            return True
+        self.wait_seconds = consume(bucket_key(scope, self.kind, ident), *bucket)
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class CitizenRateThrottle(TokenBucketThrottle):
+    """Bucket per citizen, for requests carrying a citizen access token"""
+
+    kind = 'citizen'
+
+    def get_client(self, request):
+        user_id, user_type = get_token_claims(request)
+        return user_id if user_type == 'citizen' and user_id else None
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """
+    Bucket per client IP. Behind a load balancer, set ``NUM_PROXIES`` so
+    the address comes from X-Forwarded-For.
+    """
+
+    kind = 'ip'
+
+    def get_client(self, request):
+        return self.get_ident(request)
+
+
+THROTTLE_CLASSES = [CitizenRateThrottle, IPRateThrottle]
+
+
+async def acheck_throttles(request, scope):
+    """
+    Take a token from each of the request's buckets for ``scope``, for the
+    async (ASGI profile) views.
+
+    Returns:
+        float: Seconds until the request would be allowed, or None if it is
+    """
+    waits = []
+    for throttle_class in THROTTLE_CLASSES:
+        throttle = throttle_class()
+        bucket = get_bucket(scope, throttle.kind)
+        ident = throttle.get_client(request) if bucket else None
+        if ident is not None:
+            wait = await aconsume(bucket_key(scope, throttle.kind, ident), *bucket)
+            if wait is not None:
+                waits.append(wait)
+    return max(waits) if waits else None
@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
 from api.views import (
     CitizenViewSet,
@@ -6,7 +6,9 @@ from api.views import (
     CategoryViewSet,
     SubCategoryViewSet,
     ReportViewSet,
-    reverse_geocode
+    reverse_geocode,
+    AlertSubscriptionViewSet,
+    bootstrap
 )
 from api.views.auth import (
     login_citizen,
@@ -14,6 +16,8 @@ from api.views.auth import (
     refresh_token,
     logout
 )
+from api.views.media import MediaUploadView, media_file
+from api.views.open_data import open_data_file, open_data_index
 
 # Create a router and register viewsets
 router = DefaultRouter()
@@ -22,6 +26,7 @@ router.register(r'authorities', AuthorityViewSet, basename='authority')
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'subcategories', SubCategoryViewSet, basename='subcategory')
 router.register(r'reports', ReportViewSet, basename='report')
+router.register(r'alerts/subscriptions', AlertSubscriptionViewSet, basename='alert-subscription')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -32,6 +37,21 @@ urlpatterns = [
     path('auth/refresh/', refresh_token, name='refresh-token'),
     path('auth/logout/', logout, name='logout'),
     
+    # Reference data and the caller's reports for app start-up
+    path('bootstrap/', bootstrap, name='bootstrap'),
+
     # Geocoding endpoint
     path('geocoding/reverse/', reverse_geocode, name='reverse-geocode'),
+
+    # Report photos
+    path('media/uploads/<uuid:upload_id>/', MediaUploadView.as_view(), name='media-upload'),
+    re_path(r'^media/(?P<sha256>[0-9a-f]{64})/$', media_file, {'variant': 'original'}, name='media-file'),
+    re_path(r'^media/(?P<sha256>[0-9a-f]{64})/thumbnail/$', media_file, {'variant': 'thumbnail'}, name='media-thumbnail'),
+
+    # Open-data snapshots of reports
+    path('open-data/reports/', open_data_index, name='open-data-index'),
+    re_path(
+        r'^open-data/reports/(?P<day>\d{4}-\d{2}-\d{2})\.(?P<fmt>geojson|csv)\.gz$',
+        open_data_file, name='open-data-file'
+    ),
 ]
@@ -1,15 +1,29 @@
-from .citizen import CitizenViewSet
-from .authority import AuthorityViewSet
-from .category import CategoryViewSet
-from .sub_category import SubCategoryViewSet
-from .report import ReportViewSet
-from .geocoding import reverse_geocode
-
-__all__ = [
-    'CitizenViewSet',
-    'AuthorityViewSet',
-    'CategoryViewSet',
-    'SubCategoryViewSet',
-    'ReportViewSet',
-    'reverse_geocode',
-]
+"""
+API views.
+
+The view modules are imported on first access, so that importing one of
+them (e.g. api.views.metrics from the root URLconf, or a management
+command) does not load all the others and their dependencies.
+"""
+from importlib import import_module
+
+_VIEWS = {
+    'CitizenViewSet': 'citizen',
+    'AuthorityViewSet': 'authority',
+    'CategoryViewSet': 'category',
+    'SubCategoryViewSet': 'sub_category',
+    'ReportViewSet': 'report',
+    'reverse_geocode': 'geocoding',
+    'AlertSubscriptionViewSet': 'alerts',
+    'bootstrap': 'bootstrap',
+}
+
+__all__ = list(_VIEWS)
+
+
+def __getattr__(name):
+    if name not in _VIEWS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{_VIEWS[name]}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,113 @@
+from rest_framework import viewsets, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from api.models import AlertSubscription
+from api.serializers import AlertSubscriptionSerializer
+from api.views.auth import get_token_claims
+
+
+class AlertSubscriptionViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for a citizen's hazard alert areas.
+
+    Provides standard CRUD endpoints, on the caller's own areas only:
+    - list: GET /api/alerts/subscriptions/
+    - create: POST /api/alerts/subscriptions/
+    - retrieve: GET /api/alerts/subscriptions/{id}/
+    - update: PUT /api/alerts/subscriptions/{id}/
+    - partial_update: PATCH /api/alerts/subscriptions/{id}/
+    - destroy: DELETE /api/alerts/subscriptions/{id}/
+
+    New hazard reports inside an area are mailed to its citizen as a
+    digest (see api/services/alerts.py).
+    """
+
+    queryset = AlertSubscription.objects.filter(is_active=True)
+    serializer_class = AlertSubscriptionSerializer
+    permission_classes = [AllowAny]  # We handle auth manually in initial()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        user_id, user_type = get_token_claims(request)
+        self.citizen_id = user_id if user_type == 'citizen' and user_id else None
+
+    def get_queryset(self):
+        return super().get_queryset().filter(citizen_id=self.citizen_id).order_by('id')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['citizen_id'] = getattr(self, 'citizen_id', None)
+        return context
+
+    def unauthenticated(self):
+        return Response(
+            {
+                'success': False,
+                'message': 'Authentication required. Please log in as a citizen.'
+            },
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.citizen_id is None:
+            return self.unauthenticated()
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.citizen_id is None:
+            return self.unauthenticated()
+        return super().retrieve(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        """Create an alert area for the authenticated citizen"""
+        if self.citizen_id is None:
+            return self.unauthenticated()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(citizen_id=self.citizen_id)
+
+        return Response(
+            {
+                'success': True,
+                'message': 'Alert area created successfully',
+                'data': serializer.data
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+    def update(self, request, *args, **kwargs):
+        """Update an alert area with custom response format"""
+        if self.citizen_id is None:
+            return self.unauthenticated()
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response({
+            'success': True,
+            'message': 'Alert area updated successfully',
+            'data': serializer.data
+        })
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Deactivate an alert area.
+
+        The row is kept so that workers' match indexes see the change
+        (see AlertSubscription).
+        """
+        if self.citizen_id is None:
+            return self.unauthenticated()
+        instance = self.get_object()
+        instance.is_active = False
+        instance.save(update_fields=['is_active', 'updated_at'])
+
+        return Response(
+            {
+                'success': True,
+                'message': 'Alert area deleted successfully'
+            },
+            status=status.HTTP_200_OK
+        )
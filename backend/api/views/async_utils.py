@@ -0,0 +1,54 @@
+"""
+Helpers shared by the async (ASGI profile) views.
+
+DRF views are synchronous, so the async endpoints are plain Django views
+that parse JSON themselves and answer with JsonResponse, keeping the same
+request and response bodies as their DRF counterparts.
+"""
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.exceptions import Throttled
+
+
+class InvalidJSON(ValueError):
+    pass
+
+
+def read_json(request):
+    """
+    Parse a JSON request body.
+
+    Returns:
+        dict: The parsed body ({} when empty)
+
+    Raises:
+        InvalidJSON: If the body is not a JSON object
+    """
+    if not request.body:
+        return {}
+    try:
+        data = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidJSON(f'JSON parse error - {e}')
+    if not isinstance(data, dict):
+        raise InvalidJSON('Expected a JSON object')
+    return data
+
+
+def json_response(request, payload, status=200):
+    """Encode ``payload`` as JSON, reporting the encoding time to the metrics middleware"""
+    start = time.perf_counter()
+    content = json.dumps(payload, cls=DjangoJSONEncoder)
+    request._metrics_render_time = time.perf_counter() - start
+    return HttpResponse(content, status=status, content_type='application/json')
+
+
+def throttled_response(request, wait):
+    """429 response with the same body and Retry-After header as DRF's"""
+    exc = Throttled(wait)
+    response = json_response(request, {'detail': exc.detail}, status=exc.status_code)
+    response['Retry-After'] = str(exc.wait)
+    return response
@@ -1,9 +1,39 @@
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from api.models import Citizen, Authority
+from api.services.passwords import acheck_password
+from api.views.async_utils import InvalidJSON, json_response, read_json
+
+
+def get_token_claims(request):
+    """
+    Decode the bearer token of a request, if any.
+
+    Args:
+        request: The incoming (Django or DRF) request
+
+    Returns:
+        tuple: (user_id, user_type), or (None, None) when the request
+        carries no valid token
+    """
+    # Note: Django stores HTTP headers in META with HTTP_ prefix and uppercase
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+
+    if auth_header.startswith('Bearer '):
+        token_string = auth_header.split(' ')[1]
+        try:
+            token = AccessToken(token_string)
+            return token.get('user_id'), token.get('user_type')
+        except (InvalidToken, TokenError):
+            pass
+
+    return None, None
 
 
 def get_tokens_for_user(user_id, user_type, email, name=None):
@@ -60,8 +90,9 @@ def login_citizen(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Find citizen by email (case-insensitive)
-        citizen = Citizen.objects.get(email=email.lower())
+        # Find citizen by email (case-insensitive); deleted accounts are
+        # deactivated while their data is being removed
+        citizen = Citizen.objects.get(email=email.lower(), is_active=True)
         
         # Check password
         if not citizen.check_password(password):
@@ -99,6 +130,66 @@ def login_citizen(request):
         }, status=status.HTTP_401_UNAUTHORIZED)
 
 
+@csrf_exempt
+@require_POST
+async def alogin_citizen(request):
+    """
+    Async login endpoint for citizens (ASGI profile).
+
+    POST /api/auth/login/citizen/
+    Same request and response as login_citizen; the password check runs
+    in the hashing thread pool instead of blocking the worker.
+    """
+    try:
+        data = read_json(request)
+    except InvalidJSON as e:
+        return json_response(request, {'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    email = data.get('email')
+    password = data.get('password')
+
+    if not email or not password:
+        return json_response(request, {
+            'success': False,
+            'message': 'Email and password are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        citizen = await Citizen.objects.aget(email=email.lower(), is_active=True)
+    except Citizen.DoesNotExist:
+        return json_response(request, {
+            'success': False,
+            'message': 'Invalid email or password'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    if not await acheck_password(citizen, password):
+        return json_response(request, {
+            'success': False,
+            'message': 'Invalid email or password'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    tokens = get_tokens_for_user(
+        user_id=citizen.id,
+        user_type='citizen',
+        email=citizen.email,
+        name=citizen.name
+    )
+
+    return json_response(request, {
+        'success': True,
+        'message': 'Login successful',
+        'data': {
+            'user': {
+                'id': citizen.id,
+                'name': citizen.name,
+                'email': citizen.email,
+                'user_type': 'citizen'
+            },
+            'tokens': tokens
+        }
+    })
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_authority(request):
@@ -183,6 +274,8 @@ def refresh_token(request):
         user_type = refresh.get('user_type')
         email = refresh.get('email')
         name = refresh.get('name')
+        if user_type == 'citizen' and not Citizen.objects.filter(id=user_id, is_active=True).exists():
+            raise TokenError('Account deleted')
 
         # Create a new access token with the same custom claims
         access = AccessToken()
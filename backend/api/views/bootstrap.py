@@ -0,0 +1,81 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api.db_routers import is_sticky, replica_reads
+from api.models import Report
+from api.serializers import ReportSerializer
+from api.services.reference_data import get_reference_data, matches
+from api.throttling import THROTTLE_CLASSES
+from api.views.auth import get_token_claims
+from api.views.report import visible_reports
+
+
+def first_report_page(request, user_id, user_type):
+    """The caller's reports as GET /api/reports/ would return them, first page only"""
+    queryset = visible_reports(
+        Report.objects.select_related(
+            'report_type', 'citizen', 'sub_category', 'status', 'assigned_authority'
+        ).prefetch_related('media').order_by('-created_at'),
+        user_id, user_type
+    )
+    page_size = api_settings.PAGE_SIZE
+    with replica_reads(not is_sticky(user_type, user_id)):
+        count = queryset.count()
+        reports = list(queryset[:page_size])
+    return {
+        'count': count,
+        'next': request.build_absolute_uri(f"{reverse('report-list')}?page=2") if count > page_size else None,
+        'previous': None,
+        'results': ReportSerializer(reports, many=True, context={'request': request}).data,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes(THROTTLE_CLASSES)
+def bootstrap(request):
+    """
+    Everything the app loads at start-up, in one request.
+
+    GET /api/bootstrap/
+    Headers: If-None-Match: "<reference_version>" (optional)
+
+    Returns the reference data (categories, subcategories, their
+    CATEGORY_MAPPING grouping and statuses) and, for a signed-in caller,
+    the first page of their reports. The reference data is left out
+    (``reference: null``) when If-None-Match (or ?reference_version=)
+    names its current version; anonymous callers then get 304 Not Modified.
+    """
+    reference = get_reference_data()
+    known = request.headers.get('If-None-Match') or request.query_params.get('reference_version')
+    unchanged = matches(reference, known)
+    user_id, user_type = get_token_claims(request)
+
+    headers = {'ETag': reference.etag, 'Vary': 'Authorization'}
+    if not user_id:
+        if unchanged:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        headers['Cache-Control'] = 'no-cache'
+        reports = None
+    else:
+        # Not stored, so browsers never revalidate it on their own: a
+        # response without the reference data is only for clients that
+        # kept theirs
+        headers['Cache-Control'] = 'private, no-store'
+        reports = first_report_page(request, user_id, user_type)
+
+    return Response({
+        'success': True,
+        'data': {
+            'reference_version': reference.version,
+            'reference': None if unchanged else reference.data,
+            'reports': reports,
+        }
+    }, headers=headers)
+
+
+bootstrap.cls.throttle_scope = 'bootstrap'
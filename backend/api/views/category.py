@@ -4,14 +4,16 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from api.models import Category
 from api.serializers import CategorySerializer, SubCategorySerializer
+from api.views.mixins import CachedReadMixin, ReplicaReadMixin
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedReadMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for Category operations (Read-only).
     
     Categories are predefined and seeded via migrations.
-    Public endpoint - no authentication required.
+    Public endpoint - no authentication required. Responses are cached
+    as reference data.
     
     Endpoints:
     - list: GET /api/categories/
@@ -22,6 +24,7 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]  # Allow unauthenticated access
+    replica_actions = ('list', 'retrieve', 'subcategories')
     
     @action(detail=True, methods=['get'])
     def subcategories(self, request, pk=None):
@@ -30,11 +33,14 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
         
         Usage: GET /api/categories/{id}/subcategories/
         """
-        category = self.get_object()
-        subcategories = category.subcategories.all()
-        serializer = SubCategorySerializer(subcategories, many=True)
-        
-        return Response({
-            'category': CategorySerializer(category).data,
-            'subcategories': serializer.data
-        })
+        def load():
+            category = self.get_object()
+            subcategories = category.subcategories.all()
+            serializer = SubCategorySerializer(subcategories, many=True)
+
+            return Response({
+                'category': CategorySerializer(category).data,
+                'subcategories': serializer.data
+            })
+
+        return self.cached_response(request, load)
@@ -2,8 +2,10 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from api.models import Citizen
-from api.serializers import CitizenSerializer
+from api.models import Citizen, CitizenDeletion
+from api.serializers import CitizenDeletionSerializer, CitizenSerializer
+from api.services.citizen_deletion import request_deletion
+from api.views.auth import get_token_claims
 
 
 class CitizenViewSet(viewsets.ModelViewSet):
@@ -17,6 +19,7 @@ class CitizenViewSet(viewsets.ModelViewSet):
     - update: PUT /api/citizens/{id}/
     - partial_update: PATCH /api/citizens/{id}/
     - destroy: DELETE /api/citizens/{id}/
+    - deletion: GET /api/citizens/{id}/deletion/
     """
     
     queryset = Citizen.objects.all()
@@ -25,9 +28,10 @@ class CitizenViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         """
         Allow anyone to create (register) a citizen.
+        Account deletion checks the citizen's own token itself.
         Require authentication for other operations.
         """
-        if self.action in ['create', 'options']:
+        if self.action in ['create', 'options', 'destroy', 'deletion']:
             return [AllowAny()]
         return [IsAuthenticated()]
     
@@ -75,19 +79,66 @@ class CitizenViewSet(viewsets.ModelViewSet):
             'data': serializer.data
         })
     
-    def destroy(self, request, *args, **kwargs):
-        """Delete citizen with custom response format"""
-        instance = self.get_object()
-        self.perform_destroy(instance)
-        
+    def check_own_account(self, request, pk):
+        """Return an error response unless the caller is citizen ``pk``"""
+        user_id, user_type = get_token_claims(request)
+        if not user_id:
+            return Response({
+                'success': False,
+                'message': 'Authentication required'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+        if user_type != 'citizen' or str(user_id) != str(pk):
+            return Response({
+                'success': False,
+                'message': 'Citizens can only delete their own account'
+            }, status=status.HTTP_403_FORBIDDEN)
+        return None
+
+    def destroy(self, request, pk=None, *args, **kwargs):
+        """
+        Delete a citizen's account.
+
+        The account is deactivated at once; its reports and other data are
+        deleted (or anonymized) by a background job, whose progress
+        GET /api/citizens/{id}/deletion/ reports. Returns 202 Accepted.
+        """
+        denied = self.check_own_account(request, pk)
+        if denied:
+            return denied
+        if not Citizen.objects.filter(pk=pk).exists() and not CitizenDeletion.objects.filter(citizen_id=pk).exists():
+            return Response({
+                'success': False,
+                'message': 'Citizen not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        deletion = request_deletion(int(pk))
         return Response(
             {
                 'success': True,
-                'message': 'Citizen deleted successfully'
+                'message': 'Account deactivated; its data is being deleted',
+                'data': CitizenDeletionSerializer(deletion).data
             },
-            status=status.HTTP_200_OK
+            status=status.HTTP_202_ACCEPTED
         )
-    
+
+    @action(detail=True, methods=['get'])
+    def deletion(self, request, pk=None):
+        """Progress of the deletion of a citizen's account"""
+        denied = self.check_own_account(request, pk)
+        if denied:
+            return denied
+        deletion = CitizenDeletion.objects.filter(citizen_id=pk).first()
+        if deletion is None:
+            return Response({
+                'success': False,
+                'message': 'No deletion requested for this account'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'success': True,
+            'data': CitizenDeletionSerializer(deletion).data
+        })
+
     @action(detail=False, methods=['get'])
     def count(self, request):
         """Get total count of citizens"""
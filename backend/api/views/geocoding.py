@@ -2,15 +2,24 @@
 Geocoding proxy view to handle reverse geocoding requests
 Avoids CORS and 403 issues by proxying through backend
 """
-import requests
+import asyncio
+import logging
 import random
-from rest_framework.decorators import api_view, permission_classes
+import weakref
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
+from django.conf import settings
+from django.views.decorators.http import require_GET
 import time
 
+from api.services import tiered_cache
+from api.throttling import THROTTLE_CLASSES, acheck_throttles, aconsume, consume
+from api.views.async_utils import json_response, throttled_response
+
+logger = logging.getLogger(__name__)
+
 # Pool of user agents
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -24,158 +33,261 @@ def get_random_user_agent():
     """Get a random user agent from the pool"""
     return random.choice(USER_AGENTS)
 
+# Nominatim's request slot: a bucket of one request per NOMINATIM_MIN_INTERVAL,
+# in the shared cache so that all processes together respect the limit
+NOMINATIM_SLOT_KEY = 'nominatim_last_request'
+
+
 def respect_rate_limit():
     """Ensure we don't exceed 1 request per second to Nominatim"""
-    last_request_key = 'nominatim_last_request'
-    last_request_time = cache.get(last_request_key, 0)
-    current_time = time.time()
-    
-    time_since_last = current_time - last_request_time
-    if time_since_last < 1.0:
-        time.sleep(1.0 - time_since_last)
-    
-    cache.set(last_request_key, time.time(), timeout=10)
+    interval = settings.NOMINATIM_MIN_INTERVAL * 1000
+    while (wait := consume(NOMINATIM_SLOT_KEY, 1, interval)) is not None:
+        time.sleep(wait)
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def reverse_geocode(request):
+
+async def arespect_rate_limit():
+    """Async version of respect_rate_limit that waits without blocking the event loop"""
+    interval = settings.NOMINATIM_MIN_INTERVAL * 1000
+    while (wait := await aconsume(NOMINATIM_SLOT_KEY, 1, interval)) is not None:
+        await asyncio.sleep(wait)
+
+
+# One pooled HTTP client per event loop, reused across requests
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # Imported here: only the ASGI profile's async view needs httpx
+        import httpx
+
+        client = _async_clients[loop] = httpx.AsyncClient(timeout=10)
+    return client
+
+def parse_coordinates(request):
     """
-    Proxy endpoint for reverse geocoding
-    GET /api/geocoding/reverse/?lat=<latitude>&lon=<longitude>
+    Read and validate the lat/lon query parameters.
+
+    Returns:
+        tuple: (lat, lon, error) where error is a message, or None when
+        the coordinates are valid
     """
     lat = request.GET.get('lat')
     lon = request.GET.get('lon')
-    
+
     if not lat or not lon:
-        return Response(
-            {'error': 'Missing required parameters: lat and lon'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
+        return lat, lon, 'Missing required parameters: lat and lon'
+
     try:
         # Validate coordinates
         lat_float = float(lat)
         lon_float = float(lon)
-        
+
         if not (-90 <= lat_float <= 90) or not (-180 <= lon_float <= 180):
-            return Response(
-                {'error': 'Invalid coordinates'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return lat, lon, 'Invalid coordinates'
     except ValueError:
-        return Response(
-            {'error': 'Invalid coordinate format'},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Check cache first (cache for 1 hour)
-    cache_key = f'geocode_{lat}_{lon}'
-    cached_result = cache.get(cache_key)
-    if cached_result:
-        return Response(cached_result)
-    
+        return lat, lon, 'Invalid coordinate format'
+
+    return lat, lon, None
+
+
+def geocode_cache_key(lat, lon):
+    return f'{lat}_{lon}'
+
+
+def nominatim_request(lat, lon):
+    """Return (params, headers) for a Nominatim reverse lookup"""
+    params = {
+        'format': 'json',
+        'lat': lat,
+        'lon': lon,
+        'zoom': 18,
+        'addressdetails': 1
+    }
+    headers = {
+        'User-Agent': get_random_user_agent(),
+        'Accept': 'application/json',
+        'Accept-Language': 'en',
+        'Referer': 'https://smartwayz.app'
+    }
+    return params, headers
+
+
+def nominatim_result(data):
+    """Build the response payload from a Nominatim reply"""
+    # Build detailed address from components
+    if data.get('address'):
+        addr = data['address']
+        parts = [
+            addr.get('road') or addr.get('street'),
+            addr.get('suburb') or addr.get('neighbourhood'),
+            addr.get('city') or addr.get('town') or addr.get('municipality') or addr.get('village'),
+            addr.get('state') or addr.get('province'),
+            addr.get('country')
+        ]
+        address = ', '.join([p for p in parts if p])
+    else:
+        address = data.get('display_name', '')
+
+    return {
+        'address': address,
+        'provider': 'nominatim',
+        'raw': data
+    }
+
+
+def bigdatacloud_params(lat, lon):
+    return {
+        'latitude': lat,
+        'longitude': lon,
+        'localityLanguage': 'en'
+    }
+
+
+def bigdatacloud_result(data):
+    """Build the response payload from a BigDataCloud reply"""
+    # Build address from components
+    parts = []
+    if data.get('localityInfo', {}).get('administrative'):
+        admin = data['localityInfo']['administrative']
+        if len(admin) > 6:
+            parts.append(admin[6].get('name'))
+        if len(admin) > 5:
+            parts.append(admin[5].get('name'))
+
+    parts.extend([
+        data.get('locality') or data.get('city'),
+        data.get('principalSubdivision'),
+        data.get('countryName')
+    ])
+
+    address = ', '.join([p for p in parts if p])
+
+    return {
+        'address': address,
+        'provider': 'bigdatacloud',
+        'raw': data
+    }
+
+
+def coordinates_result(lat, lon):
+    """Last resort payload when every provider failed"""
+    return {
+        'address': f'Location: {lat}, {lon}',
+        'provider': 'coordinates',
+        'raw': None
+    }
+
+
+def lookup_address(lat, lon):
+    """
+    Ask Nominatim, then BigDataCloud, for the address of a location.
+
+    Returns:
+        dict or None: The response payload, or None if every provider failed
+    """
+    # Imported on first use, so processes start without loading it
+    import requests
+
     # Try Nominatim first
     try:
         respect_rate_limit()
         
-        nominatim_url = f'https://nominatim.openstreetmap.org/reverse'
-        params = {
-            'format': 'json',
-            'lat': lat,
-            'lon': lon,
-            'zoom': 18,
-            'addressdetails': 1
-        }
-        headers = {
-            'User-Agent': get_random_user_agent(),
-            'Accept': 'application/json',
-            'Accept-Language': 'en',
-            'Referer': 'https://smartwayz.app'
-        }
-        
-        response = requests.get(nominatim_url, params=params, headers=headers, timeout=10)
+        params, headers = nominatim_request(lat, lon)
+        response = requests.get(settings.NOMINATIM_REVERSE_URL, params=params, headers=headers, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
-            
-            # Build detailed address from components
-            if data.get('address'):
-                addr = data['address']
-                parts = [
-                    addr.get('road') or addr.get('street'),
-                    addr.get('suburb') or addr.get('neighbourhood'),
-                    addr.get('city') or addr.get('town') or addr.get('municipality') or addr.get('village'),
-                    addr.get('state') or addr.get('province'),
-                    addr.get('country')
-                ]
-                address = ', '.join([p for p in parts if p])
-            else:
-                address = data.get('display_name', '')
-            
-            result = {
-                'address': address,
-                'provider': 'nominatim',
-                'raw': data
-            }
-            
-            # Cache the result
-            cache.set(cache_key, result, timeout=3600)
-            
-            return Response(result)
+            return nominatim_result(response.json())
     
-    except Exception as e:
-        print(f"Nominatim failed: {str(e)}")
+    except Exception:
+        logger.warning('Nominatim reverse geocoding failed', exc_info=True)
     
     # Fallback to BigDataCloud
     try:
-        bdc_url = f'https://api.bigdatacloud.net/data/reverse-geocode-client'
-        params = {
-            'latitude': lat,
-            'longitude': lon,
-            'localityLanguage': 'en'
-        }
-        
-        response = requests.get(bdc_url, params=params, timeout=10)
+        params = bigdatacloud_params(lat, lon)
+        response = requests.get(settings.BIGDATACLOUD_REVERSE_URL, params=params, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
-            
-            # Build address from components
-            parts = []
-            if data.get('localityInfo', {}).get('administrative'):
-                admin = data['localityInfo']['administrative']
-                if len(admin) > 6:
-                    parts.append(admin[6].get('name'))
-                if len(admin) > 5:
-                    parts.append(admin[5].get('name'))
-            
-            parts.extend([
-                data.get('locality') or data.get('city'),
-                data.get('principalSubdivision'),
-                data.get('countryName')
-            ])
-            
-            address = ', '.join([p for p in parts if p])
-            
-            result = {
-                'address': address,
-                'provider': 'bigdatacloud',
-                'raw': data
-            }
-            
-            # Cache the result
-            cache.set(cache_key, result, timeout=3600)
-            
-            return Response(result)
+            return bigdatacloud_result(response.json())
     
-    except Exception as e:
-        print(f"BigDataCloud failed: {str(e)}")
+    except Exception:
+        logger.warning('BigDataCloud reverse geocoding failed', exc_info=True)
+
+    return None
+
+
+async def alookup_address(lat, lon):
+    """Async version of lookup_address"""
+    client = get_async_client()
+
+    # Try Nominatim first
+    try:
+        await arespect_rate_limit()
+        params, headers = nominatim_request(lat, lon)
+        response = await client.get(settings.NOMINATIM_REVERSE_URL, params=params, headers=headers)
+        if response.status_code == 200:
+            return nominatim_result(response.json())
+    except Exception:
+        logger.warning('Nominatim reverse geocoding failed', exc_info=True)
+
+    # Fallback to BigDataCloud
+    try:
+        response = await client.get(settings.BIGDATACLOUD_REVERSE_URL, params=bigdatacloud_params(lat, lon))
+        if response.status_code == 200:
+            return bigdatacloud_result(response.json())
+    except Exception:
+        logger.warning('BigDataCloud reverse geocoding failed', exc_info=True)
+
+    return None
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes(THROTTLE_CLASSES)
+def reverse_geocode(request):
+    """
+    Proxy endpoint for reverse geocoding
+    GET /api/geocoding/reverse/?lat=<latitude>&lon=<longitude>
+    """
+    lat, lon, error = parse_coordinates(request)
+    if error:
+        return Response(
+            {'error': error},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
+    # Shared across processes; concurrent misses for a location make one upstream call
+    result = tiered_cache.namespace('geocode').get_or_set(
+        geocode_cache_key(lat, lon), lambda: lookup_address(lat, lon)
+    )
     # Last resort: return coordinates
-    result = {
-        'address': f'Location: {lat}, {lon}',
-        'provider': 'coordinates',
-        'raw': None
-    }
-    
-    return Response(result)
+    return Response(result or coordinates_result(lat, lon))
+
+
+reverse_geocode.cls.throttle_scope = 'geocode'
+
+
+@require_GET
+async def areverse_geocode(request):
+    """
+    Async proxy endpoint for reverse geocoding (ASGI profile).
+
+    GET /api/geocoding/reverse/?lat=<latitude>&lon=<longitude>
+    Same behaviour as reverse_geocode, but waiting on the upstream
+    providers does not hold a worker thread.
+    """
+    wait = await acheck_throttles(request, 'geocode')
+    if wait is not None:
+        return throttled_response(request, wait)
+
+    lat, lon, error = parse_coordinates(request)
+    if error:
+        return json_response(request, {'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = await tiered_cache.namespace('geocode').aget_or_set(
+        geocode_cache_key(lat, lon), lambda: alookup_address(lat, lon)
+    )
+    # Last resort: return coordinates
+    return json_response(request, result or coordinates_result(lat, lon))
@@ -0,0 +1,268 @@
+"""
+Resumable photo uploads and media file serving.
+
+Uploads are started from POST /api/reports/{id}/media/ and then sent as one
+or more raw chunks to PUT /api/media/uploads/{upload_id}/ with a
+``Content-Range: bytes <start>-<end>/<total>`` header. Request bodies are
+streamed straight to disk, so a photo is never fully buffered in memory.
+"""
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.models import ArchivedReportMedia, MediaUpload, ReportMedia
+from api.serializers import ReportMediaSerializer
+from api.services import media_pipeline, media_storage
+from api.views.auth import get_token_claims
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+# Stored files never change under a given digest, so they can be cached forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def upload_state(upload):
+    """Serialize the resumable state of an upload session"""
+    return {
+        'upload_id': str(upload.id),
+        'offset': upload.received,
+        'total_size': upload.total_size,
+        'complete': upload.is_complete,
+    }
+
+
+class MediaUploadView(APIView):
+    """
+    Resumable upload session for a report photo.
+
+    - GET/HEAD: current offset, to resume after a dropped connection
+    - PUT: append the next chunk
+    """
+
+    permission_classes = [AllowAny]  # We handle auth manually
+    # Chunks are raw bytes streamed from request.stream; never parse them
+    parser_classes = []
+
+    def get_upload(self, request, upload_id):
+        user_id, user_type = get_token_claims(request)
+        if user_type != 'citizen' or not user_id:
+            return None, Response(
+                {
+                    'success': False,
+                    'message': 'Authentication required. Please log in.'
+                },
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        try:
+            upload = MediaUpload.objects.get(id=upload_id, citizen_id=user_id)
+        except MediaUpload.DoesNotExist:
+            return None, Response(
+                {
+                    'success': False,
+                    'message': 'Upload not found.'
+                },
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return upload, None
+
+    def get(self, request, upload_id):
+        """Report how many bytes of the upload have been stored"""
+        upload, error = self.get_upload(request, upload_id)
+        if error:
+            return error
+        return Response(
+            {'success': True, 'data': upload_state(upload)},
+            headers={'Upload-Offset': str(upload.received)}
+        )
+
+    def put(self, request, upload_id):
+        """Append one chunk to the upload and finalize it once complete"""
+        upload, error = self.get_upload(request, upload_id)
+        if error:
+            return error
+
+        if 'CONTENT_LENGTH' not in request.META:
+            return Response(
+                {'success': False, 'message': 'Content-Length header required.'},
+                status=status.HTTP_411_LENGTH_REQUIRED
+            )
+        try:
+            length = int(request.META['CONTENT_LENGTH'])
+        except ValueError:
+            length = -1
+        if length < 0:
+            return Response(
+                {'success': False, 'message': 'Malformed Content-Length header.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        content_range = request.META.get('HTTP_CONTENT_RANGE')
+        if content_range:
+            match = CONTENT_RANGE_RE.match(content_range)
+            if not match:
+                return Response(
+                    {'success': False, 'message': 'Malformed Content-Range header.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            start, end, total = (int(g) for g in match.groups())
+            if total != upload.total_size or end - start + 1 != length:
+                return Response(
+                    {'success': False, 'message': 'Content-Range does not match the upload.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            # A single request carrying the whole file
+            start = 0
+
+        # Concurrent chunks of an upload are turned away by a file lock
+        # rather than a row lock, so that no transaction stays open while
+        # the body is read from a slow client
+        try:
+            with media_storage.part_lock(upload.id):
+                # Re-read under the lock: a previous chunk may just have committed
+                upload.refresh_from_db(fields=['received', 'media'])
+                if upload.is_complete:
+                    return Response({'success': True, 'data': upload_state(upload)})
+
+                received = media_storage.append_chunk(upload, request.stream, start, length)
+                if received < upload.total_size:
+                    if not MediaUpload.objects.filter(pk=upload.pk, received=start).update(received=received):
+                        upload.refresh_from_db(fields=['received'])
+                        raise media_storage.UploadOffsetMismatch(upload.received)
+                    upload.received = received
+                    return Response(
+                        {'success': True, 'data': upload_state(upload)},
+                        headers={'Upload-Offset': str(upload.received)}
+                    )
+
+                sha256, _ = media_storage.finalize_upload(upload)
+                with transaction.atomic():
+                    media = ReportMedia.objects.create(
+                        report_id=upload.report_id,
+                        sha256=sha256,
+                        content_type=upload.content_type,
+                        size=upload.total_size,
+                    )
+                    upload.received = received
+                    upload.media = media
+                    upload.save(update_fields=['received', 'media'])
+                    media_pipeline.enqueue(media.id)
+                    # Still under the lock when it runs: until the commit,
+                    # a retried chunk must be turned away, not let in
+                    transaction.on_commit(lambda: media_storage.release_upload(upload))
+        except media_storage.UploadInProgress as e:
+            return Response(
+                {'success': False, 'message': str(e), 'data': upload_state(upload)},
+                status=status.HTTP_409_CONFLICT,
+                headers={'Upload-Offset': str(upload.received)}
+            )
+        except media_storage.UploadOffsetMismatch as e:
+            return Response(
+                {'success': False, 'message': str(e), 'data': upload_state(upload)},
+                status=status.HTTP_409_CONFLICT,
+                headers={'Upload-Offset': str(e.expected)}
+            )
+        except media_storage.UploadTooLarge as e:
+            return Response(
+                {'success': False, 'message': str(e)},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        media.refresh_from_db()
+        return Response(
+            {
+                'success': True,
+                'message': 'Photo uploaded successfully.',
+                'data': ReportMediaSerializer(media, context={'request': request}).data
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+def start_upload(request, report):
+    """
+    Validate an upload request for ``report`` and open a session.
+
+    Called by ReportViewSet.media once ownership has been checked.
+    """
+    content_type = request.data.get('content_type')
+    try:
+        size = int(request.data.get('size'))
+    except (TypeError, ValueError):
+        size = 0
+
+    if content_type not in settings.MEDIA_ALLOWED_CONTENT_TYPES:
+        return Response(
+            {
+                'success': False,
+                'message': f"Unsupported content type. Allowed: {', '.join(settings.MEDIA_ALLOWED_CONTENT_TYPES)}."
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if size <= 0 or size > settings.MEDIA_MAX_UPLOAD_SIZE:
+        return Response(
+            {
+                'success': False,
+                'message': f'Size must be between 1 and {settings.MEDIA_MAX_UPLOAD_SIZE} bytes.'
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    upload = MediaUpload.objects.create(
+        report=report,
+        citizen_id=report.citizen_id,
+        content_type=content_type,
+        total_size=size,
+    )
+    return Response(
+        {'success': True, 'data': upload_state(upload)},
+        status=status.HTTP_201_CREATED
+    )
+
+
+@require_safe
+def media_file(request, sha256, variant):
+    """
+    Serve a processed photo or its thumbnail.
+
+    GET /api/media/<sha256>/
+    GET /api/media/<sha256>/thumbnail/
+    """
+    etag = f'"{sha256}-{variant}"'
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    media = ReportMedia.objects.filter(
+        sha256=sha256,
+        processing_status=ReportMedia.ProcessingStatus.READY
+    ).only('content_type').first()
+    if media is None:
+        # Photos of archived reports
+        media = ArchivedReportMedia.objects.filter(
+            sha256=sha256,
+            processing_status=ReportMedia.ProcessingStatus.READY
+        ).only('content_type').first()
+    if media is None:
+        return HttpResponse(status=404)
+
+    if variant == 'thumbnail':
+        path = media_storage.thumbnail_path(sha256)
+        content_type = 'image/jpeg'
+    else:
+        path = media_storage.blob_path(sha256)
+        content_type = media.content_type
+
+    try:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,28 @@
+"""
+Prometheus scrape endpoint for the request metrics
+"""
+import secrets
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from api.services.metrics import render_metrics
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics(request):
+    """
+    Export request histograms in the Prometheus text format.
+
+    Usage: GET /metrics
+    Requires 'Authorization: Bearer <METRICS_TOKEN>'; disabled (403) while
+    METRICS_TOKEN is not set.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse(status=403)
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not secrets.compare_digest(supplied.encode(), token.encode()):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
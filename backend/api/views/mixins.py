@@ -0,0 +1,62 @@
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.db_routers import is_sticky, replica_reads
+from api.services import tiered_cache
+from api.views.auth import get_token_claims
+
+
+class ReplicaReadMixin:
+    """
+    Serve a viewset's read-only actions from a database replica.
+
+    Actions listed in ``replica_actions`` read from a replica, unless the
+    caller wrote recently and is pinned to the primary (read-your-writes).
+    """
+
+    replica_actions = ('list', 'retrieve')
+
+    def use_replica(self, request, action):
+        if action not in self.replica_actions:
+            return False
+        user_id, user_type = get_token_claims(request)
+        return not is_sticky(user_type, user_id)
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        with replica_reads(self.use_replica(request, action)):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class CachedReadMixin:
+    """
+    Serve a viewset's list and retrieve actions from a two-level cache.
+
+    Successful responses are cached in ``cache_namespace`` per path and
+    query string, so every process shares them and concurrent misses run
+    the query once. Other actions can use ``cached_response()`` directly.
+    Saving the underlying models must invalidate the namespace.
+    """
+
+    cache_namespace = 'reference'
+
+    def cached_response(self, request, handler):
+        """Return the cached response data of a request, or run ``handler`` for it"""
+        responses = []
+
+        def load():
+            response = handler()
+            responses.append(response)
+            return response.data if response.status_code == status.HTTP_200_OK else None
+
+        key = f'{request.path}?{request.GET.urlencode()}'
+        data = tiered_cache.namespace(self.cache_namespace).get_or_set(key, load)
+        if data is None:
+            return responses[0]
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedReadMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedReadMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,181 @@
+"""
+Open-data snapshots of reports, for bulk consumers.
+
+GET /api/open-data/reports/ lists the day partitions that
+``manage.py build_snapshots`` wrote; each file is served from
+GET /api/open-data/reports/<YYYY-MM-DD>.<geojson|csv>.gz with
+Content-Length, an ETag (If-None-Match) and single byte ranges (Range,
+If-Range), so interrupted downloads resume and unchanged days are not
+downloaded again.
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from api.services import snapshots
+from api.throttling import THROTTLE_CLASSES
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+# Past days rarely change, but today's partition does through the day
+SNAPSHOT_CACHE_CONTROL = 'public, max-age=300'
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def etag_matches(header, etag):
+    """Tell whether an If-None-Match header names ``etag``"""
+    tags = {tag.strip().removeprefix('W/') for tag in (header or '').split(',')}
+    return etag in tags or '*' in tags
+
+
+def requested_range(header, size):
+    """
+    Parse a Range header against a file of ``size`` bytes.
+
+    Multiple ranges and malformed headers are ignored, as HTTP allows.
+
+    Returns:
+        tuple: (first, last) byte, inclusive, or None to send the whole file
+
+    Raises:
+        RangeNotSatisfiable: When the range starts past the end of the file
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # The last N bytes
+        if int(last) == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - int(last)), size - 1
+    if last and int(last) < int(first):
+        return None
+    if int(first) >= size:
+        raise RangeNotSatisfiable()
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def file_range(f, first, length):
+    """Yield ``length`` bytes of ``f`` from ``first`` on, closing it at the end"""
+    try:
+        f.seek(first)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes(THROTTLE_CLASSES)
+def open_data_index(request):
+    """
+    List the report snapshot files.
+
+    GET /api/open-data/reports/
+    """
+    manifest = snapshots.read_manifest()
+    if manifest is None:
+        return Response({
+            'success': False,
+            'message': 'No snapshot has been built yet'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    stat = os.stat(snapshots.reports_dir() / snapshots.MANIFEST)
+    etag = snapshots.file_etag(stat.st_size, stat.st_mtime_ns)
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    partitions = []
+    for day, partition in manifest['partitions'].items():
+        files = {}
+        for fmt, entry in partition['files'].items():
+            url = reverse('open-data-file', kwargs={'day': day, 'fmt': fmt})
+            files[fmt] = {
+                'url': request.build_absolute_uri(url),
+                'size': entry['size'],
+                'etag': entry['etag'],
+                'sha256': entry['sha256'],
+            }
+        partitions.append({'day': day, 'rows': partition['rows'], 'files': files})
+
+    return Response({
+        'success': True,
+        'data': {
+            'generated_at': manifest['generated_at'],
+            'columns': manifest['columns'],
+            'partitions': partitions,
+        }
+    }, headers={'ETag': etag, 'Cache-Control': SNAPSHOT_CACHE_CONTROL})
+
+
+open_data_index.cls.throttle_scope = 'open_data'
+
+
+@require_safe
+def open_data_file(request, day, fmt):
+    """
+    Serve one snapshot file, whole or a byte range of it.
+
+    GET /api/open-data/reports/<YYYY-MM-DD>.<geojson|csv>.gz
+    """
+    try:
+        f = open(snapshots.reports_dir() / f'{day}{snapshots.FORMATS[fmt]}', 'rb')
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+
+    # Taken from the open file: a rebuild renames a new file into place
+    # without changing this one
+    stat = os.fstat(f.fileno())
+    size = stat.st_size
+    headers = {
+        'ETag': snapshots.file_etag(size, stat.st_mtime_ns),
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': SNAPSHOT_CACHE_CONTROL,
+    }
+    if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+        f.close()
+        return HttpResponseNotModified(headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and (not if_range or if_range.strip() == headers['ETag']):
+        try:
+            byte_range = requested_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            f.close()
+            return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+
+    filename = f'reports-{day}{snapshots.FORMATS[fmt]}'
+    if byte_range is None:
+        response = FileResponse(f, content_type='application/gzip', as_attachment=True, filename=filename)
+    else:
+        first, last = byte_range
+        response = StreamingHttpResponse(
+            file_range(f, first, last - first + 1), status=206, content_type='application/gzip'
+        )
+        response['Content-Length'] = last - first + 1
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -1,14 +1,233 @@
+import math
+from collections import Counter
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, Value
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from api.models import Report, Citizen, Status
-from api.serializers import ReportSerializer
+from django.conf import settings
+from api.models import ArchivedReport, Report, ReportTombstone, Citizen, Status, Hotspot, HotspotRun
+from api.serializers import (
+    ArchivedReportSerializer, ReportSerializer, HotspotSerializer, RouteHazardSerializer, TriageReportSerializer,
+)
+from api.views.async_utils import InvalidJSON, json_response, read_json, throttled_response
+from api.views.auth import get_token_claims
+from api.views.media import start_upload
+from api.views.mixins import ReplicaReadMixin
+from api.db_routers import ais_sticky, amark_sticky, mark_sticky, replica_reads
+from api.services import confirmations, heatmap, idempotency, tiered_cache
+from api.services.archive import aarchive_horizon, archive_horizon, reaches_archive
+from api.services.jurisdictions import has_jurisdiction, route_report
+from api.services.route_hazards import CLOSED_STATUSES, hazards_along_route
+from api.services.search import search_reports
+from api.services.spatial import decode_polyline, segment_lengths
+from api.throttling import THROTTLE_CLASSES, acheck_throttles
+from api.services.sync import (
+    InvalidWatermark,
+    decode_watermark,
+    next_watermark,
+)
+
+
+def parse_date_filter(params, name):
+    """
+    Read an ISO 8601 date or datetime query parameter.
+
+    Dates mean midnight in the server's time zone.
+
+    Returns:
+        datetime: Aware datetime, or None when the parameter is absent
+
+    Raises:
+        ValidationError: If the value is not a valid date or datetime
+    """
+    value = params.get(name, '')
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.combine(day, datetime.min.time())
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValidationError({name: 'Enter a date or datetime in ISO 8601 format.'})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_reports(queryset, params):
+    """
+    Apply the citizen_id, category, sub_category, created_after and
+    created_before query parameters.
+
+    Works on both Report and ArchivedReport querysets.
+
+    Args:
+        queryset: Reports to filter
+        params: The request's query parameters
+
+    Raises:
+        ValidationError: If a date parameter is malformed
+    """
+    # Filter by citizen_id if provided (for testing without auth)
+    citizen_id = params.get('citizen_id', None)
+    if citizen_id:
+        queryset = queryset.filter(citizen_id=citizen_id)
+
+    # Filter by category if provided
+    category_id = params.get('category', None)
+    if category_id:
+        queryset = queryset.filter(report_type_id=category_id)
+
+    # Filter by sub_category if provided
+    sub_category_id = params.get('sub_category', None)
+    if sub_category_id:
+        queryset = queryset.filter(sub_category_id=sub_category_id)
+
+    # Creation date range, start inclusive and end exclusive
+    created_after = parse_date_filter(params, 'created_after')
+    if created_after:
+        queryset = queryset.filter(created_at__gte=created_after)
+    created_before = parse_date_filter(params, 'created_before')
+    if created_before:
+        queryset = queryset.filter(created_at__lt=created_before)
+
+    return queryset
+
+
+def visible_reports(queryset, user_id, user_type):
+    """Restrict hot or archived reports to those a caller may see"""
+    # If user is a citizen, only show their reports.
+    # Authorities with a jurisdiction see the reports routed to them;
+    # authorities without one still see all reports.
+    if user_type == 'citizen' and user_id:
+        return queryset.filter(citizen_id=user_id)
+    if user_type == 'authority' and user_id and has_jurisdiction(user_id):
+        return queryset.filter(assigned_authority_id=user_id)
+    return queryset
+
+
+def authenticate_report_author(request):
+    """
+    Check that a request carries a valid citizen access token.
+
+    Returns:
+        tuple: (user_id, None) for a citizen, or (None, (payload, status))
+        describing the error response
+    """
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+
+    if not auth_header.startswith('Bearer '):
+        return None, ({
+            'success': False,
+            'message': 'Authentication required. Please log in.'
+        }, status.HTTP_401_UNAUTHORIZED)
+
+    token_string = auth_header.split(' ')[1]
+
+    try:
+        # Decode and validate token
+        token = AccessToken(token_string)
+        user_id = token.get('user_id')
+        user_type = token.get('user_type')
+    except (InvalidToken, TokenError) as e:
+        return None, ({
+            'success': False,
+            'message': 'Invalid or expired token. Please log in again.',
+            'detail': str(e)
+        }, status.HTTP_401_UNAUTHORIZED)
+
+    if not user_id or user_type != 'citizen':
+        return None, ({
+            'success': False,
+            'message': 'Only citizens can create reports.'
+        }, status.HTTP_403_FORBIDDEN)
+
+    return user_id, None
+
+
+KEY_REUSED_ERROR = ({
+    'success': False,
+    'message': 'This Idempotency-Key was already used for a different request.'
+}, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
-class ReportViewSet(viewsets.ModelViewSet):
+def get_idempotency_key(request):
+    """
+    Read the optional Idempotency-Key header of a report creation.
+
+    Returns:
+        tuple: (key or None, None), or (None, (payload, status)) describing
+        the error response for an invalid key
+    """
+    key = request.headers.get('Idempotency-Key')
+    if key is None:
+        return None, None
+    if not key.strip() or len(key) > idempotency.MAX_KEY_LENGTH:
+        return None, ({
+            'success': False,
+            'message': f'Idempotency-Key must be 1 to {idempotency.MAX_KEY_LENGTH} characters.'
+        }, status.HTTP_400_BAD_REQUEST)
+    return key, None
+
+
+def idempotent_response(request, citizen_id, handler):
+    """
+    Run a citizen's POST honoring its Idempotency-Key header, if any.
+
+    Args:
+        handler (callable): Handles the request and returns (status, payload)
+
+    Returns:
+        Response: The handler's response, or the one stored for the key
+    """
+    key, error = get_idempotency_key(request)
+    if error:
+        payload, error_status = error
+        return Response(payload, status=error_status)
+    if key is None:
+        response_status, payload = handler()
+        return Response(payload, status=response_status)
+
+    try:
+        response_status, payload, replayed = idempotency.run_once(
+            citizen_id, key, idempotency.fingerprint(request.path, request.data), handler
+        )
+    except idempotency.KeyReused:
+        payload, error_status = KEY_REUSED_ERROR
+        return Response(payload, status=error_status)
+    response = Response(payload, status=response_status)
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def save_routed_report(serializer):
+    """Save a validated report, routed to the authority whose jurisdiction contains it"""
+    return serializer.save(assigned_authority_id=route_report(
+        serializer.validated_data['latitude'],
+        serializer.validated_data['longitude'],
+    ))
+
+
+class ReportViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Report CRUD operations.
     
@@ -23,103 +242,203 @@ class ReportViewSet(viewsets.ModelViewSet):
     Authorities can view all reports.
     """
     
-    queryset = Report.objects.select_related('report_type', 'citizen', 'sub_category').all()
+    queryset = Report.objects.select_related(
+        'report_type', 'citizen', 'sub_category', 'status', 'assigned_authority'
+    ).prefetch_related('media').all()
     serializer_class = ReportSerializer
     permission_classes = [AllowAny]  # We handle auth manually in create()
-    
+    throttle_classes = THROTTLE_CLASSES
+    throttle_scope = {
+        'create': 'report_create', 'list': 'report_list', 'along_route': 'report_list', 'confirm': 'report_confirm',
+    }
+
+    # Maximum number of changed reports returned by one delta sync page
+    sync_page_size = 500
+
+    # Default and maximum number of reports per triage page
+    triage_page_size = 20
+    triage_max_page_size = 100
+
+    replica_actions = ('list', 'retrieve', 'stats', 'heatmap', 'triage')
+
+    def use_replica(self, request, action):
+        # Delta sync watermarks assume every change up to them is visible;
+        # replication lag would make clients skip rows for good
+        if 'since' in request.GET:
+            return False
+        return super().use_replica(request, action)
+
+    def get_token_claims(self):
+        """Decode the bearer token of the current request, if any"""
+        return get_token_claims(self.request)
+
+    def get_citizen_scope(self):
+        """
+        Return the citizen ID the current request is restricted to, if any.
+
+        Citizens can only see their own reports; the citizen_id query param
+        is kept as a fallback for testing without auth.
+        """
+        user_id, user_type = self.get_token_claims()
+        if user_type == 'citizen' and user_id:
+            return user_id
+        return self.request.query_params.get('citizen_id', None)
+
+    def scope_reports(self, queryset):
+        """
+        Restrict hot or archived reports to what the caller may see, then
+        apply the query parameter filters.
+        """
+        user_id, user_type = self.get_token_claims()
+        return filter_reports(visible_reports(queryset, user_id, user_type), self.request.query_params)
+
     def get_queryset(self):
         """
         Filter reports based on user type and query parameters.
         Citizens can only see their own reports.
         """
-        queryset = super().get_queryset()
+        queryset = self.scope_reports(super().get_queryset())
 
-        # Extract and validate JWT token for filtering
-        # Note: Django stores HTTP headers in META with HTTP_ prefix and uppercase
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
+        # Full-text search over title and description, best matches first
+        query = self.request.query_params.get('q', '').strip()
+        if query:
+            queryset = search_reports(queryset, query)
+            return queryset.order_by('-search_rank', '-created_at')
 
-        if auth_header.startswith('Bearer '):
-            token_string = auth_header.split(' ')[1]
-            try:
-                # Decode and validate token
-                token = AccessToken(token_string)
-                user_id = token.get('user_id')
-                user_type = token.get('user_type')
-
-                # If user is a citizen, only show their reports
-                if user_type == 'citizen' and user_id:
-                    queryset = queryset.filter(citizen_id=user_id)
-                # If user is an authority, show all reports (no filter)
-                # elif user_type == 'authority':
-                #     pass  # Show all reports
-
-            except (InvalidToken, TokenError):
-                # If token is invalid, filter by citizen_id query param (fallback for testing)
-                pass
-
-        # Filter by citizen_id if provided (for testing without auth)
-        citizen_id = self.request.query_params.get('citizen_id', None)
-        if citizen_id:
-            queryset = queryset.filter(citizen_id=citizen_id)
+        return queryset.order_by('-created_at')
 
-        # Filter by category if provided
-        category_id = self.request.query_params.get('category', None)
-        if category_id:
-            queryset = queryset.filter(report_type_id=category_id)
+    def get_archived_queryset(self):
+        """Archived reports visible to the caller, filtered like get_queryset()"""
+        return self.scope_reports(ArchivedReport.objects.select_related(
+            'report_type', 'citizen', 'sub_category', 'status', 'assigned_authority'
+        ).prefetch_related('media'))
 
-        # Filter by sub_category if provided
-        sub_category_id = self.request.query_params.get('sub_category', None)
-        if sub_category_id:
-            queryset = queryset.filter(sub_category_id=sub_category_id)
+    def includes_archive(self):
+        """Tell whether the requested date range may contain archived reports"""
+        created_after = parse_date_filter(self.request.query_params, 'created_after')
+        return reaches_archive(archive_horizon(), created_after)
 
-        return queryset.order_by('-created_at')
-    
-    def create(self, request, *args, **kwargs):
+    def list(self, request, *args, **kwargs):
         """
-        Create a new report with location data.
-        Automatically extracts citizen from JWT token.
+        List reports.
+
+        With ?since=<watermark> the response only contains reports created
+        or changed after the watermark, plus IDs of deleted reports, so the
+        cost of an incremental sync depends on what changed rather than on
+        the size of the citizen's history. Pass ?since=0 for the first sync.
+
+        Archived reports are listed along with hot ones unless
+        ?created_after= starts after the newest archived report. Delta
+        sync and ?q= search only cover the hot table.
         """
-        # Extract and validate JWT token manually
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+        since = request.query_params.get('since', None)
+        if since is None:
+            if request.query_params.get('q', '').strip() or not self.includes_archive():
+                return super().list(request, *args, **kwargs)
+            return self.list_with_archive(request)
 
-        if not auth_header.startswith('Bearer '):
+        try:
+            since = decode_watermark(since)
+        except InvalidWatermark as e:
             return Response(
                 {
                     'success': False,
-                    'message': 'Authentication required. Please log in.'
+                    'message': str(e)
                 },
-                status=status.HTTP_401_UNAUTHORIZED
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        token_string = auth_header.split(' ')[1]
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            updated_at__gt=since
+        ).order_by('updated_at', 'id')
+
+        limit = self.sync_page_size
+        reports = list(queryset[:limit + 1])
+        has_more = len(reports) > limit
+        if has_more:
+            boundary = reports[limit].updated_at
+            reports = reports[:limit]
+            if reports[-1].updated_at == boundary:
+                # Never split rows sharing a timestamp across pages, or the
+                # next page (which starts strictly after it) would skip them
+                reports = [r for r in reports if r.updated_at != boundary]
+                reports += list(queryset.filter(updated_at=boundary))
+
+        last_change = reports[-1].updated_at if reports else None
 
+        tombstones = ReportTombstone.objects.filter(deleted_at__gt=since)
+        citizen_id = self.get_citizen_scope()
+        if citizen_id:
+            tombstones = tombstones.filter(citizen_id=citizen_id)
+        if has_more:
+            tombstones = tombstones.filter(deleted_at__lte=last_change)
+        tombstones = list(tombstones.values_list('report_id', 'deleted_at'))
+        if tombstones:
+            last_deletion = max(deleted_at for _, deleted_at in tombstones)
+            if not has_more and (last_change is None or last_deletion > last_change):
+                last_change = last_deletion
+
+        serializer = self.get_serializer(reports, many=True)
+
+        return Response({
+            'success': True,
+            'data': serializer.data,
+            'deleted': [report_id for report_id, _ in tombstones],
+            'watermark': next_watermark(since, last_change, has_more=has_more),
+            'has_more': has_more,
+        })
+    
+    def list_with_archive(self, request):
+        """
+        List hot and archived reports together, newest first.
+
+        Pages are cut from the union of the (created_at, id) keys of both
+        tables; only the reports on the requested page are then loaded.
+        """
+        hot_keys = self.scope_reports(Report.objects.all()).annotate(archived=Value(False))
+        archived_keys = self.scope_reports(ArchivedReport.objects.all()).annotate(archived=Value(True))
+        keys = hot_keys.values_list('created_at', 'id', 'archived').order_by().union(
+            archived_keys.values_list('created_at', 'id', 'archived').order_by(), all=True
+        ).order_by('-created_at', '-id')
+
+        page = self.paginate_queryset(keys)
+        hot_ids = [report_id for _, report_id, archived in page if not archived]
+        archived_ids = [report_id for _, report_id, archived in page if archived]
+        context = self.get_serializer_context()
+        data = {}
+        if hot_ids:
+            reports = self.get_queryset().filter(id__in=hot_ids)
+            data.update((item['id'], item) for item in ReportSerializer(reports, many=True, context=context).data)
+        if archived_ids:
+            reports = self.get_archived_queryset().filter(id__in=archived_ids)
+            data.update((item['id'], item) for item in ArchivedReportSerializer(reports, many=True, context=context).data)
+
+        return self.get_paginated_response([data[report_id] for _, report_id, _ in page])
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a report, falling back to the archive"""
         try:
-            # Decode and validate token
-            token = AccessToken(token_string)
-            user_id = token.get('user_id')
-            user_type = token.get('user_type')
-        except (InvalidToken, TokenError) as e:
-            return Response(
-                {
-                    'success': False,
-                    'message': 'Invalid or expired token. Please log in again.',
-                    'detail': str(e)
-                },
-                status=status.HTTP_401_UNAUTHORIZED
-            )
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if archive_horizon() is None:
+                raise
+        report = get_object_or_404(self.get_archived_queryset(), pk=kwargs[self.lookup_field])
+        return Response(ArchivedReportSerializer(report, context=self.get_serializer_context()).data)
 
-        if not user_id or user_type != 'citizen':
-            return Response(
-                {
-                    'success': False,
-                    'message': 'Only citizens can create reports.'
-                },
-                status=status.HTTP_403_FORBIDDEN
-            )
+    def create(self, request, *args, **kwargs):
+        """
+        Create a new report with location data.
+        Automatically extracts citizen from JWT token.
+        """
+        # Extract and validate JWT token manually
+        user_id, error = authenticate_report_author(request)
+        if error:
+            payload, error_status = error
+            return Response(payload, status=error_status)
 
         # Verify citizen exists
         try:
-            citizen = Citizen.objects.get(id=user_id)
+            citizen = Citizen.objects.get(id=user_id, is_active=True)
         except Citizen.DoesNotExist:
             return Response(
                 {
@@ -147,21 +466,24 @@ class ReportViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
 
-        serializer = self.get_serializer(data=report_data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-
-        return Response(
-            {
+        def save():
+            serializer = self.get_serializer(data=report_data)
+            serializer.is_valid(raise_exception=True)
+            self.perform_create(serializer)
+            return status.HTTP_201_CREATED, {
                 'success': True,
                 'message': 'Report created successfully. Your report has been submitted.',
                 'data': serializer.data
-            },
-            status=status.HTTP_201_CREATED,
-            headers=headers
-        )
+            }
+
+        response = idempotent_response(request, citizen.id, save)
+        if status.is_success(response.status_code):
+            mark_sticky('citizen', citizen.id)
+        return response
     
+    def perform_create(self, serializer):
+        save_routed_report(serializer)
+
     def update(self, request, *args, **kwargs):
         """
         Citizens CANNOT update reports.
@@ -203,7 +525,7 @@ class ReportViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Get report statistics by category"""
+        """Get report statistics by category, archived reports included"""
         from django.db.models import Count
         
         stats = Report.objects.values(
@@ -211,8 +533,482 @@ class ReportViewSet(viewsets.ModelViewSet):
         ).annotate(
             count=Count('id')
         ).order_by('-count')
+        total_reports = Report.objects.count()
+
+        if archive_horizon() is not None:
+            counts = Counter()
+            for model in (Report, ArchivedReport):
+                for row in model.objects.values('report_type__report_type').annotate(count=Count('id')):
+                    counts[row['report_type__report_type']] += row['count']
+            stats = [{'report_type__report_type': name, 'count': count} for name, count in counts.most_common()]
+            total_reports = sum(counts.values())
         
         return Response({
-            'total_reports': Report.objects.count(),
+            'total_reports': total_reports,
             'by_category': list(stats)
         })
+
+    @action(detail=False, methods=['get'])
+    def hotspots(self, request):
+        """
+        Get the areas where reports concentrate, strongest first.
+
+        Usage: GET /api/reports/hotspots/?sub_category={id}&limit=50
+
+        Hotspots are precomputed by `manage.py detect_hotspots`; responses
+        are cached until the next detection run.
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), 500)
+            if limit < 1:
+                raise ValueError(limit)
+            sub_category_id = request.query_params.get('sub_category')
+            if sub_category_id:
+                sub_category_id = int(sub_category_id)
+        except ValueError:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Invalid limit or sub_category.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        last_run_id = HotspotRun.objects.order_by('-id').values_list('id', flat=True).first()
+
+        def load():
+            hotspots = Hotspot.objects.select_related('sub_category').order_by('-score')
+            if sub_category_id:
+                hotspots = hotspots.filter(sub_category_id=sub_category_id)
+            return {
+                'success': True,
+                'run': last_run_id,
+                'data': HotspotSerializer(hotspots[:limit], many=True).data
+            }
+
+        data = tiered_cache.namespace('hotspots').get_or_set(f'{last_run_id}:{sub_category_id}:{limit}', load)
+
+        return Response(
+            data,
+            headers={'Cache-Control': f'public, max-age={settings.HOTSPOT_CACHE_TIMEOUT}'}
+        )
+
+    @action(detail=False, methods=['get'])
+    def triage(self, request):
+        """
+        Get the open reports to handle next, highest priority first.
+
+        Usage: GET /api/reports/triage/?limit=20&cursor={next_cursor}
+               &category={id}&sub_category={id}
+
+        Authorities with a jurisdiction only see the reports routed to them.
+        Priorities are refreshed by a background job (see
+        api/services/triage.py). Pages are keyset-paginated on
+        (priority, id): pass the previous page's next_cursor.
+        """
+        user_id, user_type = self.get_token_claims()
+        if user_type != 'authority' or not user_id:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Only authorities can view the triage queue.'
+                },
+                status=status.HTTP_401_UNAUTHORIZED if not user_id else status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.triage_page_size)), self.triage_max_page_size)
+            if limit < 1:
+                raise ValueError(limit)
+            cursor = request.query_params.get('cursor')
+            if cursor:
+                priority, report_id = cursor.split(':')
+                priority, report_id = float(priority), int(report_id)
+        except ValueError:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Invalid limit or cursor.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.scope_reports(super().get_queryset()).exclude(status__code__in=CLOSED_STATUSES)
+        if cursor:
+            queryset = queryset.filter(Q(priority__lt=priority) | Q(priority=priority, id__lt=report_id))
+        reports = list(queryset.order_by('-priority', '-id')[:limit + 1])
+        has_more = len(reports) > limit
+        reports = reports[:limit]
+
+        return Response({
+            'success': True,
+            'data': TriageReportSerializer(reports, many=True, context=self.get_serializer_context()).data,
+            'next_cursor': f'{reports[-1].priority!r}:{reports[-1].id}' if has_more else None,
+            'has_more': has_more,
+        })
+
+    @action(detail=False, methods=['get'])
+    def heatmap(self, request):
+        """
+        Get the density of reports over a bounding box as a grayscale raster.
+
+        Usage: GET /api/reports/heatmap/?bbox={min_lon},{min_lat},{max_lon},{max_lat}
+               &width=256&height=256&sigma=2&category={id}&output=png
+
+        output=raw returns the uint8 pixels row by row, north first (``format``
+        is DRF's renderer override). The box
+        actually rendered (slightly grown, see api/services/heatmap.py) is
+        returned in the X-Heatmap-Bbox header.
+        """
+        params = request.query_params
+
+        def invalid(message):
+            return Response({'success': False, 'message': message}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            bbox = tuple(float(value) for value in params.get('bbox', '').split(','))
+            width = int(params.get('width', 256))
+            height = int(params.get('height', 256))
+            sigma = float(params.get('sigma', 0))
+        except ValueError:
+            return invalid('bbox, width, height and sigma must be numbers.')
+        if len(bbox) != 4 or not (-180 <= bbox[0] < bbox[2] <= 180 and -90 <= bbox[1] < bbox[3] <= 90):
+            return invalid('bbox must be min_lon,min_lat,max_lon,max_lat.')
+        if not (0 < width <= settings.HEATMAP_MAX_SIZE and 0 < height <= settings.HEATMAP_MAX_SIZE):
+            return invalid(f'width and height must be between 1 and {settings.HEATMAP_MAX_SIZE} pixels.')
+        if not 0 <= sigma <= settings.HEATMAP_MAX_SIGMA:
+            return invalid(f'sigma must be between 0 and {settings.HEATMAP_MAX_SIGMA} pixels.')
+        output = params.get('output', 'png')
+        if output not in ('png', 'raw'):
+            return invalid('output must be png or raw.')
+
+        bbox = heatmap.snap_bbox(bbox, width, height)
+        # Only aggregate filters: a heatmap of one citizen's reports would
+        # publish where they have been
+        filters = {name: params.get(name, '') for name in ('category', 'sub_category', 'created_after', 'created_before')}
+        queryset = filter_reports(Report.objects.all(), filters)
+
+        def load():
+            raster = heatmap.render(queryset, bbox, width, height, sigma)
+            if output == 'png':
+                body, content_type = heatmap.encode_png(raster), 'image/png'
+            else:
+                body, content_type = raster.pixels, 'application/octet-stream'
+            headers = {
+                'X-Heatmap-Bbox': ','.join(str(value) for value in raster.bbox),
+                'X-Heatmap-Width': str(raster.width),
+                'X-Heatmap-Height': str(raster.height),
+                'X-Heatmap-Total': str(raster.total),
+                'X-Heatmap-Peak': str(raster.peak),
+            }
+            return body, content_type, headers
+
+        key = ':'.join([','.join(map(str, bbox)), f'{width}x{height}', str(sigma), output, *filters.values()])
+        body, content_type, headers = tiered_cache.namespace('heatmap').get_or_set(key, load)
+
+        response = HttpResponse(body, content_type=content_type)
+        for name, value in headers.items():
+            response[name] = value
+        response['Cache-Control'] = f'public, max-age={settings.HEATMAP_CACHE_TIMEOUT}'
+        return response
+
+    @action(detail=False, methods=['post'])
+    def along_route(self, request):
+        """
+        Get the open hazards inside a corridor around a route, in route order.
+
+        POST /api/reports/along_route/
+        Body: {"polyline": "_p~iF~ps|U_ulLnnqC", "width": 100,
+               "precision": 5, "sub_categories": [1, 2]}
+
+        width is the corridor width in meters, centered on the route.
+        """
+        user_id, _ = self.get_token_claims()
+        if not user_id:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Authentication required. Please log in.'
+                },
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        def invalid(message):
+            return Response({'success': False, 'message': message}, status=status.HTTP_400_BAD_REQUEST)
+
+        polyline = request.data.get('polyline')
+        if not isinstance(polyline, str) or not polyline:
+            return invalid('polyline is required.')
+        try:
+            width = float(request.data.get('width', 100))
+            precision = int(request.data.get('precision', 5))
+            sub_category_ids = [int(value) for value in request.data.get('sub_categories') or []]
+        except (TypeError, ValueError):
+            return invalid('width, precision and sub_categories must be numbers.')
+        if not 0 < width <= settings.ROUTE_MAX_WIDTH_METERS:
+            return invalid(f'width must be between 0 and {settings.ROUTE_MAX_WIDTH_METERS} meters.')
+        if precision not in (5, 6):
+            return invalid('precision must be 5 or 6.')
+        try:
+            points = decode_polyline(polyline, precision)
+        except ValueError as exc:
+            return invalid(f'Invalid polyline: {exc}')
+        if not points:
+            return invalid('polyline has no points.')
+        if len(points) > settings.ROUTE_MAX_POINTS:
+            return invalid(f'Routes are limited to {settings.ROUTE_MAX_POINTS} points.')
+        if any(not (-90 <= lat <= 90 and -180 <= lon <= 180) for lat, lon in points):
+            return invalid('polyline has points out of range; check precision.')
+        # The corridor query's cost grows with the route's length
+        lengths = segment_lengths(points)
+        if lengths and max(lengths) > settings.ROUTE_MAX_SEGMENT_METERS:
+            return invalid(f'Route segments are limited to {settings.ROUTE_MAX_SEGMENT_METERS} meters.')
+        if sum(lengths) > settings.ROUTE_MAX_LENGTH_METERS:
+            return invalid(f'Routes are limited to {settings.ROUTE_MAX_LENGTH_METERS} meters.')
+
+        reports, truncated = hazards_along_route(points, width, sub_category_ids)
+        return Response({
+            'success': True,
+            'count': len(reports),
+            'truncated': truncated,
+            'data': RouteHazardSerializer(reports, many=True).data
+        })
+
+    @action(detail=True, methods=['post', 'delete'])
+    def confirm(self, request, pk=None):
+        """
+        Confirm ("me too") another citizen's report, or withdraw the
+        confirmation with DELETE.
+
+        POST /api/reports/{id}/confirm/
+        DELETE /api/reports/{id}/confirm/
+
+        Confirming twice is not an error and counts once. The returned
+        confirmation_count is exact; the one in report listings is folded
+        in periodically (see api/services/confirmations.py).
+        """
+        user_id, user_type = self.get_token_claims()
+        if user_type != 'citizen' or not user_id:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Only citizens can confirm reports.'
+                },
+                status=status.HTTP_401_UNAUTHORIZED if not user_id else status.HTTP_403_FORBIDDEN
+            )
+
+        # Any citizen's report can be confirmed, not just their own
+        report = get_object_or_404(Report.objects.select_related('status'), pk=pk)
+        if str(report.citizen_id) == str(user_id):
+            return Response(
+                {
+                    'success': False,
+                    'message': 'You cannot confirm your own report.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'DELETE':
+            changed = confirmations.withdraw(user_id, report.id)
+            message = 'Confirmation withdrawn.' if changed else 'You had not confirmed this report.'
+        elif report.status.code in CLOSED_STATUSES:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'This report is closed and can no longer be confirmed.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        else:
+            changed = confirmations.confirm(user_id, report.id)
+            message = 'Thanks for confirming this report.' if changed else 'You already confirmed this report.'
+
+        return Response(
+            {
+                'success': True,
+                'message': message,
+                'data': {
+                    'report': report.id,
+                    'confirmed': request.method == 'POST',
+                    'confirmation_count': confirmations.confirmation_counts([report.id]).get(report.id, 0),
+                }
+            },
+            status=status.HTTP_201_CREATED if changed and request.method == 'POST' else status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['post'])
+    def media(self, request, pk=None):
+        """
+        Start a resumable photo upload for one of the citizen's reports.
+
+        POST /api/reports/{id}/media/
+        Body: {"content_type": "image/jpeg", "size": 482113}
+
+        The chunks are then sent to PUT /api/media/uploads/{upload_id}/.
+        """
+        user_id, user_type = self.get_token_claims()
+        if user_type != 'citizen' or not user_id:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'Only citizens can attach photos to reports.'
+                },
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        report = self.get_object()
+
+        def start():
+            response = start_upload(request, report)
+            return response.status_code, response.data
+
+        return idempotent_response(request, user_id, start)
+
+
+# Delta sync and search keep their sync implementations under ASGI
+_sync_report_list_create = sync_to_async(ReportViewSet.as_view({'get': 'list', 'post': 'create'}))
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def areport_list_create(request):
+    """
+    Async list/create endpoint for reports (ASGI profile).
+
+    GET/POST /api/reports/
+    Same requests and responses as ReportViewSet.list/create. ?since=,
+    ?q= and lists reaching into the archive are handed to the viewset.
+    """
+    if request.method == 'POST':
+        wait = await acheck_throttles(request, 'report_create')
+        if wait is not None:
+            return throttled_response(request, wait)
+        return await acreate_report(request)
+    if 'since' in request.GET or request.GET.get('q', '').strip():
+        return await _sync_report_list_create(request)
+    return await alist_reports(request)
+
+
+async def alist_reports(request):
+    """Async version of ReportViewSet.list (without ?since=, ?q= and archives)"""
+    try:
+        created_after = parse_date_filter(request.GET, 'created_after')
+        parse_date_filter(request.GET, 'created_before')
+    except ValidationError as e:
+        return json_response(request, e.detail, status=status.HTTP_400_BAD_REQUEST)
+    if reaches_archive(await aarchive_horizon(), created_after):
+        return await _sync_report_list_create(request)
+    # Requests handed to the viewset are throttled there
+    wait = await acheck_throttles(request, 'report_list')
+    if wait is not None:
+        return throttled_response(request, wait)
+
+    user_id, user_type = get_token_claims(request)
+    queryset = await sync_to_async(visible_reports)(ReportViewSet.queryset.all(), user_id, user_type)
+    queryset = filter_reports(queryset, request.GET).order_by('-created_at')
+
+    with replica_reads(not await ais_sticky(user_type, user_id)):
+        return await _alist_page(request, queryset)
+
+
+async def _alist_page(request, queryset):
+    # Same page semantics and envelope as DRF's PageNumberPagination
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        page_number = 0
+    count = await queryset.acount()
+    num_pages = max(1, math.ceil(count / page_size))
+    if not 1 <= page_number <= num_pages:
+        return json_response(request, {'detail': 'Invalid page.'}, status=status.HTTP_404_NOT_FOUND)
+
+    offset = (page_number - 1) * page_size
+    reports = [report async for report in queryset[offset:offset + page_size]]
+    serializer = ReportSerializer(reports, many=True, context={'request': request})
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page_number + 1) if page_number < num_pages else None
+    if page_number == 1:
+        previous_url = None
+    elif page_number == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page_number - 1)
+
+    return json_response(request, {
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': serializer.data,
+    })
+
+
+async def acreate_report(request):
+    """Async version of ReportViewSet.create"""
+    user_id, error = authenticate_report_author(request)
+    if error:
+        payload, error_status = error
+        return json_response(request, payload, status=error_status)
+
+    try:
+        report_data = read_json(request)
+    except InvalidJSON as e:
+        return json_response(request, {'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    key, error = get_idempotency_key(request)
+    if error:
+        payload, error_status = error
+        return json_response(request, payload, status=error_status)
+    request_fingerprint = idempotency.fingerprint(request.path, report_data)
+
+    try:
+        citizen = await Citizen.objects.aget(id=user_id, is_active=True)
+    except Citizen.DoesNotExist:
+        return json_response(request, {
+            'success': False,
+            'message': 'User not found. Please log in again.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    report_data['citizen'] = citizen.id
+    if 'status' not in report_data:
+        try:
+            report_data['status'] = (await Status.objects.aget(code='pending')).id
+        except Status.DoesNotExist:
+            return json_response(request, {
+                'success': False,
+                'message': 'System error: Status configuration is missing.'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    # Validation looks up related rows and saving runs Report.save and its
+    # signals, all synchronous ORM work, so do it in one thread hop
+    try:
+        response_status, payload, replayed = await sync_to_async(_save_report_once)(
+            report_data, request, citizen.id, key, request_fingerprint
+        )
+    except idempotency.KeyReused:
+        payload, error_status = KEY_REUSED_ERROR
+        return json_response(request, payload, status=error_status)
+    if status.is_success(response_status):
+        await amark_sticky('citizen', citizen.id)
+
+    response = json_response(request, payload, status=response_status)
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _save_report_once(report_data, request, citizen_id, key, request_fingerprint):
+    def save():
+        serializer = ReportSerializer(data=report_data, context={'request': request})
+        if not serializer.is_valid():
+            return status.HTTP_400_BAD_REQUEST, serializer.errors
+        save_routed_report(serializer)
+        return status.HTTP_201_CREATED, {
+            'success': True,
+            'message': 'Report created successfully. Your report has been submitted.',
+            'data': serializer.data
+        }
+
+    if key is None:
+        return *save(), False
+    return idempotency.run_once(citizen_id, key, request_fingerprint, save)
@@ -4,14 +4,16 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from api.models import SubCategory
 from api.serializers import SubCategorySerializer
+from api.views.mixins import CachedReadMixin, ReplicaReadMixin
 
 
-class SubCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class SubCategoryViewSet(CachedReadMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for SubCategory operations (Read-only).
     
     Subcategories are predefined and seeded via migrations.
-    Public endpoint - no authentication required.
+    Public endpoint - no authentication required. Responses are cached
+    as reference data.
     
     Endpoints:
     - list: GET /api/subcategories/
@@ -22,6 +24,7 @@ class SubCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = SubCategory.objects.select_related('report_type').all()
     serializer_class = SubCategorySerializer
     permission_classes = [AllowAny]  # Allow unauthenticated access
+    replica_actions = ('list', 'retrieve', 'by_category')
     
     def get_queryset(self):
         """
@@ -54,12 +57,15 @@ class SubCategoryViewSet(viewsets.ReadOnlyModelViewSet):
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        subcategories = self.queryset.filter(report_type_id=category_id)
-        serializer = self.get_serializer(subcategories, many=True)
-        
-        return Response({
-            'success': True,
-            'count': subcategories.count(),
-            'data': serializer.data
-        })
+
+        def load():
+            subcategories = self.queryset.filter(report_type_id=category_id)
+            serializer = self.get_serializer(subcategories, many=True)
+
+            return Response({
+                'success': True,
+                'count': subcategories.count(),
+                'data': serializer.data
+            })
+
+        return self.cached_response(request, load)
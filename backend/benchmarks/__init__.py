@@ -0,0 +1,5 @@
+# Benchmarks for the SmartWayz API.
+#
+# Each module is a standalone script; run them from the backend directory:
+#
+#     python -m benchmarks.bench_media_uploads --help
@@ -0,0 +1,181 @@
+"""
+Hazard alert matching benchmark.
+
+Builds the geofence index of --subscriptions circular alert areas (radius
+between --min-radius and --max-radius meters, centers drawn like report
+locations) and matches --reports hazard reports against it, reporting
+build time, index memory and per-report match latency next to a
+vectorised scan of every subscription. With --with-db it also seeds
+--db-subscriptions subscriptions and times the alerts.match job end to
+end (index refresh, matching, checks and inserts) on batches of reports.
+
+    python -m benchmarks.bench_alerts --subscriptions 1000000 --reports 5000
+"""
+import argparse
+import time
+
+from benchmarks.harness import benchmark_database, peak_rss_mb, percentiles, print_results, setup_django, timed
+
+
+def generate_areas(count, min_radius, max_radius, seed=7):
+    """
+    Returns:
+        tuple: (latitudes, longitudes, radii, type masks) arrays
+    """
+    import numpy as np
+
+    from api.services.alerts import hazard_types
+    from benchmarks.datagen import point_arrays
+
+    rng = np.random.default_rng(seed)
+    latitudes, longitudes = point_arrays(count, seed=seed)
+    radii = rng.uniform(min_radius, max_radius, count)
+    # Most citizens want every hazard; the rest pick one or two types
+    types = len(hazard_types())
+    masks = np.where(
+        rng.random(count) < 0.7,
+        (1 << types) - 1,
+        (1 << rng.integers(0, types, count)) | (1 << rng.integers(0, types, count)),
+    )
+    return latitudes, longitudes, radii, masks
+
+
+def run_in_memory(args):
+    import numpy as np
+
+    from django.conf import settings
+    from api.services.alerts import hazard_types
+    from api.services.geofence import METERS_PER_DEGREE, GeofenceIndex
+    from benchmarks.datagen import point_arrays
+
+    latitudes, longitudes, radii, masks = generate_areas(args.subscriptions, args.min_radius, args.max_radius)
+    ids = np.arange(1, args.subscriptions + 1)
+    owners = ids // 2 + 1
+
+    with timed() as build_time:
+        index = GeofenceIndex(
+            zip(ids.tolist(), owners.tolist(), latitudes.tolist(), longitudes.tolist(), radii.tolist(), masks.tolist()),
+            cell_size=settings.ALERT_INDEX_CELL_SIZE,
+        )
+
+    report_lat, report_lon = point_arrays(args.reports, seed=99)
+    rng = np.random.default_rng(99)
+    report_masks = (1 << rng.integers(0, len(hazard_types()), args.reports)).tolist()
+    points = list(zip(report_lat.tolist(), report_lon.tolist(), report_masks))
+
+    samples, matched = [], 0
+    for latitude, longitude, mask in points:
+        start = time.perf_counter()
+        keys, _ = index.match(latitude, longitude, mask)
+        samples.append(time.perf_counter() - start)
+        matched += len(keys)
+
+    lat32, lon32, radius2 = latitudes.astype(np.float32), longitudes.astype(np.float32), (radii ** 2).astype(np.float32)
+    naive_samples = []
+    for latitude, longitude, mask in points[:args.naive_sample]:
+        start = time.perf_counter()
+        dx = (lon32 - np.float32(longitude)) * np.float32(np.cos(np.radians(latitude)) * METERS_PER_DEGREE)
+        dy = (lat32 - np.float32(latitude)) * np.float32(METERS_PER_DEGREE)
+        np.flatnonzero((dx * dx + dy * dy <= radius2) & ((masks & mask) != 0))
+        naive_samples.append(time.perf_counter() - start)
+
+    stats = percentiles(samples)
+    naive = percentiles(naive_samples)
+    print_results('Alert matching (in memory)', {
+        'subscriptions': args.subscriptions,
+        'radius (m)': f'{args.min_radius}-{args.max_radius}',
+        'reports': args.reports,
+        'matches per report': round(matched / len(points), 1),
+        'index build (s)': round(build_time['seconds'], 2),
+        'index memory (MB)': round(index.nbytes / 1e6, 1),
+        'peak RSS (MiB)': round(peak_rss_mb()),
+        'match mean (us)': round(sum(samples) / len(samples) * 1e6, 1),
+        'match p50/p95/p99 (us)': ' / '.join(str(round(stats[p] * 1000, 1)) for p in ('p50', 'p95', 'p99')),
+        'full scan mean (us)': round(sum(naive_samples) / len(naive_samples) * 1e6, 1),
+    })
+
+
+def run_database(args):
+    import numpy as np
+
+    from api.models import AlertSubscription, Category, Job, Report, Status, SubCategory
+    from api.services import alerts, jobs
+    from benchmarks.datagen import generate_citizens, point_arrays
+
+    citizen_ids = generate_citizens(args.db_subscriptions // 2 + 1)
+    latitudes, longitudes, radii, _ = generate_areas(args.db_subscriptions, args.min_radius, args.max_radius)
+    rng = np.random.default_rng(3)
+    owners = rng.choice(citizen_ids, args.db_subscriptions)
+    for start in range(0, args.db_subscriptions, 5000):
+        AlertSubscription.objects.bulk_create([
+            AlertSubscription(citizen_id=owner, latitude=f'{lat:.6f}', longitude=f'{lon:.6f}', radius_meters=int(radius))
+            for owner, lat, lon, radius in zip(
+                owners[start:start + 5000].tolist(), latitudes[start:start + 5000].tolist(),
+                longitudes[start:start + 5000].tolist(), radii[start:start + 5000].tolist(),
+            )
+        ])
+
+    with timed() as build_time:
+        alerts.get_index()
+
+    hazard = Category.objects.get(report_type='Hazard')
+    flooding = SubCategory.objects.get(report_type=hazard, sub_category='FLOODING')
+    pending = Status.objects.get(code='pending')
+    report_lat, report_lon = point_arrays(args.db_reports, seed=99)
+    for latitude, longitude in zip(report_lat.tolist(), report_lon.tolist()):
+        Report.objects.create(
+            citizen_id=citizen_ids[0], status=pending, report_type=hazard, sub_category=flooding,
+            title='Flooded street', latitude=f'{latitude:.6f}', longitude=f'{longitude:.6f}',
+        )
+
+    samples = []
+    worker = jobs.Worker(queues=['alerts'], batch_size=args.batch_size, poll_interval=0)
+    while True:
+        batch = jobs.claim_jobs(worker.id, ['alerts'], args.batch_size)
+        if not batch:
+            break
+        start = time.perf_counter()
+        jobs.run_jobs(batch)
+        samples.append(time.perf_counter() - start)
+
+    stats = percentiles(samples)
+    print_results('alerts.match job (database)', {
+        'subscriptions': args.db_subscriptions,
+        'reports': args.db_reports,
+        'reports per batch': args.batch_size,
+        'index build from database (s)': round(build_time['seconds'], 2),
+        'alerts stored': alerts_count(),
+        'digests scheduled': Job.objects.filter(task=alerts.DIGEST_TASK).count(),
+        'batch p50/p95 (ms)': f"{stats['p50']} / {stats['p95']}",
+        'per report (ms)': round(sum(samples) / args.db_reports * 1000, 2),
+    })
+
+
+def alerts_count():
+    from api.models import HazardAlert
+
+    return HazardAlert.objects.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subscriptions', type=int, default=1_000_000)
+    parser.add_argument('--min-radius', type=int, default=200)
+    parser.add_argument('--max-radius', type=int, default=1500)
+    parser.add_argument('--reports', type=int, default=5000)
+    parser.add_argument('--naive-sample', type=int, default=50, help='Reports matched with the full scan')
+    parser.add_argument('--with-db', action='store_true')
+    parser.add_argument('--db-subscriptions', type=int, default=100_000)
+    parser.add_argument('--db-reports', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    run_in_memory(args)
+    if args.with_db:
+        with benchmark_database():
+            run_database(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Report archival benchmark: recent-window queries before and after.
+
+Seeds --reports synthetic reports spread over --days days and resolves
+--resolved-share of those older than --months months (over the years most
+reports end up resolved). It then measures report list requests through
+the API with everything in the hot table, runs the archival in batches,
+and measures the same requests again.
+
+    python -m benchmarks.bench_archive --reports 1000000
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.harness import (
+    benchmark_database,
+    percentiles,
+    print_results,
+    setup_django,
+    timed,
+)
+
+
+def measure(client, cases, repeat):
+    results = {}
+    for label, (path, params, headers) in cases.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get(path, params, **headers)
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.content
+        stats = percentiles(samples)
+        results[label] = f"{stats['p50']} / {stats['p95']}"
+    return results
+
+
+def run(args):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.utils import timezone
+    from api.models import ArchivedReport, Category, Report, Status
+    from api.services.archive import archive_batches, months_ago
+    from api.views.auth import get_tokens_for_user
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    with timed() as seed_time:
+        citizens = generate_citizens(args.citizens)
+        generate_reports(args.reports, citizens, days=args.days)
+        cutoff = months_ago(args.months)
+        resolved = Status.objects.get(code='resolved')
+        # id % 100 picks a deterministic, evenly spread share
+        keep_open = round(100 * (1 - args.resolved_share))
+        Report.objects.filter(created_at__lt=cutoff).exclude(status=resolved).extra(
+            where=['id %% 100 >= %s'], params=[keep_open]
+        ).update(status=resolved)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    citizen_id = Report.objects.values_list('citizen_id', flat=True).first()
+    token = get_tokens_for_user(citizen_id, 'citizen', 'citizen@example.com')['access']
+    auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+    window = (timezone.now() - timedelta(days=args.window_days)).isoformat()
+    hazard = Category.objects.get(report_type='Hazard')
+    cases = {
+        f'all, last {args.window_days} days': ('/api/reports/', {'created_after': window}, {}),
+        f'all, last {args.window_days} days, page 5': ('/api/reports/', {'created_after': window, 'page': 5}, {}),
+        f'Hazard, last {args.window_days} days': (
+            '/api/reports/', {'created_after': window, 'category': hazard.id}, {}
+        ),
+        f'citizen, last {args.window_days} days': ('/api/reports/', {'created_after': window}, auth),
+        'citizen, full history': ('/api/reports/', {}, auth),
+        'all, full history': ('/api/reports/', {}, {}),
+    }
+
+    client = Client()
+    cache.clear()
+    before = measure(client, cases, args.repeat)
+
+    with timed() as archive_time:
+        archived = sum(archive_batches(cutoff, batch_size=args.batch_size))
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    cache.clear()
+    after = measure(client, cases, args.repeat)
+
+    rows = {
+        'reports': args.reports,
+        'seed time (s)': round(seed_time['seconds'], 1),
+        'archived reports': archived,
+        'hot reports left': Report.objects.count(),
+        'archive time (s)': round(archive_time['seconds'], 1),
+        'archive rate (reports/s)': round(archived / archive_time['seconds']) if archived else 0,
+    }
+    assert ArchivedReport.objects.count() == archived
+    for label in cases:
+        rows[f'{label} p50/p95 ms, before -> after'] = f'{before[label]} -> {after[label]}'
+
+    print_results('Report archival: list latency before and after', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=1_000_000)
+    parser.add_argument('--citizens', type=int, default=10_000)
+    parser.add_argument('--days', type=int, default=3 * 365, help='Spread of report creation dates')
+    parser.add_argument('--months', type=int, default=6, help='Archive resolved reports older than this')
+    parser.add_argument('--resolved-share', type=float, default=0.9)
+    parser.add_argument('--window-days', type=int, default=30, help='Recent window queried')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+WSGI vs ASGI concurrent-connection capacity benchmark.
+
+Seeds a database, then serves it with the WSGI build (gunicorn, sync
+workers with threads) and the ASGI profile (uvicorn) in turn, with the
+same number of worker processes. For each scenario and concurrency level
+it holds that many connections open, each sending requests back to back
+for --duration seconds, and reports throughput, latency and failures.
+
+The geocode scenario goes to a local stub upstream answering after
+--upstream-delay-ms with unique coordinates per request, so every
+request waits on the upstream: capacity there is bounded by worker
+threads under WSGI and by the event loop under ASGI.
+
+    python -m benchmarks.bench_asgi --workers 2 --concurrency 16,64,256
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import benchmark_database, percentiles, setup_django
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_command(kind, port, args):
+    if kind == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'smartwayz_backend.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers), '--threads', str(args.threads),
+            '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'smartwayz_backend.asgi:application',
+        '--host', '127.0.0.1', '--port', str(port), '--workers', str(args.workers),
+        '--log-level', 'warning', '--no-access-log',
+    ]
+
+
+def start_server(kind, port, env, args):
+    settings_module = 'smartwayz_backend.settings' if kind == 'wsgi' else 'smartwayz_backend.settings_asgi'
+    process = subprocess.Popen(
+        server_command(kind, port, args), cwd=BACKEND_DIR,
+        env={**env, 'DJANGO_SETTINGS_MODULE': settings_module},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f'{kind} server did not start')
+
+
+async def drive(base_url, scenario, concurrency, duration, token):
+    """Keep ``concurrency`` connections busy for ``duration`` seconds"""
+    import httpx
+
+    counter = itertools.count()
+    latencies, failures = [], 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def user():
+            nonlocal failures
+            while time.monotonic() < deadline:
+                i = next(counter)
+                start = time.perf_counter()
+                try:
+                    if scenario == 'geocode':
+                        # Unique coordinates, so every request misses the cache
+                        response = await client.get(
+                            '/api/geocoding/reverse/', params={'lat': f'14.{i:06d}', 'lon': '121.0'}
+                        )
+                    elif scenario == 'login':
+                        response = await client.post('/api/auth/login/citizen/', json={
+                            'email': f'citizen42-{i % 50}@example.com', 'password': 'benchmark-password'
+                        })
+                    else:
+                        response = await client.get(
+                            '/api/reports/', headers={'Authorization': f'Bearer {token}'}
+                        )
+                    ok = response.status_code < 400
+                    if ok and scenario == 'geocode':
+                        # The proxy answers with bare coordinates when upstreams fail
+                        ok = response.json()['provider'] != 'coordinates'
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        # Requests in flight at the deadline still complete, so divide by
+        # the time until the last one did
+        elapsed = time.perf_counter() - start
+
+    return latencies, failures, elapsed
+
+
+def run(args):
+    from django.db import connection
+    from api.views.auth import get_tokens_for_user
+    from benchmarks.datagen import generate_citizens, generate_reports
+    from benchmarks.stub_upstream import StubUpstream
+
+    citizens = generate_citizens(args.citizens)
+    generate_reports(args.reports, citizens)
+    token = get_tokens_for_user(citizens[0], 'citizen', 'citizen42-0@example.com')['access']
+    connection.close()
+
+    with StubUpstream(delay_ms=args.upstream_delay_ms) as stub:
+        env = {
+            **os.environ,
+            'DATABASE_URL': f"sqlite:///{connection.settings_dict['NAME']}",
+            'METRICS_SAMPLE_RATE': '0',
+            **{key: str(value) for key, value in stub.settings().items()},
+        }
+        header = f"{'server':<8}{'scenario':<13}{'conns':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'failed':>8}"
+        print(f'\n{header}\n' + '-' * len(header))
+        for kind in ['wsgi', 'asgi']:
+            port = free_port()
+            process = start_server(kind, port, env, args)
+            try:
+                for scenario in args.scenarios:
+                    for concurrency in args.concurrency:
+                        latencies, failures, elapsed = asyncio.run(
+                            drive(f'http://127.0.0.1:{port}', scenario, concurrency, args.duration, token)
+                        )
+                        stats = percentiles(latencies) if latencies else {'p50': '-', 'p95': '-', 'p99': '-'}
+                        print(
+                            f'{kind:<8}{scenario:<13}{concurrency:>7}{len(latencies) / elapsed:>10.1f}'
+                            f"{stats['p50']:>10}{stats['p95']:>10}{stats['p99']:>10}{failures:>8}"
+                        )
+            finally:
+                process.terminate()
+                process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=2, help='Server processes for both builds')
+    parser.add_argument('--threads', type=int, default=2, help='Threads per gunicorn worker (as in the Dockerfile)')
+    parser.add_argument('--concurrency', default='16,64,256', help='Comma-separated open connection counts')
+    # Login last: queued password hashes outlive the clients that gave up on them
+    parser.add_argument('--scenarios', default='geocode,report_list,login')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per scenario and level')
+    parser.add_argument('--upstream-delay-ms', type=int, default=200)
+    parser.add_argument('--citizens', type=int, default=100)
+    parser.add_argument('--reports', type=int, default=10_000)
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(',')]
+    args.scenarios = args.scenarios.split(',')
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
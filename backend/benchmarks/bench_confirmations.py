@@ -0,0 +1,114 @@
+"""
+"Me too" confirmation throughput benchmark.
+
+Has --citizens citizens confirm one report from --threads threads at once,
+counting either straight into the report row (every confirmation waits for
+the previous one's row lock) or into CONFIRMATION_SHARDS counter rows, for
+each shard count in --shards. Reports confirmations/s, confirmation
+latency and the time to fold the shards into the report afterwards.
+
+Row lock waits only show on a database with row-level locking: SQLite
+serializes all writers anyway, so point DATABASE_URL at Postgres to see
+the difference.
+
+    python -m benchmarks.bench_confirmations --citizens 5000 --threads 8 --shards 1,4,16,64
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.harness import benchmark_database, percentiles, print_results, setup_django, timed
+
+
+def confirm_in_report_row(citizen_id, report_id):
+    """The unsharded alternative: count in Report.confirmation_count directly"""
+    from django.db import IntegrityError, transaction
+    from django.db.models import F
+
+    from api.models import Report, ReportConfirmation
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                ReportConfirmation.objects.create(citizen_id=citizen_id, report_id=report_id)
+        except IntegrityError:
+            return False
+        Report.objects.filter(id=report_id).update(confirmation_count=F('confirmation_count') + 1)
+    return True
+
+
+def confirm_all(confirm, citizen_ids, report_id, threads):
+    """Confirm a report once per citizen from several threads; returns seconds and latencies"""
+    from django.db import connections
+
+    latencies = []
+    barrier = threading.Barrier(threads)
+
+    def work(chunk):
+        try:
+            barrier.wait()
+            for citizen_id in chunk:
+                start = time.perf_counter()
+                assert confirm(citizen_id, report_id)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+
+    pool = [threading.Thread(target=work, args=(citizen_ids[n::threads],)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def run(args):
+    from django.test import override_settings
+
+    from api.models import Report, ReportConfirmation, ReportConfirmationShard
+    from api.services import confirmations
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    citizen_ids = generate_citizens(args.citizens + 1)
+    # The first citizen files the report, the others confirm it
+    generate_reports(1, citizen_ids[:1])
+    citizen_ids = citizen_ids[1:]
+    report_id = Report.objects.get().id
+
+    rows = {'confirmations per run': args.citizens, 'threads': args.threads}
+    modes = [('report row', confirm_in_report_row, None)]
+    modes += [(f'{shards} shards', confirmations.confirm, shards) for shards in args.shards]
+    for label, confirm, shards in modes:
+        ReportConfirmation.objects.all().delete()
+        ReportConfirmationShard.objects.all().delete()
+        Report.objects.update(confirmation_count=0)
+        with override_settings(CONFIRMATION_SHARDS=shards or 1):
+            seconds, latencies = confirm_all(confirm, citizen_ids, report_id, args.threads)
+            with timed() as fold:
+                confirmations.fold()
+        assert Report.objects.get().confirmation_count == args.citizens
+        latency = percentiles(latencies)
+        rows[f'{label} (confirmations/s)'] = f'{args.citizens / seconds:.0f}'
+        rows[f'{label} p50/p95/max (ms)'] = f"{latency['p50']} / {latency['p95']} / {latency['max']}"
+        if shards:
+            rows[f'{label} fold (ms)'] = round(fold['seconds'] * 1000, 1)
+
+    print_results('Report confirmations (database)', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--citizens', type=int, default=5000, help='Confirmations of the report per run')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--shards', default='1,4,16,64', help='CONFIRMATION_SHARDS values to compare')
+    args = parser.parse_args()
+    args.shards = [int(s) for s in args.shards.split(',')]
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
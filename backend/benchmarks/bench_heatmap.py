@@ -0,0 +1,101 @@
+"""
+Report heatmap benchmark.
+
+Rasterizes --points report locations over Metro Manila at several sizes,
+with and without smoothing, reporting binning + blur + quantization time
+next to np.histogram2d, and PNG encoding time and size. With --with-db it
+also seeds --db-reports reports and times uncached heatmap requests end
+to end (query, binning and encoding), then cached ones.
+
+    python -m benchmarks.bench_heatmap --points 1000000
+"""
+import argparse
+import time
+
+from benchmarks.harness import benchmark_database, percentiles, print_results, setup_django, timed
+
+SIZES = (256, 512, 1024)
+
+
+def run_in_memory(args):
+    import numpy as np
+
+    from api.services import heatmap
+    from benchmarks.datagen import BBOX, point_arrays
+
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    latitudes, longitudes = point_arrays(args.points, seed=7)
+
+    results = {'points': args.points}
+    for size in SIZES:
+        bbox = heatmap.snap_bbox((min_lon, min_lat, max_lon, max_lat), size, size)
+        for sigma in (0, args.sigma):
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                raster = heatmap.rasterize(latitudes, longitudes, bbox, size, size, sigma)
+                samples.append(time.perf_counter() - start)
+            results[f'{size}px sigma={sigma} p50/p95 (ms)'] = f"{percentiles(samples)['p50']} / {percentiles(samples)['p95']}"
+
+        with timed() as png_time:
+            png = heatmap.encode_png(raster)
+        results[f'{size}px PNG encode (ms) / size (KB)'] = f"{round(png_time['seconds'] * 1000, 1)} / {round(len(png) / 1024, 1)}"
+
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            np.histogram2d(latitudes, longitudes, bins=(size, size), range=[(bbox[1], bbox[3]), (bbox[0], bbox[2])])
+            samples.append(time.perf_counter() - start)
+        results[f'{size}px np.histogram2d p50 (ms)'] = percentiles(samples)['p50']
+
+    print_results('Heatmap rasterization (in memory)', results)
+
+
+def run_database(args):
+    from django.core.cache import cache
+    from django.test import Client
+
+    from benchmarks.datagen import BBOX, generate_citizens, generate_reports
+
+    generate_reports(args.db_reports, generate_citizens(1000))
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    client = Client()
+    params = {'bbox': f'{min_lon},{min_lat},{max_lon},{max_lat}', 'width': 512, 'height': 512, 'sigma': args.sigma}
+
+    cold, warm = [], []
+    for _ in range(args.repeat):
+        cache.clear()
+        start = time.perf_counter()
+        response = client.get('/api/reports/heatmap/', params)
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        client.get('/api/reports/heatmap/', params)
+        warm.append(time.perf_counter() - start)
+
+    print_results('GET /api/reports/heatmap/ (database)', {
+        'reports': args.db_reports,
+        'size': '512x512 PNG',
+        'reports in raster': response['X-Heatmap-Total'],
+        'uncached p50/p95 (ms)': f"{percentiles(cold)['p50']} / {percentiles(cold)['p95']}",
+        'cached p50/p95 (ms)': f"{percentiles(warm)['p50']} / {percentiles(warm)['p95']}",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--sigma', type=float, default=2, help='Gaussian blur in pixels')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--with-db', action='store_true')
+    parser.add_argument('--db-reports', type=int, default=200_000)
+    args = parser.parse_args()
+
+    setup_django()
+    run_in_memory(args)
+    if args.with_db:
+        with benchmark_database():
+            run_database(args)
+
+
+if __name__ == '__main__':
+    main()
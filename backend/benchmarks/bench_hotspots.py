@@ -0,0 +1,91 @@
+"""
+Hotspot detection benchmark.
+
+Always times the in-memory NumPy pass (binning + grid clustering) over
+--reports synthetic points on one core. With --with-db it also seeds the
+reports into the benchmark database and times a full detect_hotspots run
+followed by an incremental run over 1% new reports.
+
+    python -m benchmarks.bench_hotspots --reports 1000000
+    python -m benchmarks.bench_hotspots --reports 1000000 --with-db
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.harness import benchmark_database, print_results, setup_django, timed
+
+
+def compute_pass(args):
+    from django.conf import settings
+    from api.services import hotspots
+    from benchmarks.datagen import point_arrays
+
+    latitudes, longitudes = point_arrays(args.reports)
+    sub_category_ids = np.random.default_rng(7).integers(1, 20, args.reports)
+    cell_size = hotspots.cell_size_degrees()
+
+    with timed() as bin_time:
+        keys, counts = hotspots.bin_points(sub_category_ids, latitudes, longitudes, cell_size)
+
+    with timed() as cluster_time:
+        found = 0
+        sub_ids, cell_x, cell_y = hotspots.unpack_keys(keys)
+        for sub_category_id in np.unique(sub_ids):
+            mask = sub_ids == sub_category_id
+            cells = dict(zip(zip(cell_x[mask].tolist(), cell_y[mask].tolist()), counts[mask].tolist()))
+            for members in hotspots.cluster_cells(cells, settings.HOTSPOT_MIN_REPORTS):
+                hotspots.describe_cluster(members, cells, cell_size, settings.HOTSPOT_MIN_REPORTS)
+                found += 1
+
+    return {
+        'points': args.reports,
+        'occupied cells': len(keys),
+        'hotspots': found,
+        'binning (s)': round(bin_time['seconds'], 3),
+        'clustering (s)': round(cluster_time['seconds'], 3),
+        'total compute (s)': round(bin_time['seconds'] + cluster_time['seconds'], 3),
+    }
+
+
+def database_pass(args):
+    from django.test import override_settings
+
+    from api.services.hotspots import detect_hotspots
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    citizens = generate_citizens(1000)
+    with timed() as seed_time:
+        generate_reports(args.reports, citizens)
+    with timed() as full_time:
+        full = detect_hotspots(full=True)
+
+    # New reports, created now rather than spread over the past year
+    generate_reports(args.reports // 100, citizens, seed=43, days=0)
+    with timed() as incremental_time, override_settings(HOTSPOT_SAFETY_LAG_SECONDS=0):
+        incremental = detect_hotspots()
+
+    return {
+        'seed time (s)': round(seed_time['seconds'], 1),
+        'full run (s)': round(full_time['seconds'], 3),
+        'full run hotspots': full.hotspots_found,
+        'incremental reports': incremental.reports_processed,
+        'incremental run (s)': round(incremental_time['seconds'], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=1_000_000)
+    parser.add_argument('--with-db', action='store_true', help='Also time detect_hotspots against the database')
+    args = parser.parse_args()
+
+    setup_django()
+    print_results('Hotspot detection (NumPy pass, one core)', compute_pass(args))
+    if args.with_db:
+        with benchmark_database():
+            print_results('Hotspot detection (database runs)', database_pass(args))
+
+
+if __name__ == '__main__':
+    main()
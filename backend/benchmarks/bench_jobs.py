@@ -0,0 +1,119 @@
+"""
+Background job queue throughput benchmark.
+
+Queues --jobs no-op jobs and drains them with burst workers, for each
+combination of worker threads and claim batch size, reporting jobs/sec in
+total and per worker. The cost measured is the queue's own: claiming,
+bookkeeping and retry scheduling, not the work inside the jobs.
+
+Then measures email delivery through the ``mail.send`` task against a
+backend that takes --smtp-connect-ms to open a connection and
+--smtp-send-ms per message, comparing claim batch sizes (one connection per
+batch).
+
+    python -m benchmarks.bench_jobs --jobs 5000 --threads 1,2,4 --batch-sizes 1,10,100
+"""
+import argparse
+import threading
+import time
+
+from django.core.mail.backends.base import BaseEmailBackend
+
+from benchmarks.harness import benchmark_database, print_results, setup_django
+
+SMTP_LATENCY = {'connect': 0.0, 'send': 0.0}
+
+
+class LatencyEmailBackend(BaseEmailBackend):
+    """Stand-in for an SMTP server with connection and per-message latency"""
+
+    def open(self):
+        time.sleep(SMTP_LATENCY['connect'])
+        return True
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        time.sleep(SMTP_LATENCY['send'] * len(messages))
+        return len(messages)
+
+
+def drain(threads, batch_size, queues=None):
+    """Run burst workers until the queue is empty; returns jobs processed and seconds"""
+    from django.db import connections
+    from api.services.jobs import Worker
+
+    processed = []
+
+    def work():
+        try:
+            processed.append(Worker(queues=queues, batch_size=batch_size, poll_interval=0).run(burst=True))
+        finally:
+            connections.close_all()
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(processed), time.perf_counter() - start
+
+
+def run(args):
+    from django.test import override_settings
+    from api.models import Job
+    from api.services import jobs
+    from api.services.mail import queue_emails
+
+    jobs.task('bench.noop')(lambda **payload: None)
+
+    rows = {'jobs per run': args.jobs}
+    for threads in args.threads:
+        for batch_size in args.batch_sizes:
+            Job.objects.all().delete()
+            jobs.enqueue_many('bench.noop', [{'n': i} for i in range(args.jobs)])
+            processed, seconds = drain(threads, batch_size)
+            assert processed == args.jobs == Job.objects.filter(state=Job.State.DONE).count()
+            rate = processed / seconds
+            rows[f'no-op, {threads} threads, batch {batch_size} (jobs/s, per worker)'] = (
+                f'{rate:.0f}, {rate / threads:.0f}'
+            )
+
+    SMTP_LATENCY.update(connect=args.smtp_connect_ms / 1000, send=args.smtp_send_ms / 1000)
+    with override_settings(EMAIL_BACKEND=f'{__name__}.LatencyEmailBackend'):
+        for batch_size in args.email_batch_sizes:
+            Job.objects.all().delete()
+            queue_emails([
+                {'to': f'citizen{i}@example.com', 'subject': 'Report update', 'body': 'Your report was resolved'}
+                for i in range(args.emails)
+            ])
+            processed, seconds = drain(1, batch_size, queues=['mail'])
+            assert processed == args.emails
+            rows[f'email, 1 thread, batch {batch_size} (emails/s)'] = f'{processed / seconds:.0f}'
+
+    print_results('Background job throughput', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--threads', default='1,2,4')
+    parser.add_argument('--batch-sizes', default='1,10,100')
+    parser.add_argument('--emails', type=int, default=500)
+    parser.add_argument('--email-batch-sizes', default='1,10,50')
+    parser.add_argument('--smtp-connect-ms', type=float, default=50, help='Connection + TLS + AUTH time')
+    parser.add_argument('--smtp-send-ms', type=float, default=2, help='Time per message on an open connection')
+    args = parser.parse_args()
+    args.threads = [int(t) for t in args.threads.split(',')]
+    args.batch_sizes = [int(b) for b in args.batch_sizes.split(',')]
+    args.email_batch_sizes = [int(b) for b in args.email_batch_sizes.split(',')]
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
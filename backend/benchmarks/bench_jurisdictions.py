@@ -0,0 +1,163 @@
+"""
+Jurisdiction routing benchmark.
+
+Tiles the Metro Manila bounding box with --polygons wobbly jurisdiction
+polygons (--vertices each) and routes --reports points through the grid
+index, reporting build time and per-lookup latency next to a naive scan
+over every polygon. With --with-db it also seeds the reports, assigns them
+and times the authority-scoped first page query on assigned_authority_id.
+
+    python -m benchmarks.bench_jurisdictions --polygons 400 --reports 100000
+"""
+import argparse
+import math
+import time
+
+from benchmarks.harness import benchmark_database, percentiles, print_results, setup_django, timed
+
+
+def wobble(x, y, amplitude):
+    """Deterministic offset so neighbouring polygons share identical edges"""
+    return amplitude * math.sin(x * 1e4 + y * 3e4), amplitude * math.cos(x * 2e4 - y * 1e4)
+
+
+def tile_polygons(count, vertices_per_polygon):
+    """Split the benchmark bbox into ~count polygons with subdivided edges"""
+    from benchmarks.datagen import BBOX
+
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    side = max(int(math.sqrt(count)), 1)
+    width = (max_lon - min_lon) / side
+    height = (max_lat - min_lat) / side
+    steps = max(vertices_per_polygon // 4, 1)
+    amplitude = min(width, height) / 10
+
+    def point(x, y):
+        on_border = x in (min_lon, max_lon) or y in (min_lat, max_lat)
+        dx, dy = (0.0, 0.0) if on_border else wobble(round(x, 9), round(y, 9), amplitude)
+        return [x + dx, y + dy]
+
+    polygons = []
+    for i in range(side):
+        for j in range(side):
+            x0, y0 = min_lon + i * width, min_lat + j * height
+            x1, y1 = x0 + width, y0 + height
+            corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]
+            ring = []
+            for (ax, ay), (bx, by) in zip(corners, corners[1:]):
+                for k in range(steps):
+                    t = k / steps
+                    ring.append(point(ax + (bx - ax) * t, ay + (by - ay) * t))
+            ring.append(ring[0])
+            polygons.append((len(polygons) + 1, {'type': 'Polygon', 'coordinates': [ring]}))
+    return polygons
+
+
+def naive_lookup(polygons, latitude, longitude):
+    from api.services.spatial import polygons_contain
+
+    for key, rings in polygons:
+        if polygons_contain(rings, longitude, latitude):
+            return key
+    return None
+
+
+def run_in_memory(args):
+    from django.conf import settings
+    from api.services.spatial import PolygonGridIndex, polygon_rings
+    from benchmarks.datagen import point_arrays
+
+    polygons = tile_polygons(args.polygons, args.vertices)
+    latitudes, longitudes = point_arrays(args.reports)
+    points = list(zip(latitudes.tolist(), longitudes.tolist()))
+
+    with timed() as build_time:
+        index = PolygonGridIndex(polygons, cell_size=settings.JURISDICTION_INDEX_CELL_SIZE)
+
+    samples = []
+    routed = 0
+    for latitude, longitude in points:
+        start = time.perf_counter()
+        key = index.lookup(latitude, longitude)
+        samples.append(time.perf_counter() - start)
+        routed += key is not None
+
+    parsed = [(key, polygon_rings(geometry)) for key, geometry in polygons]
+    naive_samples = []
+    for latitude, longitude in points[:args.naive_sample]:
+        start = time.perf_counter()
+        naive_lookup(parsed, latitude, longitude)
+        naive_samples.append(time.perf_counter() - start)
+
+    stats = percentiles(samples)
+    naive = percentiles(naive_samples)
+    print_results('Jurisdiction routing (in memory)', {
+        'polygons': len(polygons),
+        'vertices per polygon': args.vertices,
+        'points': len(points),
+        'routed': routed,
+        'index build (s)': round(build_time['seconds'], 3),
+        'grid lookup mean (us)': round(sum(samples) / len(samples) * 1e6, 2),
+        'grid lookup p99 (us)': round(stats['p99'] * 1000, 2),
+        'naive scan mean (us)': round(sum(naive_samples) / len(naive_samples) * 1e6, 2),
+        'naive scan p99 (us)': round(naive['p99'] * 1000, 2),
+    })
+    return polygons, index
+
+
+def run_database(args, polygons, index):
+    from api.models import Authority, Report
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    Authority.objects.bulk_create([
+        Authority(id=key, authority_name=f'Authority {key}', email=f'authority{key}@example.com',
+                  password='x', jurisdiction=geometry)
+        for key, geometry in polygons
+    ])
+    generate_reports(args.reports, generate_citizens(1000))
+
+    with timed() as assign_time:
+        by_authority = {}
+        for report_id, latitude, longitude in Report.objects.values_list('id', 'latitude', 'longitude').iterator(chunk_size=10000):
+            authority_id = index.lookup(latitude, longitude)
+            if authority_id is not None:
+                by_authority.setdefault(authority_id, []).append(report_id)
+        for authority_id, report_ids in by_authority.items():
+            for start in range(0, len(report_ids), 5000):
+                Report.objects.filter(id__in=report_ids[start:start + 5000]).update(assigned_authority_id=authority_id)
+
+    busiest = max(by_authority, key=lambda a: len(by_authority[a]))
+    samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        list(Report.objects.filter(assigned_authority_id=busiest).order_by('-created_at').values_list('id', flat=True)[:10])
+        samples.append(time.perf_counter() - start)
+
+    stats = percentiles(samples)
+    print_results('Authority-scoped listing (database)', {
+        'reports': args.reports,
+        'assignment of all reports (s)': round(assign_time['seconds'], 2),
+        'busiest authority reports': len(by_authority[busiest]),
+        'first page p50/p95 (ms)': f"{stats['p50']} / {stats['p95']}",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--polygons', type=int, default=400)
+    parser.add_argument('--vertices', type=int, default=64, help='Vertices per polygon')
+    parser.add_argument('--reports', type=int, default=100_000)
+    parser.add_argument('--naive-sample', type=int, default=2000, help='Points routed with the naive scan')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--with-db', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    polygons, index = run_in_memory(args)
+    if args.with_db:
+        with benchmark_database():
+            run_database(args, polygons, index)
+
+
+if __name__ == '__main__':
+    main()
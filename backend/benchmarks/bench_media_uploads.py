@@ -0,0 +1,149 @@
+"""
+Concurrent photo upload benchmark.
+
+Simulates N citizens each uploading photos in resumable chunks through the
+real HTTP stack (Django test client), then runs the thumbnail/EXIF jobs
+they queued. Reports upload latency percentiles, throughput and peak
+RSS; the latter should stay flat as --size grows because request bodies
+are streamed to disk rather than buffered.
+
+    python -m benchmarks.bench_media_uploads --clients 16 --uploads 4 --size 2097152
+"""
+import argparse
+import io
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.harness import (
+    benchmark_database,
+    peak_rss_mb,
+    percentiles,
+    print_results,
+    setup_django,
+    timed,
+)
+
+
+def make_photo(width, height, seed):
+    """Render a noisy JPEG so every upload has distinct content"""
+    from PIL import Image
+
+    image = Image.effect_noise((width, height), 64).convert('RGB')
+    image.putpixel((0, 0), (seed % 256, (seed // 256) % 256, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def upload(client, report_id, photo, chunk_size):
+    response = client.post(
+        f'/api/reports/{report_id}/media/',
+        {'content_type': 'image/jpeg', 'size': len(photo)},
+        format='json'
+    )
+    upload_id = response.data['data']['upload_id']
+    for start in range(0, len(photo), chunk_size):
+        end = min(start + chunk_size, len(photo))
+        response = client.generic(
+            'PUT',
+            f'/api/media/uploads/{upload_id}/',
+            photo[start:end],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(photo)}'
+        )
+    assert response.status_code == 201, response.content
+
+
+def run(args):
+    from django.db import close_old_connections
+    from rest_framework.test import APIClient
+    from api.models import Category, Citizen, Report, ReportMedia, Status
+    from api.services import jobs
+    from api.views.auth import get_tokens_for_user
+
+    pending = Status.objects.get(code='pending')
+    category = Category.objects.get(report_type='Infrastructure')
+
+    # A JPEG of noise at quality 85 takes roughly 0.6 bytes per pixel
+    side = int((args.size / 0.6) ** 0.5)
+    clients = []
+    for i in range(args.clients):
+        citizen = Citizen.objects.create(
+            name=f'Bench {i}', email=f'bench{i}@example.com', password='x'
+        )
+        report = Report.objects.create(
+            citizen=citizen, status=pending, report_type=category,
+            title='Pothole', latitude='14.599500', longitude='120.984200',
+        )
+        client = APIClient()
+        tokens = get_tokens_for_user(citizen.id, 'citizen', citizen.email)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        photos = [make_photo(side, side, i * args.uploads + n) for n in range(args.uploads)]
+        clients.append((client, report.id, photos))
+
+    total_bytes = sum(len(p) for _, _, photos in clients for p in photos)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(client, report_id, photos):
+        try:
+            for photo in photos:
+                start = time.perf_counter()
+                upload(client, report_id, photo, args.chunk_size)
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+        finally:
+            close_old_connections()
+
+    threads = [threading.Thread(target=worker, args=c) for c in clients]
+    with timed() as uploads_time:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    with timed() as drain_time:
+        jobs.Worker(queues=['media'], poll_interval=0).run(burst=True)
+
+    ready = ReportMedia.objects.filter(processing_status='ready').count()
+    stats = percentiles(latencies)
+    print_results('Concurrent media uploads', {
+        'clients': args.clients,
+        'uploads': len(latencies),
+        'avg photo size (KiB)': round(total_bytes / max(len(latencies), 1) / 1024, 1),
+        'chunk size (KiB)': args.chunk_size // 1024,
+        'upload p50 (ms)': stats['p50'],
+        'upload p95 (ms)': stats['p95'],
+        'upload p99 (ms)': stats['p99'],
+        'upload wall time (s)': round(uploads_time['seconds'], 3),
+        'throughput (MiB/s)': round(total_bytes / 1024 / 1024 / uploads_time['seconds'], 2),
+        'pipeline drain (s)': round(drain_time['seconds'], 3),
+        'processed ok': f'{ready}/{len(latencies)}',
+        'peak RSS (MiB)': round(peak_rss_mb(), 1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--uploads', type=int, default=4, help='Uploads per client')
+    parser.add_argument('--size', type=int, default=1024 * 1024, help='Approximate photo size in bytes')
+    parser.add_argument('--chunk-size', type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+
+    media_root = tempfile.mkdtemp()
+    try:
+        with override_settings(MEDIA_ROOT=media_root, MEDIA_PIPELINE_EAGER=False):
+            with benchmark_database():
+                run(args)
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Request instrumentation overhead benchmark.
+
+Measures what RequestMetricsMiddleware adds to a request, two ways:
+
+- directly: the fixed cost around an empty view, plus the extra cost of a
+  sampled request around a view issuing --queries queries;
+- end to end, by alternating report list requests with the middleware
+  removed and installed at the configured sample rate.
+
+The expected overhead at a sample rate is the unsampled cost plus the
+rate times the extra cost of a sampled request, as a share of a typical
+report list request.
+
+    python -m benchmarks.bench_metrics --sample-rate 0.1
+"""
+import argparse
+import time
+
+from benchmarks.harness import benchmark_database, percentiles, print_results, setup_django
+
+
+def mean_seconds(func, repeat, chunk=50):
+    """Per-call time of ``func``: the fastest mean over chunks of calls, to damp noise"""
+    best = float('inf')
+    for _ in range(max(1, repeat // chunk)):
+        start = time.perf_counter()
+        for _ in range(chunk):
+            func()
+        best = min(best, (time.perf_counter() - start) / chunk)
+    return best
+
+
+def run(args):
+    from django.conf import settings
+    from django.http import HttpResponse
+    from django.test import Client, RequestFactory, override_settings
+    from api.middleware import RequestMetricsMiddleware
+    from api.models import Status
+    from api.views.auth import get_tokens_for_user
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    def empty_view(request):
+        return HttpResponse()
+
+    def query_view(request):
+        for _ in range(args.queries):
+            Status.objects.filter(code='pending').exists()
+        return HttpResponse()
+
+    request = RequestFactory().get('/bench/')
+    repeat = args.repeat * 20
+    # Fixed cost on every request, measured around a view doing nothing
+    with override_settings(METRICS_SAMPLE_RATE=0.0):
+        unsampled = (
+            mean_seconds(lambda: RequestMetricsMiddleware(empty_view)(request), repeat)
+            - mean_seconds(lambda: empty_view(request), repeat)
+        )
+    # Extra cost of sampling: wrapper installation plus per-query accounting
+    middleware = RequestMetricsMiddleware(query_view)
+    with override_settings(METRICS_SAMPLE_RATE=1.0):
+        sampled_with_queries = mean_seconds(lambda: middleware(request), args.repeat)
+    with override_settings(METRICS_SAMPLE_RATE=0.0):
+        unsampled_with_queries = mean_seconds(lambda: middleware(request), args.repeat)
+    sampled = unsampled + max(0.0, sampled_with_queries - unsampled_with_queries)
+
+    citizens = generate_citizens(100)
+    generate_reports(args.reports, citizens)
+    token = get_tokens_for_user(citizens[0], 'citizen', 'citizen42-0@example.com')['access']
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    without_middleware = [m for m in settings.MIDDLEWARE if m != 'api.middleware.RequestMetricsMiddleware']
+
+    # Alternate the two configurations so drift affects both equally
+    plain, instrumented = [], []
+    for _ in range(args.repeat):
+        with override_settings(MIDDLEWARE=without_middleware):
+            start = time.perf_counter()
+            client.get('/api/reports/')
+            plain.append(time.perf_counter() - start)
+        with override_settings(METRICS_SAMPLE_RATE=args.sample_rate):
+            start = time.perf_counter()
+            client.get('/api/reports/')
+            instrumented.append(time.perf_counter() - start)
+
+    plain_stats, instrumented_stats = percentiles(plain), percentiles(instrumented)
+    expected = unsampled + args.sample_rate * (sampled - unsampled)
+    report_list_mean = sum(plain) / len(plain)
+
+    print_results('Request instrumentation overhead', {
+        'queries per request (micro)': args.queries,
+        'unsampled request cost (us)': round(unsampled * 1e6, 1),
+        'sampled request cost (us)': round(sampled * 1e6, 1),
+        'sample rate': args.sample_rate,
+        'expected cost per request (us)': round(expected * 1e6, 1),
+        'report list mean (ms)': round(report_list_mean * 1000, 2),
+        'expected overhead (%)': round(100 * expected / report_list_mean, 2),
+        'report list p50 without / with (ms)': f"{plain_stats['p50']} / {instrumented_stats['p50']}",
+        'report list p95 without / with (ms)': f"{plain_stats['p95']} / {instrumented_stats['p95']}",
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sample-rate', type=float, default=0.1)
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--reports', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
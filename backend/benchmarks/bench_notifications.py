@@ -0,0 +1,102 @@
+"""
+Status change notification throughput benchmark.
+
+Makes --changes status changes spread over the reports of --citizens
+citizens through Report.save (the request-path cost of recording them),
+then delivers the digests (the digest jobs and the mail jobs they queue)
+with one worker against an email backend taking --smtp-connect-ms per
+connection and --smtp-send-ms per message, for each claim batch size. The baseline sends one email per change over a fresh
+connection, as a synchronous implementation would.
+
+    python -m benchmarks.bench_notifications --citizens 1000 --changes 5000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_jobs import SMTP_LATENCY, drain
+from benchmarks.harness import (
+    benchmark_database,
+    percentiles,
+    print_results,
+    setup_django,
+)
+
+
+def run(args):
+    from django.core.mail import EmailMessage, get_connection
+    from django.test import override_settings
+    from api.models import Job, Notification, Report, Status
+    from api.services import jobs
+    from api.services.notifications import DIGEST_TASK
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    citizens = generate_citizens(args.citizens)
+    generate_reports(args.citizens * 3, citizens)
+    report_ids = list(Report.objects.values_list('id', flat=True))
+    statuses = list(Status.objects.all())
+    rng = random.Random(42)
+
+    samples = []
+    for _ in range(args.changes):
+        report = Report.objects.get(id=rng.choice(report_ids))
+        report.status = rng.choice([s for s in statuses if s.id != report.status_id])
+        start = time.perf_counter()
+        report.save()
+        samples.append(time.perf_counter() - start)
+    save_stats = percentiles(samples)
+
+    digests = Notification.objects.order_by().values('citizen_id').distinct().count()
+    rows = {
+        'status changes': args.changes,
+        'citizens notified': digests,
+        'Report.save with notification p50/p95 (ms)': f"{save_stats['p50']} / {save_stats['p95']}",
+    }
+
+    SMTP_LATENCY.update(connect=args.smtp_connect_ms / 1000, send=args.smtp_send_ms / 1000)
+    with override_settings(EMAIL_BACKEND='benchmarks.bench_jobs.LatencyEmailBackend'):
+        start = time.perf_counter()
+        for notification in Notification.objects.select_related('citizen')[:args.baseline_sample]:
+            with get_connection() as connection:
+                connection.send_messages([EmailMessage(
+                    'Update on your report', f'Report #{notification.report_id} changed',
+                    to=[notification.citizen.email],
+                )])
+        per_change = (time.perf_counter() - start) / args.baseline_sample
+        rows['baseline: email per change (s, estimated)'] = round(per_change * args.changes, 1)
+
+        for batch_size in args.batch_sizes:
+            Notification.objects.update(sent_at=None)
+            Job.objects.all().delete()
+            jobs.enqueue_many(DIGEST_TASK, [
+                {'citizen_id': citizen_id}
+                for citizen_id in Notification.objects.order_by().values_list('citizen_id', flat=True).distinct()
+            ])
+            _, seconds = drain(1, batch_size, queues=['notifications', 'mail'])
+            assert not Job.objects.exclude(state=Job.State.DONE).exists()
+            assert not Notification.objects.filter(sent_at__isnull=True).exists()
+            rows[f'digests, batch {batch_size} (s, emails/s, changes/s)'] = (
+                f'{seconds:.1f}, {digests / seconds:.0f}, {args.changes / seconds:.0f}'
+            )
+
+    print_results('Status change notifications', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--citizens', type=int, default=1000)
+    parser.add_argument('--changes', type=int, default=5000)
+    parser.add_argument('--batch-sizes', default='1,10,50')
+    parser.add_argument('--baseline-sample', type=int, default=100, help='Emails sent to time the baseline')
+    parser.add_argument('--smtp-connect-ms', type=float, default=50, help='Connection + TLS + AUTH time')
+    parser.add_argument('--smtp-send-ms', type=float, default=2, help='Time per message on an open connection')
+    args = parser.parse_args()
+    args.batch_sizes = [int(b) for b in args.batch_sizes.split(',')]
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Outbox benchmark: cost of recording events and change stream throughput.
+
+Times Report.create with and without the outbox write, then fills the
+outbox with --events events (a creation per report, then status changes
+of random reports) and drains it with stream_batch, for each batch size in
+--batch-sizes: to NDJSON files, to a sink that discards batches (the cost
+of reading and encoding alone) and to NDJSON files with compaction.
+
+    python -m benchmarks.bench_outbox --events 200000 --batch-sizes 1000,5000,20000
+"""
+import argparse
+import random
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks.harness import benchmark_database, percentiles, print_results, setup_django
+
+
+class NullSink:
+    """Sink discarding everything"""
+
+    def write(self, batch):
+        pass
+
+    def close(self):
+        pass
+
+
+def time_creates(count, citizen_id, record):
+    """Latencies of creating ``count`` reports, with ``record`` as the outbox writer"""
+    from api.models import Category, Report, Status
+    from api.services import outbox
+
+    category = Category.objects.get(report_type='Infrastructure')
+    pending = Status.objects.get(code='pending')
+    latencies = []
+    with mock.patch.object(outbox, 'record_report_save', record):
+        for n in range(count):
+            start = time.perf_counter()
+            Report.objects.create(
+                citizen_id=citizen_id, status=pending, report_type=category, title=f'Pothole {n}',
+                latitude='14.599500', longitude='120.984200',
+            )
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def fill_outbox(count, seed=42, batch_size=5000):
+    """Bulk insert ``count`` events about the existing reports"""
+    from api.models import OutboxEvent, Report
+    from api.services.outbox import report_payload
+
+    rng = random.Random(seed)
+    reports = list(Report.objects.order_by('id'))
+    status_ids = sorted({report.status_id for report in reports})
+    created = 0
+    while created < count:
+        batch = []
+        for n in range(created, min(created + batch_size, count)):
+            if n < len(reports):
+                report, event_type, old_status_id = reports[n], OutboxEvent.Type.REPORT_CREATED, None
+            else:
+                report = rng.choice(reports)
+                old_status_id, report.status_id = report.status_id, rng.choice(status_ids)
+                event_type = OutboxEvent.Type.STATUS_CHANGED
+            batch.append(OutboxEvent(
+                event_type=event_type, report_id=report.id, payload=report_payload(report, old_status_id)
+            ))
+        OutboxEvent.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def drain(consumer, sink, batch_size, compact):
+    """Stream the whole outbox; returns (seconds, events read, events delivered, batch latencies)"""
+    from api.services.outbox import stream_batch
+
+    read = delivered = 0
+    latencies = []
+    start = time.perf_counter()
+    while True:
+        batch_start = time.perf_counter()
+        batch_read, batch_delivered = stream_batch(consumer, sink, batch_size, compact)
+        if not batch_read:
+            break
+        latencies.append(time.perf_counter() - batch_start)
+        read += batch_read
+        delivered += batch_delivered
+    return time.perf_counter() - start, read, delivered, latencies
+
+
+def run(args):
+    from api.models import OutboxEvent
+    from api.services import outbox
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    citizen_ids = generate_citizens(args.citizens)
+    rows = {}
+    original = outbox.record_report_save
+    for label, record in [('without outbox', lambda *a: None), ('with outbox', original)]:
+        latency = percentiles(time_creates(args.creates, citizen_ids[0], record))
+        rows[f'Report.create {label} p50/p95 (ms)'] = f"{latency['p50']} / {latency['p95']}"
+
+    generate_reports(min(args.reports, args.events), citizen_ids)
+    # On top of the events of the timed creations
+    fill_outbox(args.events - OutboxEvent.objects.count())
+    rows['events'] = args.events
+
+    for batch_size in args.batch_sizes:
+        runs = [
+            ('ndjson', lambda directory: outbox.NdjsonSink(directory), False),
+            ('discard', lambda directory: NullSink(), False),
+            ('ndjson, compacted', lambda directory: outbox.NdjsonSink(directory), True),
+        ]
+        for label, make_sink, compact in runs:
+            with tempfile.TemporaryDirectory() as directory:
+                consumer = f'bench-{batch_size}-{label}'
+                seconds, read, delivered, latencies = drain(consumer, make_sink(directory), batch_size, compact)
+            assert read == args.events, (read, args.events)
+            batch = percentiles(latencies)
+            rows[f'batch {batch_size}, {label} (events/s)'] = f'{read / seconds:.0f}'
+            rows[f'batch {batch_size}, {label} batch p50/max (ms)'] = f"{batch['p50']} / {batch['max']}"
+            if compact:
+                rows[f'batch {batch_size}, {label} delivered'] = delivered
+
+    print_results('Transactional outbox (database)', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--reports', type=int, default=50_000, help='Reports the events are about')
+    parser.add_argument('--citizens', type=int, default=1000)
+    parser.add_argument('--creates', type=int, default=500, help='Reports created to time the outbox write')
+    parser.add_argument('--batch-sizes', default='1000,5000,20000', help='Batch sizes to compare')
+    args = parser.parse_args()
+    args.batch_sizes = [int(s) for s in args.batch_sizes.split(',')]
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
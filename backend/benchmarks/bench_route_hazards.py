@@ -0,0 +1,151 @@
+"""
+Hazards-along-route benchmark.
+
+Builds the corridor index of --points report locations and finds the ones
+within a --width meter corridor around --routes random routes of
+--route-km kilometers (vertices every --step meters, wandering over Metro
+Manila like a long drive would), reporting build time, index memory and
+per-route query latency next to a vectorised scan of every point for a few
+routes. With --with-db it also seeds --db-reports reports and times
+hazards_along_route() end to end (index build, query and report loading).
+
+    python -m benchmarks.bench_route_hazards --points 1000000 --route-km 200
+"""
+import argparse
+import time
+
+from benchmarks.harness import benchmark_database, peak_rss_mb, percentiles, print_results, setup_django, timed
+
+
+def generate_route(length_km, step, seed):
+    """
+    A random walk of ``length_km`` kilometers inside the benchmark area.
+
+    Returns:
+        tuple: (latitudes, longitudes) arrays of its vertices
+    """
+    import numpy as np
+
+    from api.services.geofence import METERS_PER_DEGREE
+    from benchmarks.datagen import BBOX
+
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    rng = np.random.default_rng(seed)
+    count = int(length_km * 1000 / step) + 1
+    # Headings drift slowly, as roads do
+    heading = np.cumsum(rng.normal(0, 0.3, count))
+    lat = np.empty(count)
+    lon = np.empty(count)
+    lat[0], lon[0] = rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)
+    dlat = np.sin(heading) * step / METERS_PER_DEGREE
+    dlon = np.cos(heading) * step / (METERS_PER_DEGREE * np.cos(np.radians(lat[0])))
+    for i in range(1, count):
+        lat[i], lon[i] = lat[i - 1] + dlat[i], lon[i - 1] + dlon[i]
+        # Bounce off the edges of the area
+        if not min_lat <= lat[i] <= max_lat:
+            dlat[i:] = -dlat[i:]
+            lat[i] = lat[i - 1] + dlat[i]
+        if not min_lon <= lon[i] <= max_lon:
+            dlon[i:] = -dlon[i:]
+            lon[i] = lon[i - 1] + dlon[i]
+    return lat, lon
+
+
+def run_in_memory(args):
+    import numpy as np
+
+    from django.conf import settings
+    from api.services.corridor import PointGridIndex, Segments
+    from benchmarks.datagen import point_arrays
+
+    latitudes, longitudes = point_arrays(args.points, seed=7)
+    with timed() as build_time:
+        index = PointGridIndex(np.arange(args.points), latitudes, longitudes, cell_size=settings.ROUTE_INDEX_CELL_SIZE)
+
+    routes = [generate_route(args.route_km, args.step, seed) for seed in range(args.routes)]
+    samples, found = [], 0
+    for route_lat, route_lon in routes:
+        start = time.perf_counter()
+        keys, _, _ = index.near_route(route_lat, route_lon, args.width / 2)
+        samples.append(time.perf_counter() - start)
+        found += len(keys)
+
+    # The same exact distances without the grid: every point against every
+    # segment, a slice of segments at a time to bound memory
+    naive_samples = []
+    for route_lat, route_lon in routes[:args.naive_sample]:
+        start = time.perf_counter()
+        segments = Segments(route_lat[:-1], route_lon[:-1], route_lat[1:], route_lon[1:])
+        nearest = np.full(args.points, np.inf)
+        for segment in range(len(segments)):
+            distance, _ = segments.distances(latitudes, longitudes, np.full(args.points, segment))
+            np.minimum(nearest, distance, out=nearest)
+            if time.perf_counter() - start > 10:
+                break
+        np.flatnonzero(nearest <= args.width / 2)
+        naive_samples.append((time.perf_counter() - start) * len(segments) / (segment + 1))
+
+    stats = percentiles(samples)
+    print_results('Hazards along route (in memory)', {
+        'points': args.points,
+        'route (km)': args.route_km,
+        'vertices per route': len(routes[0][0]),
+        'corridor width (m)': args.width,
+        'routes': args.routes,
+        'points found per route': round(found / len(routes), 1),
+        'index build (s)': round(build_time['seconds'], 2),
+        'index memory (MB)': round(index.nbytes / 1e6, 1),
+        'peak RSS (MiB)': round(peak_rss_mb()),
+        'query mean (ms)': round(sum(samples) / len(samples) * 1000, 1),
+        'query p50/p95/p99 (ms)': ' / '.join(str(stats[p]) for p in ('p50', 'p95', 'p99')),
+        'full scan per route (s, extrapolated)': round(sum(naive_samples) / max(len(naive_samples), 1), 1),
+    })
+
+
+def run_database(args):
+    from api.services import route_hazards
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    generate_reports(args.db_reports, generate_citizens(1000))
+    with timed() as build_time:
+        route_hazards.get_index()
+
+    samples, found = [], 0
+    for seed in range(args.routes):
+        route_lat, route_lon = generate_route(args.route_km, args.step, seed)
+        start = time.perf_counter()
+        reports, _ = route_hazards.hazards_along_route(list(zip(route_lat.tolist(), route_lon.tolist())), args.width)
+        samples.append(time.perf_counter() - start)
+        found += len(reports)
+
+    stats = percentiles(samples)
+    print_results('hazards_along_route (database)', {
+        'reports': args.db_reports,
+        'open hazards indexed': len(route_hazards._index.base),
+        'index build from database (s)': round(build_time['seconds'], 2),
+        'reports returned per route': round(found / args.routes, 1),
+        'query p50/p95/p99 (ms)': ' / '.join(str(stats[p]) for p in ('p50', 'p95', 'p99')),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--route-km', type=float, default=200)
+    parser.add_argument('--step', type=float, default=50, help='Meters between route vertices')
+    parser.add_argument('--width', type=float, default=100, help='Corridor width in meters')
+    parser.add_argument('--routes', type=int, default=50)
+    parser.add_argument('--naive-sample', type=int, default=1, help='Routes matched with the full scan')
+    parser.add_argument('--with-db', action='store_true')
+    parser.add_argument('--db-reports', type=int, default=200_000)
+    args = parser.parse_args()
+
+    setup_django()
+    run_in_memory(args)
+    if args.with_db:
+        with benchmark_database():
+            run_database(args)
+
+
+if __name__ == '__main__':
+    main()
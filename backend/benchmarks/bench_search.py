@@ -0,0 +1,78 @@
+"""
+Report search latency benchmark.
+
+Seeds --reports synthetic reports, builds the search index (the fallback
+inverted index on SQLite; PostgreSQL maintains its GIN-indexed column by
+itself) and measures the latency of fetching the first page of ranked
+results, alone and combined with category/sub-category filters.
+
+    python -m benchmarks.bench_search --reports 1000000
+"""
+import argparse
+import time
+
+from benchmarks.harness import (
+    benchmark_database,
+    percentiles,
+    print_results,
+    setup_django,
+    timed,
+)
+
+QUERIES = ['flooding', 'pothole rizal', 'fallen tree storm', 'streetlight', 'sinkhole edsa']
+
+
+def run(args):
+    from django.db import connection
+    from api.models import Report, SubCategory
+    from api.services import search
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    with timed() as seed_time:
+        citizens = generate_citizens(args.citizens)
+        generate_reports(args.reports, citizens)
+    with timed() as index_time:
+        search.rebuild_index(Report.objects.all(), batch_size=10000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    flooding = SubCategory.objects.get(sub_category='FLOODING')
+    cases = {f'q={q}': {} for q in QUERIES}
+    cases['q=flooding&category=Hazard'] = {'report_type_id': flooding.report_type_id}
+    cases['q=flooding&sub_category=FLOODING'] = {'sub_category_id': flooding.id}
+
+    rows = {
+        'backend': 'postgres tsvector + GIN' if search.uses_native_search() else 'inverted index',
+        'reports': args.reports,
+        'seed time (s)': round(seed_time['seconds'], 1),
+        'index build (s)': round(index_time['seconds'], 1),
+    }
+    for label, filters in cases.items():
+        query = label.split('&')[0][2:]
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            queryset = search.search_reports(Report.objects.filter(**filters), query)
+            list(queryset.order_by('-search_rank', '-created_at').values_list('id', flat=True)[:args.page_size])
+            samples.append(time.perf_counter() - start)
+        stats = percentiles(samples)
+        rows[f'{label} p50/p95 (ms)'] = f"{stats['p50']} / {stats['p95']}"
+
+    print_results('Report search latency', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=1_000_000)
+    parser.add_argument('--citizens', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Open-data snapshot build benchmark.
+
+Builds the day partitions of --reports reports (spread over --days days)
+from scratch, then again with nothing changed, then after changing the
+status of one report. Reports rows/s, file sizes and peak memory, which
+stays flat however many reports a day holds.
+
+    python -m benchmarks.bench_snapshots --reports 200000 --days 365
+"""
+import argparse
+import tempfile
+
+from benchmarks.harness import benchmark_database, peak_rss_mb, print_results, setup_django, timed
+
+
+def run(args):
+    from django.test import override_settings
+
+    from api.models import Report, Status
+    from api.services import snapshots
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    generate_reports(args.reports, generate_citizens(args.citizens), days=args.days)
+    rows = {'reports': args.reports}
+    with tempfile.TemporaryDirectory() as directory, override_settings(SNAPSHOT_ROOT=directory):
+        with timed() as full:
+            counts = snapshots.build(chunk_size=args.chunk_size)
+        rows['full build (s)'] = round(full['seconds'], 2)
+        rows['full build (rows/s)'] = f"{args.reports / full['seconds']:.0f}"
+        rows['days written'] = counts['written']
+
+        with timed() as unchanged:
+            snapshots.build(chunk_size=args.chunk_size)
+        rows['unchanged build (ms)'] = round(unchanged['seconds'] * 1000, 1)
+
+        report = Report.objects.order_by('?').first()
+        report.status = Status.objects.exclude(id=report.status_id).first()
+        report.save()
+        with timed() as one_day:
+            counts = snapshots.build(chunk_size=args.chunk_size)
+        rows['build after one change (ms)'] = round(one_day['seconds'] * 1000, 1)
+        rows['days rewritten'] = counts['written']
+
+        partitions = snapshots.read_manifest()['partitions'].values()
+        for fmt in snapshots.FORMATS:
+            size = sum(p['files'][fmt]['size'] for p in partitions)
+            rows[f'{fmt}.gz total (MB)'] = round(size / 1e6, 2)
+            rows[f'{fmt}.gz bytes per report'] = round(size / args.reports, 1)
+    rows['peak RSS (MiB)'] = round(peak_rss_mb(), 1)
+
+    print_results('Open-data snapshots (database)', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=200_000)
+    parser.add_argument('--days', type=int, default=365, help='Days the reports are spread over')
+    parser.add_argument('--citizens', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=None, help='Rows fetched per round trip')
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
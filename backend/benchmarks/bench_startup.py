@@ -0,0 +1,190 @@
+"""
+API process startup time and memory benchmark.
+
+Cold boot: for the default and the API-only settings, starts --runs fresh
+interpreters under ``python -X importtime`` that load the WSGI application
+and the URLconf (what a worker does before serving its first request),
+and reports the median boot time, time spent importing, modules loaded
+and peak RSS, plus the slowest top-level imports.
+
+Workers: serves a seeded database with gunicorn (gunicorn.conf.py, --workers
+workers) for each profile with and without preloading, sends --requests
+requests, then reads the workers' CPU time spent so far (mostly booting)
+and their unique (USS) and proportional (PSS) memory from /proc (Linux).
+
+    python -m benchmarks.bench_startup --runs 10 --workers 4
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.harness import benchmark_database, print_results, setup_django
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'default': 'smartwayz_backend.settings',
+    'api-only': 'smartwayz_backend.settings_api',
+}
+
+BOOT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from smartwayz_backend.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'modules': len(sys.modules),
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def parse_importtime(output):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        dict: Cumulative microseconds of each top-level import (imports
+        made by other imports are included in their parent's time)
+    """
+    top_level = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            top_level[name.strip()] = int(cumulative)
+    return top_level
+
+
+def cold_boot(settings_module):
+    """Boot the application in a fresh interpreter; returns its stats and top-level imports"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        cwd=BACKEND_DIR, env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module},
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout), parse_importtime(result.stderr)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def read_worker(pid):
+    """CPU seconds used so far and USS/PSS in KiB of a process"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    memory = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Pss', 'Private_Clean', 'Private_Dirty'):
+                memory[key] = int(value.split()[0])
+    return cpu, memory['Private_Clean'] + memory['Private_Dirty'], memory['Pss']
+
+
+def serve(settings_module, preload, env, args):
+    """Start gunicorn, warm it up and measure its workers"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'smartwayz_backend.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+        ],
+        cwd=BACKEND_DIR,
+        env={
+            **env, 'DJANGO_SETTINGS_MODULE': settings_module, 'GUNICORN_PRELOAD': str(preload),
+            'GUNICORN_WORKERS': str(args.workers), 'GUNICORN_THREADS': '1',
+        },
+    )
+    try:
+        url = f'http://127.0.0.1:{port}/api/categories/'
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                urllib.request.urlopen(url, timeout=5).read()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise SystemExit('gunicorn did not start')
+                time.sleep(0.05)
+        ready = time.perf_counter() - start
+        for _ in range(args.requests):
+            urllib.request.urlopen(url, timeout=5).read()
+
+        with open(f'/proc/{process.pid}/task/{process.pid}/children') as f:
+            workers = [read_worker(int(pid)) for pid in f.read().split()]
+        _, _, master_pss = read_worker(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        'ready': ready,
+        'cpu': statistics.mean(cpu for cpu, _, _ in workers),
+        'uss': statistics.mean(uss for _, uss, _ in workers) / 1024,
+        'pss': (master_pss + sum(pss for _, _, pss in workers)) / 1024,
+    }
+
+
+def run_workers(args):
+    from django.db import connection
+
+    connection.close()
+    env = {**os.environ, 'DATABASE_URL': f"sqlite:///{connection.settings_dict['NAME']}", 'METRICS_SAMPLE_RATE': '0'}
+    rows = {}
+    for profile, settings_module in PROFILES.items():
+        for preload in (False, True):
+            stats = serve(settings_module, preload, env, args)
+            label = f"{profile}, {'preload' if preload else 'no preload'}"
+            rows[f'{label}: ready (s), worker CPU (ms)'] = f"{stats['ready']:.2f}, {stats['cpu'] * 1000:.0f}"
+            rows[f'{label}: worker USS (MiB), total PSS (MiB)'] = f"{stats['uss']:.1f}, {stats['pss']:.1f}"
+    print_results(f'gunicorn, {args.workers} workers', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10, help='Cold boots per profile')
+    parser.add_argument('--top', type=int, default=8, help='Slowest top-level imports to list')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='Requests sent before measuring workers')
+    parser.add_argument('--skip-workers', action='store_true', help='Only measure cold boots')
+    args = parser.parse_args()
+
+    setup_django()
+    rows, slowest = {}, {}
+    for profile, settings_module in PROFILES.items():
+        boots = [cold_boot(settings_module) for _ in range(args.runs)]
+        imports = [sum(top_level.values()) / 1000 for _, top_level in boots]
+        rows[f'{profile}: boot (ms)'] = f"{statistics.median(s['seconds'] for s, _ in boots) * 1000:.0f}"
+        rows[f'{profile}: importing (ms)'] = f'{statistics.median(imports):.0f}'
+        rows[f'{profile}: modules'] = boots[0][0]['modules']
+        rows[f'{profile}: peak RSS (MiB)'] = f"{statistics.median(s['rss_kb'] for s, _ in boots) / 1024:.1f}"
+        slowest[profile] = boots[-1][1]
+    print_results(f'Cold boot, median of {args.runs}', rows)
+    for profile, top_level in slowest.items():
+        print_results(f'Slowest top-level imports, {profile} (ms)', {
+            name: f'{micros / 1000:.1f}'
+            for name, micros in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]
+        })
+
+    if not args.skip_workers:
+        with benchmark_database():
+            run_workers(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Request throttle overhead benchmark.
+
+Times --checks token-bucket checks against the configured cache for a
+bucket that always has tokens, one that is empty, and --threads threads
+sharing one bucket (checking that exactly its capacity is let through).
+Then sends --requests requests through the test client to the report list
+and to a rejected geocode request (no upstream call) with the throttles on
+and off, so the difference is the per-request cost of the two buckets.
+
+With the default local-memory cache this is the cost of the bookkeeping
+alone; against Redis or Memcached each check adds one network round-trip.
+
+    python -m benchmarks.bench_throttle --checks 100000 --requests 2000
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.harness import benchmark_database, percentiles, print_results, setup_django, timed
+
+
+def time_checks(check, count):
+    """Microseconds per call of ``check``"""
+    with timed() as t:
+        for _ in range(count):
+            check()
+    return t['seconds'] / count * 1e6
+
+
+def run(args):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+    from api.throttling import consume
+    from api.views.auth import get_tokens_for_user
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    cache.clear()
+    rows = {
+        'check, tokens left (us)': f"{time_checks(lambda: consume('bench:open', 10**9, 1), args.checks):.2f}",
+    }
+    consume('bench:empty', 1, 3_600_000)
+    rows['check, bucket empty (us)'] = f"{time_checks(lambda: consume('bench:empty', 1, 3_600_000), args.checks):.2f}"
+
+    capacity = args.checks // 2
+    allowed = []
+    barrier = threading.Barrier(args.threads)
+
+    def client():
+        barrier.wait()
+        allowed.append(sum(consume('bench:shared', capacity, 3_600_000) is None for _ in range(args.checks // args.threads)))
+
+    pool = [threading.Thread(target=client) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    seconds = time.perf_counter() - start
+    assert sum(allowed) == capacity, (sum(allowed), capacity)
+    rows[f'{args.threads} threads on one bucket (checks/s, allowed)'] = (
+        f'{args.checks / seconds:.0f}, {sum(allowed)} of {capacity} tokens'
+    )
+
+    citizens = generate_citizens(args.citizens)
+    generate_reports(args.citizens * 10, citizens)
+    token = get_tokens_for_user(citizens[0], 'citizen', 'citizen42-0@example.com')['access']
+    # Buckets large enough that every request is let through
+    rates = {rate: '1000000000/min' for rate in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']}
+    scenarios = {
+        'report list': ('/api/reports/', {'HTTP_AUTHORIZATION': f'Bearer {token}'}),
+        'geocode, bad request': ('/api/geocoding/reverse/', {}),
+    }
+    for name, (path, headers) in scenarios.items():
+        for enabled in (False, True):
+            with override_settings(
+                THROTTLE_ENABLED=enabled,
+                REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates},
+            ):
+                client = Client(**headers)
+                client.get(path)
+                samples = []
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    client.get(path)
+                    samples.append(time.perf_counter() - start)
+            stats = percentiles(samples)
+            rows[f"{name}, throttles {'on' if enabled else 'off'} p50/p95 (ms)"] = f"{stats['p50']} / {stats['p95']}"
+
+    print_results('Throttle overhead', rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--checks', type=int, default=100_000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--citizens', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Triage rescoring benchmark.
+
+Seeds --reports reports and times the triage rescoring job: the first run,
+a full rescore writing a priority to every open report, a rerun with
+nothing changed, and a rerun after --changes status changes (the steady
+state of a worker rescoring every PRIORITY_INTERVAL seconds), both of
+which only rescore what changed. The load, scoring
+and write phases are reported separately, next to the latency of the
+first and a deep triage page.
+
+    python -m benchmarks.bench_triage --reports 1000000
+"""
+import argparse
+import time
+
+from benchmarks.harness import benchmark_database, peak_rss_mb, percentiles, print_results, setup_django, timed
+
+
+def timed_rescore():
+    """Run rescore() with its phases timed"""
+    from unittest import mock
+
+    from api.services import triage
+
+    phases = {}
+
+    def timing(name, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                phases[name] = phases.get(name, 0) + time.perf_counter() - start
+        return wrapper
+
+    with mock.patch.object(triage, 'load_open_reports', timing('load', triage.load_open_reports)), \
+            mock.patch.object(triage, 'count_duplicates', timing('score', triage.count_duplicates)), \
+            mock.patch.object(triage, 'compute_scores', timing('score', triage.compute_scores)), \
+            timed() as total:
+        result = triage.rescore()
+    phases['write'] = total['seconds'] - sum(phases.values())
+    return result, total['seconds'], phases
+
+
+def run(args):
+    import random
+
+    from django.core.cache import cache
+    from django.db.models import Max
+    from django.test import Client
+    from django.utils import timezone
+
+    from api.models import Authority, Report, Status
+    from api.services import triage
+    from api.services.route_hazards import CLOSED_STATUSES
+    from api.views.auth import get_tokens_for_user
+    from benchmarks.datagen import generate_citizens, generate_reports
+
+    generate_reports(args.reports, generate_citizens(1000))
+    cache.delete(triage.RESCORE_STATE_KEY)
+
+    results = {'reports': args.reports}
+    for label in ('first run', 'rerun, no changes'):
+        result, seconds, phases = timed_rescore()
+        results[f'{label} (s)'] = round(seconds, 2)
+        results[f'{label}: load / score / write (s)'] = ' / '.join(str(round(phases[p], 2)) for p in ('load', 'score', 'write'))
+        results[f'{label}: reports scored'] = result['scored']
+        results[f'{label}: rows written'] = result['updated'] + result['closed']
+
+    # Status changes between runs, as authorities work the queue
+    rng = random.Random(1)
+    max_id = Report.objects.aggregate(Max('id'))['id__max']
+    statuses = list(Status.objects.values_list('id', flat=True))
+    for report_id in rng.sample(range(1, max_id + 1), args.changes):
+        Report.objects.filter(id=report_id).update(status_id=rng.choice(statuses), updated_at=timezone.now())
+    result, seconds, phases = timed_rescore()
+    results[f'after {args.changes} status changes (s)'] = round(seconds, 2)
+    results[f'after {args.changes} status changes: reports scored'] = result['scored']
+    results[f'after {args.changes} status changes: rows written'] = result['updated'] + result['closed']
+    results['peak RSS (MiB)'] = round(peak_rss_mb())
+
+    authority = Authority.objects.create(authority_name='Bench', email='bench@example.com', password='x')
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(authority.id, 'authority', authority.email)['access']}")
+    first, deep = [], []
+    cursor = None
+    for _ in range(args.pages):
+        start = time.perf_counter()
+        body = client.get('/api/reports/triage/', {'limit': 50, **({'cursor': cursor} if cursor else {})}).json()
+        (first if cursor is None else deep).append(time.perf_counter() - start)
+        cursor = body['next_cursor']
+    results['triage page 1 (ms)'] = percentiles(first)['p50']
+    results[f'triage pages 2-{args.pages} p50/p95 (ms)'] = f"{percentiles(deep)['p50']} / {percentiles(deep)['p95']}"
+    results['open reports'] = Report.objects.exclude(status__code__in=CLOSED_STATUSES).count()
+
+    print_results('Triage rescoring (database)', results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reports', type=int, default=1_000_000)
+    parser.add_argument('--changes', type=int, default=1000, help='Status changes before the last run')
+    parser.add_argument('--pages', type=int, default=50, help='Triage pages of 50 walked')
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
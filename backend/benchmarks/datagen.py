@@ -0,0 +1,196 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+The same ``seed`` always produces the same citizens and reports, so runs
+are comparable. Reports are spread over Metro Manila with a handful of
+dense neighbourhoods, carry realistic category/sub-category pairs and have
+creation dates spread over the last ``days`` days.
+"""
+import contextlib
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+# Metro Manila bounding box and a few dense neighbourhoods
+BBOX = (14.35, 120.90, 14.80, 121.15)  # min_lat, min_lon, max_lat, max_lon
+CLUSTERS = [
+    (14.5995, 120.9842),  # Manila
+    (14.6760, 121.0437),  # Quezon City
+    (14.5547, 121.0244),  # Makati
+    (14.5176, 121.0509),  # Taguig
+    (14.6507, 121.1029),  # Marikina
+]
+CLUSTER_SHARE = 0.6
+CLUSTER_SPREAD = 0.01  # ~1 km standard deviation
+
+STREETS = [
+    'Rizal Avenue', 'EDSA', 'Taft Avenue', 'España Boulevard', 'Quezon Avenue',
+    'Aurora Boulevard', 'Ayala Avenue', 'Shaw Boulevard', 'C-5 Road', 'Roxas Boulevard',
+    'Marcos Highway', 'Commonwealth Avenue', 'Katipunan Avenue', 'Ortigas Avenue',
+]
+
+TEXT = {
+    'ROAD_DAMAGE': ('Pothole', 'Deep pothole damaging tires, cracked asphalt'),
+    'STREETLIGHTS': ('Broken streetlight', 'Streetlight flickering, street dark at night'),
+    'SIDEWALKS': ('Damaged sidewalk', 'Cracked sidewalk tiles, pedestrians walking on road'),
+    'BUILDING': ('Building crack', 'Visible cracks on building facade'),
+    'BRIDGE': ('Bridge damage', 'Rusted railing and loose expansion joint on bridge'),
+    'STRUCTURAL_COLLAPSE': ('Wall collapse', 'Retaining wall collapsed onto walkway'),
+    'SAFETY_SECURITY': ('Unsafe area', 'Missing manhole cover, open pit near school'),
+    'INFRA_OTHER': ('Infrastructure issue', 'Damaged signage and barriers'),
+    'FLOODING': ('Flooding', 'Knee deep flood water after heavy rain, road impassable'),
+    'LANDSLIDE': ('Landslide', 'Soil erosion and mud blocking one lane'),
+    'FIRE_HAZARD': ('Fire hazard', 'Exposed wiring near dry grass and garbage'),
+    'ELECTRICAL_HAZARD': ('Electrical hazard', 'Fallen power line sparking on wet road'),
+    'FALLEN_TREES': ('Fallen tree', 'Tree and debris blocking the road after storm'),
+    'ROAD_ACCIDENT': ('Road accident', 'Collision between jeepney and motorcycle'),
+    'BLOCKED_DRAINAGE': ('Blocked drainage', 'Clogged gutter causing water overflow'),
+    'EARTHQUAKE': ('Earthquake damage', 'Cracked road surface after tremor'),
+    'SINKHOLE': ('Sinkhole', 'Sinkhole opening in the middle of the road'),
+    'PUBLIC_HEALTH': ('Public health hazard', 'Uncollected garbage attracting pests'),
+    'HAZARD_OTHER': ('Hazard', 'Unidentified hazard on the road'),
+}
+
+
+@contextlib.contextmanager
+def explicit_timestamps(model):
+    """Let bulk_create keep the created_at/updated_at values we set"""
+    fields = [f for f in model._meta.concrete_fields if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def random_point(rng):
+    """Pick a coordinate: mostly around a cluster, otherwise uniform in the bbox"""
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    if rng.random() < CLUSTER_SHARE:
+        lat, lon = rng.choice(CLUSTERS)
+        lat = min(max(rng.gauss(lat, CLUSTER_SPREAD), min_lat), max_lat)
+        lon = min(max(rng.gauss(lon, CLUSTER_SPREAD), min_lon), max_lon)
+        return lat, lon
+    return rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)
+
+
+def point_arrays(count, seed=42):
+    """
+    Vectorized counterpart of random_point for pure compute benchmarks.
+
+    Returns:
+        tuple: (latitudes, longitudes) float64 arrays
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    min_lat, min_lon, max_lat, max_lon = BBOX
+    latitudes = rng.uniform(min_lat, max_lat, count)
+    longitudes = rng.uniform(min_lon, max_lon, count)
+
+    in_cluster = rng.random(count) < CLUSTER_SHARE
+    centers = np.array(CLUSTERS)[rng.integers(0, len(CLUSTERS), count)]
+    latitudes = np.where(in_cluster, rng.normal(centers[:, 0], CLUSTER_SPREAD), latitudes)
+    longitudes = np.where(in_cluster, rng.normal(centers[:, 1], CLUSTER_SPREAD), longitudes)
+    return np.clip(latitudes, min_lat, max_lat), np.clip(longitudes, min_lon, max_lon)
+
+
+def generate_citizens(count, seed=42, batch_size=5000):
+    """
+    Create ``count`` citizens sharing one password hash.
+
+    Returns:
+        list: IDs of the created citizens
+    """
+    from api.models import Citizen
+
+    password = make_password('benchmark-password')
+    start = Citizen.objects.count()
+    citizens = [
+        Citizen(name=f'Citizen {start + i}', email=f'citizen{seed}-{start + i}@example.com', password=password)
+        for i in range(count)
+    ]
+    Citizen.objects.bulk_create(citizens, batch_size=batch_size)
+    return list(
+        Citizen.objects.filter(email__startswith=f'citizen{seed}-').order_by('id').values_list('id', flat=True)
+    )
+
+
+def generate_reports(count, citizen_ids, seed=42, days=365, batch_size=5000):
+    """
+    Bulk insert ``count`` reports owned by ``citizen_ids``.
+
+    Bulk inserts bypass Report.save and signals; callers that rely on
+    derived data (e.g. the fallback search index) must rebuild it.
+
+    Returns:
+        int: Number of reports created
+    """
+    from api.models import Report, Status, SubCategory
+
+    rng = random.Random(seed)
+    sub_categories = list(SubCategory.objects.select_related('report_type'))
+    # Open reports dominate; a fraction has moved through the workflow
+    statuses = {s.code: s.id for s in Status.objects.all()}
+    status_weights = [
+        (statuses['pending'], 50), (statuses['approved'], 15), (statuses['in_progress'], 15),
+        (statuses['rejected'], 5), (statuses['resolved'], 15),
+    ]
+    status_ids = [s for s, _ in status_weights]
+    weights = [w for _, w in status_weights]
+    now = timezone.now()
+
+    created = 0
+    with explicit_timestamps(Report):
+        while created < count:
+            batch = []
+            for _ in range(min(batch_size, count - created)):
+                sub_category = rng.choice(sub_categories)
+                title, description = TEXT[sub_category.sub_category]
+                street = rng.choice(STREETS)
+                lat, lon = random_point(rng)
+                created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+                batch.append(Report(
+                    citizen_id=rng.choice(citizen_ids),
+                    status_id=rng.choices(status_ids, weights)[0],
+                    report_type_id=sub_category.report_type_id,
+                    sub_category_id=sub_category.id,
+                    title=f'{title} on {street}',
+                    description=description,
+                    latitude=round(lat, 6),
+                    longitude=round(lon, 6),
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+            Report.objects.bulk_create(batch)
+            created += len(batch)
+    return created
+
+
+def main():
+    """Seed the configured database, e.g. before a live ``benchmarks.load`` run"""
+    import argparse
+
+    from benchmarks.harness import seed_reference_data, setup_django
+
+    parser = argparse.ArgumentParser(description='Seed deterministic benchmark data into DATABASE_URL')
+    parser.add_argument('--citizens', type=int, default=200)
+    parser.add_argument('--reports', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    seed_reference_data()
+    citizen_ids = generate_citizens(args.citizens, seed=42)
+    created = generate_reports(args.reports, citizen_ids, seed=args.seed)
+    print(f'✓ Seeded {len(citizen_ids)} citizens and {created} reports')
+
+
+if __name__ == '__main__':
+    main()
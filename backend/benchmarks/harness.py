@@ -0,0 +1,119 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throw-away test database created from the
+configured DATABASE_URL, exactly like ``manage.py test`` does, so they never
+touch real data. Point DATABASE_URL at Postgres for representative numbers.
+"""
+import contextlib
+import os
+import resource
+import statistics
+import sys
+import time
+
+
+def setup_django():
+    """Configure Django for a standalone benchmark script"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartwayz_backend.settings')
+    # Load generators send everything from one address; servers they start inherit this
+    os.environ.setdefault('THROTTLE_ENABLED', 'False')
+    # In-process data only; pass CACHE_URL to measure a shared cache
+    os.environ.setdefault('CACHE_URL', 'locmem://')
+
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def benchmark_database(keepdb=False):
+    """
+    Create a test database for the duration of the benchmark.
+
+    SQLite benchmarks use an on-disk file instead of Django's shared
+    in-memory database, and take write locks up front, so that worker
+    threads can write concurrently without failing on lock upgrades.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    if connection.vendor == 'sqlite':
+        connection.settings_dict.setdefault('TEST', {})
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            os.environ.get('TMPDIR', '/tmp'), 'smartwayz_bench.sqlite3'
+        )
+        options = connection.settings_dict.setdefault('OPTIONS', {})
+        options.setdefault('transaction_mode', 'IMMEDIATE')
+        options.setdefault('timeout', 30)
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        seed_reference_data()
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def seed_reference_data():
+    """Seed the statuses the app expects (categories come from migrations)"""
+    from api.models import Status
+
+    for code, _ in Status.CODES:
+        Status.objects.get_or_create(code=code)
+
+
+def percentiles(samples):
+    """
+    Summarize latency samples.
+
+    Args:
+        samples (list): Durations in seconds
+
+    Returns:
+        dict: p50/p95/p99/max in milliseconds
+    """
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        cuts = ordered * 99
+    else:
+        cuts = statistics.quantiles(ordered, n=100, method='inclusive')
+    return {
+        'p50': round(cuts[49] * 1000, 3),
+        'p95': round(cuts[94] * 1000, 3),
+        'p99': round(cuts[98] * 1000, 3),
+        'max': round(ordered[-1] * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+@contextlib.contextmanager
+def timed():
+    """Measure wall time of a block; yields a dict filled with 'seconds'"""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result['seconds'] = time.perf_counter() - start
+
+
+def print_results(title, rows):
+    """Print benchmark results as aligned key/value lines"""
+    print(f'\n{title}')
+    print('-' * len(title))
+    width = max(len(key) for key in rows)
+    for key, value in rows.items():
+        print(f'{key:<{width}}  {value}')
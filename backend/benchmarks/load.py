@@ -0,0 +1,335 @@
+"""
+Load scenarios for the SmartWayz API.
+
+Drives login, report create, report list/filter, stats and geocode with an
+asyncio scheduler and a configurable number of concurrent virtual users,
+then records p50/p95/p99 latency, throughput and (in-process mode)
+database queries per request. Results can be compared against a stored
+baseline so that regressions fail the run.
+
+In-process mode (default) seeds a throw-away database with the
+deterministic data generator, runs requests through Django's test client
+and points the geocoder at a local stub upstream:
+
+    python -m benchmarks.load --requests 200 --concurrency 8
+
+Live mode targets a running server seeded with ``python -m benchmarks.datagen``
+(start ``python -m benchmarks.stub_upstream`` and export its settings on the
+server for the geocode scenario):
+
+    python -m benchmarks.load --url http://localhost:8000 --scenarios report_list,stats
+
+Compare against or refresh the stored baseline:
+
+    python -m benchmarks.load --baseline benchmarks/baseline.json
+    python -m benchmarks.load --baseline benchmarks/baseline.json --update-baseline
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import benchmark_database, percentiles, setup_django
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+LOGGED_IN_CITIZENS = 20
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Register a function building one request of a scenario"""
+    def register(build):
+        SCENARIOS[name] = build
+        return build
+    return register
+
+
+class RequestSpec:
+    def __init__(self, method, path, data=None, token=None):
+        self.method = method
+        self.path = path
+        self.data = data
+        self.token = token
+
+
+@scenario('login')
+def login_request(context, rng):
+    email = rng.choice(context['emails'])
+    return RequestSpec('POST', '/api/auth/login/citizen/', {'email': email, 'password': BENCHMARK_PASSWORD})
+
+
+@scenario('report_create')
+def report_create_request(context, rng):
+    from benchmarks.datagen import TEXT, random_point
+
+    sub_category = rng.choice(context['sub_categories'])
+    title, description = TEXT[sub_category['sub_category']]
+    latitude, longitude = random_point(rng)
+    return RequestSpec('POST', '/api/reports/', {
+        'report_type': sub_category['category_id'],
+        'sub_category': sub_category['id'],
+        'title': title,
+        'description': description,
+        'latitude': f'{latitude:.6f}',
+        'longitude': f'{longitude:.6f}',
+    }, token=rng.choice(context['tokens']))
+
+
+@scenario('report_list')
+def report_list_request(context, rng):
+    # Filtered lists can be shorter than three pages, so only page the full list
+    kind = rng.choice(['none', 'category', 'sub_category'])
+    params = {'page': rng.randint(1, 3) if kind == 'none' else 1}
+    if kind == 'category':
+        params['category'] = rng.choice(context['sub_categories'])['category_id']
+    elif kind == 'sub_category':
+        params['sub_category'] = rng.choice(context['sub_categories'])['id']
+    query = '&'.join(f'{k}={v}' for k, v in params.items())
+    return RequestSpec('GET', f'/api/reports/?{query}', token=rng.choice(context['tokens']))
+
+
+@scenario('stats')
+def stats_request(context, rng):
+    return RequestSpec('GET', '/api/reports/stats/')
+
+
+@scenario('geocode')
+def geocode_request(context, rng):
+    from benchmarks.datagen import random_point
+
+    # Three decimals (~100 m) so nearby requests share cache entries
+    latitude, longitude = random_point(rng)
+    return RequestSpec('GET', f'/api/geocoding/reverse/?lat={latitude:.3f}&lon={longitude:.3f}')
+
+
+class InProcessTransport:
+    """Runs requests through Django's test client and counts their queries"""
+
+    counts_queries = True
+
+    def execute(self, spec):
+        from django.db import close_old_connections, connection
+        from django.test import Client
+        from django.test.utils import CaptureQueriesContext
+
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {spec.token}'} if spec.token else {}
+        client = Client()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if spec.data is not None:
+                response = client.generic(
+                    spec.method, spec.path, json.dumps(spec.data), content_type='application/json', **headers
+                )
+            else:
+                response = client.generic(spec.method, spec.path, **headers)
+            elapsed = time.perf_counter() - start
+        close_old_connections()
+        return response.status_code, elapsed, len(queries), _json(response.content)
+
+
+class HttpTransport:
+    """Runs requests against a live server"""
+
+    counts_queries = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.local = threading.local()
+
+    def execute(self, spec):
+        import requests
+
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        headers = {'Authorization': f'Bearer {spec.token}'} if spec.token else {}
+        start = time.perf_counter()
+        response = session.request(spec.method, self.base_url + spec.path, json=spec.data, headers=headers, timeout=30)
+        elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, None, _json(response.content)
+
+
+def _json(content):
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def build_context(transport, citizens):
+    """Discover reference data and log a few citizens in, through the API itself"""
+    emails = [f'citizen42-{i}@example.com' for i in range(citizens)]
+    tokens = []
+    for email in emails[:LOGGED_IN_CITIZENS]:
+        status, _, _, body = transport.execute(
+            RequestSpec('POST', '/api/auth/login/citizen/', {'email': email, 'password': BENCHMARK_PASSWORD})
+        )
+        if status != 200:
+            raise SystemExit(f'Cannot log in {email} ({status}); seed data with python -m benchmarks.datagen')
+        tokens.append(body['data']['tokens']['access'])
+
+    sub_categories = []
+    path = '/api/subcategories/'
+    while path:
+        _, _, _, body = transport.execute(RequestSpec('GET', path))
+        sub_categories.extend(body['results'])
+        path = body['next'] and body['next'].split('/api/', 1)[1]
+        path = path and f'/api/{path}'
+
+    return {'emails': emails, 'tokens': tokens, 'sub_categories': sub_categories}
+
+
+async def run_scenario(name, transport, context, requests, concurrency, seed):
+    """Fire ``requests`` requests of one scenario, ``concurrency`` at a time"""
+    build = SCENARIOS[name]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        rng = random.Random(f'{seed}-{name}-{i}')
+        spec = build(context, rng)
+        async with semaphore:
+            return await asyncio.to_thread(transport.execute, spec)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+
+    latencies = [elapsed for _, elapsed, _, _ in outcomes]
+    result = {
+        'requests': requests,
+        'errors': sum(1 for status, _, _, _ in outcomes if status >= 400),
+        'throughput_rps': round(requests / wall, 1),
+        **percentiles(latencies),
+    }
+    if transport.counts_queries:
+        counts = [q for _, _, q, _ in outcomes]
+        result['queries_per_request'] = round(sum(counts) / len(counts), 2)
+        result['max_queries'] = max(counts)
+    return result
+
+
+def run_all(transport, args):
+    context = build_context(transport, args.citizens)
+    loop = asyncio.new_event_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency))
+    try:
+        return {
+            name: loop.run_until_complete(
+                run_scenario(name, transport, context, args.requests, args.concurrency, args.seed)
+            )
+            for name in args.scenarios
+        }
+    finally:
+        loop.close()
+
+
+def compare(results, baseline, latency_tolerance):
+    """
+    List regressions of ``results`` against ``baseline``.
+
+    Latency regresses when p95 exceeds the baseline by more than
+    ``latency_tolerance`` (a fraction). Query counts are deterministic, so
+    any increase is a regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['p95'] > previous['p95'] * (1 + latency_tolerance):
+            regressions.append(f"{name}: p95 {current['p95']}ms vs baseline {previous['p95']}ms")
+        if 'queries_per_request' in current and 'queries_per_request' in previous:
+            if current['queries_per_request'] > previous['queries_per_request']:
+                regressions.append(
+                    f"{name}: {current['queries_per_request']} queries/request "
+                    f"vs baseline {previous['queries_per_request']}"
+                )
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f"{name}: {current['errors']} errors vs baseline {previous.get('errors', 0)}")
+    return regressions
+
+
+def print_table(results):
+    columns = ['requests', 'errors', 'throughput_rps', 'p50', 'p95', 'p99', 'queries_per_request']
+    print(f"\n{'scenario':<15}" + ''.join(f'{c:>20}' for c in columns))
+    for name, result in results.items():
+        print(f'{name:<15}' + ''.join(f"{str(result.get(c, '-')):>20}" for c in columns))
+    print('(latencies in ms)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help='Target a live server instead of running in-process')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenario names')
+    parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent virtual users')
+    parser.add_argument('--citizens', type=int, default=200, help='Citizens to seed (in-process) or assume seeded')
+    parser.add_argument('--reports', type=int, default=20_000, help='Reports to seed (in-process mode)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON to this path')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='Overwrite --baseline with these results')
+    parser.add_argument('--latency-tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+    args.scenarios = [s for s in args.scenarios.split(',') if s]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    setup_django()
+
+    if args.url:
+        results = run_all(HttpTransport(args.url), args)
+    else:
+        from django.core.cache import cache
+        from django.test.utils import override_settings
+        from benchmarks.datagen import generate_citizens, generate_reports
+        from benchmarks.stub_upstream import StubUpstream
+
+        with StubUpstream(delay_ms=40) as stub, override_settings(**stub.settings()):
+            with benchmark_database():
+                generate_reports(args.reports, generate_citizens(args.citizens, seed=42), seed=args.seed)
+                cache.clear()
+                results = run_all(InProcessTransport(), args)
+
+    print_table(results)
+    document = {
+        'meta': {
+            'mode': 'live' if args.url else 'in-process',
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'citizens': args.citizens,
+            'reports': args.reports,
+        },
+        'scenarios': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(document, f, indent=2)
+            f.write('\n')
+        print(f'\nBaseline written to {args.baseline}')
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('meta') != document['meta']:
+            print(f"\nWarning: baseline was recorded with {baseline.get('meta')}; comparison may be unfair")
+        regressions = compare(results, baseline, args.latency_tolerance)
+        if regressions:
+            print('\nRegressions against baseline:')
+            for line in regressions:
+                print(f'  - {line}')
+            sys.exit(1)
+        print('\nNo regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Local stand-in for the reverse geocoding providers.
+
+Serves canned Nominatim and BigDataCloud responses after an optional
+artificial delay, so geocode load scenarios exercise our proxy without
+hitting (or being rate limited by) the real services.
+
+    python -m benchmarks.stub_upstream --port 8765 --delay-ms 40
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+NOMINATIM_RESPONSE = {
+    'display_name': 'Rizal Avenue, Santa Cruz, Manila, Metro Manila, Philippines',
+    'address': {
+        'road': 'Rizal Avenue',
+        'suburb': 'Santa Cruz',
+        'city': 'Manila',
+        'state': 'Metro Manila',
+        'country': 'Philippines',
+    },
+}
+
+BIGDATACLOUD_RESPONSE = {
+    'locality': 'Manila',
+    'principalSubdivision': 'Metro Manila',
+    'countryName': 'Philippines',
+    'localityInfo': {'administrative': []},
+}
+
+
+def make_handler(delay):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if delay:
+                time.sleep(delay)
+
+            if url.path == '/reverse':
+                body = dict(NOMINATIM_RESPONSE, lat=query.get('lat', [''])[0], lon=query.get('lon', [''])[0])
+            elif url.path == '/data/reverse-geocode-client':
+                body = BIGDATACLOUD_RESPONSE
+            else:
+                self.send_error(404)
+                return
+
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+class StubServer(ThreadingHTTPServer):
+    # Accept bursts of concurrent connections from load tests
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubUpstream:
+    """Run the stub in a background thread; usable as a context manager"""
+
+    def __init__(self, port=0, delay_ms=0):
+        self.server = StubServer(('127.0.0.1', port), make_handler(delay_ms / 1000))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def settings(self):
+        """Settings overrides pointing the geocoding proxy at this stub"""
+        return {
+            'NOMINATIM_REVERSE_URL': f'{self.base_url}/reverse',
+            'BIGDATACLOUD_REVERSE_URL': f'{self.base_url}/data/reverse-geocode-client',
+            'NOMINATIM_MIN_INTERVAL': 0,
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay-ms', type=int, default=40)
+    args = parser.parse_args()
+
+    stub = StubUpstream(args.port, args.delay_ms)
+    print(f'Stub upstream on {stub.base_url}')
+    for name, value in stub.settings().items():
+        print(f'  export {name}={value}')
+    stub.server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
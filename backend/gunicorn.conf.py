@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration for the API processes.
+
+The application is imported once in the master (preload_app), which also
+loads the URLconf and with it every view, before forking the workers.
+Workers then boot without importing anything and share the master's
+memory pages until they write to them; gc.freeze() keeps the garbage
+collector from touching (and so copying) the objects created at startup.
+
+Set METRICS_MULTIPROC_DIR so that /metrics sums the histograms of all the
+workers (see api/services/metrics.py); the master empties it on startup.
+
+    DJANGO_SETTINGS_MODULE=smartwayz_backend.settings_api gunicorn -c gunicorn.conf.py smartwayz_backend.wsgi:application
+"""
+import gc
+import os
+from pathlib import Path
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def on_starting(server):
+    # Histograms of the previous run would be added to this one's
+    directory = os.environ.get('METRICS_MULTIPROC_DIR')
+    if directory:
+        for path in Path(directory).glob('*.json'):
+            path.unlink(missing_ok=True)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    # Django resolves the URLconf on the first request; do it before forking
+    get_resolver().url_patterns
+    # Workers must not inherit database connections
+    connections.close_all()
+    gc.freeze()
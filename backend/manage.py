@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smartwayz_backend.settings")
+    # The test suite has its own profile (smartwayz_backend/settings_test.py)
+    default = "smartwayz_backend.settings_test" if sys.argv[1:2] == ["test"] else "smartwayz_backend.settings"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", default)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
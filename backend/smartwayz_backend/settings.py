@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
+from urllib.parse import urlsplit
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -83,12 +86,93 @@ WSGI_APPLICATION = "smartwayz_backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse. On PostgreSQL, Django's psycopg 3 pool keeps up to
+# DB_POOL_MAX_SIZE connections per process open across requests; with
+# DB_POOL=False, DB_CONN_MAX_AGE keeps one persistent connection per thread.
+DB_POOL = os.environ.get('DB_POOL', 'True') == 'True'
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 0))
+
+
+def database_config(url):
+    """Build one DATABASES entry from a database URL, with pooling applied"""
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_MAX_AGE > 0,
+    )
+    if DB_POOL and config['ENGINE'] == 'django.db.backends.postgresql':
+        # The pool replaces persistent connections; Django rejects both
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+    return config
+
+
 DATABASES = {
-     'default': dj_database_url.parse(
-         os.environ.get('DATABASE_URL', '')
-     )     
- }
+    'default': database_config(os.environ.get('DATABASE_URL', '')),
+}
 
+# Read replicas, as space-separated URLs. Read-only API actions are served
+# from them (see api/db_routers.py); tests run them as mirrors of default
+# (see smartwayz_backend/settings_test.py).
+DATABASE_REPLICAS = []
+for number, url in enumerate(os.environ.get('DATABASE_REPLICA_URLS', '').split(), start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {**database_config(url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
+# After a citizen writes, their reads stay on the primary this long so they
+# see their own changes despite replication lag
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+
+# Caches
+# CACHE_URL selects the cache shared by all processes: throttle buckets,
+# the Nominatim request slot, and the second level behind the in-process
+# caches of api/services/tiered_cache.py.
+#   redis://host:6379/0    Redis (needs the redis package)
+#   memcached://host:11211 Memcached (needs pymemcache; comma-separate servers)
+#   file:///path/to/dir    files, shared by the processes of one node
+#   db://table_name        a table created by `manage.py createcachetable`
+#   locmem://              per process only (the test settings' default)
+def cache_config(url):
+    """Build one CACHES entry from a cache URL"""
+    parts = urlsplit(url)
+    if parts.scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    if parts.scheme == 'memcached':
+        return {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': parts.netloc.split(',')}
+    if parts.scheme == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': parts.path,
+            'OPTIONS': {'MAX_ENTRIES': 100_000},
+        }
+    if parts.scheme == 'db':
+        return {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': parts.netloc,
+            'OPTIONS': {'MAX_ENTRIES': 100_000},
+        }
+    if parts.scheme == 'locmem':
+        return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': parts.netloc}
+    raise ValueError(f'Unsupported CACHE_URL scheme: {parts.scheme!r}')
+
+
+CACHES = {
+    'default': cache_config(os.environ.get(
+        'CACHE_URL',
+        f"file://{os.path.join(tempfile.gettempdir(), 'smartwayz_cache')}",
+    )),
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,6 +210,15 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded media (report photos)
+MEDIA_ROOT = Path(os.environ.get("MEDIA_ROOT", BASE_DIR / "media"))
+
+MEDIA_MAX_UPLOAD_SIZE = int(os.environ.get("MEDIA_MAX_UPLOAD_SIZE", 20 * 1024 * 1024))
+MEDIA_ALLOWED_CONTENT_TYPES = ["image/jpeg", "image/png", "image/webp"]
+MEDIA_THUMBNAIL_SIZE = (320, 320)
+# Process uploads inline instead of as background jobs (used by tests)
+MEDIA_PIPELINE_EAGER = os.environ.get("MEDIA_PIPELINE_EAGER", "False") == "True"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -146,8 +239,30 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Token buckets per citizen and per client IP (see api/throttling.py):
+    # N/period allows bursts of N requests, refilled at N per period
+    'DEFAULT_THROTTLE_RATES': {
+        'report_create.citizen': os.environ.get('THROTTLE_REPORT_CREATE_CITIZEN', '10/min'),
+        'report_create.ip': os.environ.get('THROTTLE_REPORT_CREATE_IP', '60/min'),
+        'report_list.citizen': os.environ.get('THROTTLE_REPORT_LIST_CITIZEN', '120/min'),
+        'report_list.ip': os.environ.get('THROTTLE_REPORT_LIST_IP', '600/min'),
+        'report_confirm.citizen': os.environ.get('THROTTLE_REPORT_CONFIRM_CITIZEN', '30/min'),
+        'report_confirm.ip': os.environ.get('THROTTLE_REPORT_CONFIRM_IP', '300/min'),
+        'geocode.citizen': os.environ.get('THROTTLE_GEOCODE_CITIZEN', '30/min'),
+        'geocode.ip': os.environ.get('THROTTLE_GEOCODE_IP', '60/min'),
+        'bootstrap.citizen': os.environ.get('THROTTLE_BOOTSTRAP_CITIZEN', '30/min'),
+        'bootstrap.ip': os.environ.get('THROTTLE_BOOTSTRAP_IP', '300/min'),
+        'open_data.citizen': os.environ.get('THROTTLE_OPEN_DATA_CITIZEN', '60/min'),
+        'open_data.ip': os.environ.get('THROTTLE_OPEN_DATA_IP', '60/min'),
+    },
+    # Proxies in front of the app; their X-Forwarded-For entries are trusted
+    # to find the client IP (0: use the connection's address)
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
+# Turns the throttles above off (benchmarks driving the API from one address)
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', 'True') == 'True'
+
 # JWT Configuration
 from datetime import timedelta
 
@@ -198,5 +313,150 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@smartwayz.com')
 
+# Report status changes of a citizen are collected this long, then mailed
+# as one digest (see api/services/notifications.py)
+NOTIFICATION_DIGEST_SECONDS = int(os.environ.get('NOTIFICATION_DIGEST_SECONDS', 300))
+
+# Hazard alerts (see api/services/alerts.py): matches of new hazard reports
+# against citizens' alert areas are collected this long, then mailed as one
+# digest
+ALERT_DIGEST_SECONDS = int(os.environ.get('ALERT_DIGEST_SECONDS', 60))
+ALERT_MAX_SUBSCRIPTIONS = int(os.environ.get('ALERT_MAX_SUBSCRIPTIONS', 10))  # active areas per citizen
+ALERT_MAX_RADIUS_METERS = int(os.environ.get('ALERT_MAX_RADIUS_METERS', 20000))  # also bounds polygon extents
+ALERT_INDEX_CELL_SIZE = float(os.environ.get('ALERT_INDEX_CELL_SIZE', 0.01))  # degrees
+# Workers apply subscription changes to their match index incrementally and
+# rebuild it every ALERT_INDEX_TTL seconds, or once this many have changed
+ALERT_INDEX_TTL = int(os.environ.get('ALERT_INDEX_TTL', 3600))
+ALERT_INDEX_MAX_OVERLAY = int(os.environ.get('ALERT_INDEX_MAX_OVERLAY', 10000))
+
+# Hazards along a route (see api/services/route_hazards.py)
+ROUTE_INDEX_CELL_SIZE = float(os.environ.get('ROUTE_INDEX_CELL_SIZE', 0.001))  # degrees
+ROUTE_INDEX_REFRESH = float(os.environ.get('ROUTE_INDEX_REFRESH', 5))  # seconds between incremental refreshes
+ROUTE_INDEX_TTL = int(os.environ.get('ROUTE_INDEX_TTL', 3600))  # seconds between rebuilds
+ROUTE_INDEX_MAX_OVERLAY = int(os.environ.get('ROUTE_INDEX_MAX_OVERLAY', 10000))
+ROUTE_MAX_WIDTH_METERS = int(os.environ.get('ROUTE_MAX_WIDTH_METERS', 2000))
+ROUTE_MAX_POINTS = int(os.environ.get('ROUTE_MAX_POINTS', 20000))  # polyline vertices
+ROUTE_MAX_LENGTH_METERS = int(os.environ.get('ROUTE_MAX_LENGTH_METERS', 1_000_000))
+ROUTE_MAX_SEGMENT_METERS = int(os.environ.get('ROUTE_MAX_SEGMENT_METERS', 50_000))
+ROUTE_MAX_RESULTS = int(os.environ.get('ROUTE_MAX_RESULTS', 500))
+
+# Reverse geocoding upstreams (overridable to point at a local stub)
+NOMINATIM_REVERSE_URL = os.environ.get('NOMINATIM_REVERSE_URL', 'https://nominatim.openstreetmap.org/reverse')
+BIGDATACLOUD_REVERSE_URL = os.environ.get(
+    'BIGDATACLOUD_REVERSE_URL', 'https://api.bigdatacloud.net/data/reverse-geocode-client'
+)
+# Nominatim's usage policy allows at most 1 request per second
+NOMINATIM_MIN_INTERVAL = float(os.environ.get('NOMINATIM_MIN_INTERVAL', 1.0))
+
+# Threads verifying passwords for the async login view (see api/services/passwords.py)
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 2))
+
+# Hotspot detection (see api/services/hotspots.py)
+HOTSPOT_CELL_SIZE_METERS = int(os.environ.get('HOTSPOT_CELL_SIZE_METERS', 200))
+HOTSPOT_MIN_REPORTS = int(os.environ.get('HOTSPOT_MIN_REPORTS', 5))
+HOTSPOT_CACHE_TIMEOUT = int(os.environ.get('HOTSPOT_CACHE_TIMEOUT', 300))
+# Reports younger than this are left to the next run, in case an older one is still uncommitted
+HOTSPOT_SAFETY_LAG_SECONDS = int(os.environ.get('HOTSPOT_SAFETY_LAG_SECONDS', 60))
+# Runs rebuild the cells from scratch this often, dropping deleted and moved reports
+HOTSPOT_FULL_REBUILD_INTERVAL = int(os.environ.get('HOTSPOT_FULL_REBUILD_INTERVAL', 86400))
+
+# Authority triage queue (see api/services/triage.py)
+PRIORITY_INTERVAL = int(os.environ.get('PRIORITY_INTERVAL', 120))  # seconds between rescoring runs
+PRIORITY_FULL_INTERVAL = int(os.environ.get('PRIORITY_FULL_INTERVAL', 86400))  # seconds between full rescores
+PRIORITY_DUPLICATE_METERS = int(os.environ.get('PRIORITY_DUPLICATE_METERS', 100))
+PRIORITY_MAX_AGE_DAYS = int(os.environ.get('PRIORITY_MAX_AGE_DAYS', 30))
+
+# "Me too" confirmations (see api/services/confirmations.py)
+CONFIRMATION_SHARDS = int(os.environ.get('CONFIRMATION_SHARDS', 16))  # counter rows per report
+CONFIRMATION_FOLD_INTERVAL = int(os.environ.get('CONFIRMATION_FOLD_INTERVAL', 60))  # seconds between folds
+
+# Account deletion (see api/services/citizen_deletion.py): 'delete' removes
+# a deleted citizen's reports, 'anonymize' keeps them under a placeholder
+# account. Each batch of CITIZEN_DELETION_BATCH_SIZE rows is one transaction.
+CITIZEN_DELETION_MODE = os.environ.get('CITIZEN_DELETION_MODE', 'delete')
+CITIZEN_DELETION_BATCH_SIZE = int(os.environ.get('CITIZEN_DELETION_BATCH_SIZE', 1000))
+CITIZEN_DELETION_JOB_SECONDS = int(os.environ.get('CITIZEN_DELETION_JOB_SECONDS', 60))  # before handing over to a new job
+
+# Change stream for analytics (see api/services/outbox.py and
+# `manage.py stream_outbox`). OUTBOX_SINK is the dotted path of the class
+# batches are written to; the default writes NDJSON files to OUTBOX_DIRECTORY.
+OUTBOX_SINK = os.environ.get('OUTBOX_SINK', 'api.services.outbox.NdjsonSink')
+OUTBOX_DIRECTORY = Path(os.environ.get('OUTBOX_DIRECTORY', BASE_DIR / 'outbox'))
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 5000))  # events per delivered batch
+OUTBOX_GAP_SECONDS = int(os.environ.get('OUTBOX_GAP_SECONDS', 30))  # wait for a missing offset to commit
+OUTBOX_GAP_RECHECK_SECONDS = int(os.environ.get('OUTBOX_GAP_RECHECK_SECONDS', 3600))  # then keep looking for it
+OUTBOX_RETENTION_SECONDS = int(os.environ.get('OUTBOX_RETENTION_SECONDS', 7 * 86400))  # after every consumer got them
+OUTBOX_PRUNE_INTERVAL = int(os.environ.get('OUTBOX_PRUNE_INTERVAL', 3600))  # seconds between prunes
+
+# Open-data snapshots (see api/services/snapshots.py): `manage.py
+# build_snapshots` writes day partitions of reports under SNAPSHOT_ROOT,
+# served from /api/open-data/reports/
+SNAPSHOT_ROOT = Path(os.environ.get('SNAPSHOT_ROOT', BASE_DIR / 'snapshots'))
+SNAPSHOT_CHUNK_SIZE = int(os.environ.get('SNAPSHOT_CHUNK_SIZE', 2000))  # rows fetched per round trip
+
+# Report heatmaps (see api/services/heatmap.py)
+HEATMAP_MAX_SIZE = int(os.environ.get('HEATMAP_MAX_SIZE', 1024))  # pixels per side
+HEATMAP_MAX_SIGMA = float(os.environ.get('HEATMAP_MAX_SIGMA', 8))  # pixels
+HEATMAP_CACHE_TIMEOUT = int(os.environ.get('HEATMAP_CACHE_TIMEOUT', 300))
+HEATMAP_PNG_COMPRESSION = int(os.environ.get('HEATMAP_PNG_COMPRESSION', 3))  # zlib level, 1-9
+
+# Two-level caches (see api/services/tiered_cache.py). Per namespace:
+# values are fresh for 'ttl' seconds, then served stale for up to 'stale'
+# more while one caller refreshes them; each process keeps them in memory
+# for at most 'l1_ttl' seconds (how long other processes can lag behind an
+# invalidation).
+CACHE_NAMESPACES = {
+    'geocode': {
+        'ttl': int(os.environ.get('CACHE_GEOCODE_TTL', 86400)),
+        'stale': int(os.environ.get('CACHE_GEOCODE_STALE', 7 * 86400)),
+        'l1_ttl': 300,
+    },
+    'reference': {
+        'ttl': int(os.environ.get('CACHE_REFERENCE_TTL', 3600)),
+        'stale': 86400,
+        'l1_ttl': int(os.environ.get('CACHE_REFERENCE_L1_TTL', 60)),
+    },
+    'hotspots': {'ttl': HOTSPOT_CACHE_TIMEOUT, 'stale': HOTSPOT_CACHE_TIMEOUT, 'l1_ttl': 30},
+    # Rasters are up to a megabyte: kept in the shared cache only
+    'heatmap': {'ttl': HEATMAP_CACHE_TIMEOUT, 'stale': HEATMAP_CACHE_TIMEOUT, 'l1_ttl': 0},
+}
+CACHE_L1_MAX_ENTRIES = int(os.environ.get('CACHE_L1_MAX_ENTRIES', 10_000))  # per namespace and process
+CACHE_LOCK_TIMEOUT = int(os.environ.get('CACHE_LOCK_TIMEOUT', 10))  # seconds one caller may spend refreshing a value
+
+# Report archival: `manage.py archive_reports` moves resolved reports older
+# than REPORT_ARCHIVE_MONTHS to the archive table. Processes cache the newest
+# archived creation date for REPORT_ARCHIVE_HORIZON_TIMEOUT seconds.
+REPORT_ARCHIVE_MONTHS = int(os.environ.get('REPORT_ARCHIVE_MONTHS', 6))
+REPORT_ARCHIVE_HORIZON_TIMEOUT = int(os.environ.get('REPORT_ARCHIVE_HORIZON_TIMEOUT', 300))
+
+# Responses of report creations sent with an Idempotency-Key header are
+# replayed to retries for this long (see api/services/idempotency.py)
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+
+# Background jobs (see api/services/jobs.py and `manage.py run_workers`)
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))  # seconds between polls of an empty queue
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_BACKOFF_BASE = float(os.environ.get('JOB_BACKOFF_BASE', 10))  # seconds before the first retry
+JOB_BACKOFF_MAX = float(os.environ.get('JOB_BACKOFF_MAX', 3600))
+JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', 600))  # seconds before a running job counts as abandoned
+JOB_DONE_RETENTION = int(os.environ.get('JOB_DONE_RETENTION', 86400))  # seconds done jobs are kept
+
+# Jurisdiction routing (see api/services/jurisdictions.py)
+JURISDICTION_INDEX_CELL_SIZE = float(os.environ.get('JURISDICTION_INDEX_CELL_SIZE', 0.01))  # degrees
+JURISDICTION_INDEX_TTL = int(os.environ.get('JURISDICTION_INDEX_TTL', 300))  # seconds
+
+# Request instrumentation (see api/middleware.py)
+# Fraction of requests whose DB queries are counted and timed
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 0.1))
+# Log SQL repeated within a request, with stack traces (samples every request)
+METRICS_DEBUG_SQL = os.environ.get('METRICS_DEBUG_SQL', 'False') == 'True'
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'True') == 'True'
+# Bearer token required by /metrics; while empty, /metrics is disabled
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Directory where the worker processes of a host share their histograms
+# (see api/services/metrics.py); empty for per-process metrics
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))  # seconds
+
 # API Base URL for email verification links
 API_BASE_URL = os.environ.get('API_BASE_URL', 'http://localhost:8000')
@@ -0,0 +1,42 @@
+"""
+API-only deployment profile.
+
+The API authenticates with JWT and only speaks JSON, so the processes
+serving it do not need the admin, sessions, messages, static files,
+templates or the browsable API. Dropping them means fewer modules to
+import when a worker boots and less memory per worker. Use it for the API
+processes, and the default settings for the admin and management
+commands (migrations included):
+
+    DJANGO_SETTINGS_MODULE=smartwayz_backend.settings_api gunicorn smartwayz_backend.wsgi:application
+"""
+from smartwayz_backend.settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = "smartwayz_backend.urls_api"
+
+# auth and contenttypes stay: the token blacklist references the user model
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "rest_framework",
+    "rest_framework_simplejwt.token_blacklist",
+    "corsheaders",
+    "api",
+]
+
+# No session or CSRF cookies: every request carries its JWT
+MIDDLEWARE = [
+    "api.middleware.RequestMetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
@@ -0,0 +1,17 @@
+"""
+ASGI deployment profile.
+
+Same settings as smartwayz_backend.settings, with the URL configuration
+that serves report list/create, citizen login and reverse geocoding from
+async views. Used by smartwayz_backend/asgi.py:
+
+    uvicorn smartwayz_backend.asgi:application --workers 4
+"""
+from smartwayz_backend.settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = "smartwayz_backend.urls_asgi"
+
+# Django does not support persistent connections under ASGI; rely on the
+# psycopg pool (DB_POOL, on by default) or an external pooler (e.g. PgBouncer).
+for database in DATABASES.values():  # noqa: F405
+    database["CONN_MAX_AGE"] = 0
@@ -0,0 +1,26 @@
+"""
+Test suite profile.
+
+Same settings as smartwayz_backend.settings, adjusted so tests run in
+isolation. ``manage.py test`` uses it unless DJANGO_SETTINGS_MODULE says
+otherwise:
+
+    python manage.py test
+"""
+import os
+
+from smartwayz_backend.settings import *  # noqa: F401,F403
+
+# Replica routing is exercised against a local alias mirroring the
+# primary; it is only routed to when a test enables it
+if not DATABASE_REPLICAS:  # noqa: F405
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}  # noqa: F405
+
+# Per process, so nothing carries over from earlier runs
+CACHES = {
+    'default': cache_config(os.environ.get('CACHE_URL', 'locmem://')),  # noqa: F405
+}
+
+# Throttle buckets would carry over between tests; the throttling tests
+# turn it on
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', 'False') == 'True'
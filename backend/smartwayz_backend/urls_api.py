@@ -0,0 +1,12 @@
+"""
+URL configuration of the API-only deployment profile: the API and
+/metrics, without the admin.
+"""
+from django.urls import path, include
+
+from api.views.metrics import metrics
+
+urlpatterns = [
+    path("api/", include("api.urls")),
+    path("metrics", metrics, name="metrics"),
+]
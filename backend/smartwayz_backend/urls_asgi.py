@@ -0,0 +1,24 @@
+"""
+URL configuration of the ASGI deployment profile.
+
+Routes the hot endpoints to their async views and everything else to the
+regular (sync) URL configuration, which Django runs in a thread. Under
+the API-only settings (no admin) that is smartwayz_backend.urls_api.
+"""
+from django.apps import apps
+from django.urls import path
+
+from api.views.auth import alogin_citizen
+from api.views.geocoding import areverse_geocode
+from api.views.report import areport_list_create
+
+if apps.is_installed("django.contrib.admin"):
+    from smartwayz_backend.urls import urlpatterns as sync_urlpatterns
+else:
+    from smartwayz_backend.urls_api import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/reports/", areport_list_create, name="report-list"),
+    path("api/auth/login/citizen/", alogin_citizen, name="login-citizen"),
+    path("api/geocoding/reverse/", areverse_geocode, name="reverse-geocode"),
+] + sync_urlpatterns